@@ -50,6 +50,9 @@ CREATE INDEX IF NOT EXISTS idx_trades_status ON trades(status);
 CREATE INDEX IF NOT EXISTS idx_trades_create_time ON trades(create_time DESC);
 CREATE INDEX IF NOT EXISTS idx_trades_update_time ON trades(update_time DESC);
 CREATE INDEX IF NOT EXISTS idx_trades_account ON trades(account);
+-- Keyset pagination in search-service walks (sort time, id) in descending order
+CREATE INDEX IF NOT EXISTS idx_trades_update_time_id ON trades(update_time DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_trades_create_time_id ON trades(create_time DESC, id DESC);
 
 -- Create transactions table
 -- Schema matches production: stores transaction flow for each trade
@@ -135,4 +138,38 @@ ALTER SEQUENCE solutions_id_seq RESTART WITH 100000;
 -- Create indexes for solutions table
 CREATE INDEX IF NOT EXISTS idx_solutions_exception_id ON solutions(exception_id);
 CREATE INDEX IF NOT EXISTS idx_solutions_scores ON solutions(scores DESC);
-CREATE INDEX IF NOT EXISTS idx_solutions_create_time ON solutions(create_time DESC);
\ No newline at end of file
+CREATE INDEX IF NOT EXISTS idx_solutions_create_time ON solutions(create_time DESC);
+
+-- Create trade_filter_values table (search-service filter options snapshot)
+-- One row per distinct value of each trade filter field; kept in sync with trades by search-service
+CREATE TABLE IF NOT EXISTS trade_filter_values (
+    field VARCHAR(32) NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (field, value)
+);
+
+-- Create exception_rollup table (search-service chat analytics)
+-- Exception counts per day x trade attributes x priority x msg, maintained by search-service
+CREATE TABLE IF NOT EXISTS exception_rollup (
+    day DATE NOT NULL,
+    booking_system VARCHAR(50) NOT NULL,
+    asset_type VARCHAR(50) NOT NULL,
+    affirmation_system VARCHAR(50) NOT NULL,
+    clearing_house VARCHAR(50) NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    priority VARCHAR(20) NOT NULL,
+    msg TEXT NOT NULL,
+    exception_count INTEGER NOT NULL,
+    affected_trades INTEGER NOT NULL,
+    first_msg_trades INTEGER NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_exception_rollup_day ON exception_rollup(day);
+
+-- Day each trade's exceptions are counted under in exception_rollup
+CREATE TABLE IF NOT EXISTS exception_rollup_trades (
+    trade_id INTEGER PRIMARY KEY,
+    day DATE NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_exception_rollup_trades_day ON exception_rollup_trades(day);
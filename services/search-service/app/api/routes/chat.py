@@ -2,25 +2,46 @@
 Chat API route for LLM-led analytics and table retrieval.
 """
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
 
 from app.models.chat import ChatRequest, ChatResponse, ToolsManifestResponse
 from app.services.chat_service import chat_service
+from app.utils.exceptions import LLMCapacityError
 from app.utils.logger import logger
 
 router = APIRouter(prefix="/api", tags=["chat"])
 
+SSE_MEDIA_TYPE = "text/event-stream"
+
 
 @router.post("/chat", response_model=ChatResponse, status_code=status.HTTP_200_OK)
-async def chat(request: ChatRequest) -> ChatResponse:
-    """Handle free-form chat query and return table, analysis, or both."""
+async def chat(request: ChatRequest, http_request: Request):
+    """
+    Handle free-form chat query and return table, analysis, or both.
+
+    **Streaming (optional):** send `Accept: text/event-stream` to receive server-sent
+    events instead: `params` (extracted filters), one `tool_result` per tool call as it
+    completes (table rows, evidence, chart), `answer_delta` text chunks (`answer_reset`
+    discards text streamed so far), then `done` with the full response or `error`.
+    """
     logger.info(
         "Received chat request",
         extra={"user_id": request.user_id, "message_preview": request.message[:120]},
     )
 
+    if SSE_MEDIA_TYPE in http_request.headers.get("accept", ""):
+        # Failures after this point arrive as an "error" event
+        return StreamingResponse(
+            chat_service.stream_chat(request),
+            media_type=SSE_MEDIA_TYPE,
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
     try:
         return await chat_service.execute_chat(request)
+    except LLMCapacityError:
+        raise  # 503 via the app-level handler
     except Exception as exc:
         logger.error(
             "Chat endpoint failed",
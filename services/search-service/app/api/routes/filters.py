@@ -3,10 +3,12 @@ Filter Options Routes
 Provides distinct values for trade filter dropdowns without fetching full trade data.
 """
 
-from fastapi import APIRouter, HTTPException, status
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Response, status
 from pydantic import BaseModel
 
-from app.database.connection import db_manager
+from app.services.filter_options_service import filter_options_service
 from app.utils.logger import logger
 
 router = APIRouter(prefix="/api", tags=["filters"])
@@ -23,37 +25,29 @@ class FilterOptions(BaseModel):
     statuses: list[str]
 
 
-@router.get("/filter-options", response_model=FilterOptions, status_code=status.HTTP_200_OK)
-async def get_filter_options():
+@router.get(
+    "/filter-options",
+    response_model=FilterOptions,
+    status_code=status.HTTP_200_OK,
+    responses={304: {"description": "Options unchanged since the ETag in If-None-Match"}},
+)
+async def get_filter_options(response: Response, if_none_match: Optional[str] = Header(default=None)):
     """
     Return all distinct values for each trade filter dropdown.
 
-    Runs a single aggregation query instead of fetching every trade row,
-    so this stays fast regardless of table size.
-    """
-    query = """
-        SELECT
-            array_agg(DISTINCT account   ORDER BY account)            FILTER (WHERE account IS NOT NULL)            AS accounts,
-            array_agg(DISTINCT asset_type ORDER BY asset_type)        FILTER (WHERE asset_type IS NOT NULL)         AS asset_types,
-            array_agg(DISTINCT booking_system ORDER BY booking_system) FILTER (WHERE booking_system IS NOT NULL)    AS booking_systems,
-            array_agg(DISTINCT affirmation_system ORDER BY affirmation_system) FILTER (WHERE affirmation_system IS NOT NULL) AS affirmation_systems,
-            array_agg(DISTINCT clearing_house ORDER BY clearing_house) FILTER (WHERE clearing_house IS NOT NULL)   AS clearing_houses,
-            array_agg(DISTINCT status ORDER BY status)                FILTER (WHERE status IS NOT NULL)            AS statuses
-        FROM trades;
+    Served from a cached snapshot of the distinct-values table, so the cost does not
+    depend on the number of trades. The response carries an ETag; clients sending it
+    back in If-None-Match get 304 Not Modified until a value is added or removed.
     """
-
     try:
-        async with db_manager.acquire() as conn:
-            row = await conn.fetchrow(query)
-
-        return FilterOptions(
-            accounts=list(row["accounts"] or []),
-            asset_types=list(row["asset_types"] or []),
-            booking_systems=list(row["booking_systems"] or []),
-            affirmation_systems=list(row["affirmation_systems"] or []),
-            clearing_houses=list(row["clearing_houses"] or []),
-            statuses=list(row["statuses"] or []),
-        )
+        snapshot = await filter_options_service.get_snapshot()
+        headers = {"ETag": snapshot["etag"], "Cache-Control": "no-cache"}
+        client_tags = {tag.strip().removeprefix("W/") for tag in (if_none_match or "").split(",")}
+        if "*" in client_tags or snapshot["etag"] in client_tags:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        response.headers.update(headers)
+        return FilterOptions(**snapshot["options"])
 
     except Exception as e:
         logger.error(f"Failed to fetch filter options: {e}")
@@ -10,6 +10,13 @@ from fastapi import APIRouter, HTTPException, status
 from app.cache.redis_client import redis_manager
 from app.config.settings import settings
 from app.database.connection import db_manager
+from app.services.analytics_snapshot import analytics_snapshot
+from app.services.exception_rollup import exception_rollup
+from app.services.filter_options_service import filter_options_service
+from app.services.llm_executor import llm_executor
+from app.services.query_history_writer import query_history_writer
+from app.services.similar_extraction_cache import similar_extraction_cache
+from app.services.suggestion_index import suggestion_index
 from app.utils.logger import logger
 
 router = APIRouter(tags=["health"])
@@ -151,6 +158,7 @@ async def readiness_check():
             readiness_status["checks"]["database"] = {
                 "ready": db_healthy,
                 "pool_size": f"{db_manager._pool.get_size()}/{db_manager._pool.get_max_size()}",
+                "statement_cache": db_manager.statement_cache_stats(),
             }
 
             if not db_healthy:
@@ -169,11 +177,19 @@ async def readiness_check():
             }
         else:
             redis_healthy = await redis_manager.health_check()
-            readiness_status["checks"]["cache"] = {"ready": redis_healthy}
+            readiness_status["checks"]["cache"] = {"ready": redis_healthy, "tiers": redis_manager.stats()}
 
     except Exception as e:
         readiness_status["checks"]["cache"] = {"ready": False, "error": str(e)}
 
+    readiness_status["checks"]["similar_extractions"] = similar_extraction_cache.stats()
+    readiness_status["checks"]["llm"] = llm_executor.stats()
+    readiness_status["checks"]["query_history_writer"] = query_history_writer.stats()
+    readiness_status["checks"]["suggestion_index"] = suggestion_index.stats()
+    readiness_status["checks"]["filter_options"] = filter_options_service.stats()
+    readiness_status["checks"]["exception_rollup"] = exception_rollup.stats()
+    readiness_status["checks"]["analytics_snapshot"] = analytics_snapshot.stats()
+
     if not is_ready:
         readiness_status["ready"] = False
 
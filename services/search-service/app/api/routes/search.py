@@ -3,7 +3,8 @@ Search API Routes
 POST /search endpoint for natural language and manual trade searches.
 """
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.responses import Response, StreamingResponse
 
 from app.models.request import SearchRequest
 from app.models.response import SearchResponse
@@ -18,14 +19,18 @@ from app.utils.logger import logger
 
 router = APIRouter(prefix="/api", tags=["search"])
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
 
 @router.post("/search", response_model=SearchResponse, status_code=status.HTTP_200_OK)
-async def search_trades(request: SearchRequest):
+async def search_trades(request: SearchRequest, http_request: Request):
     """
     Execute trade search using natural language query or manual filters.
 
     **Natural Language Search Flow:**
-    1. Extract parameters from query using AWS Bedrock (Claude 3.5 Sonnet)
+    1. Extract parameters from query: a rule-based parser handles simple queries over known
+       filter values (`extraction_method: "rules"`), a close rewording of a recent query reuses its
+       extraction (`"similar"`), anything else goes to AWS Bedrock (`"llm"`)
     2. Build parameterized SQL query from extracted parameters
     3. Execute query against trades database
     4. Save query to history
@@ -65,14 +70,28 @@ async def search_trades(request: SearchRequest):
     {
       "query_id": 42,
       "total_results": 15,
+      "total_results_exact": true,
       "results": [...],
       "search_type": "natural_language",
       "cached": false,
       "execution_time_ms": 234.5,
-      "extracted_params": {...}
+      "extracted_params": {...},
+      "extraction_method": "llm",
+      "next_cursor": null
     }
     ```
 
+    `total_results` counts every matching trade, not just the returned rows. Broad filters
+    report the planner's estimate (`total_results_exact: false`) instead of a full COUNT(*).
+
+    **Pagination (optional):** send `page_size` (and, for later pages, the previous
+    response's `next_cursor` as `cursor`) to page through results newest-first by
+    (update_time or filters.date_type, id). Ranking reorders within each page.
+
+    **Streaming (optional):** send `Accept: application/x-ndjson` to receive one trade
+    JSON object per line as rows are produced. Metadata moves to response headers
+    (`X-Query-Id`, `X-Search-Type`, `X-Ranking-Mode`); pagination is not supported.
+
     **Error Responses:**
     - 400: Invalid request (missing required fields, validation failed)
     - 422: AI response parsing error or validation error
@@ -86,6 +105,15 @@ async def search_trades(request: SearchRequest):
     )
 
     try:
+        if NDJSON_MEDIA_TYPE in http_request.headers.get("accept", ""):
+            headers, lines = await search_orchestrator.stream_search(request)
+            return StreamingResponse(lines, media_type=NDJSON_MEDIA_TYPE, headers=headers)
+
+        # Without Python ranking, Postgres builds the results JSON and we pass the bytes through
+        if search_orchestrator.can_assemble_json(request):
+            body = await search_orchestrator.execute_search_json(request)
+            return Response(content=body, media_type="application/json")
+
         # Execute search through orchestrator
         result = await search_orchestrator.execute_search(request)
 
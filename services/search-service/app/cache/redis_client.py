@@ -1,14 +1,21 @@
 """
 Redis cache client for caching search results and AI extractions.
 Provides connection management and common cache operations.
+
+Keys under LOCAL_CACHE_PREFIXES are also kept in an in-process LRU tier, so hot reads
+skip the network round trip and JSON decode. Writes and deletes publish the key on
+CACHE_INVALIDATION_CHANNEL and every replica drops its local copy.
 """
 
+import asyncio
 import hashlib
 import json
+import uuid
 from typing import Any, Optional
 
 import redis.asyncio as redis
 
+from app.cache.local_cache import LocalCache
 from app.config.settings import settings
 from app.utils.exceptions import CacheConnectionError, CacheOperationError
 from app.utils.logger import logger
@@ -17,8 +24,15 @@ from app.utils.logger import logger
 class RedisManager:
     """Manages Redis connection and cache operations"""
 
+    RECONNECT_DELAY_SECONDS = 5.0
+
     def __init__(self):
         self._client: Optional[redis.Redis] = None
+        self.local = LocalCache(settings.LOCAL_CACHE_MAX_ENTRIES, settings.LOCAL_CACHE_TTL_SECONDS)
+        self.redis_hits = 0
+        self.redis_misses = 0
+        self._instance_id = uuid.uuid4().hex
+        self._invalidation_task: Optional[asyncio.Task] = None
 
     async def connect(self) -> None:
         """
@@ -79,12 +93,24 @@ class RedisManager:
             key: Cache key
 
         Returns:
-            Cached value (deserialized from JSON) or None if not found
+            Cached value (deserialized from JSON) or None if not found.
+            Values served from the local tier are shared; treat them as read-only.
         """
+        local = self._is_local(key)
+        if local:
+            value = self.local.get(key)
+            if value is not None:
+                return value
+
         try:
             value = await self.client.get(key)
             if value:
-                return json.loads(value)
+                self.redis_hits += 1
+                decoded = json.loads(value)
+                if local:
+                    self.local.set(key, decoded)
+                return decoded
+            self.redis_misses += 1
             return None
         except json.JSONDecodeError as e:
             logger.warning(f"Failed to decode cached value for key {key}: {e}")
@@ -111,11 +137,15 @@ class RedisManager:
                 await self.client.setex(key, ttl, serialized)
             else:
                 await self.client.set(key, serialized)
-            return True
         except Exception as e:
             logger.error(f"Cache set error: {e}", extra={"key": key})
             raise CacheOperationError("Failed to set value in cache", details={"error": str(e), "key": key})
 
+        if self._is_local(key):
+            self.local.set(key, value, ttl)
+            await self._publish_invalidation({"keys": [key]})
+        return True
+
     async def delete(self, key: str) -> bool:
         """
         Delete value from cache.
@@ -126,6 +156,10 @@ class RedisManager:
         Returns:
             True if key was deleted, False if key didn't exist
         """
+        if self._is_local(key):
+            self.local.delete(key)
+            await self._publish_invalidation({"keys": [key]})
+
         try:
             result = await self.client.delete(key)
             return result > 0
@@ -156,6 +190,67 @@ class RedisManager:
                 details={"error": str(e), "key": key},
             )
 
+    async def hset(self, key: str, field: str, value: Any) -> None:
+        """
+        Set a field of a hash (value serialized to JSON).
+
+        Args:
+            key: Hash key
+            field: Field name within the hash
+            value: Value to store (will be serialized to JSON)
+        """
+        try:
+            await self.client.hset(key, field, json.dumps(value))
+        except Exception as e:
+            logger.error(f"Cache hset error: {e}", extra={"key": key, "field": field})
+            raise CacheOperationError(
+                "Failed to set hash field in cache",
+                details={"error": str(e), "key": key, "field": field},
+            )
+
+    async def hgetall(self, key: str) -> dict[str, Any]:
+        """
+        Get all fields of a hash.
+
+        Args:
+            key: Hash key
+
+        Returns:
+            Mapping of field name to deserialized value (undecodable fields are skipped)
+        """
+        try:
+            raw = await self.client.hgetall(key)
+        except Exception as e:
+            logger.error(f"Cache hgetall error: {e}", extra={"key": key})
+            raise CacheOperationError("Failed to read hash from cache", details={"error": str(e), "key": key})
+
+        decoded: dict[str, Any] = {}
+        for field, value in raw.items():
+            try:
+                decoded[field] = json.loads(value)
+            except (TypeError, json.JSONDecodeError):
+                logger.warning(f"Failed to decode hash field {field} in {key}")
+        return decoded
+
+    async def hdel(self, key: str, *fields: str) -> int:
+        """
+        Delete fields from a hash.
+
+        Args:
+            key: Hash key
+            *fields: Field names to remove
+
+        Returns:
+            Number of fields removed
+        """
+        if not fields:
+            return 0
+        try:
+            return await self.client.hdel(key, *fields)
+        except Exception as e:
+            logger.error(f"Cache hdel error: {e}", extra={"key": key})
+            raise CacheOperationError("Failed to delete hash fields from cache", details={"error": str(e), "key": key})
+
     async def clear_pattern(self, pattern: str) -> int:
         """
         Delete all keys matching a pattern.
@@ -166,6 +261,9 @@ class RedisManager:
         Returns:
             Number of keys deleted
         """
+        self.local.delete_pattern(pattern)
+        await self._publish_invalidation({"pattern": pattern})
+
         try:
             keys = []
             async for key in self.client.scan_iter(match=pattern):
@@ -181,6 +279,91 @@ class RedisManager:
                 details={"error": str(e), "pattern": pattern},
             )
 
+    def stats(self) -> dict[str, Any]:
+        """Hit/miss/eviction counters per tier since startup."""
+        lookups = self.redis_hits + self.redis_misses
+        return {
+            "local": self.local.stats(),
+            "redis": {
+                "hits": self.redis_hits,
+                "misses": self.redis_misses,
+                "hit_rate": round(self.redis_hits / lookups, 4) if lookups else 0.0,
+            },
+        }
+
+    def _is_local(self, key: str) -> bool:
+        return settings.LOCAL_CACHE_ENABLED and key.startswith(tuple(settings.LOCAL_CACHE_PREFIXES))
+
+    async def _publish_invalidation(self, message: dict[str, Any]) -> None:
+        """Tell other replicas to drop local copies; failures only cost staleness up to the local TTL."""
+        if not settings.LOCAL_CACHE_ENABLED or self._client is None:
+            return
+        try:
+            payload = json.dumps({**message, "origin": self._instance_id})
+            await self._client.publish(settings.CACHE_INVALIDATION_CHANNEL, payload)
+        except Exception as e:
+            logger.warning(f"Cache invalidation publish failed: {e}", extra=message)
+
+    def apply_invalidation(self, raw_message: Any) -> None:
+        """Drop local entries named by an invalidation message from another replica."""
+        try:
+            message = json.loads(raw_message)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Ignoring malformed cache invalidation: {e}")
+            return
+        if message.get("origin") == self._instance_id:
+            return
+        for key in message.get("keys", []):
+            self.local.delete(key)
+        if message.get("pattern"):
+            self.local.delete_pattern(message["pattern"])
+
+    def start_invalidation_listener(self) -> None:
+        """Subscribe to cross-replica invalidations for the local tier (idempotent)."""
+        if not settings.LOCAL_CACHE_ENABLED:
+            return
+        if self._invalidation_task is None or self._invalidation_task.done():
+            self._invalidation_task = asyncio.create_task(
+                self._listen_invalidations(), name="cache-invalidation-listener"
+            )
+            logger.info("Cache invalidation listener started", extra={"channel": settings.CACHE_INVALIDATION_CHANNEL})
+
+    async def stop_invalidation_listener(self) -> None:
+        """Cancel the invalidation subscription task."""
+        if self._invalidation_task is None:
+            return
+        self._invalidation_task.cancel()
+        try:
+            await self._invalidation_task
+        except asyncio.CancelledError:
+            pass
+        self._invalidation_task = None
+
+    async def _listen_invalidations(self) -> None:
+        """Apply invalidations forever, reconnecting after Redis failures."""
+        while True:
+            pubsub = None
+            try:
+                pubsub = self.client.pubsub()
+                await pubsub.subscribe(settings.CACHE_INVALIDATION_CHANNEL)
+                while True:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message and message.get("type") == "message":
+                        self.apply_invalidation(message.get("data"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Messages may have been missed while disconnected
+                self.local.clear()
+                logger.warning(f"Cache invalidation subscription failed, retrying: {e}")
+                await asyncio.sleep(self.RECONNECT_DELAY_SECONDS)
+            finally:
+                if pubsub is not None:
+                    try:
+                        await pubsub.aclose()
+                    except Exception:
+                        pass
+
     async def health_check(self) -> bool:
         """
         Check if Redis connection is healthy.
@@ -208,9 +391,24 @@ class CacheKeys:
         return f"ai:extraction:{query_hash}"
 
     @staticmethod
-    def search_results(user_id: str, query_hash: str) -> str:
-        """Cache key for search results"""
-        return f"search:results:{user_id}:{query_hash}"
+    def search_results(query_hash: str) -> str:
+        """Cache key for search results (shared across users - results are not user-specific)"""
+        return f"search:results:{query_hash}"
+
+    @staticmethod
+    def search_results_index() -> str:
+        """Hash of cached search entries -> predicate + result ids, used for targeted eviction"""
+        return "search:results:index"
+
+    @staticmethod
+    def search_count(query_hash: str) -> str:
+        """Cache key for an estimated total match count (shared across users)"""
+        return f"search:count:{query_hash}"
+
+    @staticmethod
+    def filter_options() -> str:
+        """Cache key for the filter options snapshot (served from the local tier)"""
+        return "filters:options"
 
     @staticmethod
     def query_history(user_id: str) -> str:
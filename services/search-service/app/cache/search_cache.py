@@ -0,0 +1,319 @@
+"""
+Search result cache with predicate-aware invalidation.
+
+Entries are keyed on the canonical SQL plus bound parameters produced by QueryBuilder,
+so two requests that compile to the same statement share one entry regardless of user.
+Alongside each entry we keep the filter predicate and the returned trade ids; when a
+trade changes, only entries that contained the trade or whose filters could match its
+new state are evicted. Everything else keeps serving until its TTL.
+"""
+
+import hashlib
+import json
+import re
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Optional, Tuple
+
+from app.cache.redis_client import CacheKeys, redis_manager
+from app.config.settings import settings
+from app.models.domain import ExtractedParams, Trade
+from app.models.request import ManualSearchFilters
+from app.utils.logger import logger
+
+
+class TradePredicate:
+    """
+    Python mirror of the WHERE clause QueryBuilder emits, evaluated against a trade row.
+
+    Only used to decide whether a changed trade *could* appear in a cached result, so any
+    condition that cannot be checked from the trade row alone (EXISTS on exceptions) is
+    treated as satisfied.
+    """
+
+    COLUMNS = ("account", "asset_type", "booking_system", "affirmation_system", "clearing_house", "status")
+
+    def __init__(
+        self,
+        trade_id: Optional[int] = None,
+        allowed: Optional[dict[str, list[str]]] = None,
+        date_field: str = "update_time",
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        with_exceptions_only: bool = False,
+    ):
+        self.trade_id = trade_id
+        self.allowed = {column: list(values) for column, values in (allowed or {}).items() if values}
+        self.date_field = date_field
+        self.date_from = date_from
+        self.date_to = date_to
+        self.with_exceptions_only = with_exceptions_only
+
+    @classmethod
+    def from_extracted_params(cls, params: ExtractedParams) -> "TradePredicate":
+        """Build predicate matching QueryBuilder.build_from_extracted_params."""
+        if params.trade_id is not None:
+            return cls(trade_id=params.trade_id)
+
+        allowed = {
+            "account": params.accounts or [],
+            "asset_type": params.asset_types or [],
+            "booking_system": params.booking_systems or [],
+            "affirmation_system": params.affirmation_systems or [],
+            "clearing_house": params.clearing_houses or [],
+            "status": params.statuses or [],
+        }
+        if params.cleared_trades_only:
+            allowed["status"] = cls._intersect(allowed["status"], ["CLEARED"])
+
+        return cls(
+            allowed=allowed,
+            date_field="update_time",
+            date_from=params.date_from,
+            date_to=params.date_to,
+            with_exceptions_only=params.with_exceptions_only,
+        )
+
+    @classmethod
+    def from_manual_filters(cls, filters: ManualSearchFilters) -> "TradePredicate":
+        """Build predicate matching QueryBuilder.build_from_manual_filters."""
+        allowed = {
+            "account": [filters.account] if filters.account else [],
+            "asset_type": [filters.asset_type] if filters.asset_type else [],
+            "booking_system": [filters.booking_system] if filters.booking_system else [],
+            "affirmation_system": [filters.affirmation_system] if filters.affirmation_system else [],
+            "clearing_house": [filters.clearing_house] if filters.clearing_house else [],
+            "status": list(filters.status or []),
+        }
+        if filters.cleared_trades_only:
+            allowed["status"] = cls._intersect(allowed["status"], ["CLEARED"])
+
+        return cls(
+            trade_id=int(filters.trade_id) if filters.trade_id else None,
+            allowed=allowed,
+            date_field=filters.date_type,
+            date_from=filters.date_from,
+            date_to=filters.date_to,
+            with_exceptions_only=filters.with_exceptions_only,
+        )
+
+    @staticmethod
+    def _intersect(current: list[str], required: list[str]) -> list[str]:
+        """AND two IN-lists together; an impossible combination keeps a sentinel no row matches."""
+        if not current:
+            return list(required)
+        merged = [value for value in current if value in required]
+        return merged or ["__none__"]
+
+    def matches(self, row: dict[str, Any]) -> bool:
+        """Return True if a trade row could satisfy this predicate."""
+        if self.trade_id is not None and int(row.get("id", row.get("trade_id", -1))) != self.trade_id:
+            return False
+
+        for column, values in self.allowed.items():
+            if row.get(column) not in values:
+                return False
+
+        if self.date_from or self.date_to:
+            row_time = self._coerce_datetime(row.get(self.date_field))
+            if row_time is None:
+                return True  # Unknown timestamp - be conservative
+            if self.date_from and row_time < datetime.strptime(self.date_from, "%Y-%m-%d"):
+                return False
+            if self.date_to and row_time >= datetime.strptime(self.date_to, "%Y-%m-%d") + timedelta(days=1):
+                return False
+
+        # with_exceptions_only needs the exceptions table; assume it could match.
+        return True
+
+    @staticmethod
+    def _coerce_datetime(value: Any) -> Optional[datetime]:
+        if isinstance(value, datetime):
+            return value.replace(tzinfo=None)
+        if isinstance(value, date):
+            return datetime(value.year, value.month, value.day)
+        if isinstance(value, str):
+            try:
+                return datetime.fromisoformat(value.replace("Z", "+00:00")).replace(tzinfo=None)
+            except ValueError:
+                return None
+        return None
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "trade_id": self.trade_id,
+            "allowed": self.allowed,
+            "date_field": self.date_field,
+            "date_from": self.date_from,
+            "date_to": self.date_to,
+            "with_exceptions_only": self.with_exceptions_only,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "TradePredicate":
+        return cls(**data)
+
+
+class SearchResultCache:
+    """
+    Redis-backed cache of ranked search results.
+
+    Layout:
+        search:results:{hash}   -> {"results": [...trade dicts...], "next_cursor": str | null} with TTL,
+                                   or {"results_json": str, "total_results": int} for SQL-assembled results
+        search:results:index    -> hash {entry hash -> {"predicate", "trade_ids", "expires_at"}}
+    """
+
+    _WHITESPACE = re.compile(r"\s+")
+
+    def __init__(self):
+        self.cache = redis_manager
+        self.ttl = settings.CACHE_TTL_SEARCH_RESULTS
+
+    @property
+    def enabled(self) -> bool:
+        return settings.SEARCH_CACHE_ENABLED
+
+    def build_hash(self, sql_query: str, params: list[Any]) -> str:
+        """Canonical hash of SQL text (whitespace-collapsed) plus bound parameter values."""
+        canonical_sql = self._WHITESPACE.sub(" ", sql_query).strip()
+        canonical_params = json.dumps(params, default=str, separators=(",", ":"))
+        return hashlib.sha256(f"{canonical_sql}|{canonical_params}".encode()).hexdigest()[:32]
+
+    async def get(self, sql_query: str, params: list[Any]) -> Optional[Tuple[list[Trade], Optional[str]]]:
+        """Return cached (trades, next_cursor) for this statement, or None on miss / cache failure."""
+        if not self.enabled:
+            return None
+
+        entry_hash = self.build_hash(sql_query, params)
+        try:
+            payload = await self.cache.get(CacheKeys.search_results(entry_hash))
+            if not payload:
+                return None
+            return [Trade(**row) for row in payload.get("results", [])], payload.get("next_cursor")
+        except Exception as e:
+            logger.warning(f"Search cache read error: {e}", extra={"entry_hash": entry_hash})
+            return None
+
+    async def set(
+        self,
+        sql_query: str,
+        params: list[Any],
+        predicate: TradePredicate,
+        trades: list[Trade],
+        next_cursor: Optional[str] = None,
+    ) -> None:
+        """Store ranked trades (and the page cursor) and register the entry for targeted invalidation."""
+        if not self.enabled:
+            return
+
+        entry_hash = self.build_hash(sql_query, params)
+        try:
+            await self.cache.set(
+                CacheKeys.search_results(entry_hash),
+                {"results": [trade.model_dump() for trade in trades], "next_cursor": next_cursor},
+                ttl=self.ttl,
+            )
+            await self._register(entry_hash, predicate, [trade.trade_id for trade in trades])
+        except Exception as e:
+            logger.warning(f"Search cache write error: {e}", extra={"entry_hash": entry_hash})
+
+    async def get_json(self, sql_query: str, params: list[Any]) -> Optional[Tuple[str, int]]:
+        """Return cached (results JSON text, row count) for a SQL-assembled search, or None on miss / cache failure."""
+        if not self.enabled:
+            return None
+
+        entry_hash = self.build_hash(sql_query, params)
+        try:
+            payload = await self.cache.get(CacheKeys.search_results(entry_hash))
+            if not payload or "results_json" not in payload:
+                return None
+            return payload["results_json"], payload["total_results"]
+        except Exception as e:
+            logger.warning(f"Search cache read error: {e}", extra={"entry_hash": entry_hash})
+            return None
+
+    async def set_json(
+        self,
+        sql_query: str,
+        params: list[Any],
+        predicate: TradePredicate,
+        results_json: str,
+        trade_ids: list[int],
+    ) -> None:
+        """Store a SQL-assembled results array as-is and register it for targeted invalidation."""
+        if not self.enabled:
+            return
+
+        entry_hash = self.build_hash(sql_query, params)
+        try:
+            await self.cache.set(
+                CacheKeys.search_results(entry_hash),
+                {"results_json": results_json, "total_results": len(trade_ids)},
+                ttl=self.ttl,
+            )
+            await self._register(entry_hash, predicate, trade_ids)
+        except Exception as e:
+            logger.warning(f"Search cache write error: {e}", extra={"entry_hash": entry_hash})
+
+    async def _register(self, entry_hash: str, predicate: TradePredicate, trade_ids: list[int]) -> None:
+        """Add an entry to the invalidation index."""
+        await self.cache.hset(
+            CacheKeys.search_results_index(),
+            entry_hash,
+            {
+                "predicate": predicate.to_dict(),
+                "trade_ids": list(trade_ids),
+                "expires_at": time.time() + self.ttl,
+            },
+        )
+
+    async def invalidate_trade(
+        self,
+        trade_id: int,
+        trade_row: Optional[dict[str, Any]],
+        event: Optional[dict[str, Any]] = None,  # pylint: disable=unused-argument
+    ) -> int:
+        """
+        Evict cached entries a changed trade could affect.
+
+        An entry is evicted when the trade was in its result set (old state) or the
+        trade's current row satisfies its predicate (new state). Expired index entries
+        are pruned on the way through.
+
+        Returns:
+            Number of cache entries evicted
+        """
+        if not self.enabled:
+            return 0
+
+        index_key = CacheKeys.search_results_index()
+        index = await self.cache.hgetall(index_key)
+        now = time.time()
+
+        stale: list[str] = []
+        evict: list[str] = []
+        for entry_hash, meta in index.items():
+            if meta.get("expires_at", 0) < now:
+                stale.append(entry_hash)
+                continue
+            if trade_id in meta.get("trade_ids", []):
+                evict.append(entry_hash)
+                continue
+            if trade_row is None or TradePredicate.from_dict(meta.get("predicate", {})).matches(trade_row):
+                evict.append(entry_hash)
+
+        for entry_hash in evict:
+            await self.cache.delete(CacheKeys.search_results(entry_hash))
+        await self.cache.hdel(index_key, *(stale + evict))
+
+        if evict:
+            logger.info(
+                "Evicted search cache entries for changed trade",
+                extra={"trade_id": trade_id, "evicted": len(evict), "remaining": len(index) - len(evict) - len(stale)},
+            )
+        return len(evict)
+
+
+# Global singleton instance
+search_result_cache = SearchResultCache()
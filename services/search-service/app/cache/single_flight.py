@@ -0,0 +1,152 @@
+"""
+Single-flight request coalescing.
+
+Concurrent callers asking for the same key share one in-flight computation instead of
+each repeating it (e.g. identical natural-language queries at market open each missing
+the extraction cache and calling the LLM). Within a process callers share one task;
+across replicas a short Redis lock elects one leader while the others poll the cache
+it will populate.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+from app.cache.redis_client import redis_manager
+from app.config.settings import settings
+from app.utils.logger import logger
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent computations by key.
+
+    compute() is expected to write its result to the cache that get_cached() reads;
+    replicas that lose the Redis lock wait for that entry and only compute themselves
+    if it does not appear before SINGLE_FLIGHT_WAIT_SECONDS.
+    """
+
+    POLL_INTERVAL_SECONDS = 0.1
+
+    def __init__(
+        self,
+        lock_ttl: int = settings.SINGLE_FLIGHT_LOCK_TTL_SECONDS,
+        wait_timeout: float = settings.SINGLE_FLIGHT_WAIT_SECONDS,
+    ):
+        self.lock_ttl = lock_ttl
+        self.wait_timeout = wait_timeout
+        self.cache = redis_manager
+        self._inflight: dict[str, asyncio.Task] = {}
+        self.leaders = 0
+        self.coalesced = 0
+        self.remote_hits = 0
+        self.remote_timeouts = 0
+
+    async def run(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[T]],
+        get_cached: Callable[[], Awaitable[Optional[T]]],
+    ) -> T:
+        """
+        Return compute()'s result for key, sharing it with every concurrent caller.
+
+        The shared work runs in its own task, so a cancelled caller (e.g. a client
+        disconnect) does not cancel it for the others.
+
+        Args:
+            key: Coalescing key (the cache key compute() populates)
+            compute: Coroutine factory doing the expensive work
+            get_cached: Coroutine factory reading the cached result, None on miss
+
+        Returns:
+            The shared result; exceptions from compute() propagate to every caller
+        """
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            logger.info("Coalesced onto in-flight request", extra={"key": key, "coalesced": self.coalesced})
+            return await asyncio.shield(task)
+
+        self.leaders += 1
+        task = asyncio.create_task(self._lead(key, compute, get_cached), name=f"single-flight:{key}")
+        self._inflight[key] = task
+        task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # Retrieved here in case every caller was cancelled
+
+    async def _lead(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[T]],
+        get_cached: Callable[[], Awaitable[Optional[T]]],
+    ) -> T:
+        """Compute under the cross-replica lock, or wait for the replica that holds it."""
+        lock = self._lock(key)
+        if lock is None:
+            return await compute()
+
+        try:
+            acquired = await lock.acquire(blocking=False)
+        except Exception as e:
+            logger.warning(f"Single-flight lock unavailable, computing locally: {e}", extra={"key": key})
+            return await compute()
+
+        if acquired:
+            try:
+                # Another replica may have finished between our cache miss and the lock
+                cached = await get_cached()
+                if cached is not None:
+                    return cached
+                return await compute()
+            finally:
+                await self._release(lock, key)
+
+        cached = await self._wait_for_remote(get_cached)
+        if cached is not None:
+            self.remote_hits += 1
+            logger.info("Served by another replica's in-flight request", extra={"key": key})
+            return cached
+
+        self.remote_timeouts += 1
+        logger.warning("Timed out waiting for another replica, computing locally", extra={"key": key})
+        return await compute()
+
+    def _lock(self, key: str) -> Optional[Any]:
+        try:
+            return self.cache.client.lock(f"lock:{key}", timeout=self.lock_ttl)
+        except Exception:
+            return None  # Redis not connected - in-process coalescing only
+
+    @staticmethod
+    async def _release(lock: Any, key: str) -> None:
+        try:
+            await lock.release()
+        except Exception as e:
+            # Expired (compute outlived lock_ttl) or Redis went away; the TTL cleans up
+            logger.debug(f"Single-flight lock release failed: {e}", extra={"key": key})
+
+    async def _wait_for_remote(self, get_cached: Callable[[], Awaitable[Optional[T]]]) -> Optional[T]:
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.POLL_INTERVAL_SECONDS)
+            cached = await get_cached()
+            if cached is not None:
+                return cached
+        return None
+
+    def stats(self) -> dict[str, int]:
+        """Counters since startup."""
+        return {
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "remote_hits": self.remote_hits,
+            "remote_timeouts": self.remote_timeouts,
+        }
@@ -0,0 +1,135 @@
+"""
+Trade change listener.
+Subscribes to the Redis channel that data-processing-service publishes on whenever a
+trade, transaction or exception is written, and fans the change out to in-process
+handlers (e.g. search result cache eviction).
+"""
+
+import asyncio
+import json
+from typing import Any, Awaitable, Callable, Optional
+
+from app.cache.redis_client import redis_manager
+from app.config.settings import settings
+from app.database.connection import db_manager
+from app.utils.logger import logger
+
+# Handler signature: (trade_id, current trade row or None when it could not be read, raw event payload).
+# Handlers must treat a None row conservatively (the trade could now match anything).
+TradeChangeHandler = Callable[[int, Optional[dict[str, Any]], dict[str, Any]], Awaitable[None]]
+
+
+class TradeEventListener:
+    """
+    Background subscriber for trade change events.
+
+    Message format (published by data-processing-service):
+        {"trade_id": "10001234", "data": {...transaction or exception row...}}
+
+    The payload does not carry the trade row itself, so the listener re-reads the
+    trade once per event and hands the same row to every registered handler.
+    """
+
+    TRADE_ROW_QUERY = """
+        SELECT
+            id,
+            account,
+            asset_type,
+            booking_system,
+            affirmation_system,
+            clearing_house,
+            create_time,
+            update_time,
+            status
+        FROM trades
+        WHERE id = $1::integer
+    """
+
+    RECONNECT_DELAY_SECONDS = 5.0
+
+    def __init__(self, channel: str = settings.TRADE_UPDATES_CHANNEL):
+        self.channel = channel
+        self._handlers: list[TradeChangeHandler] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, handler: TradeChangeHandler) -> None:
+        """Register an async handler invoked for every trade change event."""
+        if handler not in self._handlers:
+            self._handlers.append(handler)
+
+    def start(self) -> None:
+        """Start the background subscription task (idempotent)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="trade-event-listener")
+            logger.info("Trade event listener started", extra={"channel": self.channel})
+
+    async def stop(self) -> None:
+        """Cancel the background subscription task."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        logger.info("Trade event listener stopped", extra={"channel": self.channel})
+
+    async def _run(self) -> None:
+        """Subscribe and dispatch forever, reconnecting after Redis failures."""
+        while True:
+            pubsub = None
+            try:
+                pubsub = redis_manager.client.pubsub()
+                await pubsub.subscribe(self.channel)
+                while True:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message and message.get("type") == "message":
+                        await self.dispatch(message.get("data"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(
+                    f"Trade event subscription failed, retrying: {e}",
+                    extra={"channel": self.channel},
+                )
+                await asyncio.sleep(self.RECONNECT_DELAY_SECONDS)
+            finally:
+                if pubsub is not None:
+                    try:
+                        await pubsub.aclose()
+                    except Exception:
+                        pass
+
+    async def dispatch(self, raw_message: Any) -> None:
+        """
+        Decode one event and invoke every handler.
+
+        Handler failures are logged and isolated so one consumer cannot starve the others.
+        """
+        try:
+            event = json.loads(raw_message) if isinstance(raw_message, (str, bytes)) else dict(raw_message)
+            trade_id = int(event["trade_id"])
+        except (TypeError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring malformed trade event: {e}")
+            return
+
+        try:
+            record = await db_manager.fetchrow(self.TRADE_ROW_QUERY, trade_id)
+            trade_row = dict(record) if record else None
+        except Exception as e:
+            logger.warning(f"Failed to load changed trade {trade_id}: {e}")
+            trade_row = None
+
+        for handler in self._handlers:
+            try:
+                await handler(trade_id, trade_row, event)
+            except Exception as e:
+                logger.warning(
+                    f"Trade change handler failed: {e}",
+                    extra={"trade_id": trade_id, "handler": getattr(handler, "__qualname__", str(handler))},
+                )
+
+
+# Global listener instance
+trade_event_listener = TradeEventListener()
@@ -28,6 +28,7 @@ class Settings(BaseSettings):
     DB_POOL_MIN_SIZE: int = 2
     DB_POOL_MAX_SIZE: int = 10
     DB_COMMAND_TIMEOUT: int = 60
+    DB_STATEMENT_CACHE_SIZE: int = 256  # asyncpg prepared statements cached per connection (QueryBuilder shapes)
 
     # Redis Configuration
     REDIS_HOST: str
@@ -57,13 +58,86 @@ class Settings(BaseSettings):
     # Cache TTL (Time To Live) in seconds
     CACHE_TTL_AI_EXTRACTION: int = 3600  # 1 hour
     CACHE_TTL_SEARCH_RESULTS: int = 300  # 5 minutes
+    CACHE_TTL_SEARCH_COUNT: int = 120  # 2 minutes (estimated totals for broad filters)
     CACHE_TTL_QUERY_HISTORY: int = 900  # 15 minutes
+    CACHE_TTL_FILTER_OPTIONS: int = 3600  # Dropped explicitly whenever a value is added or removed
+    SINGLE_FLIGHT_LOCK_TTL_SECONDS: int = 30  # Cross-replica lock on an in-flight LLM extraction
+    SINGLE_FLIGHT_WAIT_SECONDS: float = 20.0  # How long other replicas wait for its cached result
+
+    # LLM call limits per provider (dedicated worker threads; excess calls queue, then get a 503)
+    LLM_MAX_CONCURRENCY: dict[str, int] = {"gemini": 8, "bedrock": 8}
+    LLM_DEFAULT_MAX_CONCURRENCY: int = 4  # Providers missing from LLM_MAX_CONCURRENCY
+    LLM_MAX_QUEUE: int = 64  # Waiting calls per provider before new ones are refused
+    LLM_QUEUE_TIMEOUT_SECONDS: float = 10.0  # Longest a call waits for a slot
+
+    # Search result cache (evicted per-trade via the trade-updates channel)
+    SEARCH_CACHE_ENABLED: bool = True
+    TRADE_UPDATES_CHANNEL: str = "trade-updates"
+
+    # In-process cache tier in front of Redis (hot, small keys only; kept coherent over pub/sub)
+    LOCAL_CACHE_ENABLED: bool = True
+    LOCAL_CACHE_MAX_ENTRIES: int = 2048
+    LOCAL_CACHE_TTL_SECONDS: int = 30  # Upper bound on staleness if an invalidation message is missed
+    LOCAL_CACHE_PREFIXES: list[str] = ["gemini:extraction:", "bedrock:extraction:", "search:count:", "filters:"]
+    CACHE_INVALIDATION_CHANNEL: str = "cache-invalidation"
+
+    # Rule-based NL parser in front of the LLM (simple queries over known filter values)
+    RULE_PARSER_ENABLED: bool = True
+    RULE_PARSER_VOCAB_TTL_SECONDS: int = 300  # Refresh interval of the filter-value vocabulary
+
+    # Near-duplicate extraction cache (reworded/misspelt repeats of recent NL queries skip the LLM)
+    SIMILAR_EXTRACTION_CACHE_ENABLED: bool = True
+    SIMILAR_EXTRACTION_THRESHOLD: float = 0.75  # Cosine similarity of n-gram TF-IDF vectors; tune with eval script
+    SIMILAR_EXTRACTION_MAX_ENTRIES: int = 5000
+
+    # Write-behind batching of new query_history rows (ids pre-allocated from the sequence)
+    HISTORY_WRITE_BEHIND_ENABLED: bool = True
+    HISTORY_BATCH_SIZE: int = 100  # Flush as soon as this many rows are buffered
+    HISTORY_FLUSH_INTERVAL_SECONDS: float = 0.5
+    HISTORY_ID_BLOCK_SIZE: int = 100  # Ids reserved per nextval round trip
+    HISTORY_MAX_PENDING: int = 10000  # Rows kept for retry while the database is unavailable
+    HISTORY_PENDING_WAIT_SECONDS: float = 2.0  # Saves/deletes wait this long for ids another replica buffered
+
+    # Filter options from the trade_filter_values table (new values added from trade change events)
+    FILTER_OPTIONS_SNAPSHOT_ENABLED: bool = True
+    FILTER_OPTIONS_RECONCILE_SECONDS: int = 3600  # Full pass over trades to add missed and drop unused values
+
+    # In-process typeahead suggestion index (filter values, trade ids, recent history per user)
+    SUGGESTION_INDEX_ENABLED: bool = True
+    SUGGESTION_INDEX_REBUILD_SECONDS: int = 900  # Full reload; trade change events keep it current in between
+    SUGGESTION_HISTORY_PER_USER: int = 200
+    SUGGESTION_HISTORY_MAX_USERS: int = 1000
+    SUGGESTION_HISTORY_TTL_SECONDS: int = 60  # Picks up other replicas' history writes
 
     # Chat Configuration
     CHAT_MAX_TOOL_ITERATIONS: int = 4
+    CHAT_TOOL_CACHE_ENABLED: bool = True  # Reuse identical SQL tool results across turns and conversations
+    CHAT_TOOL_CACHE_TTL_SECONDS: int = 30  # Short: results are not evicted on trade changes
+    CHAT_TOOL_CACHE_MAX_ENTRIES: int = 256
+    CHAT_PARALLEL_STAGES_ENABLED: bool = True  # History save and extraction overlap Gemini's first turn
+    CHAT_SPECULATIVE_TRADE_ROWS_ENABLED: bool = True  # Fetch get_trade_rows rows before Gemini asks for them
+    CHAT_TOOL_RESULT_MAX_CHARS: int = 4000  # Per-call budget (~1000 tokens) for a tool result sent to Gemini
+    CHAT_TOOL_RESULT_MAX_ROWS: int = 10  # Rows per result before the rest are folded into an "others" bucket
+
+    # Exception rollup (day x trade attributes x priority x msg) behind get_exception_analytics
+    EXCEPTION_ROLLUP_ENABLED: bool = True
+    EXCEPTION_ROLLUP_FLUSH_SECONDS: float = 2.0  # Recompute days touched by trade change events
+    EXCEPTION_ROLLUP_REBUILD_SECONDS: int = 3600  # Full rebuild (also at startup) for writes without events
+
+    # In-process columnar snapshot of trades/exceptions for chat group-bys (exception analytics, timeseries)
+    CHAT_ANALYTICS_ENGINE: str = "sql"  # "sql", "snapshot", or "compare" (serve SQL, diff against the snapshot)
+    ANALYTICS_SNAPSHOT_FLUSH_SECONDS: float = 2.0  # Re-read trades changed since the last flush
+    ANALYTICS_SNAPSHOT_REBUILD_SECONDS: int = 3600  # Full reload (also at startup) for writes without events
 
     # Application Settings
     MAX_SEARCH_RESULTS: int = 1000
+    SEARCH_PAGE_SIZE: int = 50  # Default page size when keyset pagination is requested
+    SEARCH_STREAM_PREFETCH: int = 500  # Rows per server-side cursor fetch in NDJSON mode
+    SEARCH_SQL_JSON_ENABLED: bool = True  # Let Postgres build the results JSON when no Python ranking is needed
+    SEARCH_SINGLE_ROUND_TRIP: bool = True  # Fetch transaction counts for ranking in the search query itself
+    SEARCH_RANK_IN_SQL: bool = False  # ORDER BY relevance score; cost grows with matches (scripts/README.md)
+    SEARCH_COUNT_ENABLED: bool = True  # Report total matches (not just returned rows) in total_results
+    SEARCH_EXACT_COUNT_THRESHOLD: int = 10000  # Run an exact COUNT(*) only when the planner estimate is at most this
     LOG_LEVEL: str = "INFO"
     ENABLE_CORS: bool = True
     CORS_ORIGINS: list[str] = ["*"]  # Allow all origins
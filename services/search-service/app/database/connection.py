@@ -4,7 +4,7 @@ Provides connection pooling for efficient resource usage.
 """
 
 from contextlib import asynccontextmanager
-from typing import Optional
+from typing import Any, AsyncIterator, Optional
 
 import asyncpg
 
@@ -18,6 +18,8 @@ class DatabaseManager:
 
     def __init__(self):
         self._pool: Optional[asyncpg.Pool] = None
+        self.statement_cache_hits = 0
+        self.statement_cache_misses = 0
 
     async def connect(self) -> None:
         """
@@ -34,6 +36,7 @@ class DatabaseManager:
                 min_size=settings.DB_POOL_MIN_SIZE,
                 max_size=settings.DB_POOL_MAX_SIZE,
                 command_timeout=settings.DB_COMMAND_TIMEOUT,
+                statement_cache_size=settings.DB_STATEMENT_CACHE_SIZE,
             )
             logger.info(
                 "Database connection pool initialized",
@@ -99,6 +102,7 @@ class DatabaseManager:
         """
         try:
             async with self.acquire() as conn:
+                self._count_statement(conn, query)
                 result = await conn.execute(query, *args)
                 return result
         except Exception as e:
@@ -121,6 +125,7 @@ class DatabaseManager:
         """
         try:
             async with self.acquire() as conn:
+                self._count_statement(conn, query)
                 results = await conn.fetch(query, *args)
                 return results
         except Exception as e:
@@ -143,6 +148,7 @@ class DatabaseManager:
         """
         try:
             async with self.acquire() as conn:
+                self._count_statement(conn, query)
                 result = await conn.fetchrow(query, *args)
                 return result
         except Exception as e:
@@ -165,6 +171,7 @@ class DatabaseManager:
         """
         try:
             async with self.acquire() as conn:
+                self._count_statement(conn, query)
                 result = await conn.fetchval(query, *args)
                 return result
         except Exception as e:
@@ -174,6 +181,63 @@ class DatabaseManager:
                 details={"error": str(e), "query": query},
             )
 
+    async def stream(self, query: str, *args, prefetch: Optional[int] = None) -> AsyncIterator[asyncpg.Record]:
+        """
+        Execute a query through a server-side cursor and yield records as they arrive.
+
+        The connection stays checked out (inside a read transaction, as cursors require)
+        until the iterator is exhausted or closed, so callers should consume it promptly.
+
+        Args:
+            query: SQL query string
+            *args: Query parameters
+            prefetch: Rows fetched per round trip (default SEARCH_STREAM_PREFETCH)
+
+        Yields:
+            Database records in query order
+        """
+        try:
+            async with self.acquire() as conn:
+                async with conn.transaction(readonly=True):
+                    self._count_statement(conn, query)
+                    cursor = conn.cursor(query, *args, prefetch=prefetch or settings.SEARCH_STREAM_PREFETCH)
+                    async for record in cursor:
+                        yield record
+        except Exception as e:
+            logger.error(f"Database stream error: {e}", extra={"query": query})
+            raise DatabaseQueryError(
+                "Failed to stream database results",
+                details={"error": str(e), "query": query},
+            )
+
+    def _count_statement(self, conn, query: str) -> None:
+        """
+        Count whether the connection's statement cache already holds a prepared statement for query.
+
+        asyncpg keeps an LRU of prepared statements per connection (DB_STATEMENT_CACHE_SIZE)
+        but exposes no counters, so the cache is looked up (without promoting the entry)
+        just before the query runs. Queries run directly on acquire()d connections are not counted.
+        """
+        try:
+            cache = conn._con._stmt_cache  # PoolConnectionProxy -> Connection
+            key = (query, conn._protocol.get_record_class(), False)
+        except AttributeError:
+            return
+        if cache.has(key):
+            self.statement_cache_hits += 1
+        else:
+            self.statement_cache_misses += 1
+
+    def statement_cache_stats(self) -> dict[str, Any]:
+        """Statement cache hits and misses since startup for queries run through this manager."""
+        lookups = self.statement_cache_hits + self.statement_cache_misses
+        return {
+            "hits": self.statement_cache_hits,
+            "misses": self.statement_cache_misses,
+            "hit_rate": round(self.statement_cache_hits / lookups, 4) if lookups else 0.0,
+            "max_size": settings.DB_STATEMENT_CACHE_SIZE,
+        }
+
     async def health_check(self) -> bool:
         """
         Check if database connection is healthy.
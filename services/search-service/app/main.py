@@ -10,9 +10,17 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from app.cache.redis_client import redis_manager
+from app.cache.search_cache import search_result_cache
+from app.cache.trade_events import trade_event_listener
 from app.config.settings import settings
 from app.database.connection import db_manager
 from app.database.neo4j_client import neo4j_client
+from app.services.analytics_snapshot import analytics_snapshot
+from app.services.exception_rollup import exception_rollup
+from app.services.filter_options_service import filter_options_service
+from app.services.query_history_writer import query_history_writer
+from app.services.ranking_service import ranking_config
+from app.services.suggestion_index import suggestion_index
 from app.utils.exceptions import (
     BedrockAPIError,
     BedrockResponseError,
@@ -21,6 +29,7 @@ from app.utils.exceptions import (
     DatabaseConnectionError,
     DatabaseQueryError,
     InvalidSearchRequestError,
+    LLMCapacityError,
     QueryHistoryNotFoundError,
     SearchServiceException,
     UnauthorizedAccessError,
@@ -66,6 +75,30 @@ async def lifespan(app: FastAPI):
             CREATE INDEX IF NOT EXISTS idx_query_history_last_use_time ON query_history(last_use_time DESC);
             CREATE INDEX IF NOT EXISTS idx_query_history_is_saved ON query_history(is_saved);
             CREATE INDEX IF NOT EXISTS idx_query_history_user_saved ON query_history(user_id, is_saved);
+            CREATE TABLE IF NOT EXISTS trade_filter_values (
+                field VARCHAR(32) NOT NULL,
+                value TEXT NOT NULL,
+                PRIMARY KEY (field, value)
+            );
+            CREATE TABLE IF NOT EXISTS exception_rollup (
+                day DATE NOT NULL,
+                booking_system VARCHAR(50) NOT NULL,
+                asset_type VARCHAR(50) NOT NULL,
+                affirmation_system VARCHAR(50) NOT NULL,
+                clearing_house VARCHAR(50) NOT NULL,
+                status VARCHAR(20) NOT NULL,
+                priority VARCHAR(20) NOT NULL,
+                msg TEXT NOT NULL,
+                exception_count INTEGER NOT NULL,
+                affected_trades INTEGER NOT NULL,
+                first_msg_trades INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_exception_rollup_day ON exception_rollup(day);
+            CREATE TABLE IF NOT EXISTS exception_rollup_trades (
+                trade_id INTEGER PRIMARY KEY,
+                day DATE NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_exception_rollup_trades_day ON exception_rollup_trades(day);
         """)
         logger.info("Database tables verified/created successfully")
 
@@ -76,11 +109,36 @@ async def lifespan(app: FastAPI):
         await db_manager.pool.execute("""
             SELECT setval(
                 'query_history_id_seq',
-                GREATEST(100000, COALESCE((SELECT MAX(id) FROM query_history), 99999))
+                GREATEST(
+                    100000,
+                    COALESCE((SELECT MAX(id) FROM query_history), 99999),
+                    -- Never move backwards: other replicas may hold reserved, not yet written ids
+                    (SELECT last_value FROM query_history_id_seq)
+                )
             );
         """)
         logger.info("query_history sequence resynced on startup")
 
+        # Batch new history rows off the request path
+        if settings.HISTORY_WRITE_BEHIND_ENABLED:
+            query_history_writer.start()
+
+        # Backfill/reconcile the distinct filter values table in the background
+        if settings.FILTER_OPTIONS_SNAPSHOT_ENABLED:
+            filter_options_service.start()
+
+        # Build the chat analytics rollup in the background; raw SQL answers until it is ready
+        if settings.EXCEPTION_ROLLUP_ENABLED:
+            exception_rollup.start()
+
+        # Load the columnar analytics snapshot in the background; SQL answers until it is ready
+        if settings.CHAT_ANALYTICS_ENGINE != "sql":
+            analytics_snapshot.start()
+
+        # Load typeahead candidates in the background; SQL serves suggestions until ready
+        if settings.SUGGESTION_INDEX_ENABLED:
+            suggestion_index.start()
+
         # Initialize Redis cache connection
         await redis_manager.connect()
         logger.info("Redis cache connection initialized successfully")
@@ -98,6 +156,21 @@ async def lifespan(app: FastAPI):
 
         if not redis_healthy:
             logger.warning("Redis health check failed on startup - continuing without cache")
+        else:
+            # React to trade changes (published by data-processing-service): evict cached
+            # search results, index new typeahead and filter values, update the exception rollup
+            # and the analytics snapshot
+            trade_event_listener.register(search_result_cache.invalidate_trade)
+            trade_event_listener.register(suggestion_index.apply_trade_change)
+            trade_event_listener.register(filter_options_service.apply_trade_change)
+            trade_event_listener.register(exception_rollup.apply_trade_change)
+            trade_event_listener.register(analytics_snapshot.apply_trade_change)
+            trade_event_listener.start()
+            # Keep the in-process cache tier coherent across replicas
+            redis_manager.start_invalidation_listener()
+
+        # Hot-reload ranking weights on file change
+        ranking_config.start_watching()
 
         logger.info("Search service startup completed successfully")
 
@@ -111,11 +184,22 @@ async def lifespan(app: FastAPI):
     logger.info("Shutting down search-service")
 
     try:
+        await trade_event_listener.stop()
+        await redis_manager.stop_invalidation_listener()
+        await ranking_config.stop_watching()
+        await suggestion_index.stop()
+        await filter_options_service.stop()
+        await exception_rollup.stop()
+        await analytics_snapshot.stop()
+
         await redis_manager.disconnect()
         logger.info("Redis cache connection closed")
 
         await neo4j_client.close()
 
+        # Write buffered history rows before the pool closes
+        await query_history_writer.stop()
+
         await db_manager.disconnect()
         logger.info("Database connection pool closed")
 
@@ -245,6 +329,25 @@ async def bedrock_api_error_handler(request: Request, exc: BedrockAPIError):
     )
 
 
+@app.exception_handler(LLMCapacityError)
+async def llm_capacity_error_handler(request: Request, exc: LLMCapacityError):
+    """Handle LLM overload (503 Service Unavailable, retry shortly)"""
+    logger.warning(
+        f"LLM capacity exhausted: {exc.message}",
+        extra={"path": request.url.path, "details": exc.details},
+    )
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": "5"},
+        content={
+            "success": False,
+            "error": "AI service busy",
+            "message": "The AI service is handling too many requests. Please retry shortly or use manual search.",
+            "details": exc.details if settings.LOG_LEVEL == "DEBUG" else None,
+        },
+    )
+
+
 @app.exception_handler(BedrockResponseError)
 async def bedrock_response_error_handler(request: Request, exc: BedrockResponseError):
     """Handle Bedrock response parsing errors (422 Unprocessable Entity)"""
@@ -39,6 +39,7 @@ class SearchRequest(BaseModel):
     Frontend Usage:
     - Natural Language: { user_id, search_type: "natural_language", query_text }
     - Manual Search: { user_id, search_type: "manual", filters }
+    - Next page: same request plus { page_size, cursor: previous response's next_cursor }
     """
 
     user_id: str = Field(..., description="User ID from authentication")
@@ -55,6 +56,10 @@ class SearchRequest(BaseModel):
         None, description="Manual search filters (required if search_type='manual')"
     )
 
+    # Keyset pagination (optional)
+    page_size: Optional[int] = Field(None, description="Results per page; enables cursor pagination", ge=1, le=1000)
+    cursor: Optional[str] = Field(None, description="Opaque next_cursor from the previous page")
+
     model_config = ConfigDict(
         json_schema_extra={
             "examples": [
@@ -137,16 +142,30 @@ class SearchResponse(BaseModel):
 
     query_id: int = Field(..., description="ID of saved query history record")
     total_results: int = Field(..., description="Total number of results found")
+    total_results_exact: bool = Field(
+        True, description="Whether total_results is an exact count (false: planner or cached estimate)"
+    )
     results: list[Trade] = Field(..., description="List of matching trades")
     search_type: str = Field(..., description="Type of search performed")
     cached: bool = Field(False, description="Whether result was from cache")
     execution_time_ms: Optional[float] = Field(None, description="Query execution time in milliseconds")
+    extraction_method: Optional[Literal["rules", "similar", "llm"]] = Field(
+        None,
+        description=(
+            "How the natural language query was parsed: rule-based parser, reuse of a near-duplicate "
+            "recent query's extraction, or LLM (null for manual searches)"
+        ),
+    )
+    next_cursor: Optional[str] = Field(
+        None, description="Pass as cursor to fetch the next page (paginated searches only; null on the last page)"
+    )
 
     model_config = ConfigDict(
         json_schema_extra={
             "example": {
                 "query_id": 42,
                 "total_results": 2,
+                "total_results_exact": True,
                 "results": [
                     {
                         "trade_id": "10001234",
@@ -163,6 +182,8 @@ class SearchResponse(BaseModel):
                 "search_type": "natural_language",
                 "cached": False,
                 "execution_time_ms": 234.5,
+                "extraction_method": "rules",
+                "next_cursor": None,
             }
         }
     )
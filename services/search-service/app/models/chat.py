@@ -39,6 +39,11 @@ class ChatResponse(BaseModel):
     follow_up_prompts: list[str] = Field(default_factory=list)
     execution_time_ms: Optional[float] = None
     extracted_params: Optional[ExtractedParams] = None
+    # Milliseconds per stage (history, extraction, trade_rows_prefetch, first_turn, llm, tools,
+    # synthesis, total); stages overlap, so they need not add up to total
+    stage_timings_ms: Optional[dict[str, float]] = None
+    # Tool call reuse in this chat (calls, deduplicated, cache_hits, executed, hit_rate), in every mode
+    tool_cache: Optional[dict[str, Any]] = None
 
 
 class ToolParameter(BaseModel):
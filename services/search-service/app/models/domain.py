@@ -76,6 +76,57 @@ class Trade(BaseModel):
             status=record["status"],
         )
 
+    @classmethod
+    def from_trusted_record(cls, record) -> "Trade":
+        """
+        Create Trade instance from a trades row without re-validating it.
+
+        Only for rows selected straight from the trades table by our own parameterised
+        SQL: the schema already guarantees every column is NOT NULL and status passes a
+        CHECK constraint, so from_db_record's per-row validation repeats the database's
+        work. model_construct is no cheaper than validation here, so the instance is
+        populated the same way pydantic does it internally.
+
+        Args:
+            record: asyncpg.Record (or mapping) with the trades columns
+
+        Returns:
+            Trade instance equal to from_db_record(record)
+        """
+        trade = cls.__new__(cls)
+        object.__setattr__(
+            trade,
+            "__dict__",
+            {
+                "trade_id": record["id"],
+                "account": record["account"],
+                "asset_type": record["asset_type"],
+                "booking_system": record["booking_system"],
+                "affirmation_system": record["affirmation_system"],
+                "clearing_house": record["clearing_house"],
+                "create_time": _format_timestamp(record["create_time"]),
+                "update_time": _format_timestamp(record["update_time"]),
+                "status": record["status"],
+            },
+        )
+        object.__setattr__(trade, "__pydantic_fields_set__", set(_TRADE_FIELDS))
+        object.__setattr__(trade, "__pydantic_extra__", None)
+        object.__setattr__(trade, "__pydantic_private__", None)
+        return trade
+
+
+_TRADE_FIELDS = frozenset(Trade.model_fields)
+
+
+def _format_timestamp(value) -> str:
+    """Format a DB timestamp as YYYY-MM-DDTHH:MM:SSZ (same output as from_db_record's strftime)."""
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            # isoformat is several times cheaper than strftime for naive TIMESTAMP columns
+            return value.isoformat(timespec="seconds") + "Z"
+        return value.strftime("%Y-%m-%dT%H:%M:%SZ")
+    return value
+
 
 class QueryHistory(BaseModel):
     """
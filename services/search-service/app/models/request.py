@@ -88,6 +88,10 @@ class SearchRequest(BaseModel):
         None, description="Manual search filters (required if search_type='manual')"
     )
 
+    # Keyset pagination (opt-in; omit both to receive the full result set in one response)
+    page_size: Optional[int] = Field(None, description="Results per page; enables cursor pagination", ge=1, le=1000)
+    cursor: Optional[str] = Field(None, description="Opaque next_cursor from the previous page")
+
     @model_validator(mode="after")
     def validate_search_requirements(self):
         """Ensure query_text or filters are provided based on search_type"""
@@ -19,6 +19,9 @@ class SearchResponse(BaseModel):
 
     query_id: int = Field(..., description="ID of saved query history record")
     total_results: int = Field(..., description="Total number of results found")
+    total_results_exact: bool = Field(
+        True, description="Whether total_results is an exact count (false: planner or cached estimate)"
+    )
     results: list[Trade] = Field(..., description="List of matching trades")
     search_type: str = Field(..., description="Type of search performed (natural_language or manual)")
     cached: bool = Field(False, description="Whether result was from cache")
@@ -26,12 +29,23 @@ class SearchResponse(BaseModel):
     extracted_params: Optional[ExtractedParams] = Field(
         None, description="Extracted parameters (for natural_language searches only)"
     )
+    extraction_method: Optional[Literal["rules", "similar", "llm"]] = Field(
+        None,
+        description=(
+            "How extracted_params were produced (natural_language searches only): rule-based parser, "
+            "reuse of a near-duplicate recent query's extraction, or LLM"
+        ),
+    )
+    next_cursor: Optional[str] = Field(
+        None, description="Cursor for the next page (paginated searches only; null on the last page)"
+    )
 
     model_config = ConfigDict(
         json_schema_extra={
             "example": {
                 "query_id": 42,
                 "total_results": 2,
+                "total_results_exact": True,
                 "results": [
                     {
                         "trade_id": 10001234,
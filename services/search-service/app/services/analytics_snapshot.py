@@ -0,0 +1,612 @@
+"""
+Analytics Snapshot - in-process columnar copy of trades and exceptions for chat analytics.
+
+get_exception_analytics and get_trade_timeseries group by a handful of low-cardinality
+trade attributes, so they can be answered from NumPy arrays instead of a database round
+trip: categorical columns are dictionary-encoded to int32 codes, update_time is kept as
+int64 microseconds, and a group-by is a mixed-radix key and a few bincounts over the
+filtered rows. Results have the same columns, values and order as the SQL queries in
+ChatService (ties in ORDER BY exception_count, which SQL leaves unordered, are broken by
+the group values).
+
+The snapshot is loaded at startup and reloaded every ANALYTICS_SNAPSHOT_REBUILD_SECONDS;
+trade change events are applied every ANALYTICS_SNAPSHOT_FLUSH_SECONDS by re-reading the
+changed trades and their exceptions. CHAT_ANALYTICS_ENGINE picks the engine: "sql"
+(default, snapshot not loaded), "snapshot", or "compare" (answer from SQL, also run the
+snapshot and count/log every difference).
+
+Each load or flush builds a new immutable _Tables version in a worker thread and swaps it
+in with one assignment; queries also run in worker threads against the version current
+when they started, so the NumPy work never blocks the event loop and never sees a
+half-applied flush. A flush drops the superseded exception rows (and deleted trades)
+instead of masking them, so memory does not grow between reloads.
+"""
+
+import asyncio
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Iterable, Optional
+
+import numpy as np
+
+from app.config.settings import settings
+from app.database.connection import db_manager
+from app.models.domain import ExtractedParams
+from app.services.filter_options_service import FIELD_COLUMNS
+from app.utils.logger import logger
+
+TRADE_COLUMNS = ("account", "asset_type", "booking_system", "affirmation_system", "clearing_house", "status")
+EXCEPTION_COLUMNS = ("priority", "msg")
+
+# Snapshot column for each chat analytics dimension (see ChatService.ALLOWED_DIMENSIONS)
+DIMENSION_COLUMNS = {
+    "booking_system": "booking_system",
+    "asset_type": "asset_type",
+    "affirmation_system": "affirmation_system",
+    "clearing_house": "clearing_house",
+    "account": "account",
+    "status": "status",
+    "exception_message": "msg",
+    "priority": "priority",
+}
+
+EPOCH = datetime(1970, 1, 1)
+DAY_US = 86_400_000_000
+LOAD_CHUNK_ROWS = 50_000
+DENSE_GROUP_LIMIT = 1 << 22  # Largest key space grouped with a bincount instead of a sort
+
+
+def _micros(value: datetime) -> int:
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+
+def _first_of_runs(ordered: np.ndarray) -> np.ndarray:
+    """Mask of the first element of each run of equal values in a sorted array."""
+    first = np.ones(len(ordered), dtype=bool)
+    np.not_equal(ordered[1:], ordered[:-1], out=first[1:])
+    return first
+
+
+class _Dictionary:
+    """Value <-> int32 code mapping for one categorical column (codes are never reused)."""
+
+    def __init__(self):
+        self.values: list[Any] = []
+        self._codes: dict[Any, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def _add(self, value: Any) -> int:
+        code = self._codes[value] = len(self.values)
+        self.values.append(value)
+        return code
+
+    def encode(self, values: list[Any]) -> np.ndarray:
+        codes = self._codes
+        return np.fromiter(
+            (codes[v] if v in codes else self._add(v) for v in values), dtype=np.int32, count=len(values)
+        )
+
+    def lookup(self, values: Iterable[Any]) -> np.ndarray:
+        """Codes of the given values that occur in the column (unknown values match nothing)."""
+        return np.array([self._codes[v] for v in values if v in self._codes], dtype=np.int32)
+
+    def ranks(self, size: int) -> np.ndarray:
+        """Position of each of the first size codes when values are sorted, for value-ordered tie breaks."""
+        values = self.values[:size]
+        ranks = np.empty(size, dtype=np.int64)
+        ranks[sorted(range(size), key=values.__getitem__)] = np.arange(size)
+        return ranks
+
+
+class _Tables:
+    """
+    One immutable version of the snapshot.
+
+    Columns are read-only, and sizes holds each dictionary's length when the version was
+    built: encoding for the next version appends to the shared dictionaries, so queries
+    take key widths from here rather than from the dictionaries themselves.
+    """
+
+    def __init__(self, trades: dict[str, np.ndarray], exceptions: dict[str, np.ndarray], sizes: dict[str, int]):
+        for column in (*trades.values(), *exceptions.values()):
+            column.flags.writeable = False
+        self.trades = trades
+        self.exceptions = exceptions
+        self.sizes = sizes
+
+
+class AnalyticsSnapshot:
+    """
+    Columnar snapshot with vectorised equivalents of the chat analytics SQL.
+
+    Trades are kept sorted by id so exceptions find their trade row by binary search.
+    Loads, flushes and queries run in worker threads (asyncio.to_thread); only swapping
+    self._tables happens on the event loop.
+    """
+
+    TRADES_QUERY = """
+        SELECT id, account, asset_type, booking_system, affirmation_system, clearing_house, status, update_time
+        FROM trades
+    """
+
+    EXCEPTIONS_QUERY = "SELECT trade_id, priority, msg FROM exceptions"
+
+    def __init__(
+        self,
+        flush_interval: float = settings.ANALYTICS_SNAPSHOT_FLUSH_SECONDS,
+        rebuild_interval: float = settings.ANALYTICS_SNAPSHOT_REBUILD_SECONDS,
+    ):
+        self.db = db_manager
+        self.flush_interval = flush_interval
+        self.rebuild_interval = rebuild_interval
+        self._dictionaries = {column: _Dictionary() for column in TRADE_COLUMNS + EXCEPTION_COLUMNS}
+        self._tables = _Tables(self._empty_trades(), self._empty_exceptions(), self._sizes())
+        self._pending: set[int] = set()
+        self._lock = asyncio.Lock()
+        self._tasks: list[asyncio.Task] = []
+        self.rebuilt_at: Optional[float] = None
+        self.queries_served = 0
+        self.comparisons = 0
+        self.mismatches = 0
+
+    @property
+    def ready(self) -> bool:
+        return self.rebuilt_at is not None
+
+    def start(self) -> None:
+        """Start the reload and change flush tasks (idempotent)."""
+        if not any(not task.done() for task in self._tasks):
+            self._tasks = [
+                asyncio.create_task(self._rebuild_loop(), name="analytics-snapshot-rebuild"),
+                asyncio.create_task(self._flush_loop(), name="analytics-snapshot-flush"),
+            ]
+            logger.info(
+                "Analytics snapshot started",
+                extra={"flush_interval": self.flush_interval, "rebuild_interval": self.rebuild_interval},
+            )
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+    async def _rebuild_loop(self) -> None:
+        while True:
+            try:
+                await self.rebuild()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Analytics snapshot reload failed: {e}")
+            await asyncio.sleep(self.rebuild_interval)
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Analytics snapshot update failed, will retry: {e}")
+
+    # ------------------------------------------------------------------
+    # Loading and incremental refresh
+    # ------------------------------------------------------------------
+
+    async def rebuild(self) -> None:
+        """Reload both tables from one consistent read and swap them in."""
+        started = time.perf_counter()
+        async with self._lock:
+            covered = set(self._pending)  # Changes arriving during the load stay pending
+            async with self.db.acquire() as conn:
+                async with conn.transaction(isolation="repeatable_read", readonly=True):
+                    trades = await self._read(conn, self.TRADES_QUERY, self._encode_trades)
+                    exceptions = await self._read(conn, self.EXCEPTIONS_QUERY, self._encode_exceptions)
+            self._tables = await asyncio.to_thread(self._load, trades, exceptions)
+            self._pending -= covered
+            self.rebuilt_at = time.monotonic()
+
+        logger.info(
+            "Analytics snapshot loaded",
+            extra={
+                "trades": len(self._tables.trades["id"]),
+                "exceptions": len(self._tables.exceptions["trade_id"]),
+                "memory_bytes": self.memory_bytes(),
+                "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+            },
+        )
+
+    async def _read(self, conn, query: str, encode) -> list[dict[str, np.ndarray]]:
+        """Stream a query through a cursor, encoding each chunk to columns in a worker thread."""
+        chunks: list[dict[str, np.ndarray]] = []
+        rows: list[Any] = []
+        async for record in conn.cursor(query, prefetch=settings.SEARCH_STREAM_PREFETCH):
+            rows.append(record)
+            if len(rows) == LOAD_CHUNK_ROWS:
+                chunks.append(await asyncio.to_thread(encode, rows))
+                rows = []
+        chunks.append(await asyncio.to_thread(encode, rows))
+        return chunks
+
+    def _load(
+        self, trade_chunks: list[dict[str, np.ndarray]], exception_chunks: list[dict[str, np.ndarray]]
+    ) -> _Tables:
+        """Build a new version from freshly encoded trade and exception chunks."""
+        trades = {key: np.concatenate([chunk[key] for chunk in trade_chunks]) for key in trade_chunks[0]}
+        exceptions = {key: np.concatenate([chunk[key] for chunk in exception_chunks]) for key in exception_chunks[0]}
+        order = np.argsort(trades["id"], kind="stable")
+        trades = {key: column[order] for key, column in trades.items()}
+        exceptions["row"] = self._rows_of(trades["id"], exceptions["trade_id"])
+        return _Tables(trades, exceptions, self._sizes())
+
+    async def apply_trade_change(self, trade_id: int, trade_row: Optional[dict[str, Any]], event: dict) -> None:
+        """Trade change handler: re-read the trade and its exceptions on the next flush."""
+        if self._tasks:
+            self._pending.add(trade_id)
+
+    async def flush(self) -> int:
+        """
+        Re-read every trade changed since the last flush, with its exceptions.
+
+        Returns:
+            Number of trades refreshed
+        """
+        async with self._lock:
+            if not self._pending or not self.ready:
+                return 0
+            pending, self._pending = self._pending, set()
+            trade_ids = sorted(pending)
+            try:
+                async with self.db.acquire() as conn:
+                    async with conn.transaction(isolation="repeatable_read", readonly=True):
+                        trades = await conn.fetch(f"{self.TRADES_QUERY} WHERE id = ANY($1::integer[])", trade_ids)
+                        exceptions = await conn.fetch(
+                            f"{self.EXCEPTIONS_QUERY} WHERE trade_id = ANY($1::integer[])", trade_ids
+                        )
+            except Exception:
+                self._pending |= pending  # Retry on the next flush
+                raise
+            changed = np.array(trade_ids, dtype=np.int64)
+            self._tables = await asyncio.to_thread(self._apply, self._tables, changed, trades, exceptions)
+
+        logger.debug("Analytics snapshot updated", extra={"trades": len(trade_ids)})
+        return len(trade_ids)
+
+    def _apply(self, tables: _Tables, changed: np.ndarray, trade_rows: list[Any], exception_rows: list[Any]) -> _Tables:
+        """
+        Build a new version with the changed trades (and all their exceptions) replaced by their current rows.
+
+        Deleted trades and the old exceptions of changed trades are dropped rather than masked;
+        exception trade rows are only re-resolved when that shifts the trade rows.
+        """
+        fresh = self._encode_trades(trade_rows)
+        trades = tables.trades
+
+        gone = self._rows_of(trades["id"], np.setdiff1d(changed, fresh["id"]))  # Trades not read back were deleted
+        gone = gone[gone >= 0]
+        if len(gone):
+            kept = np.ones(len(trades["id"]), dtype=bool)
+            kept[gone] = False
+            trades = {key: column[kept] for key, column in trades.items()}
+        else:
+            trades = {key: column.copy() for key, column in trades.items()}
+        shifted = len(gone) > 0
+
+        rows = self._rows_of(trades["id"], fresh["id"])
+        existing = rows >= 0
+        for key, column in fresh.items():
+            trades[key][rows[existing]] = column[existing]
+
+        if not existing.all():
+            added = {key: column[~existing] for key, column in fresh.items()}
+            in_order = len(trades["id"]) == 0 or added["id"].min() > trades["id"][-1]
+            trades = {key: np.concatenate([trades[key], added[key]]) for key in trades}
+            if not in_order:
+                order = np.argsort(trades["id"], kind="stable")
+                trades = {key: column[order] for key, column in trades.items()}
+                shifted = True
+
+        current = ~np.isin(tables.exceptions["trade_id"], changed)
+        exceptions = {key: column[current] for key, column in tables.exceptions.items()}
+        if shifted:
+            exceptions["row"] = self._rows_of(trades["id"], exceptions["trade_id"])
+        added = self._encode_exceptions(exception_rows)
+        added["row"] = self._rows_of(trades["id"], added["trade_id"])
+        exceptions = {key: np.concatenate([exceptions[key], added[key]]) for key in exceptions}
+        return _Tables(trades, exceptions, self._sizes())
+
+    @staticmethod
+    def _rows_of(ids: np.ndarray, trade_ids: np.ndarray) -> np.ndarray:
+        """Row of each trade id in the sorted ids, -1 where the trade is not in the snapshot."""
+        if len(ids) == 0:
+            return np.full(len(trade_ids), -1, dtype=np.int64)
+        rows = np.minimum(np.searchsorted(ids, trade_ids), len(ids) - 1)
+        return np.where(ids[rows] == trade_ids, rows, -1)
+
+    def _sizes(self) -> dict[str, int]:
+        return {column: len(dictionary) for column, dictionary in self._dictionaries.items()}
+
+    def _encode_trades(self, rows: list[Any]) -> dict[str, np.ndarray]:
+        columns = {"id": np.array([row["id"] for row in rows], dtype=np.int64)}
+        for column in TRADE_COLUMNS:
+            columns[column] = self._dictionaries[column].encode([row[column] for row in rows])
+        columns["update_time"] = np.array([row["update_time"] for row in rows], dtype="datetime64[us]").astype(np.int64)
+        return columns
+
+    def _encode_exceptions(self, rows: list[Any]) -> dict[str, np.ndarray]:
+        columns = {"trade_id": np.array([row["trade_id"] for row in rows], dtype=np.int64)}
+        for column in EXCEPTION_COLUMNS:
+            columns[column] = self._dictionaries[column].encode([row[column] for row in rows])
+        return columns
+
+    @staticmethod
+    def _empty_trades() -> dict[str, np.ndarray]:
+        columns = {column: np.empty(0, dtype=np.int32) for column in TRADE_COLUMNS}
+        columns.update(id=np.empty(0, dtype=np.int64), update_time=np.empty(0, dtype=np.int64))
+        return columns
+
+    @staticmethod
+    def _empty_exceptions() -> dict[str, np.ndarray]:
+        columns = {column: np.empty(0, dtype=np.int32) for column in EXCEPTION_COLUMNS}
+        columns.update(trade_id=np.empty(0, dtype=np.int64), row=np.empty(0, dtype=np.int64))
+        return columns
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    async def exception_analytics(
+        self,
+        dimensions: list[str],
+        extracted_params: ExtractedParams,
+        priority_filter: list[str] | None,
+        top_k: int,
+    ) -> Optional[list[dict[str, Any]]]:
+        """
+        Snapshot equivalent of ChatService._build_raw_analytics_query, run in a worker thread.
+
+        Returns:
+            Rows with dimension_N, priority, exception_count and affected_trades ordered by
+            exception_count DESC, or None until the snapshot is loaded
+        """
+        if not self.ready:
+            return None
+        rows = await asyncio.to_thread(
+            self._exception_analytics, self._tables, dimensions, extracted_params, priority_filter, top_k
+        )
+        self.queries_served += 1
+        return rows
+
+    def _exception_analytics(
+        self,
+        tables: _Tables,
+        dimensions: list[str],
+        extracted_params: ExtractedParams,
+        priority_filter: list[str] | None,
+        top_k: int,
+    ) -> list[dict[str, Any]]:
+        exceptions = tables.exceptions
+        trade_mask = self._trade_mask(tables, extracted_params, FIELD_COLUMNS.items())
+        mask = exceptions["row"] >= 0
+        mask[mask] = trade_mask[exceptions["row"][mask]]
+        if priority_filter:
+            mask &= np.isin(exceptions["priority"], self._dictionaries["priority"].lookup(priority_filter))
+        selected = np.flatnonzero(mask)
+        trade_rows = exceptions["row"][selected]
+
+        key_columns = [DIMENSION_COLUMNS[dimension] for dimension in dimensions] + ["priority"]
+        codes = [
+            exceptions[column][selected] if column in EXCEPTION_COLUMNS else tables.trades[column][trade_rows]
+            for column in key_columns
+        ]
+        group_codes, inverse = self._group(tables, key_columns, codes)
+        groups = len(group_codes[0])
+
+        counts = np.bincount(inverse, minlength=groups)
+        # Distinct (group, trade) pairs; sorting beats np.unique, which hashes in NumPy 2
+        width = max(len(tables.trades["id"]), 1)
+        trade_pairs = np.sort(inverse * width + trade_rows)
+        affected = np.bincount(trade_pairs[_first_of_runs(trade_pairs)] // width, minlength=groups)
+
+        sort_keys = [
+            self._dictionaries[column].ranks(tables.sizes[column])[code]
+            for column, code in zip(key_columns, group_codes, strict=True)
+        ]
+        order = np.lexsort(sort_keys[::-1] + [-counts])[:top_k]
+
+        rows = []
+        for index in order:
+            row = {
+                f"dimension_{position + 1}": self._dictionaries[column].values[group_codes[position][index]]
+                for position, column in enumerate(key_columns[:-1])
+            }
+            row["priority"] = self._dictionaries["priority"].values[group_codes[-1][index]]
+            row["exception_count"] = int(counts[index])
+            row["affected_trades"] = int(affected[index])
+            rows.append(row)
+        return rows
+
+    async def trade_timeseries(
+        self,
+        extracted_params: ExtractedParams,
+        year: int | None,
+        status: str,
+        bucket: str,
+    ) -> Optional[list[dict[str, Any]]]:
+        """
+        Snapshot equivalent of the ChatService._build_trade_timeseries_evidence query, run in a worker thread.
+
+        Returns:
+            One row per month ('YYYY-MM') or ISO week ('IYYY-"W"IW') in ascending order,
+            or None until the snapshot is loaded
+        """
+        if not self.ready:
+            return None
+        rows = await asyncio.to_thread(self._trade_timeseries, self._tables, extracted_params, year, status, bucket)
+        self.queries_served += 1
+        return rows
+
+    def _trade_timeseries(
+        self,
+        tables: _Tables,
+        extracted_params: ExtractedParams,
+        year: int | None,
+        status: str,
+        bucket: str,
+    ) -> list[dict[str, Any]]:
+        filters = [(field, column) for field, column in FIELD_COLUMNS.items() if field != "statuses"]
+        mask = self._trade_mask(tables, extracted_params, filters)
+        mask &= np.isin(tables.trades["status"], self._dictionaries["status"].lookup([status]))
+        times = tables.trades["update_time"][mask]
+        if year is not None:
+            years = times.astype("datetime64[us]").astype("datetime64[Y]").astype(np.int64) + 1970
+            times = times[years == year]
+
+        if bucket == "week":
+            days = times // DAY_US
+            starts, counts = np.unique(days - (days + 3) % 7, return_counts=True)  # 1970-01-01 was a Thursday
+            labels = []
+            for start in starts.tolist():
+                iso = (date(1970, 1, 1) + timedelta(days=start)).isocalendar()
+                labels.append(f"{iso.year:04d}-W{iso.week:02d}")
+        else:
+            months = times.astype("datetime64[us]").astype("datetime64[M]")
+            starts, counts = np.unique(months, return_counts=True)
+            labels = [str(month) for month in starts]
+
+        return [
+            {"dimension_1": label, "priority": status, "exception_count": int(count), "affected_trades": int(count)}
+            for label, count in zip(labels, counts, strict=True)
+        ]
+
+    def _trade_mask(
+        self, tables: _Tables, extracted_params: ExtractedParams, filters: Iterable[tuple[str, str]]
+    ) -> np.ndarray:
+        """Trades matching the ExtractedParams filters, as in ChatService._build_analytics_conditions."""
+        trades = tables.trades
+        mask = np.ones(len(trades["id"]), dtype=bool)
+        for field, column in filters:
+            values = getattr(extracted_params, field)
+            if values:
+                mask &= np.isin(trades[column], self._dictionaries[column].lookup(values))
+        if extracted_params.date_from:
+            mask &= trades["update_time"] >= _micros(datetime.strptime(extracted_params.date_from, "%Y-%m-%d"))
+        if extracted_params.date_to:
+            end = _micros(datetime.strptime(extracted_params.date_to, "%Y-%m-%d")) + DAY_US
+            mask &= trades["update_time"] < end
+        return mask
+
+    def _group(
+        self, tables: _Tables, columns: list[str], codes: list[np.ndarray]
+    ) -> tuple[list[np.ndarray], np.ndarray]:
+        """
+        Group rows by several code columns at once.
+
+        Returns:
+            (codes of each column per group, group index of every row)
+        """
+        key = np.zeros(len(codes[0]), dtype=np.int64)
+        space = 1
+        for column, column_codes in zip(columns, codes, strict=True):
+            key = key * tables.sizes[column] + column_codes
+            space *= tables.sizes[column]
+
+        if space <= DENSE_GROUP_LIMIT:
+            present = np.bincount(key, minlength=space) > 0
+            keys = np.flatnonzero(present)
+            inverse = (np.cumsum(present) - 1)[key]
+        else:
+            order = np.argsort(key, kind="stable")
+            first = _first_of_runs(key[order])
+            keys = key[order][first]
+            inverse = np.empty(len(key), dtype=np.int64)
+            inverse[order] = np.cumsum(first) - 1
+
+        group_codes = []
+        for column in reversed(columns):
+            size = tables.sizes[column]
+            group_codes.append(keys % size)
+            keys = keys // size
+        return group_codes[::-1], inverse
+
+    # ------------------------------------------------------------------
+    # SQL comparison
+    # ------------------------------------------------------------------
+
+    def compare(
+        self,
+        name: str,
+        sql_rows: list[dict[str, Any]],
+        snapshot_rows: list[dict[str, Any]],
+        top_k: int | None = None,
+    ) -> bool:
+        """
+        Check snapshot rows against the SQL answer and record the outcome.
+
+        Args:
+            name: Query name for the mismatch log
+            sql_rows: Rows from the SQL path
+            snapshot_rows: Rows from this snapshot
+            top_k: LIMIT of a query ordered by exception_count; rows tied at the cut-off
+                   may legitimately differ, so only their counts are compared
+
+        Returns:
+            True if the results are identical
+        """
+        matched = self.rows_match(sql_rows, snapshot_rows, top_k)
+        self.comparisons += 1
+        if not matched:
+            self.mismatches += 1
+            logger.warning(
+                f"Analytics snapshot differs from SQL for {name}",
+                extra={"sql_rows": sql_rows[:10], "snapshot_rows": snapshot_rows[:10]},
+            )
+        return matched
+
+    @staticmethod
+    def rows_match(sql_rows: list[dict[str, Any]], snapshot_rows: list[dict[str, Any]], top_k: int | None) -> bool:
+        sql_rows = [dict(row) for row in sql_rows]
+        if top_k is None:
+            return sql_rows == snapshot_rows
+        if [row["exception_count"] for row in sql_rows] != [row["exception_count"] for row in snapshot_rows]:
+            return False
+        cut_off = sql_rows[-1]["exception_count"] if len(sql_rows) == top_k else None
+
+        def canonical(rows: list[dict[str, Any]]) -> list[tuple]:
+            return sorted(
+                tuple(sorted((key, str(value)) for key, value in row.items()))
+                for row in rows
+                if row["exception_count"] != cut_off
+            )
+
+        return canonical(sql_rows) == canonical(snapshot_rows)
+
+    def memory_bytes(self) -> int:
+        tables = self._tables
+        return sum(column.nbytes for table in (tables.trades, tables.exceptions) for column in table.values())
+
+    def stats(self) -> dict[str, Any]:
+        tables = self._tables
+        return {
+            "ready": self.ready,
+            "trades": len(tables.trades["id"]),
+            "exceptions": len(tables.exceptions["trade_id"]),
+            "pending_trades": len(self._pending),
+            "memory_bytes": self.memory_bytes(),
+            "queries_served": self.queries_served,
+            "comparisons": self.comparisons,
+            "mismatches": self.mismatches,
+            "seconds_since_rebuild": round(time.monotonic() - self.rebuilt_at, 1) if self.ready else None,
+        }
+
+
+# Global singleton instance
+analytics_snapshot = AnalyticsSnapshot()
@@ -21,6 +21,7 @@ from tenacity import (
 )
 
 from app.cache.redis_client import redis_manager
+from app.cache.single_flight import SingleFlight
 from app.config.settings import settings
 from app.models.domain import ExtractedParams
 from app.prompts.extraction_prompt import (
@@ -28,7 +29,8 @@ from app.prompts.extraction_prompt import (
     build_user_prompt,
     build_validation_rules,
 )
-from app.utils.exceptions import BedrockAPIError, BedrockResponseError
+from app.services.llm_executor import llm_executor
+from app.utils.exceptions import BedrockAPIError, BedrockResponseError, LLMCapacityError
 from app.utils.logger import logger
 
 
@@ -64,6 +66,7 @@ class BedrockService:
         self.session = aioboto3.Session(**session_config)
         self.region = settings.BEDROCK_REGION
         self.cache = redis_manager
+        self.single_flight = SingleFlight()
         self.validation_rules = build_validation_rules()
 
         logger.info(
@@ -82,7 +85,7 @@ class BedrockService:
 
         Flow:
         1. Check cache for previous extraction of same query
-        2. If cache miss, call Bedrock API
+        2. If cache miss, call Bedrock API (concurrent misses for the same key share one call)
         3. Parse and validate response
         4. Cache result for future use
         5. Return ExtractedParams
@@ -123,9 +126,22 @@ class BedrockService:
 
         logger.info("Cache miss - calling Bedrock API")
 
+        # Steps 2-4, coalesced with identical in-flight extractions (this and other replicas)
+        return await self.single_flight.run(
+            cache_key,
+            lambda: self._extract_uncached(query, user_id, current_date, cache_key),
+            lambda: self._get_from_cache(cache_key),
+        )
+
+    async def _extract_uncached(
+        self, query: str, user_id: str, current_date: Optional[datetime], cache_key: str
+    ) -> ExtractedParams:
+        """Call Bedrock, parse and validate the response, and cache it under cache_key."""
         # Step 2: Call Bedrock API (with automatic retries)
         try:
             raw_response = await self._invoke_bedrock(query, current_date)
+        except LLMCapacityError:
+            raise
         except Exception as e:
             logger.error(
                 f"Bedrock API call failed: {e}",
@@ -256,8 +272,11 @@ class BedrockService:
                     },
                 )
 
-                # Call Bedrock API asynchronously
-                response = await client.invoke_model(modelId=settings.BEDROCK_MODEL_ID, body=json.dumps(request_body))
+                # Call Bedrock API asynchronously, within the provider's concurrency limit
+                async with llm_executor.slot("bedrock"):
+                    response = await client.invoke_model(
+                        modelId=settings.BEDROCK_MODEL_ID, body=json.dumps(request_body)
+                    )
 
                 # Log token usage from response headers
                 headers = response.get("ResponseMetadata", {}).get("HTTPHeaders", {})
@@ -454,12 +473,11 @@ class BedrockService:
             ExtractedParams if found, None otherwise
         """
         try:
-            cached_json = await self.cache.get(cache_key)
-
-            if cached_json:
-                params_dict = json.loads(cached_json)
-                return ExtractedParams(**params_dict)
-
+            cached = await self.cache.get(cache_key)
+            if isinstance(cached, str):  # Entries written before params were stored as a JSON object
+                cached = json.loads(cached)
+            if cached:
+                return ExtractedParams(**cached)
             return None
 
         except Exception as e:
@@ -476,8 +494,7 @@ class BedrockService:
             params: Extracted parameters to cache
         """
         try:
-            params_json = params.model_dump_json()
-            await self.cache.set(cache_key, params_json, ttl=settings.CACHE_TTL_AI_EXTRACTION)
+            await self.cache.set(cache_key, params.model_dump(mode="json"), ttl=settings.CACHE_TTL_AI_EXTRACTION)
 
             logger.debug(
                 "Cached extraction result",
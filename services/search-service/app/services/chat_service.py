@@ -6,26 +6,44 @@ Flow:
 2. Extract structured filters using existing extraction service
 3. Execute only parameterized, validated SQL
 4. Optionally synthesize AI answer from SQL evidence
+
+With CHAT_PARALLEL_STAGES_ENABLED, steps 1 and 2 overlap: the history insert runs in
+the background, extraction runs alongside Gemini's first turn (tools wait for it), and
+the get_trade_rows query is prefetched from the extracted filters while Gemini decides.
+
+stream_chat runs the same flow and reports progress as server-sent events: the
+extracted params first, each tool result as soon as it completes, then the answer
+text as the model generates it, and finally the full ChatResponse.
 """
 
 import asyncio
+import hashlib
 import json
 import time
 from datetime import datetime
-from typing import Any
+from typing import Any, AsyncIterator, Callable, Optional
 
 import google.generativeai as genai
 
+from app.cache.local_cache import LocalCache
 from app.config.settings import settings
 from app.database.connection import db_manager
 from app.models.chat import ChatRequest, ChatResponse, ToolDefinition, ToolParameter, ToolsManifestResponse
 from app.models.domain import ExtractedParams, Trade
+from app.services.analytics_snapshot import analytics_snapshot
+from app.services.exception_rollup import exception_rollup
 from app.services.gemini_service import gemini_service as extraction_service
 from app.services.kg_service import kg_service
+from app.services.llm_executor import llm_executor
 from app.services.query_builder import query_builder
 from app.services.query_history_service import query_history_service
+from app.services.tool_result_encoder import encode_tool_result, estimate_tokens
+from app.utils.exceptions import LLMCapacityError
 from app.utils.logger import logger
 
+# Progress callback: (event name, JSON-able payload), invoked on the event loop thread
+ChatEventCallback = Callable[[str, dict[str, Any]], None]
+
 
 class ChatService:
     """Chat orchestration for free-form analytics and row retrieval."""
@@ -43,6 +61,9 @@ class ChatService:
 
     ALLOWED_PRIORITIES = {"CRITICAL", "HIGH", "MEDIUM", "LOW"}
 
+    # SQL-backed tools whose results depend only on (tool, args, extracted filters)
+    CACHEABLE_TOOLS = {"get_trade_rows", "get_exception_analytics", "get_trade_timeseries"}
+
     _SYSTEM_INSTRUCTION = (
         "You are an analytics assistant for a financial trade operations platform. "
         "Always call tools to fetch data before answering — never guess or fabricate numbers.\n\n"
@@ -81,6 +102,8 @@ class ChatService:
         self.history = query_history_service
         self._chat_model = None
         self._fc_model = None
+        # Results are shared between requests; treat them as read-only
+        self.tool_cache = LocalCache(settings.CHAT_TOOL_CACHE_MAX_ENTRIES, settings.CHAT_TOOL_CACHE_TTL_SECONDS)
 
         if settings.GOOGLE_API_KEY:
             genai.configure(api_key=settings.GOOGLE_API_KEY)
@@ -105,41 +128,50 @@ class ChatService:
         else:
             logger.warning("GOOGLE_API_KEY missing - ChatService will use heuristic fallback")
 
-    async def execute_chat(self, request: ChatRequest) -> ChatResponse:
-        """Execute chat request and return table and/or analysis outputs."""
-        start_time = time.time()
-        query_id = 0
+    async def execute_chat(
+        self,
+        request: ChatRequest,
+        on_event: Optional[ChatEventCallback] = None,
+    ) -> ChatResponse:
+        """
+        Execute chat request and return table and/or analysis outputs.
 
-        try:
-            query_id = await self.history.save_query(
-                user_id=request.user_id,
-                query_text=request.message,
-                search_type="chat",
-            )
-        except Exception as exc:
-            logger.warning("Failed to save chat query", extra={"error": str(exc)})
+        Args:
+            request: Chat request
+            on_event: Optional progress callback, called with "params", "tool_result",
+                      "answer_delta" and "answer_reset" events (see stream_chat)
+        """
+        start_time = time.time()
+        started = time.perf_counter()
+        timings: dict[str, float] = {}
+        parallel = settings.CHAT_PARALLEL_STAGES_ENABLED
+
+        history = asyncio.create_task(self._save_history(request, timings), name="chat-history")
+        if not parallel:
+            await history
+        extraction = asyncio.create_task(self._extract_parameters(request, timings), name="chat-extraction")
+        if not parallel:
+            await extraction
+        reporter = asyncio.create_task(self._report_params(history, extraction, on_event)) if on_event else None
+        prefetch = (
+            asyncio.create_task(self._prefetch_trade_rows(extraction, timings), name="chat-rows-prefetch")
+            if parallel and settings.CHAT_SPECULATIVE_TRADE_ROWS_ENABLED
+            else None
+        )
 
         try:
-            # Convert conversation models to simple dicts for extraction
-            conversation_context = [{"role": msg.role, "content": msg.content} for msg in request.conversation]
-
-            extracted_params = await extraction_service.extract_parameters(
-                query=request.message,
-                user_id=request.user_id,
-                current_date=datetime.now(),
-                conversation=conversation_context,
+            loop_result = await self._run_tool_calling_loop(
+                request=request,
+                extracted_params=extraction.result() if extraction.done() else extraction,
+                on_event=on_event,
+                timings=timings,
+                trade_rows_prefetch=prefetch,
             )
-        except Exception as exc:
-            logger.warning(
-                "Extraction failed in chat flow, using empty filters",
-                extra={"error": str(exc)},
-            )
-            extracted_params = ExtractedParams()
-
-        loop_result = await self._run_tool_calling_loop(
-            request=request,
-            extracted_params=extracted_params,
-        )
+        finally:
+            # Unused speculation is dropped; extraction only outlives a failed loop
+            self._discard(prefetch)
+            self._discard(extraction)
+        extracted_params = extraction.result()
 
         mode = loop_result.get("mode", "both")
         table_results: list[Trade] = loop_result.get("table_results", [])
@@ -154,12 +186,14 @@ class ChatService:
         # The FC model produces ai_answer from the tool preview data directly.
         # Only invoke _generate_analysis_answer when the FC loop produced no text.
         if mode in ("analysis", "both") and not ai_answer:
+            synthesis_started = time.perf_counter()
             try:
                 ai_answer = await self._generate_analysis_answer(
                     question=request.message,
                     evidence=evidence,
                     trades=table_results,
                     kg_evidence=kg_evidence,
+                    on_delta=self._delta_callback(on_event),
                 )
             except Exception as exc:
                 logger.warning(
@@ -167,6 +201,7 @@ class ChatService:
                     extra={"error": str(exc)},
                 )
                 ai_answer = None
+            self._add_timing(timings, "synthesis", synthesis_started)
 
         follow_up_prompts = self._build_follow_up_prompts(
             mode=mode,
@@ -174,7 +209,13 @@ class ChatService:
             has_table=bool(table_results),
         )
 
+        query_id = await history  # Long finished in practice: it started before extraction
+        if reporter:
+            await reporter
+
         execution_time_ms = (time.time() - start_time) * 1000
+        self._add_timing(timings, "total", started)
+        logger.info("Chat stages", extra={"stage_timings_ms": timings, "parallel": parallel})
 
         return ChatResponse(
             mode=mode,
@@ -186,8 +227,196 @@ class ChatService:
             follow_up_prompts=follow_up_prompts,
             execution_time_ms=execution_time_ms,
             extracted_params=extracted_params,
+            stage_timings_ms=timings,
+            tool_cache=loop_result.get("tool_cache"),
         )
 
+    async def _save_history(self, request: ChatRequest, timings: dict[str, float]) -> int:
+        """Record the chat message in query history; 0 if that fails (the chat still runs)."""
+        started = time.perf_counter()
+        try:
+            return await self.history.save_query(
+                user_id=request.user_id,
+                query_text=request.message,
+                search_type="chat",
+            )
+        except Exception as exc:
+            logger.warning("Failed to save chat query", extra={"error": str(exc)})
+            return 0
+        finally:
+            self._add_timing(timings, "history", started)
+
+    async def _extract_parameters(self, request: ChatRequest, timings: dict[str, float]) -> ExtractedParams:
+        """Extract SQL filters from the message; empty filters if extraction fails."""
+        started = time.perf_counter()
+        try:
+            # Convert conversation models to simple dicts for extraction
+            conversation_context = [{"role": msg.role, "content": msg.content} for msg in request.conversation]
+
+            return await extraction_service.extract_parameters(
+                query=request.message,
+                user_id=request.user_id,
+                current_date=datetime.now(),
+                conversation=conversation_context,
+            )
+        except Exception as exc:
+            logger.warning(
+                "Extraction failed in chat flow, using empty filters",
+                extra={"error": str(exc)},
+            )
+            return ExtractedParams()
+        finally:
+            self._add_timing(timings, "extraction", started)
+
+    @staticmethod
+    async def _report_params(
+        history: asyncio.Task,
+        extraction: asyncio.Task,
+        on_event: ChatEventCallback,
+    ) -> None:
+        """Emit the params event as soon as the query id and the filters are known."""
+        query_id, extracted_params = await history, await extraction
+        on_event("params", {"query_id": query_id, "extracted_params": extracted_params.model_dump(mode="json")})
+
+    async def _prefetch_trade_rows(self, extraction: asyncio.Task, timings: dict[str, float]) -> list[Any]:
+        """Speculatively run the get_trade_rows query as soon as the filters are extracted."""
+        extracted_params = await extraction
+        started = time.perf_counter()
+        try:
+            return await self._fetch_trade_records(extracted_params)
+        finally:
+            self._add_timing(timings, "trade_rows_prefetch", started)
+
+    async def _fetch_trade_records(self, extracted_params: ExtractedParams) -> list[Any]:
+        """Trade records for get_trade_rows (the SQL does not depend on the tool's limit)."""
+        sql_query, params = self.query_builder.build_from_extracted_params(extracted_params)
+        self._validate_sql_or_raise(sql_query, params)
+        return await db_manager.fetch(sql_query, *params)
+
+    async def _trade_records(
+        self,
+        extracted_params: ExtractedParams,
+        trade_rows_prefetch: Optional[asyncio.Task],
+    ) -> list[Any]:
+        """get_trade_rows records: the speculative prefetch if one is running, else a fresh query."""
+        if trade_rows_prefetch is not None:
+            try:
+                return await asyncio.shield(trade_rows_prefetch)
+            except Exception as exc:
+                logger.warning(f"Speculative trade rows fetch failed, querying again: {exc}")
+        return await self._fetch_trade_records(extracted_params)
+
+    @staticmethod
+    def _discard(task: Optional[asyncio.Task]) -> None:
+        """Cancel a pending helper task, or mark a failed one's exception as retrieved."""
+        if task is None:
+            return
+        if not task.done():
+            task.cancel()
+        elif not task.cancelled():
+            task.exception()
+
+    @staticmethod
+    def _add_timing(timings: dict[str, float], stage: str, started: float) -> None:
+        """Add the milliseconds since started (a perf_counter value) to a stage."""
+        timings[stage] = round(timings.get(stage, 0.0) + (time.perf_counter() - started) * 1000, 1)
+
+    async def stream_chat(self, request: ChatRequest) -> AsyncIterator[bytes]:
+        """
+        Execute a chat request and yield its progress as server-sent events.
+
+        Events (done/error always last; with parallel stages, params may follow text
+        from Gemini's first turn):
+        - params: {"query_id", "extracted_params"} once extraction finishes
+        - tool_result: {"tool", and "results"/"total_results", "evidence", "kg_evidence"
+          or "error"} as each distinct tool call completes
+        - answer_delta: {"text"} chunks of the answer as the model generates them;
+          answer_reset means text streamed so far was not the final answer
+        - done: the full ChatResponse (its ai_answer is authoritative), or
+          error: {"success", "error", "message"} if the request failed
+
+        Yields:
+            UTF-8 encoded SSE frames
+        """
+        queue: asyncio.Queue[Optional[tuple[str, dict[str, Any]]]] = asyncio.Queue()
+
+        async def _run() -> None:
+            try:
+                response = await self.execute_chat(
+                    request, on_event=lambda event, data: queue.put_nowait((event, data))
+                )
+                queue.put_nowait(("done", response.model_dump(mode="json")))
+            except LLMCapacityError as exc:
+                logger.warning(f"LLM capacity exhausted: {exc.message}", extra={"user_id": request.user_id})
+                queue.put_nowait(
+                    (
+                        "error",
+                        {
+                            "success": False,
+                            "error": "AI service busy",
+                            "message": "The AI service is handling too many requests. Please retry shortly.",
+                        },
+                    )
+                )
+            except Exception as exc:
+                logger.error(
+                    "Chat stream failed",
+                    extra={"user_id": request.user_id, "error": str(exc)},
+                    exc_info=True,
+                )
+                queue.put_nowait(
+                    (
+                        "error",
+                        {
+                            "success": False,
+                            "error": "Chat execution failed",
+                            "message": "Unable to process chat request at this time.",
+                        },
+                    )
+                )
+            finally:
+                queue.put_nowait(None)
+
+        task = asyncio.create_task(_run(), name="chat-stream")
+        try:
+            while (item := await queue.get()) is not None:
+                event, data = item
+                yield f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n".encode()
+        finally:
+            if not task.done():
+                task.cancel()  # Client disconnected
+
+    @staticmethod
+    def _delta_callback(on_event: Optional[ChatEventCallback]) -> Optional[Callable[[str], None]]:
+        """answer_delta emitter that LLM worker threads can call."""
+        if on_event is None:
+            return None
+        loop = asyncio.get_running_loop()
+        return lambda text: loop.call_soon_threadsafe(on_event, "answer_delta", {"text": text})
+
+    @staticmethod
+    def _forward_text(response: Any, on_delta: Callable[[str], None], sink: Optional[list[str]] = None) -> None:
+        """Pass the text of each chunk of a streamed response to on_delta (consuming, i.e. resolving, it)."""
+        for chunk in response:
+            # Function-call parts carry no text
+            text = "".join(getattr(part, "text", "") or "" for part in getattr(chunk, "parts", []))
+            if text:
+                if sink is not None:
+                    sink.append(text)
+                on_delta(text)
+
+    @staticmethod
+    def _tool_result_event(tool_name: str, tool_result: dict[str, Any]) -> dict[str, Any]:
+        """tool_result event payload: the rows/evidence a client can render before the answer."""
+        event: dict[str, Any] = {"tool": tool_name}
+        if "table_results" in tool_result:
+            event["results"] = [trade.model_dump(mode="json") for trade in tool_result["table_results"]]
+            event["total_results"] = len(event["results"])
+        for key in ("evidence", "kg_evidence"):
+            if key in tool_result:
+                event[key] = tool_result[key]
+        return event
+
     def _infer_mode_from_tools(self, tools_called: set[str]) -> str:
         """Infer the response mode based on which tools were invoked."""
         has_table = "get_trade_rows" in tools_called
@@ -222,7 +451,10 @@ class ChatService:
     async def _run_tool_calling_loop(
         self,
         request: ChatRequest,
-        extracted_params: ExtractedParams,
+        extracted_params: ExtractedParams | asyncio.Task,
+        on_event: Optional[ChatEventCallback] = None,
+        timings: Optional[dict[str, float]] = None,
+        trade_rows_prefetch: Optional[asyncio.Task] = None,
     ) -> dict[str, Any]:
         """
         Run the native Gemini function-calling loop.
@@ -231,51 +463,60 @@ class ChatService:
         (including in parallel within a single turn).  We execute every function
         call concurrently with asyncio.gather, send all results back in one turn,
         and repeat until Gemini emits a plain-text final answer.
+
+        With on_event, each tool result is reported as it completes and model
+        responses are streamed so the final answer arrives as answer_delta events.
+
+        extracted_params may be a still-running extraction task: the first turn is
+        then sent without the filters, which follow with the first tool results.
+        trade_rows_prefetch is a task already fetching the get_trade_rows records.
         """
         if not self._fc_model:
             raise RuntimeError("ChatService: GOOGLE_API_KEY is not configured")
 
+        timings = {} if timings is None else timings
+        extraction = extracted_params if isinstance(extracted_params, asyncio.Task) else None
+
         table_results: list[Trade] = []
         analytics_evidence_list: list[dict[str, Any]] = []
         kg_evidence: dict[str, Any] = {}
         tools_called: set[str] = set()
+        accumulated_keys: set[str] = set()  # Identical calls contribute their evidence once
+        tool_stats = {"calls": 0, "deduplicated": 0, "cache_hits": 0, "executed": 0}
 
-        # Build the first user message: question + conversation history + SQL filters
-        conversation_text = "\n".join(f"{m.role}: {m.content}" for m in request.conversation[-6:])
-        # Map extracted dimension hints so Gemini picks correct analytics grouping
-        dimension_hint = self._infer_dimension_hint(request.message)
-
-        initial_message = (
-            f"INSTRUCTION: If you call get_exception_analytics, you MUST set "
-            f"dimensions to {dimension_hint} because the user's question is about "
-            f"{'and '.join(eval(dimension_hint))} — do not default to booking_system unless the user specifically asked about booking systems.\n\n"
-            f"User question: {request.message}\n\n"
-            f"Conversation history:\n{conversation_text or '(none)'}\n\n"
-            f"Pre-extracted SQL filters (use these when calling SQL tools):\n"
-            f"{extracted_params.model_dump_json()}\n\n"
-            f"Today: {datetime.now().strftime('%Y-%m-%d')}"
-        )
+        initial_message = self._build_initial_message(request, None if extraction else extracted_params)
 
         chat = self._fc_model.start_chat(history=[])
-        loop = asyncio.get_event_loop()
+        on_delta = self._delta_callback(on_event)
+        streamed: list[str] = []  # Text forwarded during the current turn
 
         def _send(content):
-            return chat.send_message(
+            response = chat.send_message(
                 content,
                 generation_config=genai.types.GenerationConfig(
                     temperature=0.1,
                     max_output_tokens=1000,
                 ),
+                stream=on_delta is not None,
             )
+            if on_delta is not None:
+                self._forward_text(response, on_delta, streamed)
+            return response
 
+        turn_started = time.perf_counter()
         try:
-            response = await loop.run_in_executor(None, _send, initial_message)
+            response = await llm_executor.run("gemini", _send, initial_message)
         except Exception as exc:
             logger.warning(
                 "FC model initial call failed",
                 extra={"error": str(exc)},
             )
             raise
+        self._add_timing(timings, "first_turn", turn_started)
+        self._add_timing(timings, "llm", turn_started)
+
+        # Tools need the filters; the first tool-response turn also tells Gemini what they were
+        extracted_params, filters_part = await self._resolve_filters(extracted_params)
 
         for iteration in range(settings.CHAT_MAX_TOOL_ITERATIONS):
             # Collect every function call Gemini emitted in this turn
@@ -289,6 +530,10 @@ class ChatService:
                 # No more tool calls — Gemini produced the final text answer
                 break
 
+            if streamed and on_event:
+                on_event("answer_reset", {})  # Text sent alongside tool calls, not the answer
+            streamed.clear()
+
             logger.info(
                 "FC tool calls - iteration %d: %s",
                 iteration + 1,
@@ -300,54 +545,78 @@ class ChatService:
             # _execute_tool_call rather than a broken deep-conversion here.
             converted_args_list = [dict(fc.args) for fc in function_calls]
 
-            # Execute all tool calls for this turn concurrently
+            # Identical calls in this turn (same tool, args and filters) run once
+            call_keys = [
+                self._tool_cache_key(fc.name, args, extracted_params)
+                for fc, args in zip(function_calls, converted_args_list, strict=True)
+            ]
+            unique_calls: dict[str, tuple[str, dict[str, Any]]] = {}
+            for fc, args, key in zip(function_calls, converted_args_list, call_keys, strict=True):
+                unique_calls.setdefault(key, (fc.name, args))
+            tool_stats["calls"] += len(function_calls)
+            tool_stats["deduplicated"] += len(function_calls) - len(unique_calls)
+
+            # Execute the distinct tool calls for this turn concurrently
             tool_tasks = [
-                self._execute_tool_call(
-                    tool_name=fc.name,
-                    args=args,
-                    extracted_params=extracted_params,
+                self._execute_tool_call_reported(
+                    key, tool_name, args, extracted_params, tool_stats, on_event, trade_rows_prefetch
                 )
-                for fc, args in zip(function_calls, converted_args_list, strict=False)
+                for key, (tool_name, args) in unique_calls.items()
             ]
-            tool_results_list = await asyncio.gather(*tool_tasks, return_exceptions=True)
+            tools_started = time.perf_counter()
+            results_by_key = dict(
+                zip(unique_calls, await asyncio.gather(*tool_tasks, return_exceptions=True), strict=True)
+            )
+            self._add_timing(timings, "tools", tools_started)
 
-            # Build function-response parts to send back
-            fn_response_parts = []
-            for fc, tool_result in zip(function_calls, tool_results_list, strict=False):
+            # Build function-response parts to send back (one per call, as Gemini expects)
+            fn_response_parts = [filters_part] if filters_part else []
+            sent_chars = len(filters_part.text) if filters_part else 0
+            filters_part = None
+            for fc, key in zip(function_calls, call_keys, strict=True):
                 tools_called.add(fc.name)
+                tool_result = results_by_key[key]
 
                 if isinstance(tool_result, Exception):
                     logger.warning("Tool call %s raised an exception: %s", fc.name, str(tool_result))
                     result_payload: dict[str, Any] = {"error": str(tool_result)}
                 else:
-                    table_results, analytics_evidence_list, kg_evidence = self._accumulate_tool_result(
-                        fc.name,
-                        tool_result,
-                        table_results,
-                        analytics_evidence_list,
-                        kg_evidence,
-                    )
+                    if key not in accumulated_keys:
+                        accumulated_keys.add(key)
+                        table_results, analytics_evidence_list, kg_evidence = self._accumulate_tool_result(
+                            fc.name,
+                            tool_result,
+                            table_results,
+                            analytics_evidence_list,
+                            kg_evidence,
+                        )
                     result_payload = tool_result.get("result_preview", {})
 
+                encoded = self._encode_tool_result(fc.name, result_payload)
+                sent_chars += len(encoded)
                 fn_response_parts.append(
                     genai.protos.Part(
                         function_response=genai.protos.FunctionResponse(
                             name=fc.name,
-                            response={"result": json.dumps(result_payload, default=str)},
+                            response={"result": encoded},
                         )
                     )
                 )
 
             # Send all function results back to Gemini in a single turn
+            self._log_prompt_size(iteration + 1, sent_chars, response)
+            turn_started = time.perf_counter()
             try:
-                response = await loop.run_in_executor(
-                    None,
+                response = await llm_executor.run(
+                    "gemini",
                     _send,
                     genai.protos.Content(role="user", parts=fn_response_parts),
                 )
             except Exception as exc:
                 logger.warning("FC model tool-response call failed", extra={"error": str(exc)})
                 break
+            finally:
+                self._add_timing(timings, "llm", turn_started)
 
         # Extract final answer text safely (response may not have .text if something went wrong)
         final_answer: str | None = None
@@ -359,6 +628,11 @@ class ChatService:
 
         # Merge all analytics evidence collected across (possibly multiple) tool calls
         evidence = self._merge_analytics_evidence(analytics_evidence_list)
+        tool_cache: dict[str, Any] | None = None
+        if tool_stats["calls"]:
+            reused = tool_stats["deduplicated"] + tool_stats["cache_hits"]
+            tool_cache = {**tool_stats, "hit_rate": round(reused / tool_stats["calls"], 4)}
+            logger.info("Chat tool calls", extra=tool_cache)
 
         # Infer mode from which tools were called rather than asking the LLM to declare it
         mode = self._infer_mode_from_tools(tools_called)
@@ -369,8 +643,66 @@ class ChatService:
             "table_results": table_results,
             "evidence": evidence,
             "kg_evidence": kg_evidence,
+            "tool_cache": tool_cache,
         }
 
+    @staticmethod
+    def _encode_tool_result(tool_name: str, result_payload: dict[str, Any]) -> str:
+        """Tool result as compact JSON within the per-call budget (columnar rows, top-k + others)."""
+        encoded = encode_tool_result(
+            result_payload,
+            max_chars=settings.CHAT_TOOL_RESULT_MAX_CHARS,
+            max_rows=settings.CHAT_TOOL_RESULT_MAX_ROWS,
+        )
+        logger.debug("Encoded tool result", extra={"tool": tool_name, "chars": len(encoded)})
+        return encoded
+
+    @staticmethod
+    def _log_prompt_size(iteration: int, chars: int, previous_response: Any) -> None:
+        """Log the size of the tool-response turn about to be sent and Gemini's count for the previous prompt."""
+        usage = getattr(previous_response, "usage_metadata", None)
+        logger.info(
+            "FC prompt size",
+            extra={
+                "iteration": iteration,
+                "tool_result_chars": chars,
+                "tool_result_tokens_est": estimate_tokens(chars),
+                "previous_prompt_tokens": getattr(usage, "prompt_token_count", None),
+            },
+        )
+
+    @staticmethod
+    async def _resolve_filters(
+        extracted_params: ExtractedParams | asyncio.Task,
+    ) -> tuple[ExtractedParams, Optional["genai.protos.Part"]]:
+        """Wait for a pending extraction; returns the filters and, if Gemini has not seen them, a part that says them."""
+        if not isinstance(extracted_params, asyncio.Task):
+            return extracted_params, None
+        resolved = await extracted_params
+        text = f"Pre-extracted SQL filters applied by the SQL tools:\n{resolved.model_dump_json()}"
+        return resolved, genai.protos.Part(text=text)
+
+    def _build_initial_message(self, request: ChatRequest, extracted_params: Optional[ExtractedParams]) -> str:
+        """First user message: question + conversation history + SQL filters (if already extracted)."""
+        conversation_text = "\n".join(f"{m.role}: {m.content}" for m in request.conversation[-6:])
+        # Map extracted dimension hints so Gemini picks correct analytics grouping
+        dimension_hint = self._infer_dimension_hint(request.message)
+        filters_text = (
+            f"Pre-extracted SQL filters (use these when calling SQL tools):\n{extracted_params.model_dump_json()}"
+            if extracted_params is not None
+            else "SQL filters are being extracted from the question; the SQL tools apply them automatically."
+        )
+
+        return (
+            f"INSTRUCTION: If you call get_exception_analytics, you MUST set "
+            f"dimensions to {dimension_hint} because the user's question is about "
+            f"{'and '.join(eval(dimension_hint))} — do not default to booking_system unless the user specifically asked about booking systems.\n\n"
+            f"User question: {request.message}\n\n"
+            f"Conversation history:\n{conversation_text or '(none)'}\n\n"
+            f"{filters_text}\n\n"
+            f"Today: {datetime.now().strftime('%Y-%m-%d')}"
+        )
+
     def _merge_analytics_evidence(self, evidence_list: list[dict[str, Any]]) -> dict[str, Any]:
         """Merge analytics evidence from multiple tool calls into one response dict.
 
@@ -409,27 +741,101 @@ class ChatService:
             ],
         }
 
+    @classmethod
+    def _normalize_tool_args(cls, value: Any) -> Any:
+        """Plain JSON-able args: proto lists/maps unwrapped, integral floats (Gemini numbers) as ints."""
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        if isinstance(value, (str, int, float, bool)) or value is None:
+            return value
+        if hasattr(value, "items"):
+            return {str(key): cls._normalize_tool_args(item) for key, item in value.items() if item is not None}
+        try:
+            return [cls._normalize_tool_args(item) for item in value]
+        except TypeError:
+            return str(value)
+
+    @classmethod
+    def _tool_cache_key(cls, tool_name: str, args: dict[str, Any], extracted_params: ExtractedParams) -> str:
+        """Cache/dedupe key: tool name, normalised args and the extracted filters the SQL is built from."""
+        payload = json.dumps(
+            [tool_name, cls._normalize_tool_args(args or {}), extracted_params.model_dump(mode="json")],
+            sort_keys=True,
+            default=str,
+        )
+        return f"chat:tool:{hashlib.sha256(payload.encode()).hexdigest()}"
+
+    async def _execute_tool_call_cached(
+        self,
+        key: str,
+        tool_name: str,
+        args: dict[str, Any],
+        extracted_params: ExtractedParams,
+        tool_stats: dict[str, int],
+        trade_rows_prefetch: Optional[asyncio.Task] = None,
+    ) -> dict[str, Any]:
+        """Serve a recent identical SQL tool result from the short-TTL cache, else execute and store it."""
+        cacheable = settings.CHAT_TOOL_CACHE_ENABLED and tool_name in self.CACHEABLE_TOOLS
+        if cacheable:
+            cached = self.tool_cache.get(key)
+            if cached is not None:
+                tool_stats["cache_hits"] += 1
+                return cached
+
+        tool_stats["executed"] += 1
+        result = await self._execute_tool_call(
+            tool_name=tool_name,
+            args=args,
+            extracted_params=extracted_params,
+            trade_rows_prefetch=trade_rows_prefetch,
+        )
+        if cacheable:
+            self.tool_cache.set(key, result)
+        return result
+
+    async def _execute_tool_call_reported(
+        self,
+        key: str,
+        tool_name: str,
+        args: dict[str, Any],
+        extracted_params: ExtractedParams,
+        tool_stats: dict[str, int],
+        on_event: Optional[ChatEventCallback],
+        trade_rows_prefetch: Optional[asyncio.Task] = None,
+    ) -> dict[str, Any]:
+        """Run one (possibly cached) tool call and report its result as a tool_result event."""
+        try:
+            result = await self._execute_tool_call_cached(
+                key, tool_name, args, extracted_params, tool_stats, trade_rows_prefetch
+            )
+        except Exception as exc:
+            if on_event:
+                on_event("tool_result", {"tool": tool_name, "error": str(exc)})
+            raise
+        if on_event:
+            on_event("tool_result", self._tool_result_event(tool_name, result))
+        return result
+
     async def _execute_tool_call(
         self,
         tool_name: str,
         args: dict[str, Any],
         extracted_params: ExtractedParams,
+        trade_rows_prefetch: Optional[asyncio.Task] = None,
     ) -> dict[str, Any]:
         """Execute approved tool call and return preview-safe output."""
         if tool_name == "get_trade_rows":
-            sql_query, params = self.query_builder.build_from_extracted_params(extracted_params)
-            self._validate_sql_or_raise(sql_query, params)
-            records = await db_manager.fetch(sql_query, *params)
-            trades = [Trade.from_db_record(record) for record in records]
+            records = await self._trade_records(extracted_params, trade_rows_prefetch)
             limit = int(args.get("limit", 20)) if args else 20
             limit = max(1, min(limit, 100))
-            trades = trades[:limit]
+            # Rows come straight from QueryBuilder's trades SQL; only decode the ones we keep
+            trades = [Trade.from_trusted_record(record) for record in records[:limit]]
 
             return {
                 "table_results": trades,
                 "result_preview": {
                     "row_count": len(trades),
-                    "sample": [trade.model_dump() for trade in trades[:5]],
+                    "sample": [trade.model_dump() for trade in trades[: settings.CHAT_TOOL_RESULT_MAX_ROWS]],
                 },
             }
 
@@ -468,7 +874,7 @@ class ChatService:
                 "result_preview": {
                     "dimensions": evidence.get("dimensions", []),
                     "row_count": evidence.get("metadata", {}).get("row_count", 0),
-                    "sample": evidence.get("rows", [])[:5],
+                    "sample": evidence.get("rows", []),
                 },
             }
 
@@ -502,7 +908,7 @@ class ChatService:
                 "result_preview": {
                     "dimensions": evidence.get("dimensions", []),
                     "row_count": evidence.get("metadata", {}).get("row_count", 0),
-                    "sample": evidence.get("rows", [])[:5],
+                    "sample": evidence.get("rows", []),
                 },
             }
 
@@ -516,7 +922,7 @@ class ChatService:
                     "source": "knowledge_graph",
                     "dimension": kg_result.get("dimension"),
                     "row_count": kg_result.get("metadata", {}).get("row_count", 0),
-                    "sample": kg_result.get("rows", [])[:5],
+                    "sample": kg_result.get("rows", []),
                 },
             }
 
@@ -773,38 +1179,38 @@ class ChatService:
         if not safe_dimensions:
             safe_dimensions = ["booking_system"]
 
-        select_parts = []
-        group_parts = []
-        for idx, dimension in enumerate(safe_dimensions):
-            sql_col = self.ALLOWED_DIMENSIONS[dimension]
-            alias = f"dimension_{idx + 1}"
-            select_parts.append(f"{sql_col} AS {alias}")
-            group_parts.append(sql_col)
-
-        query = f"""
-            SELECT
-                {', '.join(select_parts)},
-                e.priority,
-                COUNT(*) AS exception_count,
-                COUNT(DISTINCT e.trade_id) AS affected_trades
-            FROM exceptions e
-            JOIN trades t ON t.id = e.trade_id
-            WHERE 1=1
-        """
-
-        conditions, values = self._build_analytics_conditions(extracted_params, priority_filter)
-
-        if conditions:
-            query += " AND " + " AND ".join(conditions)
+        engine = settings.CHAT_ANALYTICS_ENGINE
+        snapshot_rows = (
+            await analytics_snapshot.exception_analytics(safe_dimensions, extracted_params, priority_filter, top_k)
+            if engine in ("snapshot", "compare")
+            else None
+        )
 
-        query += f" GROUP BY {', '.join(group_parts)}, e.priority" " ORDER BY exception_count DESC" f" LIMIT {top_k}"
+        if engine == "snapshot" and snapshot_rows is not None:
+            evidence_rows = snapshot_rows
+            source = "analytics_snapshot"
+        else:
+            # Answer from the pre-aggregated rollup when its key covers the dimensions and filters
+            rollup_query = (
+                exception_rollup.analytics_query(safe_dimensions, extracted_params, priority_filter, top_k)
+                if settings.EXCEPTION_ROLLUP_ENABLED
+                else None
+            )
+            if rollup_query:
+                query, values = rollup_query
+                source = "exception_rollup"
+            else:
+                query, values = self._build_raw_analytics_query(
+                    safe_dimensions, extracted_params, priority_filter, top_k
+                )
+                source = "exceptions"
 
-        self._validate_sql_or_raise(query, values)
-        records = await db_manager.fetch(query, *values)
+            self._validate_sql_or_raise(query, values)
+            records = await db_manager.fetch(query, *values)
+            evidence_rows = [dict(record) for record in records]
 
-        evidence_rows: list[dict[str, Any]] = []
-        for record in records:
-            evidence_rows.append(dict(record))
+            if snapshot_rows is not None:
+                analytics_snapshot.compare("get_exception_analytics", evidence_rows, snapshot_rows, top_k)
 
         if len(safe_dimensions) == 1:
             # Multi-series pivot: X = unique dimension values, one series per priority.
@@ -867,15 +1273,52 @@ class ChatService:
                 "top_k": top_k,
                 "priority_filter": priority_filter,
                 "row_count": len(evidence_rows),
+                "source": source,
             },
         }
 
+    def _build_raw_analytics_query(
+        self,
+        safe_dimensions: list[str],
+        extracted_params: ExtractedParams,
+        priority_filter: list[str] | None,
+        top_k: int,
+    ) -> tuple[str, list[Any]]:
+        """Grouped exception counts straight from exceptions JOIN trades (full history scan)."""
+        select_parts = []
+        group_parts = []
+        for idx, dimension in enumerate(safe_dimensions):
+            sql_col = self.ALLOWED_DIMENSIONS[dimension]
+            alias = f"dimension_{idx + 1}"
+            select_parts.append(f"{sql_col} AS {alias}")
+            group_parts.append(sql_col)
+
+        query = f"""
+            SELECT
+                {', '.join(select_parts)},
+                e.priority,
+                COUNT(*) AS exception_count,
+                COUNT(DISTINCT e.trade_id) AS affected_trades
+            FROM exceptions e
+            JOIN trades t ON t.id = e.trade_id
+            WHERE 1=1
+        """
+
+        conditions, values = self._build_analytics_conditions(extracted_params, priority_filter)
+
+        if conditions:
+            query += " AND " + " AND ".join(conditions)
+
+        query += f" GROUP BY {', '.join(group_parts)}, e.priority" " ORDER BY exception_count DESC" f" LIMIT {top_k}"
+        return query, values
+
     async def _generate_analysis_answer(
         self,
         question: str,
         evidence: dict[str, Any],
         trades: list[Trade],
         kg_evidence: dict[str, Any] | None = None,
+        on_delta: Optional[Callable[[str], None]] = None,
     ) -> str:
         """Generate narrative answer from SQL evidence, KG evidence, and trade rows."""
         if not self._chat_model:
@@ -916,7 +1359,7 @@ Trade sample rows:
 {json.dumps(limited_trades, default=str)}
 """.strip()
 
-        response_text = await self._call_model(prompt)
+        response_text = await self._call_model(prompt, on_delta)
         return response_text.strip()
 
     async def _build_trade_timeseries_evidence(
@@ -993,10 +1436,24 @@ Trade sample rows:
         query += " AND " + " AND ".join(conditions)
         query += f" GROUP BY {group_expr}, {label_expr}, t.status ORDER BY {group_expr} ASC"
 
-        self._validate_sql_or_raise(query, values)
-        records = await db_manager.fetch(query, *values)
+        engine = settings.CHAT_ANALYTICS_ENGINE
+        snapshot_rows = (
+            await analytics_snapshot.trade_timeseries(extracted_params, year, status, bucket)
+            if engine in ("snapshot", "compare")
+            else None
+        )
+
+        if engine == "snapshot" and snapshot_rows is not None:
+            evidence_rows = snapshot_rows
+            source = "analytics_snapshot"
+        else:
+            self._validate_sql_or_raise(query, values)
+            records = await db_manager.fetch(query, *values)
+            evidence_rows = [dict(record) for record in records]
+            source = "trades_timeseries"
 
-        evidence_rows = [dict(record) for record in records]
+            if snapshot_rows is not None:
+                analytics_snapshot.compare("get_trade_timeseries", evidence_rows, snapshot_rows)
         chart_labels = [str(row.get("dimension_1", "")) for row in evidence_rows]
         chart_values = [int(row.get("exception_count", 0) or 0) for row in evidence_rows]
 
@@ -1021,14 +1478,14 @@ Trade sample rows:
                 "top_k": len(evidence_rows),
                 "priority_filter": [status],
                 "row_count": len(evidence_rows),
-                "source": "trades_timeseries",
+                "source": source,
                 "year": year,
                 "status": status,
             },
         }
 
-    async def _call_model(self, prompt: str) -> str:
-        """Invoke Gemini model in executor to avoid blocking event loop."""
+    async def _call_model(self, prompt: str, on_delta: Optional[Callable[[str], None]] = None) -> str:
+        """Invoke Gemini model on the bounded LLM executor to avoid blocking event loop."""
 
         def _sync_call() -> str:
             response = self._chat_model.generate_content(
@@ -1037,13 +1494,15 @@ Trade sample rows:
                     temperature=0.1,
                     max_output_tokens=700,
                 ),
+                stream=on_delta is not None,
             )
+            if on_delta is not None:
+                self._forward_text(response, on_delta)
             if not response.text:
                 return ""
             return response.text.strip()
 
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, _sync_call)
+        return await llm_executor.run("gemini", _sync_call)
 
     def _validate_sql_or_raise(self, query: str, values: list[Any]) -> None:
         """Ensure all chat SQL uses same safety validator as search flow."""
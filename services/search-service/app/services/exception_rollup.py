@@ -0,0 +1,346 @@
+"""
+Exception Rollup - pre-aggregated exception counts for chat analytics.
+
+get_exception_analytics used to join exceptions to trades and GROUP BY over the full
+history on every call, so its cost grew with history. exception_rollup holds exception
+counts per day x booking_system x asset_type x affirmation_system x clearing_house x
+status x priority x msg, and grouped analytics are a SUM over it instead.
+
+Maintenance: one replica is the writer, elected by holding a session-level advisory
+lock on a pooled connection for as long as it runs. On the writer, trade change events
+mark days dirty (the trade's current update_time day and, via exception_rollup_trades,
+the day it was counted under before); dirty days are recomputed every
+EXCEPTION_ROLLUP_FLUSH_SECONDS. The writer also rebuilds everything when elected and
+every EXCEPTION_ROLLUP_REBUILD_SECONDS to pick up writes that published no event.
+Other replicas only read the table and retry the election every flush, so a writer
+that goes away is replaced. Until the table has been built, analytics keep using the
+raw join.
+"""
+
+import asyncio
+import time
+from datetime import date
+from typing import Any, Optional
+
+import asyncpg
+
+from app.config.settings import settings
+from app.database.connection import db_manager
+from app.models.domain import ExtractedParams
+from app.utils.logger import logger
+
+# Rollup column for each chat analytics dimension (account is not in the rollup key)
+ROLLUP_DIMENSIONS = {
+    "booking_system": "r.booking_system",
+    "asset_type": "r.asset_type",
+    "affirmation_system": "r.affirmation_system",
+    "clearing_house": "r.clearing_house",
+    "status": "r.status",
+    "exception_message": "r.msg",
+    "priority": "r.priority",
+}
+
+# (ExtractedParams field, rollup column) for the trade filters the rollup can apply
+ROLLUP_FILTERS = (
+    ("asset_types", "r.asset_type"),
+    ("booking_systems", "r.booking_system"),
+    ("affirmation_systems", "r.affirmation_system"),
+    ("clearing_houses", "r.clearing_house"),
+    ("statuses", "r.status"),
+)
+
+# Held (session-level) by the single replica that writes the rollup
+ROLLUP_LOCK_ID = 0x5E7C0
+
+
+class ExceptionRollup:
+    """
+    Incrementally maintained exception rollup.
+
+    affected_trades counts distinct trades per rollup key, which is only additive when
+    the result is also grouped by msg (a trade's day and attributes are single-valued,
+    so rows that differ in those never share a trade). first_msg_trades counts each
+    trade once per (day, attributes, priority), under its alphabetically first msg, so
+    summing it over msg gives exact distinct trade counts for groupings without msg.
+    """
+
+    ROLLUP_SELECT = """
+        INSERT INTO exception_rollup (
+            day, booking_system, asset_type, affirmation_system, clearing_house, status, priority, msg,
+            exception_count, affected_trades, first_msg_trades
+        )
+        SELECT
+            day, booking_system, asset_type, affirmation_system, clearing_house, status, priority, msg,
+            COUNT(*), COUNT(DISTINCT trade_id), COUNT(DISTINCT trade_id) FILTER (WHERE is_first_msg)
+        FROM (
+            SELECT
+                t.update_time::date AS day, t.booking_system, t.asset_type, t.affirmation_system,
+                t.clearing_house, t.status, e.priority, e.msg, e.trade_id,
+                e.msg = MIN(e.msg) OVER (PARTITION BY e.trade_id, e.priority) AS is_first_msg
+            FROM exceptions e
+            JOIN trades t ON t.id = e.trade_id
+            {days_join}
+        ) x
+        GROUP BY day, booking_system, asset_type, affirmation_system, clearing_house, status, priority, msg
+    """
+
+    TRADES_SELECT = """
+        INSERT INTO exception_rollup_trades (trade_id, day)
+        SELECT DISTINCT e.trade_id, t.update_time::date
+        FROM exceptions e
+        JOIN trades t ON t.id = e.trade_id
+        {days_join}
+    """
+
+    # Range join per day keeps the trades.update_time index usable
+    DAYS_JOIN = "JOIN unnest($1::date[]) AS d(day) ON t.update_time >= d.day AND t.update_time < d.day + 1"
+
+    PREVIOUS_DAYS_QUERY = "SELECT DISTINCT day FROM exception_rollup_trades WHERE trade_id = ANY($1::integer[])"
+
+    POPULATED_QUERY = "SELECT EXISTS (SELECT 1 FROM exception_rollup)"
+
+    def __init__(
+        self,
+        flush_interval: float = settings.EXCEPTION_ROLLUP_FLUSH_SECONDS,
+        rebuild_interval: float = settings.EXCEPTION_ROLLUP_REBUILD_SECONDS,
+    ):
+        self.db = db_manager
+        self.flush_interval = flush_interval
+        self.rebuild_interval = rebuild_interval
+        self._pending: dict[int, Optional[date]] = {}  # trade_id -> current update_time day (None if gone)
+        self._lock = asyncio.Lock()
+        self._writer_conn: Optional[asyncpg.Connection] = None  # Holds ROLLUP_LOCK_ID while this replica writes
+        self._tasks: list[asyncio.Task] = []
+        self.rebuilt_at: Optional[float] = None
+        self.days_recomputed = 0
+        self.queries_served = 0
+
+    @property
+    def ready(self) -> bool:
+        return self.rebuilt_at is not None
+
+    @property
+    def is_writer(self) -> bool:
+        return self._writer_conn is not None
+
+    def start(self) -> None:
+        """Start the rebuild and dirty-day flush tasks (idempotent)."""
+        if not any(not task.done() for task in self._tasks):
+            self._tasks = [
+                asyncio.create_task(self._rebuild_loop(), name="exception-rollup-rebuild"),
+                asyncio.create_task(self._flush_loop(), name="exception-rollup-flush"),
+            ]
+            logger.info(
+                "Exception rollup started",
+                extra={"flush_interval": self.flush_interval, "rebuild_interval": self.rebuild_interval},
+            )
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        await self._resign()
+
+    async def _rebuild_loop(self) -> None:
+        while True:
+            try:
+                await self.rebuild()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Exception rollup rebuild failed: {e}")
+            await asyncio.sleep(self.rebuild_interval)
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                if self.is_writer:
+                    await self.flush()
+                else:
+                    await self.rebuild()  # Takes over if the writer went away, else waits for its table
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Exception rollup update failed, will retry: {e}")
+
+    async def rebuild(self) -> None:
+        """
+        Recompute the whole rollup from exceptions and trades in one transaction.
+
+        Only the elected writer rebuilds. On other replicas this just retries the election
+        and, until then, marks the rollup ready once the writer has populated it.
+        """
+        if not await self._elect():
+            if not self.ready and await self.db.fetchval(self.POPULATED_QUERY):
+                self.rebuilt_at = time.monotonic()
+                logger.info("Exception rollup ready (maintained by another replica)")
+            return
+
+        started = time.perf_counter()
+        async with self._lock:
+            self._pending.clear()  # The rebuild covers them
+            try:
+                await self.build(self._writer_conn)
+            except Exception:
+                await self._resign_if_closed()
+                raise
+            self.rebuilt_at = time.monotonic()
+
+        logger.info(
+            "Exception rollup rebuilt",
+            extra={"duration_ms": round((time.perf_counter() - started) * 1000, 1)},
+        )
+
+    async def build(self, conn: asyncpg.Connection) -> None:
+        """Replace both rollup tables with a full recompute, in one transaction on conn."""
+        async with conn.transaction():
+            await conn.execute("DELETE FROM exception_rollup")
+            await conn.execute("DELETE FROM exception_rollup_trades")
+            await conn.execute(self.ROLLUP_SELECT.format(days_join=""))
+            await conn.execute(self.TRADES_SELECT.format(days_join=""))
+
+    async def _elect(self) -> bool:
+        """Become the writer if no replica holds ROLLUP_LOCK_ID; True while this replica is the writer."""
+        await self._resign_if_closed()
+        if self._writer_conn is not None:
+            return True
+
+        conn = await self.db.pool.acquire()
+        try:
+            elected = await conn.fetchval("SELECT pg_try_advisory_lock($1)", ROLLUP_LOCK_ID)
+        except Exception:
+            await self.db.pool.release(conn)
+            raise
+        if not elected:
+            await self.db.pool.release(conn)
+            return False
+
+        self._writer_conn = conn
+        logger.info("Exception rollup writer elected")
+        return True
+
+    async def _resign_if_closed(self) -> None:
+        """Drop a writer connection the server has closed (its session lock went with it)."""
+        if self._writer_conn is not None and self._writer_conn.is_closed():
+            await self._resign()
+
+    async def _resign(self) -> None:
+        """Give up the writer role; releasing to the pool runs pg_advisory_unlock_all."""
+        conn, self._writer_conn = self._writer_conn, None
+        if conn is not None:
+            try:
+                await self.db.pool.release(conn)
+            except Exception as e:
+                logger.warning(f"Exception rollup writer connection release failed: {e}")
+
+    async def apply_trade_change(self, trade_id: int, trade_row: Optional[dict[str, Any]], event: dict) -> None:
+        """Trade change handler: mark the trade's days dirty for the next flush (writer only)."""
+        if not self.is_writer:
+            return  # The writer replica receives the same event
+        update_time = trade_row.get("update_time") if trade_row else None
+        self._pending[trade_id] = update_time.date() if update_time else None
+
+    async def flush(self) -> int:
+        """
+        Recompute every day touched by trades changed since the last flush.
+
+        Returns:
+            Number of days recomputed
+        """
+        async with self._lock:
+            if not self._pending or not self.ready or not self.is_writer:
+                return 0
+            pending, self._pending = self._pending, {}
+            try:
+                days = await self._recompute(self._writer_conn, pending)
+            except Exception:
+                self._pending = pending | self._pending  # Retry on the next flush
+                await self._resign_if_closed()
+                raise
+
+        self.days_recomputed += len(days)
+        logger.debug("Exception rollup updated", extra={"trades": len(pending), "days": len(days)})
+        return len(days)
+
+    async def _recompute(self, conn: asyncpg.Connection, pending: dict[int, Optional[date]]) -> list[date]:
+        async with conn.transaction():
+            previous = await conn.fetch(self.PREVIOUS_DAYS_QUERY, list(pending))
+            days = sorted({row["day"] for row in previous} | {day for day in pending.values() if day})
+            if days:
+                await conn.execute("DELETE FROM exception_rollup WHERE day = ANY($1::date[])", days)
+                await conn.execute("DELETE FROM exception_rollup_trades WHERE day = ANY($1::date[])", days)
+                await conn.execute(self.ROLLUP_SELECT.format(days_join=self.DAYS_JOIN), days)
+                await conn.execute(self.TRADES_SELECT.format(days_join=self.DAYS_JOIN), days)
+        return days
+
+    def analytics_query(
+        self,
+        dimensions: list[str],
+        extracted_params: ExtractedParams,
+        priority_filter: list[str] | None,
+        top_k: int,
+    ) -> Optional[tuple[str, list[Any]]]:
+        """
+        Rollup equivalent of the chat analytics join, if the request can be answered from it.
+
+        Returns:
+            (query, values) with the same columns as the raw query, or None when the rollup
+            is not loaded yet or a dimension/filter (account) is not part of its key
+        """
+        if not self.ready or extracted_params.accounts or any(d not in ROLLUP_DIMENSIONS for d in dimensions):
+            return None
+
+        conditions: list[str] = []
+        values: list[Any] = []
+        for field, column in ROLLUP_FILTERS:
+            field_values = getattr(extracted_params, field)
+            if field_values:
+                values.append(field_values)
+                conditions.append(f"{column} = ANY(${len(values)}::text[])")
+        if extracted_params.date_from:
+            values.append(date.fromisoformat(extracted_params.date_from))
+            conditions.append(f"r.day >= ${len(values)}::date")
+        if extracted_params.date_to:
+            values.append(date.fromisoformat(extracted_params.date_to))
+            conditions.append(f"r.day <= ${len(values)}::date")
+        if priority_filter:
+            values.append(priority_filter)
+            conditions.append(f"r.priority = ANY(${len(values)}::text[])")
+
+        columns = [ROLLUP_DIMENSIONS[dimension] for dimension in dimensions]
+        affected = "affected_trades" if "exception_message" in dimensions else "first_msg_trades"
+        select = ", ".join(f"{column} AS dimension_{index + 1}" for index, column in enumerate(columns))
+        query = f"""
+            SELECT
+                {select},
+                r.priority,
+                SUM(r.exception_count)::bigint AS exception_count,
+                SUM(r.{affected})::bigint AS affected_trades
+            FROM exception_rollup r
+            WHERE 1=1
+        """
+        if conditions:
+            query += " AND " + " AND ".join(conditions)
+        query += f" GROUP BY {', '.join(columns)}, r.priority ORDER BY exception_count DESC LIMIT {top_k}"
+        self.queries_served += 1
+        return query, values
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "writer": self.is_writer,
+            "pending_trades": len(self._pending),
+            "days_recomputed": self.days_recomputed,
+            "queries_served": self.queries_served,
+            "seconds_since_rebuild": round(time.monotonic() - self.rebuilt_at, 1) if self.ready else None,
+        }
+
+
+# Global singleton instance
+exception_rollup = ExceptionRollup()
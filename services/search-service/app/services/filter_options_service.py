@@ -0,0 +1,255 @@
+"""
+Filter Options Service - distinct values for each trade filter field.
+Backs the /api/filter-options dropdowns and the vocabulary of the rule-based NL parser.
+
+Values are kept in trade_filter_values (one row per field and value) instead of being
+aggregated over trades on every call. Reads go through the cache (local tier first,
+"filters:" prefix) and fall back to that small table, so they cost the same whatever
+the size of trades. Trade change events add values the first time they appear; a
+background reconcile against trades every FILTER_OPTIONS_RECONCILE_SECONDS picks up
+anything written without an event and drops values no trade uses any more.
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from typing import Any, Optional
+
+from app.cache.redis_client import CacheKeys, redis_manager
+from app.config.settings import settings
+from app.database.connection import db_manager
+from app.utils.logger import logger
+
+# Field names match ExtractedParams (and the FilterOptions response model)
+FILTER_FIELDS = ("accounts", "asset_types", "booking_systems", "affirmation_systems", "clearing_houses", "statuses")
+
+# Trade column behind each filter field
+FIELD_COLUMNS = {
+    "accounts": "account",
+    "asset_types": "asset_type",
+    "booking_systems": "booking_system",
+    "affirmation_systems": "affirmation_system",
+    "clearing_houses": "clearing_house",
+    "statuses": "status",
+}
+
+
+class FilterOptionsService:
+    """
+    Snapshot of distinct filter values with an ETag.
+
+    The snapshot is {"options": {field: sorted values}, "etag": quoted hash of the
+    options}; the ETag only changes when a value is added or removed.
+    """
+
+    FILTER_OPTIONS_QUERY = """
+        SELECT
+            array_agg(DISTINCT account   ORDER BY account)            FILTER (WHERE account IS NOT NULL)            AS accounts,
+            array_agg(DISTINCT asset_type ORDER BY asset_type)        FILTER (WHERE asset_type IS NOT NULL)         AS asset_types,
+            array_agg(DISTINCT booking_system ORDER BY booking_system) FILTER (WHERE booking_system IS NOT NULL)    AS booking_systems,
+            array_agg(DISTINCT affirmation_system ORDER BY affirmation_system) FILTER (WHERE affirmation_system IS NOT NULL) AS affirmation_systems,
+            array_agg(DISTINCT clearing_house ORDER BY clearing_house) FILTER (WHERE clearing_house IS NOT NULL)   AS clearing_houses,
+            array_agg(DISTINCT status ORDER BY status)                FILTER (WHERE status IS NOT NULL)            AS statuses
+        FROM trades;
+    """
+
+    SNAPSHOT_QUERY = """
+        SELECT field, array_agg(value ORDER BY value) AS values
+        FROM trade_filter_values
+        GROUP BY field
+    """
+
+    INSERT_VALUES_QUERY = """
+        INSERT INTO trade_filter_values (field, value)
+        SELECT * FROM unnest($1::text[], $2::text[])
+        ON CONFLICT DO NOTHING
+    """
+
+    # Per field; {column} comes from FIELD_COLUMNS. NOT EXISTS is evaluated when the DELETE
+    # runs, so values that trade events inserted after the aggregate was read are kept.
+    DELETE_STALE_QUERY = """
+        DELETE FROM trade_filter_values v
+        WHERE v.field = $1
+          AND v.value <> ALL($2::text[])
+          AND NOT EXISTS (SELECT 1 FROM trades t WHERE t.{column} = v.value)
+    """
+
+    def __init__(
+        self,
+        reconcile_interval: float = settings.FILTER_OPTIONS_RECONCILE_SECONDS,
+        cache_ttl: int = settings.CACHE_TTL_FILTER_OPTIONS,
+    ):
+        self.db = db_manager
+        self.cache = redis_manager
+        self.reconcile_interval = reconcile_interval
+        self.cache_ttl = cache_ttl
+        self._known: Optional[set[tuple[str, str]]] = None  # (field, value) pairs already in the table
+        self._task: Optional[asyncio.Task] = None
+        self.reconciled_at: Optional[float] = None
+        self.values_added = 0
+
+    def start(self) -> None:
+        """Start the background reconcile task (idempotent)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="filter-options-reconcile")
+            logger.info("Filter options reconcile started", extra={"interval": self.reconcile_interval})
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.reconcile()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Filter options reconcile failed, keeping current values: {e}")
+            await asyncio.sleep(self.reconcile_interval)
+
+    async def get_options(self) -> dict[str, list[str]]:
+        """
+        Return all distinct values for each filter field.
+
+        Returns:
+            Mapping of field name (see FILTER_FIELDS) to sorted distinct values
+        """
+        return (await self.get_snapshot())["options"]
+
+    async def get_snapshot(self) -> dict[str, Any]:
+        """
+        Return the current options and their ETag, from the cache when possible.
+
+        Returns:
+            {"options": {field: sorted values}, "etag": '"<hash>"'}; treat as read-only
+        """
+        if not settings.FILTER_OPTIONS_SNAPSHOT_ENABLED:
+            return self._snapshot(await self._aggregate())
+
+        try:
+            cached = await self.cache.get(CacheKeys.filter_options())
+            if cached is not None:
+                return cached
+        except Exception as e:
+            logger.warning(f"Filter options cache read error: {e}")
+
+        snapshot = await self._load()
+        try:
+            await self.cache.set(CacheKeys.filter_options(), snapshot, ttl=self.cache_ttl)
+        except Exception as e:
+            logger.warning(f"Filter options cache write error: {e}")
+        return snapshot
+
+    async def _load(self) -> dict[str, Any]:
+        """Read the distinct-values table (aggregating trades only while it is still empty)."""
+        rows = await self.db.fetch(self.SNAPSHOT_QUERY)
+        if rows:
+            options = {field: [] for field in FILTER_FIELDS}
+            for row in rows:
+                if row["field"] in options:
+                    options[row["field"]] = list(row["values"])
+        else:
+            options = await self._aggregate()  # First start: the reconcile task has not backfilled yet
+        self._known = self._pairs(options)
+        return self._snapshot(options)
+
+    async def _aggregate(self) -> dict[str, list[str]]:
+        """Distinct values straight from trades (one pass over the whole table)."""
+        row = await self.db.fetchrow(self.FILTER_OPTIONS_QUERY)
+        return {field: list(row[field] or []) if row else [] for field in FILTER_FIELDS}
+
+    async def reconcile(self) -> None:
+        """Make trade_filter_values match trades exactly: add missing values, drop unused ones."""
+        started = time.perf_counter()
+        known_before = set(self._known or ())
+        options = await self._aggregate()
+        pairs = self._pairs(options)
+        fields, values = [field for field, _ in pairs], [value for _, value in pairs]
+
+        deleted = 0
+        async with self.db.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(self.INSERT_VALUES_QUERY, fields, values)
+                for field, column in FIELD_COLUMNS.items():
+                    status = await conn.execute(self.DELETE_STALE_QUERY.format(column=column), field, options[field])
+                    deleted += int(status.split()[-1])
+
+        # Keep pairs apply_trade_change added while this ran; the DELETE left them in the table
+        added_meanwhile = (self._known or set()) - known_before
+        pairs |= added_meanwhile
+        changed = pairs != self._known
+        self._known = pairs
+        self.reconciled_at = time.monotonic()
+        if changed:
+            await self._invalidate()
+
+        logger.info(
+            "Filter options reconciled",
+            extra={
+                "values": len(pairs),
+                "deleted": deleted,
+                "changed": changed,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+            },
+        )
+
+    async def apply_trade_change(self, trade_id: int, trade_row: Optional[dict[str, Any]], event: dict) -> None:
+        """Trade change handler: add field values seen for the first time and refresh the snapshot."""
+        if not trade_row or not settings.FILTER_OPTIONS_SNAPSHOT_ENABLED:
+            return
+        if self._known is None:
+            snapshot = await self.get_snapshot()
+            if self._known is None:  # Cache hit (e.g. written by another replica): diff against it
+                self._known = self._pairs(snapshot["options"])
+
+        new_pairs = {
+            (field, value)
+            for field, column in FIELD_COLUMNS.items()
+            if isinstance(value := trade_row.get(column), str) and value and (field, value) not in self._known
+        }
+        if not new_pairs:
+            return
+
+        fields, values = zip(*sorted(new_pairs), strict=True)
+        await self.db.execute(self.INSERT_VALUES_QUERY, list(fields), list(values))
+        self._known |= new_pairs
+        self.values_added += len(new_pairs)
+        await self._invalidate()
+        logger.info("New filter values added", extra={"trade_id": trade_id, "values": sorted(new_pairs)})
+
+    async def _invalidate(self) -> None:
+        """Drop the cached snapshot here and (via the local-tier invalidation channel) on every replica."""
+        try:
+            await self.cache.delete(CacheKeys.filter_options())
+        except Exception as e:
+            logger.warning(f"Filter options cache invalidation error: {e}")
+
+    @staticmethod
+    def _pairs(options: dict[str, list[str]]) -> set[tuple[str, str]]:
+        return {(field, value) for field, field_values in options.items() for value in field_values}
+
+    @staticmethod
+    def _snapshot(options: dict[str, list[str]]) -> dict[str, Any]:
+        digest = hashlib.sha1(json.dumps(options, sort_keys=True).encode()).hexdigest()
+        return {"options": options, "etag": f'"{digest}"'}
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "values": len(self._known) if self._known is not None else None,
+            "values_added": self.values_added,
+            "seconds_since_reconcile": (
+                round(time.monotonic() - self.reconciled_at, 1) if self.reconciled_at is not None else None
+            ),
+        }
+
+
+# Global singleton instance
+filter_options_service = FilterOptionsService()
@@ -7,7 +7,6 @@ NOTE: BedrockService (bedrock_service.py) remains the production target.
       Switch search_orchestrator.py back to bedrock_service when ready.
 """
 
-import asyncio
 import hashlib
 import json
 from datetime import datetime
@@ -16,6 +15,7 @@ from typing import Optional
 import google.generativeai as genai
 
 from app.cache.redis_client import redis_manager
+from app.cache.single_flight import SingleFlight
 from app.config.settings import settings
 from app.models.domain import ExtractedParams
 from app.prompts.extraction_prompt import (
@@ -23,7 +23,8 @@ from app.prompts.extraction_prompt import (
     build_user_prompt,
     build_validation_rules,
 )
-from app.utils.exceptions import BedrockAPIError, BedrockResponseError
+from app.services.llm_executor import llm_executor
+from app.utils.exceptions import BedrockAPIError, BedrockResponseError, LLMCapacityError
 from app.utils.logger import logger
 
 
@@ -45,6 +46,7 @@ class GeminiService:
         self._initialized = False
         self.model = None
         self.cache = redis_manager
+        self.single_flight = SingleFlight()
         self.validation_rules = build_validation_rules()
 
         if not api_key:
@@ -78,7 +80,7 @@ class GeminiService:
 
         Flow identical to BedrockService:
         1. Check cache
-        2. On miss → call Gemini API
+        2. On miss → call Gemini API (concurrent misses for the same key share one call)
         3. Parse and validate JSON response
         4. Cache result
         5. Return ExtractedParams
@@ -125,9 +127,31 @@ class GeminiService:
 
         logger.info("Cache miss - calling Gemini API")
 
+        # Steps 2-4, coalesced with identical in-flight extractions (this and other replicas)
+        return await self.single_flight.run(
+            cache_key,
+            lambda: self._extract_uncached(query, user_id, current_date, conversation, cache_key),
+            lambda: self._get_from_cache(cache_key),
+        )
+
+    # ------------------------------------------------------------------
+    # Private helpers
+    # ------------------------------------------------------------------
+
+    async def _extract_uncached(
+        self,
+        query: str,
+        user_id: str,
+        current_date: Optional[datetime],
+        conversation: Optional[list[dict[str, str]]],
+        cache_key: str,
+    ) -> ExtractedParams:
+        """Call Gemini, parse and validate the response, and cache it under cache_key."""
         # Step 2: Call Gemini API
         try:
             raw_response = await self._invoke_gemini(query, current_date, conversation)
+        except LLMCapacityError:
+            raise
         except Exception as e:
             logger.error(
                 f"Gemini API call failed: {e}",
@@ -165,10 +189,6 @@ class GeminiService:
 
         return extracted_params
 
-    # ------------------------------------------------------------------
-    # Private helpers
-    # ------------------------------------------------------------------
-
     async def _invoke_gemini(
         self,
         query: str,
@@ -176,7 +196,7 @@ class GeminiService:
         conversation: Optional[list[dict[str, str]]] = None,
     ) -> str:
         """
-        Call Google Gemini synchronously via asyncio executor so the
+        Call Google Gemini synchronously on the bounded LLM executor so the
         async orchestrator is not blocked.
 
         Returns:
@@ -198,8 +218,7 @@ class GeminiService:
                 raise RuntimeError("Empty response from Gemini.")
             return response.text.strip()
 
-        loop = asyncio.get_event_loop()
-        raw_text = await loop.run_in_executor(None, _sync_call)
+        raw_text = await llm_executor.run("gemini", _sync_call)
 
         logger.info(
             "Gemini API call successful",
@@ -314,9 +333,11 @@ class GeminiService:
     async def _get_from_cache(self, cache_key: str) -> Optional[ExtractedParams]:
         """Retrieve cached extraction result."""
         try:
-            cached_json = await self.cache.get(cache_key)
-            if cached_json:
-                return ExtractedParams(**json.loads(cached_json))
+            cached = await self.cache.get(cache_key)
+            if isinstance(cached, str):  # Entries written before params were stored as a JSON object
+                cached = json.loads(cached)
+            if cached:
+                return ExtractedParams(**cached)
             return None
         except Exception as e:
             logger.warning(f"Cache retrieval error: {e}", extra={"cache_key": cache_key})
@@ -327,7 +348,7 @@ class GeminiService:
         try:
             await self.cache.set(
                 cache_key,
-                params.model_dump_json(),
+                params.model_dump(mode="json"),
                 ttl=settings.CACHE_TTL_AI_EXTRACTION,
             )
             logger.debug(
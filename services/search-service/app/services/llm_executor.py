@@ -0,0 +1,199 @@
+"""
+LLM Executor - bounded concurrency for LLM provider calls.
+
+The Gemini SDK is synchronous, so extraction and chat calls used to go through the
+default run_in_executor(None, ...) pool, shared with everything else in the process
+and uncapped per provider: a burst of chat turns could take every worker and stall
+unrelated executor users. Each provider now gets its own worker threads, a limit on
+in-flight calls and a bounded wait queue with a deadline, so a burst queues (or is
+refused with 503) instead of starving the process. Async SDKs (aioboto3 for Bedrock)
+take the same slots through slot().
+"""
+
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Optional, TypeVar
+
+from app.config.settings import settings
+from app.utils.exceptions import LLMCapacityError
+from app.utils.logger import logger
+
+T = TypeVar("T")
+
+
+class ProviderLimiter:
+    """
+    In-flight limit and FIFO wait queue for one provider.
+
+    A released slot is handed directly to the oldest waiter, so waiters are served in
+    arrival order and cannot be overtaken by new callers. Waiters give up (LLMCapacityError)
+    after queue_timeout seconds; callers arriving to a full queue are refused immediately.
+    """
+
+    def __init__(self, name: str, max_concurrency: int, max_queue: int, queue_timeout: float):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.waited = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Worker threads for blocking SDK calls (one per slot, created on first use)."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix=f"llm-{self.name}")
+        return self._executor
+
+    async def acquire(self) -> None:
+        """Take a slot, waiting in the queue up to queue_timeout seconds."""
+        if self.in_flight < self.max_concurrency and not self._waiters:
+            self.in_flight += 1
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            raise LLMCapacityError(
+                f"{self.name} LLM queue is full",
+                details={"provider": self.name, "queue_depth": len(self._waiters), "in_flight": self.in_flight},
+            )
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                self.release()  # The slot was handed over just as we gave up; pass it on
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self.timeouts += 1
+            raise LLMCapacityError(
+                f"Timed out waiting for a {self.name} LLM slot",
+                details={"provider": self.name, "queue_timeout_seconds": self.queue_timeout},
+            ) from None
+        finally:
+            self._record_wait((time.monotonic() - started) * 1000)
+
+    def release(self) -> None:
+        """Hand the slot to the oldest live waiter, or free it."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def _record_wait(self, wait_ms: float) -> None:
+        self.waited += 1
+        self.wait_ms_total += wait_ms
+        self.wait_ms_max = max(self.wait_ms_max, wait_ms)
+        if wait_ms >= 1000:
+            logger.warning(
+                "LLM call queued for over a second",
+                extra={"provider": self.name, "wait_ms": round(wait_ms, 1), "queue_depth": len(self._waiters)},
+            )
+
+    def stats(self) -> dict[str, Any]:
+        """Current load plus counters since startup."""
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "queue_depth": len(self._waiters),
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "queued": self.waited,
+            "wait_ms_avg": round(self.wait_ms_total / self.waited, 1) if self.waited else 0.0,
+            "wait_ms_max": round(self.wait_ms_max, 1),
+        }
+
+
+class LLMExecutor:
+    """Per-provider limiters, created on first use from LLM_MAX_CONCURRENCY."""
+
+    def __init__(
+        self,
+        max_concurrency: Optional[dict[str, int]] = None,
+        max_queue: int = settings.LLM_MAX_QUEUE,
+        queue_timeout: float = settings.LLM_QUEUE_TIMEOUT_SECONDS,
+    ):
+        self.max_concurrency = settings.LLM_MAX_CONCURRENCY if max_concurrency is None else max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._limiters: dict[str, ProviderLimiter] = {}
+
+    def limiter(self, provider: str) -> ProviderLimiter:
+        limiter = self._limiters.get(provider)
+        if limiter is None:
+            limiter = ProviderLimiter(
+                provider,
+                max_concurrency=self.max_concurrency.get(provider, settings.LLM_DEFAULT_MAX_CONCURRENCY),
+                max_queue=self.max_queue,
+                queue_timeout=self.queue_timeout,
+            )
+            self._limiters[provider] = limiter
+        return limiter
+
+    async def run(self, provider: str, fn: Callable[..., T], *args: Any) -> T:
+        """
+        Run a blocking SDK call on the provider's worker threads once a slot is free.
+
+        The slot is held until the thread finishes, even if the caller is cancelled,
+        so the in-flight count always matches the calls actually running.
+
+        Raises:
+            LLMCapacityError: If the queue is full or no slot frees up before the deadline
+        """
+        limiter = self.limiter(provider)
+        await limiter.acquire()
+        loop = asyncio.get_running_loop()
+        try:
+            future = limiter.executor.submit(fn, *args)
+        except BaseException:
+            limiter.release()
+            raise
+        future.add_done_callback(lambda _: self._release_from_thread(loop, limiter))
+        return await asyncio.wrap_future(future)
+
+    @asynccontextmanager
+    async def slot(self, provider: str) -> AsyncIterator[None]:
+        """Hold one of the provider's slots around an async SDK call."""
+        limiter = self.limiter(provider)
+        await limiter.acquire()
+        try:
+            yield
+        finally:
+            limiter.completed += 1
+            limiter.release()
+
+    @staticmethod
+    def _release_from_thread(loop: asyncio.AbstractEventLoop, limiter: ProviderLimiter) -> None:
+        def _release():
+            limiter.completed += 1
+            limiter.release()
+
+        try:
+            loop.call_soon_threadsafe(_release)
+        except RuntimeError:
+            pass  # Loop already closed (shutdown); nothing is waiting on it any more
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        return {name: limiter.stats() for name, limiter in self._limiters.items()}
+
+
+# Global singleton instance
+llm_executor = LLMExecutor()
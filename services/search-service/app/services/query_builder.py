@@ -8,12 +8,17 @@ CRITICAL SECURITY:
 - asyncpg handles escaping automatically - we just provide values in order
 """
 
+import base64
+import binascii
+import json
 from datetime import datetime
-from typing import Any, Tuple
+from typing import Any, Optional, Tuple
 
 from app.config.settings import settings
 from app.models.domain import ExtractedParams
 from app.models.request import ManualSearchFilters
+from app.services.ranking_service import SqlScoreExpression
+from app.utils.exceptions import InvalidSearchRequestError
 from app.utils.logger import logger
 
 
@@ -44,12 +49,21 @@ class QueryBuilder:
         WHERE 1=1
     """
 
-    def build_from_extracted_params(self, params: ExtractedParams) -> Tuple[str, list[Any]]:
+    def build_from_extracted_params(
+        self,
+        params: ExtractedParams,
+        page_size: Optional[int] = None,
+        cursor: Optional[str] = None,
+        sql_score: Optional[SqlScoreExpression] = None,
+    ) -> Tuple[str, list[Any]]:
         """
         Build SQL query from AI-extracted parameters.
 
         Args:
             params: ExtractedParams from Bedrock
+            page_size: Optional keyset page size (enables cursor pagination)
+            cursor: Optional opaque cursor from a previous page's next_cursor
+            sql_score: Optional compiled ranking; orders by relevance in SQL (not with pagination)
 
         Returns:
             Tuple of (sql_query, parameter_values)
@@ -65,6 +79,8 @@ class QueryBuilder:
             values.append(params.trade_id)
             param_index += 1
             query = f"{self.BASE_QUERY} AND {conditions[0]} LIMIT 1"
+            if sql_score is not None:
+                query = self.build_score_ranked_query(query, values, "update_time", sql_score)
             logger.info(
                 "Built SQL query from extracted parameters (trade_id exact lookup)",
                 extra={"trade_id": params.trade_id},
@@ -135,8 +151,11 @@ class QueryBuilder:
             param_index += 1
 
         # Build final query
+        order_limit = self._build_order_and_limit(conditions, values, "update_time", page_size, cursor, sql_score)
         where_clause = " AND ".join(conditions) if conditions else "TRUE"
-        query = f"{self.BASE_QUERY} AND {where_clause} ORDER BY update_time DESC LIMIT {settings.MAX_SEARCH_RESULTS}"
+        query = f"{self.BASE_QUERY} AND {where_clause} {order_limit}"
+        if sql_score is not None:
+            query = self.build_score_ranked_query(query, values, "update_time", sql_score)
 
         logger.info(
             "Built SQL query from extracted parameters",
@@ -149,12 +168,21 @@ class QueryBuilder:
 
         return query, values
 
-    def build_from_manual_filters(self, filters: ManualSearchFilters) -> Tuple[str, list[Any]]:
+    def build_from_manual_filters(
+        self,
+        filters: ManualSearchFilters,
+        page_size: Optional[int] = None,
+        cursor: Optional[str] = None,
+        sql_score: Optional[SqlScoreExpression] = None,
+    ) -> Tuple[str, list[Any]]:
         """
         Build SQL query from manual frontend filters.
 
         Args:
             filters: ManualSearchFilters from frontend
+            page_size: Optional keyset page size (enables cursor pagination)
+            cursor: Optional opaque cursor from a previous page's next_cursor
+            sql_score: Optional compiled ranking; orders by relevance in SQL (not with pagination)
 
         Returns:
             Tuple of (sql_query, parameter_values)
@@ -240,8 +268,11 @@ class QueryBuilder:
             param_index += 1
 
         # Build final query
+        order_limit = self._build_order_and_limit(conditions, values, date_field, page_size, cursor, sql_score)
         where_clause = " AND ".join(conditions) if conditions else "TRUE"
-        query = f"{self.BASE_QUERY} AND {where_clause} ORDER BY {date_field} DESC LIMIT {settings.MAX_SEARCH_RESULTS}"
+        query = f"{self.BASE_QUERY} AND {where_clause} {order_limit}"
+        if sql_score is not None:
+            query = self.build_score_ranked_query(query, values, date_field, sql_score)
 
         logger.info(
             "Built SQL query from manual filters",
@@ -255,6 +286,87 @@ class QueryBuilder:
 
         return query, values
 
+    def _build_order_and_limit(
+        self,
+        conditions: list[str],
+        values: list[Any],
+        sort_field: str,
+        page_size: Optional[int],
+        cursor: Optional[str],
+        sql_score: Optional[SqlScoreExpression] = None,
+    ) -> str:
+        """
+        Build the ORDER BY / LIMIT tail, appending a keyset condition when paginating.
+
+        Without page_size or cursor the legacy single-shot shape is kept
+        (ORDER BY sort_field DESC LIMIT MAX_SEARCH_RESULTS). With pagination the
+        order is made total by tie-breaking on id, and one extra row is fetched so
+        the caller can tell whether another page exists. With sql_score the tail is
+        left to build_score_ranked_query, which ranks every matching row.
+
+        Raises:
+            InvalidSearchRequestError: If sql_score is combined with pagination
+        """
+        if sql_score is not None:
+            if page_size is not None or cursor is not None:
+                raise InvalidSearchRequestError("SQL relevance ordering cannot be combined with pagination")
+            return ""
+
+        if page_size is None and cursor is None:
+            return f"ORDER BY {sort_field} DESC LIMIT {settings.MAX_SEARCH_RESULTS}"
+
+        page_size = self.clamp_page_size(page_size)
+
+        if cursor:
+            cursor_time, cursor_id = self.decode_cursor(cursor, sort_field)
+            next_index = len(values) + 1
+            conditions.append(f"({sort_field}, id) < (${next_index}::timestamp, ${next_index + 1}::integer)")
+            values.extend([cursor_time, cursor_id])
+
+        return f"ORDER BY {sort_field} DESC, id DESC LIMIT {page_size + 1}"
+
+    @staticmethod
+    def clamp_page_size(page_size: Optional[int]) -> int:
+        """Clamp a requested page size to 1..MAX_SEARCH_RESULTS (default SEARCH_PAGE_SIZE)."""
+        if page_size is None:
+            page_size = settings.SEARCH_PAGE_SIZE
+        return max(1, min(int(page_size), settings.MAX_SEARCH_RESULTS))
+
+    @staticmethod
+    def encode_cursor(sort_field: str, sort_value: datetime, trade_id: int) -> str:
+        """
+        Encode the keyset position of the last row of a page as an opaque cursor.
+
+        The raw timestamp is kept at full precision; the second-resolution strings on
+        Trade would skip rows sharing the same second.
+        """
+        payload = json.dumps({"f": sort_field, "t": sort_value.isoformat(), "id": int(trade_id)}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor: str, sort_field: str) -> Tuple[datetime, int]:
+        """
+        Decode a cursor produced by encode_cursor.
+
+        Raises:
+            InvalidSearchRequestError: If the cursor is malformed or was issued for another sort field
+        """
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            cursor_field = payload["f"]
+            cursor_time = datetime.fromisoformat(payload["t"])
+            cursor_id = int(payload["id"])
+        except (binascii.Error, ValueError, KeyError, TypeError) as e:
+            raise InvalidSearchRequestError("Invalid pagination cursor", details={"error": str(e)})
+
+        if cursor_field != sort_field:
+            raise InvalidSearchRequestError(
+                "Pagination cursor does not match the requested sort order",
+                details={"cursor_field": cursor_field, "sort_field": sort_field},
+            )
+        return cursor_time, cursor_id
+
     # DML / DDL keywords that must never appear in a read-only query.
     # Checked against a normalised (stripped, upper-cased) copy of the SQL so
     # that mixed-case or leading-whitespace variants are also caught.
@@ -331,6 +443,52 @@ class QueryBuilder:
         logger.debug("Query safety validation passed")
         return True
 
+    # to_char pattern producing the same strings as Trade.from_db_record's strftime
+    JSON_TIMESTAMP_FORMAT = 'YYYY-MM-DD"T"HH24:MI:SS"Z"'
+
+    def build_json_query(self, search_query: str, sort_field: str = "update_time", ranked: bool = False) -> str:
+        """
+        Wrap a search query so Postgres assembles the results array itself.
+
+        The row shape matches the Trade model's JSON (id exposed as trade_id, ISO
+        timestamps), so the text can be placed into the response body untouched.
+        Rows are aggregated in the search query's order, tie-broken on id.
+
+        Args:
+            search_query: SELECT built by build_from_extracted_params/build_from_manual_filters
+            sort_field: Column the search query orders by
+            ranked: search_query is score-ranked (build_score_ranked_query); keep that order
+
+        Returns:
+            Query returning one row: results (JSON array text) and trade_ids (for cache invalidation)
+        """
+        order_by = f"t.{sort_field} DESC, t.id DESC"
+        if ranked:
+            order_by = f"t.relevance_score DESC, {order_by}"
+
+        return f"""
+            SELECT
+                COALESCE(
+                    json_agg(
+                        json_build_object(
+                            'trade_id', t.id,
+                            'account', t.account,
+                            'asset_type', t.asset_type,
+                            'booking_system', t.booking_system,
+                            'affirmation_system', t.affirmation_system,
+                            'clearing_house', t.clearing_house,
+                            'create_time', to_char(t.create_time, '{self.JSON_TIMESTAMP_FORMAT}'),
+                            'update_time', to_char(t.update_time, '{self.JSON_TIMESTAMP_FORMAT}'),
+                            'status', t.status
+                        )
+                        ORDER BY {order_by}
+                    ),
+                    '[]'::json
+                )::text AS results,
+                COALESCE(array_agg(t.id), ARRAY[]::integer[]) AS trade_ids
+            FROM ({search_query}) AS t
+        """
+
     def build_count_query(self, search_query: str) -> str:
         """
         Convert a search query to a count query.
@@ -341,20 +499,103 @@ class QueryBuilder:
         Returns:
             COUNT query with same WHERE clause
         """
-        # Extract WHERE clause from original query
+        count_query = f"SELECT COUNT(*) FROM trades {self._extract_where_clause(search_query)}"
+
+        return count_query
+
+    def build_estimate_query(self, search_query: str) -> str:
+        """
+        Convert a search query to an EXPLAIN that yields the planner's row estimate.
+
+        Nothing is scanned; the estimate comes from table statistics, so it is cheap
+        on any filter but only approximate. Read it from [0]["Plan"]["Plan Rows"].
+
+        Args:
+            search_query: Original SELECT query (unpaginated, without a score wrapper)
+
+        Returns:
+            EXPLAIN (FORMAT JSON) query with same WHERE clause
+        """
+        return f"EXPLAIN (FORMAT JSON) SELECT 1 FROM trades {self._extract_where_clause(search_query)}"
+
+    @staticmethod
+    def _extract_where_clause(search_query: str) -> str:
+        """Return the WHERE clause of a search query, up to (not including) ORDER BY."""
         where_index = search_query.lower().find("where")
         order_index = search_query.lower().find("order by")
 
         if where_index == -1:
-            where_clause = ""
-        elif order_index == -1:
-            where_clause = search_query[where_index:]
-        else:
-            where_clause = search_query[where_index:order_index]
+            return ""
+        if order_index == -1:
+            return search_query[where_index:]
+        return search_query[where_index:order_index]
 
-        count_query = f"SELECT COUNT(*) FROM trades {where_clause}"
+    def build_ranked_query(self, search_query: str, sort_field: str = "update_time") -> str:
+        """
+        Wrap a search query so each row also carries its transaction count.
 
-        return count_query
+        Replaces the follow-up build_enriched_data_query round trip: the LATERAL count
+        runs only for the rows that survive the search query's LIMIT, using
+        idx_transactions_trade_id, and the search order (tie-broken on id) is kept.
+
+        Args:
+            search_query: SELECT built by build_from_extracted_params/build_from_manual_filters
+            sort_field: Column the search query orders by
+
+        Returns:
+            Query returning the trade columns plus transaction_count
+        """
+        return f"""
+            SELECT t.*, tx.transaction_count
+            FROM ({search_query}) AS t
+            CROSS JOIN LATERAL (
+                SELECT COUNT(*) AS transaction_count
+                FROM transactions tr
+                WHERE tr.trade_id = t.id
+            ) AS tx
+            ORDER BY t.{sort_field} DESC, t.id DESC
+        """
+
+    def build_score_ranked_query(
+        self,
+        search_query: str,
+        values: list[Any],
+        sort_field: str,
+        sql_score: SqlScoreExpression,
+    ) -> str:
+        """
+        Wrap a search query so Postgres ranks the matches and returns only the top rows.
+
+        Every row matching the filters is scored with the compiled ranking config
+        (transaction count via the same LATERAL as build_ranked_query), then the query
+        returns ORDER BY relevance_score DESC LIMIT MAX_SEARCH_RESULTS. The config
+        values are appended to values.
+
+        Args:
+            search_query: Search SELECT (unordered, or the single-row trade_id lookup)
+            values: Parameter list of search_query; extended in place
+            sort_field: Date column used as the first tie-breaker
+            sql_score: Compiled ranking from TradeRanker.compile_sql_score()
+
+        Returns:
+            Query returning trade columns plus transaction_count and relevance_score
+        """
+        config_row = sql_score.config_row_sql(len(values) + 1)
+        values.extend(sql_score.params)
+
+        return f"""
+            SELECT t.*, tx.transaction_count, ({sql_score.SCORE_SQL}) AS relevance_score
+            FROM ({search_query}) AS t
+            CROSS JOIN LATERAL (
+                SELECT COUNT(*) AS transaction_count
+                FROM transactions tr
+                WHERE tr.trade_id = t.id
+            ) AS tx
+            CROSS JOIN LATERAL (SELECT {sql_score.AGE_DAYS_SQL} AS age_days) AS age
+            CROSS JOIN ({config_row}) AS rc
+            ORDER BY relevance_score DESC, t.{sort_field} DESC, t.id DESC
+            LIMIT {settings.MAX_SEARCH_RESULTS}
+        """
 
     def build_enriched_data_query(self, trade_ids: list[int]) -> Tuple[str, list[Any]]:
         """
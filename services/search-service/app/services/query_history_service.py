@@ -3,12 +3,19 @@ Query History Service - CRUD Operations for Query History
 Manages user query history: saving, retrieving, updating, and deleting queries.
 """
 
+import asyncio
+import time
 from datetime import datetime
-from difflib import SequenceMatcher
 from typing import Optional
 
+import numpy as np
+
+from app.config.settings import settings
 from app.database.connection import db_manager
 from app.models.domain import QueryHistory
+from app.services.query_history_writer import query_history_writer
+from app.services.suggestion_index import suggestion_index
+from app.services.suggestion_scorer import NgramScorer
 from app.utils.exceptions import (
     DatabaseQueryError,
     QueryHistoryNotFoundError,
@@ -32,6 +39,9 @@ class QueryHistoryService:
             query_text: Natural language query or JSON filters
             search_type: "natural_language" or "manual"
 
+        With write-behind enabled the row is buffered and inserted in a batch shortly
+        after; its id is already reserved, so the returned query_id is final.
+
         Returns:
             query_id of the newly created record
 
@@ -46,7 +56,12 @@ class QueryHistoryService:
         """
 
         try:
-            query_id = await db_manager.fetchval(query, user_id, query_text)
+            write_behind = settings.HISTORY_WRITE_BEHIND_ENABLED and query_history_writer.running
+            if write_behind:
+                query_id = await query_history_writer.enqueue(user_id, query_text)
+            else:
+                query_id = await db_manager.fetchval(query, user_id, query_text)
+            suggestion_index.record_history(user_id, query_id, query_text)
 
             logger.info(
                 "Query saved to history",
@@ -55,6 +70,7 @@ class QueryHistoryService:
                     "user_id": user_id,
                     "search_type": search_type,
                     "query_length": len(query_text),
+                    "write_behind": write_behind,
                 },
             )
 
@@ -82,6 +98,7 @@ class QueryHistoryService:
         Raises:
             DatabaseQueryError: If query fails
         """
+        await query_history_writer.flush()  # Make rows still buffered by this replica visible
         # Build query based on filters
         if saved_only:
             query = """
@@ -136,6 +153,7 @@ class QueryHistoryService:
         Raises:
             DatabaseQueryError: If query fails
         """
+        await query_history_writer.flush()
         query = """
             SELECT
                 COUNT(*) as total_count,
@@ -192,6 +210,8 @@ class QueryHistoryService:
             UnauthorizedAccessError: If user doesn't own the query
             DatabaseQueryError: If update fails
         """
+        await query_history_writer.flush()
+        suggestion_index.forget_history(user_id)
         # First, verify ownership
         await self._verify_ownership(query_id, user_id)
 
@@ -251,6 +271,8 @@ class QueryHistoryService:
             UnauthorizedAccessError: If user doesn't own the query
             DatabaseQueryError: If deletion fails
         """
+        await query_history_writer.flush()
+        suggestion_index.forget_history(user_id)
         # First, verify ownership
         await self._verify_ownership(query_id, user_id)
 
@@ -300,6 +322,8 @@ class QueryHistoryService:
         Raises:
             DatabaseQueryError: If deletion fails
         """
+        await query_history_writer.flush()
+        suggestion_index.forget_history(user_id)
         query = """
             DELETE FROM query_history
             WHERE user_id = $1
@@ -337,6 +361,8 @@ class QueryHistoryService:
         Raises:
             DatabaseQueryError: If update fails
         """
+        await query_history_writer.flush()
+        suggestion_index.forget_history(user_id)
         query = """
             UPDATE query_history
             SET last_use_time = NOW()
@@ -371,6 +397,11 @@ class QueryHistoryService:
           1. The user's own query history (ranked first via score boost)
           2. Fuzzy matches against actual trade field values
 
+        Candidates come from the in-process suggestion index once it has loaded (trade ids
+        from a bounded primary-key range query), and from ILIKE queries against Postgres
+        until then (or when the index is disabled).
+        Each source is scored in one batch (NgramScorer) and only its top `limit` are kept.
+
         Args:
             user_id: User ID to fetch suggestions for
             query: User-typed query string
@@ -385,54 +416,49 @@ class QueryHistoryService:
         if len(normalized_query) < 2:
             return []
 
-        pattern = f"%{query.strip()}%"
         per_field_limit = max(5, min(25, max_candidates // 6))
+        use_index = settings.SUGGESTION_INDEX_ENABLED and suggestion_index.ready
 
         scored: dict[str, tuple[float, dict]] = {}
 
         # ── 1. History-based suggestions (user's own past queries) ──────────
         # These rank above field-value matches because natural language queries
         # typed by the user are far more contextually relevant than raw DB values.
-        history_sql = """
-            SELECT id, query_text, is_saved, query_name, create_time, last_use_time
-            FROM query_history
-            WHERE user_id = $1
-              AND query_text ILIKE $2
-            ORDER BY last_use_time DESC
-            LIMIT $3
-        """
         try:
-            history_records = await db_manager.fetch(history_sql, user_id, pattern, max_candidates)
+            if use_index:
+                history_records = await suggestion_index.history_matches(user_id, query, max_candidates)
+            else:
+                history_records = await self._history_candidates_sql(user_id, query, max_candidates)
+            records_by_text: dict[str, dict] = {}
             for record in history_records:
                 raw_text = (record.get("query_text") or "").strip()
                 # Skip JSON blobs saved from manual filter searches
                 if not raw_text or self._looks_like_manual_filters(raw_text):
                     continue
-
-                normalized_candidate = self._normalize_text(raw_text)
-                score = self._similarity_score(normalized_query, normalized_candidate)
-
-                # Boost history matches so they consistently outrank field-value hints
-                score = min(score + 0.5, 1.5)
-
-                if score < min_score:
-                    continue
-
-                suggestion = {
-                    "query_id": record.get("id", 0),
-                    "user_id": user_id,
-                    "query_text": raw_text,
-                    "is_saved": record.get("is_saved", False),
-                    "query_name": record.get("query_name"),
-                    "create_time": record.get("create_time"),
-                    "last_use_time": record.get("last_use_time"),
-                    "score": score,
-                    "category": "History",
-                }
-
-                existing = scored.get(raw_text)
-                if existing is None or score > existing[0]:
-                    scored[raw_text] = (score, suggestion)
+                records_by_text.setdefault(raw_text, record)  # Most recently used copy wins
+
+            history_texts = list(records_by_text)
+            scorer = NgramScorer([self._normalize_text(text) for text in history_texts])
+            # Boost history matches so they consistently outrank field-value hints
+            scores = np.minimum(scorer.scores(normalized_query) + 0.5, NgramScorer.MAX_SCORE)
+
+            for index in NgramScorer.top_k(scores, limit, min_score):
+                raw_text = history_texts[index]
+                record = records_by_text[raw_text]
+                scored[raw_text] = (
+                    float(scores[index]),
+                    {
+                        "query_id": record.get("id", 0),
+                        "user_id": user_id,
+                        "query_text": raw_text,
+                        "is_saved": record.get("is_saved", False),
+                        "query_name": record.get("query_name"),
+                        "create_time": record.get("create_time"),
+                        "last_use_time": record.get("last_use_time"),
+                        "score": float(scores[index]),
+                        "category": "History",
+                    },
+                )
 
         except Exception as e:
             # History is non-critical — fall through to field-value suggestions
@@ -445,6 +471,70 @@ class QueryHistoryService:
         # Surfaces concrete values like "status CANCELLED", "asset type FX".
         # Lower base scores than history matches; useful when the input looks
         # like a field value rather than a natural language sentence.
+        if use_index:
+            field_values = await suggestion_index.field_matches(query, per_field_limit)
+        else:
+            field_values = await self._field_value_candidates_sql(user_id, query, per_field_limit)
+
+        field_candidates: dict[str, tuple[str, str]] = {}  # query_text -> (category, raw value)
+        for category, label, raw_value in field_values:
+            raw_value = (raw_value or "").strip()
+            if raw_value:
+                field_candidates.setdefault(f"{label} {raw_value}", (category, raw_value))
+
+        # Score each candidate as the bare value and as the "label value" phrase, keep the better
+        field_texts = list(field_candidates)
+        scorer = NgramScorer(
+            [self._normalize_text(field_candidates[text][1]) for text in field_texts]
+            + [self._normalize_text(text) for text in field_texts]
+        )
+        both = scorer.scores(normalized_query)
+        scores = np.maximum(both[: len(field_texts)], both[len(field_texts) :])
+
+        for index in NgramScorer.top_k(scores, limit, min_score):
+            query_text = field_texts[index]
+            score = float(scores[index])
+            existing = scored.get(query_text)
+            if existing is None or score > existing[0]:
+                scored[query_text] = (
+                    score,
+                    {
+                        "query_id": 0,
+                        "user_id": user_id,
+                        "query_text": query_text,
+                        "is_saved": False,
+                        "query_name": None,
+                        "create_time": None,
+                        "last_use_time": None,
+                        "score": score,
+                        "category": field_candidates[query_text][0],
+                    },
+                )
+
+        suggestions = [item[1] for item in scored.values()]
+
+        suggestions.sort(key=lambda item: item["score"], reverse=True)
+
+        return suggestions[:limit]
+
+    async def _history_candidates_sql(self, user_id: str, query: str, max_candidates: int) -> list:
+        """User's history rows containing query (ILIKE), most recently used first."""
+        await query_history_writer.flush()
+        history_sql = """
+            SELECT id, query_text, is_saved, query_name, create_time, last_use_time
+            FROM query_history
+            WHERE user_id = $1
+              AND query_text ILIKE $2
+            ORDER BY last_use_time DESC
+            LIMIT $3
+        """
+        return await db_manager.fetch(history_sql, user_id, f"%{query.strip()}%", max_candidates)
+
+    async def _field_value_candidates_sql(
+        self, user_id: str, query: str, per_field_limit: int
+    ) -> list[tuple[str, str, str]]:
+        """(category, label, value) for distinct trade field values containing query (ILIKE)."""
+        pattern = f"%{query.strip()}%"
         field_specs = [
             ("Account", "account", "account", "text"),
             ("Asset type", "asset_type", "asset type", "text"),
@@ -455,6 +545,7 @@ class QueryHistoryService:
             ("Trade id", "id", "trade id", "id"),
         ]
 
+        candidates = []
         for category, column, label, value_type in field_specs:
             if value_type == "id":
                 sql_query = f"""
@@ -484,44 +575,8 @@ class QueryHistoryService:
                 )
                 continue
 
-            for record in records:
-                raw_value = (record.get("value") or "").strip()
-                if not raw_value:
-                    continue
-
-                query_text = f"{label} {raw_value}"
-                normalized_value = self._normalize_text(raw_value)
-                normalized_phrase = self._normalize_text(query_text)
-
-                score = max(
-                    self._similarity_score(normalized_query, normalized_value),
-                    self._similarity_score(normalized_query, normalized_phrase),
-                )
-
-                if score < min_score:
-                    continue
-
-                suggestion = {
-                    "query_id": 0,
-                    "user_id": user_id,
-                    "query_text": query_text,
-                    "is_saved": False,
-                    "query_name": None,
-                    "create_time": None,
-                    "last_use_time": None,
-                    "score": score,
-                    "category": category,
-                }
-
-                existing = scored.get(query_text)
-                if existing is None or score > existing[0]:
-                    scored[query_text] = (score, suggestion)
-
-        suggestions = [item[1] for item in scored.values()]
-
-        suggestions.sort(key=lambda item: item["score"], reverse=True)
-
-        return suggestions[:limit]
+            candidates.extend((category, label, record.get("value")) for record in records)
+        return candidates
 
     async def _verify_ownership(self, query_id: int, user_id: str) -> None:
         """
@@ -535,13 +590,8 @@ class QueryHistoryService:
             QueryHistoryNotFoundError: If query doesn't exist
             UnauthorizedAccessError: If user doesn't own the query
         """
-        query = """
-            SELECT user_id FROM query_history
-            WHERE id = $1
-        """
-
         try:
-            record = await db_manager.fetchrow(query, query_id)
+            record = await self._fetch_owner(query_id)
 
             if not record:
                 raise QueryHistoryNotFoundError(f"Query {query_id} not found", details={"query_id": query_id})
@@ -571,6 +621,35 @@ class QueryHistoryService:
                 details={"error": str(e), "query_id": query_id},
             )
 
+    async def _fetch_owner(self, query_id: int):
+        """
+        Owner row of a query, or None.
+
+        With write-behind, a query_id returned by one replica stays in that replica's
+        buffer for up to HISTORY_FLUSH_INTERVAL_SECONDS. When the row is missing but the
+        id has been handed out by the sequence, poll for it for up to
+        HISTORY_PENDING_WAIT_SECONDS before reporting it as not found.
+        """
+        query = """
+            SELECT user_id FROM query_history
+            WHERE id = $1
+        """
+        record = await db_manager.fetchrow(query, query_id)
+        if record is not None or not settings.HISTORY_WRITE_BEHIND_ENABLED:
+            return record
+
+        reserved = await db_manager.fetchval("SELECT $1::bigint <= last_value FROM query_history_id_seq", query_id)
+        if not reserved:
+            return None
+
+        deadline = time.monotonic() + settings.HISTORY_PENDING_WAIT_SECONDS
+        while record is None and time.monotonic() < deadline:
+            await asyncio.sleep(settings.HISTORY_FLUSH_INTERVAL_SECONDS / 2)
+            record = await db_manager.fetchrow(query, query_id)
+        if record is not None:
+            logger.info("Query history row appeared after waiting for write-behind", extra={"query_id": query_id})
+        return record
+
     @staticmethod
     def _normalize_text(text: str) -> str:
         return " ".join(text.lower().split())
@@ -580,27 +659,6 @@ class QueryHistoryService:
         # Manual search filters are saved as JSON strings.
         return text.lstrip().startswith("{")
 
-    @staticmethod
-    def _tokenize(text: str) -> set[str]:
-        return {token for token in text.split(" ") if token}
-
-    def _similarity_score(self, query: str, candidate: str) -> float:
-        ratio = SequenceMatcher(None, query, candidate).ratio()
-
-        if candidate.startswith(query):
-            ratio += 0.3
-        elif query in candidate:
-            ratio += 0.1
-
-        query_tokens = self._tokenize(query)
-        candidate_tokens = self._tokenize(candidate)
-        if query_tokens and candidate_tokens:
-            intersection = query_tokens.intersection(candidate_tokens)
-            union = query_tokens.union(candidate_tokens)
-            ratio += 0.2 * (len(intersection) / len(union))
-
-        return min(ratio, 1.5)
-
     @staticmethod
     def _coerce_datetime(value) -> datetime:
         if isinstance(value, datetime):
@@ -0,0 +1,212 @@
+"""
+Query History Writer - write-behind batching for new query_history rows.
+
+Every search and chat turn records a history row before doing any work, and the
+INSERT ... RETURNING id used to sit on that critical path. The writer hands out ids
+from a block pre-allocated from query_history_id_seq, buffers the rows in memory and
+writes them with COPY when the buffer reaches HISTORY_BATCH_SIZE or every
+HISTORY_FLUSH_INTERVAL_SECONDS. Callers get the same query_id as before without
+waiting on the database.
+
+create_time/last_use_time keep their CURRENT_TIMESTAMP defaults, so they are the
+database's clock at flush time (at most one flush interval after the request).
+
+Trade-offs: rows still buffered when the process dies are lost (history is best-effort
+already; a failed save never fails a search), and a query_id returned by one replica is
+not in the table until that replica flushes; QueryHistoryService waits for such ids
+when a save or delete for one arrives elsewhere.
+"""
+
+import asyncio
+from collections import deque
+from typing import Any, Optional
+
+import asyncpg
+
+from app.config.settings import settings
+from app.database.connection import db_manager
+from app.utils.logger import logger
+
+
+class QueryHistoryWriter:
+    """
+    Background batcher for query_history inserts.
+
+    Failed batches are kept and retried on the next flush (up to HISTORY_MAX_PENDING
+    rows). When Postgres rejects the batch itself, rows are retried one by one so a
+    single bad row, or rows a lost acknowledgement already wrote, cannot block the rest.
+    """
+
+    ID_BLOCK_QUERY = "SELECT nextval('query_history_id_seq') FROM generate_series(1, $1)"
+
+    INSERT_QUERY = """
+        INSERT INTO query_history (id, user_id, query_text)
+        VALUES ($1, $2, $3)
+    """
+
+    COLUMNS = ("id", "user_id", "query_text")  # is_saved and the timestamps use the table defaults
+
+    def __init__(
+        self,
+        batch_size: int = settings.HISTORY_BATCH_SIZE,
+        flush_interval: float = settings.HISTORY_FLUSH_INTERVAL_SECONDS,
+        id_block_size: int = settings.HISTORY_ID_BLOCK_SIZE,
+        max_pending: int = settings.HISTORY_MAX_PENDING,
+    ):
+        self.db = db_manager
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.id_block_size = id_block_size
+        self.max_pending = max_pending
+        self._ids: deque[int] = deque()
+        self._pending: list[tuple[Any, ...]] = []
+        self._id_lock = asyncio.Lock()
+        self._flush_lock = asyncio.Lock()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.enqueued = 0
+        self.written = 0
+        self.batches = 0
+        self.failed_batches = 0
+        self.dropped = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start the background flush task (idempotent)."""
+        if not self.running:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run(), name="query-history-writer")
+            logger.info(
+                "Query history writer started",
+                extra={"batch_size": self.batch_size, "flush_interval": self.flush_interval},
+            )
+
+    async def stop(self) -> None:
+        """Cancel the flush task and write whatever is still buffered."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await self.flush()
+        logger.info("Query history writer stopped", extra={"unwritten": len(self._pending)})
+
+    async def enqueue(self, user_id: str, query_text: str) -> int:
+        """
+        Buffer a new history row and return its id.
+
+        Returns:
+            query_id the row will have once flushed
+        """
+        query_id = await self._next_id()
+        self._pending.append((query_id, user_id, query_text))
+        self.enqueued += 1
+        if len(self._pending) >= self.batch_size and self._wakeup is not None:
+            self._wakeup.set()
+        return query_id
+
+    async def flush(self) -> int:
+        """
+        Write all buffered rows now.
+
+        Returns:
+            Number of rows written (0 if nothing was pending or the write failed)
+        """
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, []
+            try:
+                written = await self._write(batch)
+            except Exception as e:
+                self.failed_batches += 1
+                self._requeue(batch)
+                logger.warning(
+                    f"Query history batch write failed, will retry: {e}",
+                    extra={"rows": len(batch), "pending": len(self._pending)},
+                )
+                return 0
+
+            self.batches += 1
+            self.written += written
+            logger.debug("Query history batch written", extra={"rows": written})
+            return written
+
+    async def _write(self, batch: list[tuple[Any, ...]]) -> int:
+        async with self.db.acquire() as conn:
+            try:
+                await conn.copy_records_to_table("query_history", records=batch, columns=self.COLUMNS)
+                return len(batch)
+            except asyncpg.PostgresError as e:
+                logger.warning(f"Query history COPY rejected, inserting rows individually: {e}")
+
+            written = 0
+            for row in batch:
+                try:
+                    await conn.execute(self.INSERT_QUERY, *row)
+                    written += 1
+                except asyncpg.UniqueViolationError:
+                    pass  # Already written by a COPY whose acknowledgement was lost
+                except asyncpg.PostgresError as e:
+                    self.dropped += 1
+                    logger.error(f"Dropping query history row: {e}", extra={"query_id": row[0], "user_id": row[1]})
+            return written
+
+    def _requeue(self, batch: list[tuple[Any, ...]]) -> None:
+        """Put a failed batch back in front of newer rows, dropping the oldest beyond max_pending."""
+        self._pending[:0] = batch
+        overflow = len(self._pending) - self.max_pending
+        if overflow > 0:
+            del self._pending[:overflow]
+            self.dropped += overflow
+            logger.error("Query history buffer full, dropped oldest rows", extra={"dropped": overflow})
+
+    async def _next_id(self) -> int:
+        while not self._ids:  # A burst larger than one block can drain a fresh block before we pop
+            await self._allocate_ids()
+        return self._ids.popleft()
+
+    async def _allocate_ids(self) -> None:
+        """Reserve the next id block from the sequence (one round trip per block)."""
+        async with self._id_lock:
+            if len(self._ids) > self.id_block_size // 4:
+                return  # Topped up while we waited for the lock
+            rows = await self.db.fetch(self.ID_BLOCK_QUERY, self.id_block_size)
+            self._ids.extend(row[0] for row in rows)
+
+    async def _run(self) -> None:
+        """Flush on size or interval, and keep the id block topped up off the request path."""
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+            if len(self._ids) < self.id_block_size // 4:
+                try:
+                    await self._allocate_ids()
+                except Exception as e:
+                    logger.warning(f"Query history id pre-allocation failed: {e}")
+
+    def stats(self) -> dict[str, int]:
+        """Counters since startup plus current buffer state."""
+        return {
+            "pending": len(self._pending),
+            "ids_reserved": len(self._ids),
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "batches": self.batches,
+            "failed_batches": self.failed_batches,
+            "dropped": self.dropped,
+        }
+
+
+# Global singleton instance
+query_history_writer = QueryHistoryWriter()
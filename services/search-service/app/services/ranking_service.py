@@ -6,11 +6,15 @@ IMPORTANT: Works with existing Trade model - no schema changes required.
 Uses in-memory scoring with data from enriched query results.
 """
 
+import asyncio
 import json
 import math
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from watchfiles import awatch
 
 from app.models.domain import Trade
 from app.utils.logger import logger
@@ -19,7 +23,8 @@ from app.utils.logger import logger
 class RankingConfig:
     """
     Loads and validates ranking configuration from JSON file.
-    Supports hot-reload for runtime configuration updates.
+    Supports hot-reload for runtime configuration updates: start_watching() reloads
+    the file on change events instead of stat()-ing it on every ranking call.
     """
 
     def __init__(self, config_path: str = None):
@@ -29,6 +34,8 @@ class RankingConfig:
         self.config_path = Path(config_path)
         self.config: Dict[str, Any] = {}
         self._last_modified: float = 0
+        self.version: int = 0  # Bumped on every (re)load so derived state can be rebuilt
+        self._watch_task: Optional[asyncio.Task] = None
         self.load()
 
     def load(self) -> None:
@@ -56,6 +63,8 @@ class RankingConfig:
         except Exception as e:
             logger.error(f"Error loading ranking config: {e}")
             self._load_defaults()
+        finally:
+            self.version += 1
 
     def reload_if_modified(self) -> bool:
         """Check if config file changed and reload if needed."""
@@ -69,6 +78,45 @@ class RankingConfig:
             logger.warning(f"Error checking config modification: {e}")
         return False
 
+    def start_watching(self) -> None:
+        """Start reloading the config whenever the file changes (idempotent)."""
+        if self._watch_task is None or self._watch_task.done():
+            self._watch_task = asyncio.create_task(self._watch(), name="ranking-config-watcher")
+            logger.info("Ranking config watcher started", extra={"config_path": str(self.config_path)})
+
+    async def stop_watching(self) -> None:
+        """Cancel the config watcher task."""
+        if self._watch_task is None:
+            return
+        self._watch_task.cancel()
+        try:
+            await self._watch_task
+        except asyncio.CancelledError:
+            pass
+        self._watch_task = None
+
+    async def _watch(self) -> None:
+        """
+        Reload on file change events.
+
+        The parent directory is watched rather than the file so editors and deploys
+        that replace the file atomically (write + rename) are still seen.
+        """
+        target_name = self.config_path.name
+        while True:
+            try:
+                async for _changes in awatch(
+                    self.config_path.parent,
+                    watch_filter=lambda _change, path: Path(path).name == target_name,
+                ):
+                    logger.info("Ranking config file modified, reloading...")
+                    self.load()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Ranking config watcher failed, retrying: {e}")
+                await asyncio.sleep(5.0)
+
     def _validate(self) -> None:
         """Validate configuration values."""
         # Validate and normalize required sections
@@ -170,6 +218,65 @@ class RankingConfig:
         return self.config.get("ranking_enabled", True)
 
 
+class SqlScoreExpression:
+    """
+    Ranking config compiled to a SQL relevance score.
+
+    SCORE_SQL mirrors TradeRanker._calculate_relevance_score. It reads trade columns
+    from alias ``t``, the transaction count from ``tx.transaction_count``, the age from
+    ``age.age_days`` and every config value from a one-row ``rc`` subquery, so each
+    bind parameter appears exactly once however often the expression uses it.
+    """
+
+    # (column alias, SQL type) of the rc config row, in parameter order
+    CONFIG_COLUMNS = [
+        ("status_priority", "jsonb"),
+        ("asset_type_priority", "jsonb"),
+        ("w_status_urgency", "float8"),
+        ("w_recency", "float8"),
+        ("w_transaction_volume", "float8"),
+        ("w_asset_type_risk", "float8"),
+        ("max_age_days", "float8"),
+        ("half_life_days", "float8"),
+        ("min_transactions", "float8"),
+        ("max_transactions", "float8"),
+    ]
+
+    SCORE_SQL = """
+        rc.w_status_urgency * COALESCE((rc.status_priority ->> t.status)::float8, 50)
+        + rc.w_recency * CASE
+            WHEN age.age_days > rc.max_age_days THEN 0
+            ELSE LEAST(100, GREATEST(0, 100 * power(0.5, age.age_days / rc.half_life_days)))
+          END
+        + rc.w_transaction_volume * CASE
+            WHEN tx.transaction_count <= 0 THEN 0
+            WHEN tx.transaction_count < rc.min_transactions THEN 25
+            WHEN tx.transaction_count >= rc.max_transactions THEN 100
+            ELSE LEAST(
+                100,
+                25 + (tx.transaction_count - rc.min_transactions)
+                    / GREATEST(rc.max_transactions - rc.min_transactions, 1) * 75
+            )
+          END
+        + rc.w_asset_type_risk * COALESCE((rc.asset_type_priority ->> t.asset_type)::float8, 50)
+    """
+
+    # Trades.update_time is a naive UTC timestamp, as _score_recency assumes
+    AGE_DAYS_SQL = "EXTRACT(EPOCH FROM ((now() AT TIME ZONE 'UTC') - t.update_time)) / 86400.0"
+
+    def __init__(self, params: List[Any], version: int):
+        self.params = params
+        self.version = version
+
+    def config_row_sql(self, first_index: int) -> str:
+        """Render the rc subquery with placeholders starting at $first_index."""
+        columns = ", ".join(
+            f"${first_index + offset}::{sql_type} AS {alias}"
+            for offset, (alias, sql_type) in enumerate(self.CONFIG_COLUMNS)
+        )
+        return f"SELECT {columns}"
+
+
 class TradeRanker:
     """
     Ranks trades by business relevance using multi-factor scoring.
@@ -187,8 +294,45 @@ class TradeRanker:
 
     def __init__(self, config: RankingConfig = None):
         self.config = config or RankingConfig()
+        self._sql_score: Optional[SqlScoreExpression] = None
 
-    def rank_trades(self, trades: List[Trade], enriched_data: Dict[int, Dict[str, Any]] = None) -> List[Trade]:
+    def compile_sql_score(self) -> SqlScoreExpression:
+        """
+        Compile the active config into a SqlScoreExpression.
+
+        The result is cached per config version, so a hot-reload (which bumps the
+        version) regenerates it on the next call.
+        """
+        if self._sql_score is not None and self._sql_score.version == self.config.version:
+            return self._sql_score
+
+        weights = self.config.get("weights", {})
+        recency_config = self.config.get("recency_config", {})
+        transaction_config = self.config.get("transaction_config", {})
+
+        params = [
+            json.dumps(self.config.get("status_priority", {})),
+            json.dumps(self.config.get("asset_type_priority", {})),
+            float(weights.get("status_urgency", 0.45)),
+            float(weights.get("recency", 0.30)),
+            float(weights.get("transaction_volume", 0.15)),
+            float(weights.get("asset_type_risk", 0.10)),
+            float(recency_config.get("max_age_days", 90)),
+            float(recency_config.get("half_life_days", 14)),
+            float(transaction_config.get("min_transactions_for_bonus", 5)),
+            float(transaction_config.get("max_transaction_count", 20)),
+        ]
+        self._sql_score = SqlScoreExpression(params, self.config.version)
+
+        logger.info("Compiled ranking config to SQL score expression", extra={"config_version": self.config.version})
+        return self._sql_score
+
+    def rank_trades(
+        self,
+        trades: List[Trade],
+        enriched_data: Dict[int, Dict[str, Any]] = None,
+        transaction_counts: Optional[Sequence[int]] = None,
+    ) -> List[Trade]:
         """
         Rank trades by relevance score and return sorted list.
 
@@ -197,45 +341,132 @@ class TradeRanker:
             enriched_data: Optional dict mapping trade_id to {
                 'transaction_count': int
             }
+            transaction_counts: Optional counts aligned with trades (as returned by
+                QueryBuilder.build_ranked_query); takes precedence over enriched_data
 
         Returns:
             Sorted list of trades (highest relevance first)
         """
-        # Check if ranking is enabled
+        # Check if ranking is enabled (config changes are picked up by the file watcher)
         if not self.config.is_enabled():
             logger.debug("Ranking disabled, returning trades unsorted")
             return trades
 
-        # Reload config if modified (hot-reload)
-        self.config.reload_if_modified()
-
         if not trades:
             return trades
 
-        # Calculate relevance scores
-        scored_trades: List[Tuple[float, Trade]] = []
+        if transaction_counts is None:
+            transaction_counts = [
+                enriched_data.get(trade.trade_id, {}).get("transaction_count", 0) if enriched_data else 0
+                for trade in trades
+            ]
 
-        for trade in trades:
-            enriched = enriched_data.get(trade.trade_id, {}) if enriched_data else {}
-            score = self._calculate_relevance_score(trade, enriched)
-            scored_trades.append((score, trade))
+        scores = self.score_batch(trades, transaction_counts)
 
-        # Sort by score descending (highest relevance first)
-        scored_trades.sort(key=lambda x: x[0], reverse=True)
+        # Stable descending order keeps SQL order for ties, like list.sort(reverse=True)
+        order = np.argsort(-scores, kind="stable")
 
-        ranked_trades = [trade for score, trade in scored_trades]
+        ranked_trades = [trades[i] for i in order]
 
         logger.info(
             "Trades ranked by relevance",
             extra={
                 "total_trades": len(trades),
-                "top_score": scored_trades[0][0] if scored_trades else 0,
-                "bottom_score": scored_trades[-1][0] if scored_trades else 0,
+                "top_score": float(scores[order[0]]),
+                "bottom_score": float(scores[order[-1]]),
             },
         )
 
         return ranked_trades
 
+    def score_batch(self, trades: Sequence[Trade], transaction_counts: Sequence[int]) -> np.ndarray:
+        """
+        Compute relevance scores for a batch of trades in one vectorised pass.
+
+        Produces the same values as _calculate_relevance_score per trade, with config
+        lookups hoisted out of the loop, timestamps parsed as one datetime64 array and
+        a single "now" for the whole batch.
+
+        Args:
+            trades: Trades to score
+            transaction_counts: Transaction counts aligned with trades
+
+        Returns:
+            float64 array of scores (0-100), aligned with trades
+        """
+        count = len(trades)
+        weights = self.config.get("weights", {})
+        status_priority = self.config.get("status_priority", {})
+        asset_type_priority = self.config.get("asset_type_priority", {})
+
+        status_scores = np.fromiter(
+            (status_priority.get(trade.status, 50) for trade in trades), dtype=np.float64, count=count
+        )
+        asset_type_scores = np.fromiter(
+            (asset_type_priority.get(trade.asset_type, 50) for trade in trades), dtype=np.float64, count=count
+        )
+        recency_scores = self._score_recency_batch([trade.update_time for trade in trades])
+        transaction_scores = self._score_transaction_volume_batch(
+            np.asarray(transaction_counts, dtype=np.float64).reshape(count)
+        )
+
+        return (
+            weights.get("status_urgency", 0.45) * status_scores
+            + weights.get("recency", 0.30) * recency_scores
+            + weights.get("transaction_volume", 0.15) * transaction_scores
+            + weights.get("asset_type_risk", 0.10) * asset_type_scores
+        )
+
+    def _score_recency_batch(self, update_times: List[str]) -> np.ndarray:
+        """Vectorised _score_recency: exponential decay on age in days, 0 past max_age_days."""
+        recency_config = self.config.get("recency_config", {})
+        max_age_days = recency_config.get("max_age_days", 90)
+        half_life_days = recency_config.get("half_life_days", 14)
+
+        timestamps = self._parse_timestamps(update_times)
+        now = np.datetime64(datetime.now(timezone.utc).replace(tzinfo=None), "us")
+        age_days = (now - timestamps) / np.timedelta64(1, "D")
+
+        scores = np.clip(100.0 * np.power(0.5, age_days / half_life_days), 0.0, 100.0)
+        scores = np.where(age_days > max_age_days, 0.0, scores)
+        # Unparseable timestamps get the same middle score as _score_recency
+        return np.where(np.isnat(timestamps), 50.0, scores)
+
+    @staticmethod
+    def _parse_timestamps(values: List[str]) -> np.ndarray:
+        """Parse ISO ("...T...Z") or "YYYY-MM-DD HH:MM:SS" strings into datetime64[us] (UTC)."""
+        cleaned = [value[:-1] if value.endswith("Z") else value for value in values]
+        try:
+            return np.array(cleaned, dtype="datetime64[us]")
+        except ValueError:
+            # Mixed or malformed input - fall back per value, marking failures NaT
+            parsed = np.empty(len(cleaned), dtype="datetime64[us]")
+            for index, value in enumerate(cleaned):
+                try:
+                    parsed[index] = np.datetime64(value, "us")
+                except ValueError:
+                    logger.warning(f"Error parsing update_time '{value}'")
+                    parsed[index] = np.datetime64("NaT")
+            return parsed
+
+    def _score_transaction_volume_batch(self, transaction_counts: np.ndarray) -> np.ndarray:
+        """Vectorised _score_transaction_volume."""
+        transaction_config = self.config.get("transaction_config", {})
+        min_transactions = transaction_config.get("min_transactions_for_bonus", 5)
+        max_transactions = transaction_config.get("max_transaction_count", 20)
+
+        span = max(max_transactions - min_transactions, 1)
+        interpolated = np.minimum(25.0 + (transaction_counts - min_transactions) / span * 75.0, 100.0)
+        return np.select(
+            [
+                transaction_counts <= 0,
+                transaction_counts < min_transactions,
+                transaction_counts >= max_transactions,
+            ],
+            [0.0, 25.0, 100.0],
+            default=interpolated,
+        )
+
     def _calculate_relevance_score(self, trade: Trade, enriched: Dict[str, Any]) -> float:
         """
         Calculate weighted relevance score for a single trade.
@@ -0,0 +1,218 @@
+"""
+Rule-Based Parser - deterministic NL parameter extraction for simple queries.
+
+Queries such as "cleared FX trades at LCH last week" or a bare trade id use only
+vocabulary we already know (the distinct values behind /api/filter-options, the fixed
+status set, a handful of date phrases). For those, an ExtractedParams can be built
+directly and the 600-1500 ms LLM call skipped. The parser only answers when every
+word of the query is accounted for; anything else returns None and the caller falls
+back to the LLM.
+"""
+
+import asyncio
+import re
+import time
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from app.config.settings import settings
+from app.models.domain import ExtractedParams
+from app.services.filter_options_service import filter_options_service
+from app.utils.logger import logger
+
+
+class RuleBasedParser:
+    """
+    Dictionary and pattern parser mirroring the extraction prompt's conventions.
+
+    Confidence rule: after date phrases are removed, every remaining token must be a
+    known filter value, a status word, an exceptions word, or a filler word, and at
+    least one filter must be set. Unknown words (including negations like "not" or
+    "without") make the parser decline.
+    """
+
+    # Same mapping the extraction prompt examples use ("pending" -> ALLEGED)
+    STATUS_WORDS = {
+        "alleged": "ALLEGED",
+        "pending": "ALLEGED",
+        "cleared": "CLEARED",
+        "rejected": "REJECTED",
+        "cancelled": "CANCELLED",
+        "canceled": "CANCELLED",
+    }
+
+    EXCEPTION_WORDS = {"exception", "exceptions", "break", "breaks"}
+
+    FILLER_WORDS = {
+        "a", "all", "an", "and", "any", "are", "at", "booked", "by", "display", "fetch", "find", "for", "from",
+        "get", "give", "in", "list", "me", "of", "on", "or", "please", "show", "that", "the", "trade", "trades",
+        "via", "what", "which", "with",
+    }  # fmt: skip
+
+    _TRADE_ID = re.compile(r"^(?:trade\s*(?:id)?\s*[#:]?\s*)?#?(\d{4,})$")
+    _ACCOUNT = re.compile(r"^acc\d+$")
+    _ISO_DATE = r"(\d{4}-\d{2}-\d{2})"
+    _TOKEN = re.compile(r"[a-z0-9_\-]+")
+
+    def __init__(self):
+        self.options_service = filter_options_service
+        self._vocabulary: dict[str, list[Tuple[str, str]]] = {}
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def parse(self, query: str, current_date: Optional[datetime] = None) -> Optional[ExtractedParams]:
+        """
+        Extract parameters without an LLM call, or return None when not confident.
+
+        Args:
+            query: Natural language query string
+            current_date: Reference date for relative phrases (defaults to now, like the LLM prompt)
+
+        Returns:
+            ExtractedParams, or None if the query needs the LLM
+        """
+        text = " ".join(query.strip().lower().split())
+        if not text:
+            return None
+
+        trade_id = self._TRADE_ID.match(text)
+        if trade_id:
+            return ExtractedParams(trade_id=int(trade_id.group(1)))
+
+        vocabulary = await self._get_vocabulary()
+        if not vocabulary:
+            return None
+
+        today = (current_date or datetime.now()).date()
+        dates = self._extract_dates(text, today)
+        if dates is None:
+            return None
+        text, date_from, date_to = dates
+
+        values: dict[str, list[str]] = {}
+        with_exceptions_only = False
+        for token in self._TOKEN.findall(text):
+            if token in self.FILLER_WORDS:
+                continue
+            if token in self.EXCEPTION_WORDS:
+                with_exceptions_only = True
+                continue
+            match = self._match_token(token, vocabulary)
+            if match is None:
+                return None
+            field, value = match
+            if value not in values.setdefault(field, []):
+                values[field].append(value)
+
+        if not values and not with_exceptions_only and not date_from and not date_to:
+            return None
+
+        return ExtractedParams(
+            accounts=values.get("accounts"),
+            asset_types=values.get("asset_types"),
+            booking_systems=values.get("booking_systems"),
+            affirmation_systems=values.get("affirmation_systems"),
+            clearing_houses=values.get("clearing_houses"),
+            statuses=values.get("statuses"),
+            date_from=date_from,
+            date_to=date_to,
+            with_exceptions_only=with_exceptions_only,
+        )
+
+    def _match_token(self, token: str, vocabulary: dict[str, list[Tuple[str, str]]]) -> Optional[Tuple[str, str]]:
+        """Resolve one token to (field, canonical value); None if unknown or ambiguous."""
+        if token in self.STATUS_WORDS:
+            return "statuses", self.STATUS_WORDS[token]
+
+        candidates = vocabulary.get(token)
+        if candidates is None and token.endswith("s"):
+            candidates = vocabulary.get(token[:-1])  # "bonds", "equities" handled below
+        if candidates is None and token.endswith("ies"):
+            candidates = vocabulary.get(token[:-3] + "y")
+        if candidates is None and self._ACCOUNT.match(token):
+            candidates = [("accounts", token.upper())]
+
+        if not candidates or len(candidates) > 1:
+            return None
+        return candidates[0]
+
+    def _extract_dates(self, text: str, today) -> Optional[Tuple[str, Optional[str], Optional[str]]]:
+        """
+        Remove one supported date phrase from text.
+
+        Returns:
+            (remaining text, date_from, date_to), or None if the dates are not understood
+        """
+        iso = self._ISO_DATE
+        patterns = [
+            (rf"\b(?:from|between) {iso} (?:to|and|until) {iso}\b", lambda m: (m.group(1), m.group(2))),
+            (rf"\b(?:since|after|from) {iso}\b", lambda m: (m.group(1), None)),
+            (rf"\b(?:until|before|to) {iso}\b", lambda m: (None, m.group(1))),
+            (rf"\b(?:on )?{iso}\b", lambda m: (m.group(1), m.group(1))),
+            (r"\btoday\b", lambda m: (today.isoformat(), today.isoformat())),
+            (r"\byesterday\b", lambda m: ((today - timedelta(days=1)).isoformat(),) * 2),
+            (
+                r"\b(?:from )?(?:last|past) week\b",
+                lambda m: ((today - timedelta(days=7)).isoformat(), today.isoformat()),
+            ),
+            (r"\bthis week\b", lambda m: ((today - timedelta(days=today.weekday())).isoformat(), today.isoformat())),
+            (r"\bthis month\b", lambda m: (today.replace(day=1).isoformat(), today.isoformat())),
+            (
+                r"\b(?:in the )?(?:last|past) (\d{1,3}) days\b",
+                lambda m: ((today - timedelta(days=int(m.group(1)))).isoformat(), today.isoformat()),
+            ),
+        ]
+
+        found = None
+        for pattern, resolve in patterns:
+            match = re.search(pattern, text)
+            if match is None:
+                continue
+            if found is not None:
+                return None  # More than one date expression - leave it to the LLM
+            found = resolve(match)
+            text = text[: match.start()] + " " + text[match.end() :]
+
+        date_from, date_to = found or (None, None)
+        for value in (date_from, date_to):
+            if value is not None:
+                try:
+                    datetime.strptime(value, "%Y-%m-%d")
+                except ValueError:
+                    return None
+        if date_from and date_to and date_from > date_to:
+            return None
+        return text, date_from, date_to
+
+    async def _get_vocabulary(self) -> dict[str, list[Tuple[str, str]]]:
+        """Lower-cased filter value -> [(field, canonical value)], refreshed every RULE_PARSER_VOCAB_TTL_SECONDS."""
+        if self._vocabulary and time.monotonic() - self._loaded_at < settings.RULE_PARSER_VOCAB_TTL_SECONDS:
+            return self._vocabulary
+
+        async with self._lock:
+            if self._vocabulary and time.monotonic() - self._loaded_at < settings.RULE_PARSER_VOCAB_TTL_SECONDS:
+                return self._vocabulary
+            try:
+                options = await self.options_service.get_options()
+            except Exception as e:
+                logger.warning(f"Rule parser vocabulary refresh failed: {e}")
+                return self._vocabulary  # Keep serving the previous vocabulary (possibly empty)
+
+            vocabulary: dict[str, list[Tuple[str, str]]] = {}
+            for field, values in options.items():
+                if field == "statuses":
+                    continue  # Fixed set, handled by STATUS_WORDS
+                for value in values:
+                    key = value.lower()
+                    if key in self.FILLER_WORDS or (field, value) in vocabulary.get(key, []):
+                        continue
+                    vocabulary.setdefault(key, []).append((field, value))
+
+            self._vocabulary = vocabulary
+            self._loaded_at = time.monotonic()
+            logger.info("Rule parser vocabulary loaded", extra={"terms": len(vocabulary)})
+            return vocabulary
+
+
+# Global singleton instance
+rule_based_parser = RuleBasedParser()
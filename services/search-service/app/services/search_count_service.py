@@ -0,0 +1,84 @@
+"""
+Search Count Service - total match counts for search responses.
+An exact COUNT(*) over a broad filter scans most of the trades table, so the total is
+taken from the planner estimate unless that estimate says an exact count is cheap.
+"""
+
+import json
+from typing import Any, Optional, Tuple
+
+from app.cache.redis_client import CacheKeys, redis_manager
+from app.cache.search_cache import search_result_cache
+from app.config.settings import settings
+from app.database.connection import db_manager
+from app.services.query_builder import query_builder
+from app.utils.logger import logger
+
+
+class SearchCountService:
+    """
+    Count strategy for a search's WHERE clause.
+
+    1. An estimate cached for the same filter (canonical SQL + params) is served as-is.
+    2. Otherwise the planner row estimate is read with EXPLAIN (nothing is scanned).
+    3. If the estimate is at most SEARCH_EXACT_COUNT_THRESHOLD, COUNT(*) runs and the
+       total is exact; broader filters keep the estimate, which is cached.
+    """
+
+    def __init__(self):
+        self.builder = query_builder
+        self.db = db_manager
+        self.cache = redis_manager
+        self.ttl = settings.CACHE_TTL_SEARCH_COUNT
+
+    async def count(self, search_query: str, params: list[Any]) -> Optional[Tuple[int, bool]]:
+        """
+        Return (total, exact) for a search query, or None if no count could be obtained.
+
+        Args:
+            search_query: Unpaginated search SELECT without a score wrapper
+            params: Its parameter values
+
+        Returns:
+            Tuple of (total matching trades, whether the total is exact) or None
+        """
+        cache_key = CacheKeys.search_count(search_result_cache.build_hash(search_query, params))
+        cached = await self._get_cached(cache_key)
+        if cached is not None:
+            return cached, False
+
+        try:
+            estimate = await self._estimate(search_query, params)
+            if estimate <= settings.SEARCH_EXACT_COUNT_THRESHOLD:
+                total = await self.db.fetchval(self.builder.build_count_query(search_query), *params)
+                return int(total), True
+        except Exception as e:
+            logger.warning(f"Search count failed: {e}", extra={"param_count": len(params)})
+            return None
+
+        try:
+            await self.cache.set(cache_key, estimate, ttl=self.ttl)
+        except Exception as e:
+            logger.warning(f"Search count cache write error: {e}")
+
+        logger.debug("Using planner estimate for search total", extra={"estimate": estimate})
+        return estimate, False
+
+    async def _estimate(self, search_query: str, params: list[Any]) -> int:
+        """Planner row estimate for the search's WHERE clause."""
+        plan = await self.db.fetchval(self.builder.build_estimate_query(search_query), *params)
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    async def _get_cached(self, cache_key: str) -> Optional[int]:
+        try:
+            cached = await self.cache.get(cache_key)
+            return int(cached) if cached is not None else None
+        except Exception as e:
+            logger.warning(f"Search count cache read error: {e}")
+            return None
+
+
+# Global singleton instance
+search_count_service = SearchCountService()
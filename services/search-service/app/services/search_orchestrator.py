@@ -3,9 +3,12 @@ Search Orchestrator - Business Logic Coordinator
 Orchestrates the complete search flow: parameter extraction, query building, execution, and history tracking.
 """
 
+import asyncio
 import time
-from typing import Any, Optional, Tuple
+from typing import Any, AsyncIterator, Optional, Tuple
 
+from app.cache.search_cache import TradePredicate, search_result_cache
+from app.config.settings import settings
 from app.database.connection import db_manager
 from app.models.domain import ExtractedParams, Trade
 from app.models.request import SearchRequest
@@ -17,6 +20,9 @@ from app.services.gemini_service import gemini_service as bedrock_service
 from app.services.query_builder import query_builder
 from app.services.query_history_service import query_history_service
 from app.services.ranking_service import trade_ranker
+from app.services.rule_parser import rule_based_parser
+from app.services.search_count_service import search_count_service
+from app.services.similar_extraction_cache import similar_extraction_cache
 from app.utils.exceptions import DatabaseQueryError, InvalidSearchRequestError
 from app.utils.logger import logger
 
@@ -26,25 +32,37 @@ class SearchOrchestrator:
     Orchestrates the complete search flow.
 
     Flow for Natural Language Search:
-    1. Extract parameters using Bedrock
+    1. Extract parameters with the rule-based parser, or Bedrock when it is not confident
     2. Build SQL from extracted parameters
-    3. Execute query against database
+    3. Serve from result cache, or execute query against database and rank
     4. Save to query history
     5. Format and return response
 
     Flow for Manual Search:
     1. Build SQL from manual filters
-    2. Execute query against database
+    2. Serve from result cache, or execute query against database and rank
     3. Save to query history
     4. Format and return response
+
+    When the request carries page_size/cursor the query is keyset-paginated on
+    (sort field, id); ranking then reorders within the returned page only, so
+    page boundaries stay stable while the user walks forward. Otherwise, with
+    SEARCH_RANK_IN_SQL on, ranking is pushed into SQL: Postgres scores every match
+    and the limit keeps the most relevant rows rather than the most recent ones.
+    It is off by default because scoring every match grows with the table, while
+    the newest-rows limit is served from the update_time index.
     """
 
     def __init__(self):
         self.bedrock = bedrock_service
+        self.rule_parser = rule_based_parser
+        self.similar_extractions = similar_extraction_cache
         self.builder = query_builder
         self.history = query_history_service
         self.db = db_manager
         self.ranker = trade_ranker
+        self.result_cache = search_result_cache
+        self.count_service = search_count_service
 
     async def execute_search(self, request: SearchRequest) -> SearchResponse:
         """
@@ -62,7 +80,6 @@ class SearchOrchestrator:
             DatabaseQueryError: If query execution fails
         """
         start_time = time.time()
-        query_id: Optional[int] = None
 
         logger.info(
             "Starting search execution",
@@ -70,9 +87,331 @@ class SearchOrchestrator:
         )
 
         # Save to query history early (before execution) so failed searches are tracked
+        query_id = await self._save_history(request)
+
+        # Step 1-2: Build SQL query based on search type and validate its safety
+        sql_query, params, extracted_params, extraction_method = await self._build_query(request)
+
+        # Step 3: Serve from result cache, or execute + rank and populate it
+        page_size = None
+        if request.page_size is not None or request.cursor is not None:
+            page_size = self.builder.clamp_page_size(request.page_size)
+        sort_field = self._sort_field(request)
+
+        cached_page = await self.result_cache.get(sql_query, params)
+        cached = cached_page is not None
+        rank_in_sql = self._rank_in_sql(request)
+
+        if cached:
+            trades, next_cursor = cached_page
+            count = await self._count_matches(request, extracted_params)
+        else:
+            # The total is counted on a second connection while the page is fetched
+            (trades, next_cursor, transaction_counts), count = await asyncio.gather(
+                self._execute_query(
+                    sql_query,
+                    params,
+                    request.user_id,
+                    page_size=page_size,
+                    sort_field=sort_field,
+                    with_transaction_counts=self._fold_enrichment() and not rank_in_sql,
+                ),
+                self._count_matches(request, extracted_params),
+            )
+
+            # Step 3.5: Apply intelligent ranking (if enabled and not already done by the query)
+            # - within the page when paginating
+            if not rank_in_sql:
+                trades = await self._apply_ranking(trades, request.user_id, transaction_counts)
+
+            predicate = self._build_predicate(request, extracted_params)
+            await self.result_cache.set(sql_query, params, predicate, trades, next_cursor)
+
+        # Step 4: Format response
+        total_results, total_exact = self._resolve_total(count, len(trades), page_size)
+        execution_time = (time.time() - start_time) * 1000  # Convert to milliseconds
+
+        response = SearchResponse(
+            query_id=query_id or 0,  # Use 0 if history save failed
+            total_results=total_results,
+            total_results_exact=total_exact,
+            results=trades,
+            search_type=request.search_type,
+            cached=cached,
+            execution_time_ms=execution_time,
+            extracted_params=extracted_params if request.search_type == "natural_language" else None,
+            extraction_method=extraction_method,
+            next_cursor=next_cursor,
+        )
+
+        logger.info(
+            "Search completed successfully",
+            extra={
+                "user_id": request.user_id,
+                "query_id": query_id,
+                "results_count": len(trades),
+                "total_results": total_results,
+                "total_results_exact": total_exact,
+                "execution_time_ms": execution_time,
+                "search_type": request.search_type,
+                "cached": cached,
+                "rank_in_sql": rank_in_sql,
+                "paginated": page_size is not None,
+                "has_next_page": next_cursor is not None,
+            },
+        )
+
+        return response
+
+    async def stream_search(self, request: SearchRequest) -> Tuple[dict[str, str], AsyncIterator[bytes]]:
+        """
+        Execute a search and return results as NDJSON lines (one trade per line).
+
+        Variants, chosen by where the result order comes from:
+        - cache: a cached ranked result set is replayed
+        - none: ranking disabled, rows stream from a server-side cursor in SQL order
+        - sql: ranking runs in the query, rows stream from a server-side cursor in score order
+        - python: ranking needs the full set, so rows are fetched, ranked, then emitted
+
+        The first row is fetched before returning so database errors still map to
+        a normal error response instead of a truncated stream.
+
+        Args:
+            request: SearchRequest (page_size/cursor are not supported in this mode)
+
+        Returns:
+            Tuple of (response headers, async iterator of NDJSON-encoded lines)
+
+        Raises:
+            InvalidSearchRequestError: If the request is invalid or paginated
+            BedrockAPIError: If AI extraction fails
+            DatabaseQueryError: If query execution fails
+        """
+        if request.page_size is not None or request.cursor is not None:
+            raise InvalidSearchRequestError(
+                "Pagination is not supported in NDJSON streaming mode",
+                details={"user_id": request.user_id},
+            )
+
+        logger.info(
+            "Starting streaming search execution",
+            extra={"user_id": request.user_id, "search_type": request.search_type},
+        )
+
+        query_id = await self._save_history(request)
+        sql_query, params, extracted_params, extraction_method = await self._build_query(request)
+
+        cached_page = await self.result_cache.get(sql_query, params)
+        if cached_page is not None:
+            ranking_mode = "cache"
+            lines = self._encode_trades(cached_page[0], request.user_id)
+        elif not self.ranker.config.is_enabled():
+            ranking_mode = "none"
+            lines = await self._open_record_stream(sql_query, params, request.user_id)
+        elif self._rank_in_sql(request):
+            ranking_mode = "sql"
+            lines = await self._open_record_stream(sql_query, params, request.user_id)
+        else:
+            ranking_mode = "python"
+            trades, _, transaction_counts = await self._execute_query(
+                sql_query,
+                params,
+                request.user_id,
+                sort_field=self._sort_field(request),
+                with_transaction_counts=self._fold_enrichment(),
+            )
+            trades = await self._apply_ranking(trades, request.user_id, transaction_counts)
+            await self.result_cache.set(sql_query, params, self._build_predicate(request, extracted_params), trades)
+            lines = self._encode_trades(trades, request.user_id)
+
+        headers = {
+            "X-Query-Id": str(query_id or 0),
+            "X-Search-Type": request.search_type,
+            "X-Ranking-Mode": ranking_mode,
+        }
+        if extraction_method:
+            headers["X-Extraction-Method"] = extraction_method
+        return headers, lines
+
+    def can_assemble_json(self, request: SearchRequest) -> bool:
+        """
+        Whether this request can be answered by execute_search_json.
+
+        Postgres can only produce the final result order when ranking is disabled or
+        runs in SQL, and the look-ahead row used for pagination cannot be trimmed from
+        an aggregated array, so paginated requests keep the regular path.
+        """
+        return (
+            settings.SEARCH_SQL_JSON_ENABLED
+            and request.page_size is None
+            and request.cursor is None
+            and (not self.ranker.config.is_enabled() or self._rank_in_sql(request))
+        )
+
+    async def execute_search_json(self, request: SearchRequest) -> bytes:
+        """
+        Execute a search with Postgres assembling the results array.
+
+        The array arrives as JSON text and is spliced into the response envelope as-is,
+        so rows are never decoded into Trade models or re-encoded by SearchResponse.
+        The text is cached under the JSON query's hash (with the same predicate-aware
+        invalidation as Trade rows), so repeated searches skip the query entirely.
+
+        Args:
+            request: SearchRequest for which can_assemble_json() is True
+
+        Returns:
+            UTF-8 JSON body with the SearchResponse shape
+
+        Raises:
+            InvalidSearchRequestError: If request is invalid
+            BedrockAPIError: If AI extraction fails
+            DatabaseQueryError: If query execution fails
+        """
+        start_time = time.time()
+
+        logger.info(
+            "Starting search execution (SQL JSON assembly)",
+            extra={"user_id": request.user_id, "search_type": request.search_type},
+        )
+
+        query_id = await self._save_history(request)
+        sql_query, params, extracted_params, extraction_method = await self._build_query(request)
+
+        json_query = self.builder.build_json_query(
+            sql_query, self._sort_field(request), ranked=self._rank_in_sql(request)
+        )
+
+        cached_json = await self.result_cache.get_json(json_query, params)
+        cached = cached_json is not None
+        if cached:
+            results_json, results_count = cached_json
+            count = await self._count_matches(request, extracted_params)
+        else:
+            (results_json, trade_ids), count = await asyncio.gather(
+                self._execute_json_query(json_query, params, request.user_id),
+                self._count_matches(request, extracted_params),
+            )
+            results_count = len(trade_ids)
+            predicate = self._build_predicate(request, extracted_params)
+            await self.result_cache.set_json(json_query, params, predicate, results_json, trade_ids)
+
+        total_results, total_exact = self._resolve_total(count, results_count)
+
+        execution_time = (time.time() - start_time) * 1000
+
+        # Serialise everything except results through the model, then splice the array in
+        envelope = SearchResponse(
+            query_id=query_id or 0,
+            total_results=total_results,
+            total_results_exact=total_exact,
+            results=[],
+            search_type=request.search_type,
+            cached=cached,
+            execution_time_ms=execution_time,
+            extracted_params=extracted_params if request.search_type == "natural_language" else None,
+            extraction_method=extraction_method,
+        ).model_dump_json(exclude={"results"})
+        body = f'{envelope[:-1]},"results":{results_json}}}'.encode()
+
+        logger.info(
+            "Search completed successfully",
+            extra={
+                "user_id": request.user_id,
+                "query_id": query_id,
+                "results_count": results_count,
+                "total_results": total_results,
+                "total_results_exact": total_exact,
+                "execution_time_ms": execution_time,
+                "search_type": request.search_type,
+                "cached": cached,
+                "sql_json": True,
+                "response_bytes": len(body),
+            },
+        )
+
+        return body
+
+    async def _count_matches(
+        self, request: SearchRequest, extracted_params: Optional[ExtractedParams]
+    ) -> Optional[Tuple[int, bool]]:
+        """
+        Count every trade the request's filters match (not just the returned rows).
+
+        The count runs on the plain filter query: no keyset condition, limit or score
+        wrapper, so all pages of a paginated search share one total.
+
+        Returns:
+            Tuple of (total, exact) from the count strategy, or None when disabled/failed
+        """
+        if not settings.SEARCH_COUNT_ENABLED:
+            return None
+
+        try:
+            if request.search_type == "natural_language":
+                count_query, count_params = self.builder.build_from_extracted_params(extracted_params)
+            else:
+                count_query, count_params = self.builder.build_from_manual_filters(request.filters)
+        except Exception as e:
+            logger.warning(f"Failed to build count query: {e}", extra={"user_id": request.user_id})
+            return None
+
+        return await self.count_service.count(count_query, count_params)
+
+    @staticmethod
+    def _resolve_total(
+        count: Optional[Tuple[int, bool]], results_count: int, page_size: Optional[int] = None
+    ) -> Tuple[int, bool]:
+        """
+        Pick total_results and whether it is exact.
+
+        An estimate is never reported below the rows actually returned. Without a count,
+        the returned rows are the total only if an unpaginated search did not hit the limit.
+        """
+        if count is None:
+            return results_count, page_size is None and results_count < settings.MAX_SEARCH_RESULTS
+
+        total, exact = count
+        if exact:
+            return total, True
+        return max(total, results_count), False
+
+    def _fold_enrichment(self) -> bool:
+        """Whether ranking inputs should come back with the search rows (one round trip)."""
+        return settings.SEARCH_SINGLE_ROUND_TRIP and self.ranker.config.is_enabled()
+
+    def _rank_in_sql(self, request: SearchRequest) -> bool:
+        """
+        Whether the query should order by the compiled relevance score.
+
+        Paginated requests keep keyset order on (sort field, id), which a score that
+        decays with time cannot provide, so they rank within each page in Python.
+        """
+        return (
+            settings.SEARCH_RANK_IN_SQL
+            and self.ranker.config.is_enabled()
+            and request.page_size is None
+            and request.cursor is None
+        )
+
+    @staticmethod
+    def _sort_field(request: SearchRequest) -> str:
+        """Column the generated query orders by (manual searches may choose create_time)."""
+        if request.search_type == "manual" and request.filters:
+            return request.filters.date_type
+        return "update_time"
+
+    async def _save_history(self, request: SearchRequest) -> Optional[int]:
+        """
+        Record the search in query history, returning its query_id.
+
+        Failures are logged and swallowed so history never blocks a search.
+        """
+        query_id: Optional[int] = None
         try:
-            should_save = True
-            if request.search_type == "manual" and request.filters:
+            # Continuation pages belong to the query already recorded for the first page
+            should_save = request.cursor is None
+            if should_save and request.search_type == "manual" and request.filters:
                 # Check if filters are effectively empty (default state)
                 f = request.filters
                 is_empty = (
@@ -113,17 +452,32 @@ class SearchOrchestrator:
                 extra={"user_id": request.user_id},
             )
 
-        # Step 1: Build SQL query based on search type
+        return query_id
+
+    async def _build_query(
+        self, request: SearchRequest
+    ) -> Tuple[str, list[Any], Optional[ExtractedParams], Optional[str]]:
+        """
+        Build the parameterised SQL for a request and validate its safety.
+
+        Returns:
+            Tuple of (sql_query, params, extracted_params, extraction_method);
+            extraction_method is "rules", "similar" or "llm" for natural language searches, else None
+
+        Raises:
+            InvalidSearchRequestError: If the generated query fails safety validation
+        """
         if request.search_type == "natural_language":
             (
                 sql_query,
                 params,
                 extracted_params,
+                extraction_method,
             ) = await self._handle_natural_language_search(request)
         else:  # manual
             sql_query, params, extracted_params = await self._handle_manual_search(request)
+            extraction_method = None
 
-        # Step 2: Validate query safety
         if not self.builder.validate_query_safety(sql_query, params):
             logger.error("Query safety validation failed", extra={"user_id": request.user_id})
             raise InvalidSearchRequestError(
@@ -131,41 +485,18 @@ class SearchOrchestrator:
                 details={"user_id": request.user_id},
             )
 
-        # Step 3: Execute query
-        trades = await self._execute_query(sql_query, params, request.user_id)
-
-        # Step 3.5: Apply intelligent ranking (if enabled)
-        trades = await self._apply_ranking(trades, request.user_id)
-
-        # Step 4: Format response
-        execution_time = (time.time() - start_time) * 1000  # Convert to milliseconds
-
-        response = SearchResponse(
-            query_id=query_id or 0,  # Use 0 if history save failed
-            total_results=len(trades),
-            results=trades,
-            search_type=request.search_type,
-            cached=False,  # TODO: Implement result caching in Phase 2
-            execution_time_ms=execution_time,
-            extracted_params=extracted_params if request.search_type == "natural_language" else None,
-        )
-
-        logger.info(
-            "Search completed successfully",
-            extra={
-                "user_id": request.user_id,
-                "query_id": query_id,
-                "results_count": len(trades),
-                "execution_time_ms": execution_time,
-                "search_type": request.search_type,
-            },
-        )
+        return sql_query, params, extracted_params, extraction_method
 
-        return response
+    @staticmethod
+    def _build_predicate(request: SearchRequest, extracted_params: Optional[ExtractedParams]) -> TradePredicate:
+        """Build the cache invalidation predicate for a request."""
+        if request.search_type == "natural_language":
+            return TradePredicate.from_extracted_params(extracted_params)
+        return TradePredicate.from_manual_filters(request.filters)
 
     async def _handle_natural_language_search(
         self, request: SearchRequest
-    ) -> Tuple[str, list[Any], Optional[ExtractedParams]]:
+    ) -> Tuple[str, list[Any], Optional[ExtractedParams], str]:
         """
         Handle natural language search: extract params → build SQL.
 
@@ -173,26 +504,45 @@ class SearchOrchestrator:
             request: SearchRequest with query_text
 
         Returns:
-            Tuple of (sql_query, params, extracted_params)
+            Tuple of (sql_query, params, extracted_params, extraction_method)
         """
         logger.info(
             "Processing natural language query",
             extra={"user_id": request.user_id, "query": request.query_text[:100]},
         )
 
-        # Extract parameters using Bedrock
-        extracted_params = await self.bedrock.extract_parameters(query=request.query_text, user_id=request.user_id)
+        # Extract parameters: deterministic parser first, then a near-duplicate of a recent
+        # LLM extraction, Bedrock when neither is confident
+        extracted_params = None
+        extraction_method = "rules"
+        if settings.RULE_PARSER_ENABLED:
+            extracted_params = await self.rule_parser.parse(request.query_text)
+        if extracted_params is None and settings.SIMILAR_EXTRACTION_CACHE_ENABLED:
+            extraction_method = "similar"
+            similar = self.similar_extractions.lookup(request.query_text)
+            extracted_params = similar[0] if similar else None
+        if extracted_params is None:
+            extraction_method = "llm"
+            extracted_params = await self.bedrock.extract_parameters(query=request.query_text, user_id=request.user_id)
+            if settings.SIMILAR_EXTRACTION_CACHE_ENABLED:
+                self.similar_extractions.add(request.query_text, extracted_params)
 
         logger.info(
             "Parameters extracted from natural language",
             extra={
                 "user_id": request.user_id,
                 "extracted_params": extracted_params.model_dump(),
+                "extraction_method": extraction_method,
             },
         )
 
         # Build SQL from extracted parameters
-        sql_query, params = self.builder.build_from_extracted_params(extracted_params)
+        sql_query, params = self.builder.build_from_extracted_params(
+            extracted_params,
+            page_size=request.page_size,
+            cursor=request.cursor,
+            sql_score=self.ranker.compile_sql_score() if self._rank_in_sql(request) else None,
+        )
 
         logger.info(
             "[SQL QUERY]\n%s\n[SQL PARAMS] %s",
@@ -200,7 +550,7 @@ class SearchOrchestrator:
             params,
         )
 
-        return sql_query, params, extracted_params
+        return sql_query, params, extracted_params, extraction_method
 
     async def _handle_manual_search(self, request: SearchRequest) -> Tuple[str, list[Any], None]:
         """
@@ -218,11 +568,24 @@ class SearchOrchestrator:
         )
 
         # Build SQL from manual filters
-        sql_query, params = self.builder.build_from_manual_filters(request.filters)
+        sql_query, params = self.builder.build_from_manual_filters(
+            request.filters,
+            page_size=request.page_size,
+            cursor=request.cursor,
+            sql_score=self.ranker.compile_sql_score() if self._rank_in_sql(request) else None,
+        )
 
         return sql_query, params, None
 
-    async def _execute_query(self, sql_query: str, params: list[Any], user_id: str) -> list[Trade]:
+    async def _execute_query(
+        self,
+        sql_query: str,
+        params: list[Any],
+        user_id: str,
+        page_size: Optional[int] = None,
+        sort_field: str = "update_time",
+        with_transaction_counts: bool = False,
+    ) -> Tuple[list[Trade], Optional[str], Optional[list[int]]]:
         """
         Execute SQL query and convert results to Trade models.
 
@@ -230,9 +593,13 @@ class SearchOrchestrator:
             sql_query: Parameterized SQL query
             params: List of parameter values
             user_id: User ID for logging
+            page_size: Page size when keyset-paginated (query fetches page_size + 1 rows)
+            sort_field: Keyset sort column, used to build next_cursor
+            with_transaction_counts: Fold the ranking enrichment into this query
 
         Returns:
-            List of Trade models
+            Tuple of (list of Trade models, next_cursor or None,
+            transaction counts aligned with the trades or None)
 
         Raises:
             DatabaseQueryError: If query execution fails
@@ -246,19 +613,33 @@ class SearchOrchestrator:
             },
         )
 
+        if with_transaction_counts:
+            sql_query = self.builder.build_ranked_query(sql_query, sort_field)
+
         try:
             # Execute query
             records = await self.db.fetch(sql_query, *params)
 
-            # Convert records to Trade models
-            trades = [Trade.from_db_record(record) for record in records]
+            # The look-ahead row only signals another page; the cursor comes from the
+            # last kept row in SQL order, before ranking reorders the page.
+            next_cursor = None
+            if page_size is not None and len(records) > page_size:
+                records = records[:page_size]
+                last = records[-1]
+                next_cursor = self.builder.encode_cursor(sort_field, last[sort_field], last["id"])
+
+            # Convert records to Trade models (rows come from our own trades SQL, so skip re-validation)
+            trades = [Trade.from_trusted_record(record) for record in records]
+            transaction_counts = (
+                [record["transaction_count"] for record in records] if with_transaction_counts else None
+            )
 
             logger.info(
                 "Query executed successfully",
                 extra={"user_id": user_id, "results_count": len(trades)},
             )
 
-            return trades
+            return trades, next_cursor, transaction_counts
 
         except Exception as e:
             logger.error(
@@ -270,16 +651,99 @@ class SearchOrchestrator:
                 details={"error": str(e), "user_id": user_id},
             )
 
-    async def _apply_ranking(self, trades: list[Trade], user_id: str) -> list[Trade]:
+    async def _execute_json_query(self, json_query: str, params: list[Any], user_id: str) -> Tuple[str, list[int]]:
+        """
+        Execute a build_json_query statement.
+
+        Returns:
+            Tuple of (results JSON array text, trade ids in it)
+
+        Raises:
+            DatabaseQueryError: If query execution fails
+        """
+        try:
+            row = await self.db.fetchrow(json_query, *params)
+        except Exception as e:
+            logger.error(
+                f"Failed to execute trade search JSON query: {e}",
+                extra={"user_id": user_id, "param_count": len(params), "error": str(e)},
+            )
+            raise DatabaseQueryError(
+                "Failed to execute search query",
+                details={"error": str(e), "user_id": user_id},
+            )
+
+        if not row:
+            return "[]", []
+        return row["results"], list(row["trade_ids"])
+
+    async def _open_record_stream(self, sql_query: str, params: list[Any], user_id: str) -> AsyncIterator[bytes]:
+        """
+        Open a server-side cursor and prime it with the first row.
+
+        Returns:
+            Async iterator of NDJSON lines, starting with the primed row
+        """
+        records = self.db.stream(sql_query, *params)
+        try:
+            first = await records.__anext__()
+        except StopAsyncIteration:
+            first = None
+        return self._encode_record_stream(first, records, user_id)
+
+    async def _encode_record_stream(
+        self, first: Optional[Any], records: AsyncIterator[Any], user_id: str
+    ) -> AsyncIterator[bytes]:
+        """Encode cursor records to NDJSON as they arrive, closing the cursor when done."""
+        row_count = 0
+        try:
+            if first is None:
+                return
+            yield Trade.from_trusted_record(first).model_dump_json().encode() + b"\n"
+            row_count += 1
+            async for record in records:
+                yield Trade.from_trusted_record(record).model_dump_json().encode() + b"\n"
+                row_count += 1
+        except Exception as e:
+            logger.error(
+                f"NDJSON search stream aborted: {e}",
+                extra={"user_id": user_id, "rows_sent": row_count},
+            )
+            raise
+        finally:
+            await records.aclose()
+            logger.info(
+                "Streamed search results",
+                extra={"user_id": user_id, "results_count": row_count},
+            )
+
+    @staticmethod
+    async def _encode_trades(trades: list[Trade], user_id: str) -> AsyncIterator[bytes]:
+        """Encode an already materialised (ranked or cached) result set to NDJSON."""
+        for trade in trades:
+            yield trade.model_dump_json().encode() + b"\n"
+        logger.info(
+            "Streamed search results",
+            extra={"user_id": user_id, "results_count": len(trades)},
+        )
+
+    async def _apply_ranking(
+        self,
+        trades: list[Trade],
+        user_id: str,
+        transaction_counts: Optional[list[int]] = None,
+    ) -> list[Trade]:
         """
         Apply intelligent ranking to search results.
 
-        Fetches enriched data (exceptions, transactions) and ranks trades
-        by relevance using the configured ranking algorithm.
+        Uses transaction counts already returned with the search rows when available;
+        otherwise fetches enriched data (transactions) in a second query. Trades are
+        then ranked by relevance using the configured ranking algorithm.
 
         Args:
             trades: Initial list of trades from search query
             user_id: User ID for logging
+            transaction_counts: Counts aligned with trades from the folded search query
 
         Returns:
             Ranked list of trades (most relevant first)
@@ -296,6 +760,14 @@ class SearchOrchestrator:
             return trades
 
         try:
+            if transaction_counts is not None:
+                ranked_trades = self.ranker.rank_trades(trades, transaction_counts=transaction_counts)
+                logger.info(
+                    "Applied intelligent ranking to search results",
+                    extra={"user_id": user_id, "trade_count": len(ranked_trades), "round_trips": 1},
+                )
+                return ranked_trades
+
             # Extract trade IDs
             trade_ids = [trade.trade_id for trade in trades]
 
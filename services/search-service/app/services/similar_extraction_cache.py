@@ -0,0 +1,205 @@
+"""
+Near-duplicate cache for NL parameter extractions.
+
+The exact extraction cache keys on the normalised query text, so reworded or misspelt
+queries ("show fx trades rejected yesterday" / "rejected FX trades from yesterday")
+always miss it and pay for an LLM call. This in-process index keeps recent queries as
+hashed character n-gram TF-IDF vectors next to their ExtractedParams and serves the
+nearest one when it is similar enough and names exactly the same filter values.
+
+Entries are stored sparsely (the hashed n-gram ids and counts of each query, padded to
+a common width), so adding one only writes its own row. IDF weights change with every
+add, so each lookup applies them to the stored counts: a gather over entries x n-grams
+per query instead of re-weighting a dense entries x DIMENSIONS matrix.
+"""
+
+import difflib
+import re
+import zlib
+from datetime import datetime
+from typing import Optional, Tuple
+
+import numpy as np
+
+from app.config.settings import settings
+from app.models.domain import ExtractedParams
+from app.services.rule_parser import RuleBasedParser
+from app.utils.logger import logger
+
+
+class SimilarExtractionCache:
+    """
+    Bounded, per-day vector index of recent (query, ExtractedParams) pairs.
+
+    A lookup hits when cosine similarity >= threshold AND the two queries' content
+    words agree: words containing digits and short words (asset types, clearing houses,
+    account ids) must match exactly, longer words may differ by a typo. This keeps
+    "rejected FX trades" from being served "rejected IRS trades", which n-grams alone
+    would score as close. Entries are dropped when the day changes, since relative
+    dates were resolved against the day they were extracted.
+    """
+
+    NGRAM = 3
+    DIMENSIONS = 2048  # Hashed feature space
+    INITIAL_WIDTH = 64  # Distinct n-grams per entry before the sparse rows are widened
+    EXACT_WORD_MAX_LENGTH = 4  # Words this short (FX, IRS, LCH) must match exactly
+    FUZZY_WORD_RATIO = 0.8  # Longer words may differ by a typo
+
+    _TOKEN = re.compile(r"[a-z0-9_\-]+")
+
+    def __init__(
+        self,
+        threshold: float = settings.SIMILAR_EXTRACTION_THRESHOLD,
+        max_entries: int = settings.SIMILAR_EXTRACTION_MAX_ENTRIES,
+    ):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._clear(day="")
+
+    def _clear(self, day: str) -> None:
+        self._day = day
+        # Row i holds entry i's n-gram ids and counts; unused cells have count 0
+        self._grams = np.zeros((self.max_entries, self.INITIAL_WIDTH), dtype=np.int32)
+        self._counts = np.zeros((self.max_entries, self.INITIAL_WIDTH), dtype=np.float32)
+        self._df = np.zeros(self.DIMENSIONS, dtype=np.float32)
+        self._words: list[Optional[list[str]]] = [None] * self.max_entries
+        self._params: list[Optional[ExtractedParams]] = [None] * self.max_entries
+        self._size = 0  # Slots fill in order, so entries occupy rows [0, _size)
+        self._next = 0
+
+    def lookup(self, query: str, current_date: Optional[datetime] = None) -> Optional[Tuple[ExtractedParams, float]]:
+        """
+        Return (params, similarity) of the closest confident match, or None.
+
+        Args:
+            query: Natural language query string
+            current_date: Day the extraction would be resolved against (defaults to today)
+        """
+        self._roll_day(current_date)
+        words = self._content_words(query)
+        if self._size == 0 or not words:
+            self.misses += 1
+            return None
+
+        similarities = self._similarities(words)
+
+        for index in np.argsort(-similarities):
+            similarity = float(similarities[index])
+            if similarity < self.threshold:
+                break
+            if self._words_agree(words, self._words[index]):
+                self.hits += 1
+                logger.info(
+                    "Near-duplicate extraction cache hit",
+                    extra={"similarity": round(similarity, 4), "matched_query": " ".join(self._words[index])},
+                )
+                return self._params[index].model_copy(deep=True), similarity
+
+        self.misses += 1
+        return None
+
+    def add(self, query: str, params: ExtractedParams, current_date: Optional[datetime] = None) -> None:
+        """Index an extraction, replacing the oldest entry when full."""
+        self._roll_day(current_date)
+        words = self._content_words(query)
+        if not words:
+            return
+
+        grams, counts = self._sparse_term_frequencies(words)
+        if len(grams) > self._grams.shape[1]:
+            self._widen(len(grams))
+
+        slot = self._next
+        if self._words[slot] is not None:
+            self._df[self._grams[slot][self._counts[slot] > 0]] -= 1.0
+        else:
+            self._size += 1
+
+        self._grams[slot] = 0
+        self._counts[slot] = 0.0
+        self._grams[slot, : len(grams)] = grams
+        self._counts[slot, : len(grams)] = counts
+        self._df[grams] += 1.0
+        self._words[slot] = words
+        self._params[slot] = params.model_copy(deep=True)
+        self._next = (slot + 1) % self.max_entries
+
+    def stats(self) -> dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "size": self._size,
+            "threshold": self.threshold,
+        }
+
+    def _roll_day(self, current_date: Optional[datetime]) -> None:
+        day = (current_date or datetime.now()).strftime("%Y-%m-%d")
+        if day != self._day:
+            self._clear(day)
+
+    def _content_words(self, query: str) -> list[str]:
+        """Lower-cased words without filler or possessives, status synonyms folded ("pending" -> "alleged")."""
+        words = []
+        for token in self._TOKEN.findall(query.lower().replace("'s", "")):
+            if token in RuleBasedParser.FILLER_WORDS:
+                continue
+            status = RuleBasedParser.STATUS_WORDS.get(token)
+            words.append(status.lower() if status else token)
+        return sorted(set(words))
+
+    def _sparse_term_frequencies(self, words: list[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Distinct hashed character n-gram ids of the (order-insensitive) content words, with counts."""
+        hashes = [
+            zlib.crc32(padded[start : start + self.NGRAM].encode()) % self.DIMENSIONS
+            for padded in (f" {word} " for word in words)
+            for start in range(max(1, len(padded) - self.NGRAM + 1))
+        ]
+        grams, counts = np.unique(np.array(hashes, dtype=np.int32), return_counts=True)
+        return grams, counts.astype(np.float32)
+
+    def _widen(self, width: int) -> None:
+        """Grow the sparse rows to hold at least width n-grams (padding has count 0)."""
+        extra = max(width, 2 * self._grams.shape[1]) - self._grams.shape[1]
+        self._grams = np.pad(self._grams, ((0, 0), (0, extra)))
+        self._counts = np.pad(self._counts, ((0, 0), (0, extra)))
+
+    def _similarities(self, words: list[str]) -> np.ndarray:
+        """Cosine similarity of the query's TF-IDF vector to every entry's, under the current IDF."""
+        idf = (np.log((1.0 + self._size) / (1.0 + self._df)) + 1.0).astype(np.float32)
+        query = np.zeros(self.DIMENSIONS, dtype=np.float32)
+        grams, counts = self._sparse_term_frequencies(words)
+        query[grams] = counts * idf[grams]
+        query /= np.linalg.norm(query)
+
+        entry_grams = self._grams[: self._size]
+        weighted = self._counts[: self._size] * idf[entry_grams]
+        norms = np.sqrt(np.einsum("ij,ij->i", weighted, weighted))
+        dots = np.einsum("ij,ij->i", weighted, query[entry_grams])
+        return np.divide(dots, norms, out=np.zeros_like(dots), where=norms > 0)
+
+    def _words_agree(self, words: list[str], other: Optional[list[str]]) -> bool:
+        """Every content word on each side has a counterpart on the other."""
+        if other is None:
+            return False
+        return all(self._has_counterpart(word, other) for word in words) and all(
+            self._has_counterpart(word, words) for word in other
+        )
+
+    def _has_counterpart(self, word: str, candidates: list[str]) -> bool:
+        if word in candidates:
+            return True
+        if len(word) <= self.EXACT_WORD_MAX_LENGTH or any(char.isdigit() for char in word):
+            return False
+        return any(
+            len(candidate) > self.EXACT_WORD_MAX_LENGTH
+            and difflib.SequenceMatcher(None, word, candidate).ratio() >= self.FUZZY_WORD_RATIO
+            for candidate in candidates
+        )
+
+
+# Global singleton instance
+similar_extraction_cache = SimilarExtractionCache()
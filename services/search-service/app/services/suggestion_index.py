@@ -0,0 +1,282 @@
+"""
+Suggestion Index - in-process typeahead candidates without per-keystroke SQL.
+
+get_suggestions used to run one SELECT DISTINCT ... ILIKE '%q%' per trade field plus a
+history ILIKE on every keystroke (150-400 ms). This index keeps the distinct field
+values (trigram postings for substring lookups) and each active user's recent history
+in memory. It is loaded once, kept current from trade change events and the history
+writes of this replica, and rebuilt every SUGGESTION_INDEX_REBUILD_SECONDS to drop
+values no trade uses any more.
+
+Trade ids are not held in memory (that would be O(trades) per replica): an id prefix is
+answered from the trades primary key with one bounded range scan per id length.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from app.config.settings import settings
+from app.database.connection import db_manager
+from app.services.filter_options_service import filter_options_service
+from app.utils.logger import logger
+
+# (category, trade column, phrase label, FilterOptionsService field) - same order as the SQL fallback
+FIELD_SPECS = (
+    ("Account", "account", "account", "accounts"),
+    ("Asset type", "asset_type", "asset type", "asset_types"),
+    ("Booking system", "booking_system", "booking system", "booking_systems"),
+    ("Affirmation system", "affirmation_system", "affirmation system", "affirmation_systems"),
+    ("Clearing house", "clearing_house", "clearing house", "clearing_houses"),
+    ("Status", "status", "status", "statuses"),
+)
+
+TRADE_ID_CATEGORY = ("Trade id", "id", "trade id")
+MAX_TRADE_ID = 2**31 - 1  # trades.id is INTEGER
+
+
+class SuggestionIndex:
+    """
+    Trigram/prefix index over filter values and per-user recent history.
+
+    Field values match like the SQL they replace (case-insensitive substring). Trade ids
+    match by prefix, which is how ids are typed. History is kept per user as the
+    SUGGESTION_HISTORY_PER_USER most recently used queries; a scan of that short list
+    is cheaper than maintaining postings for it. Once a user's list is older than the
+    TTL it is still served while a background query refreshes it.
+    """
+
+    # First $3 ids of each [low, high) range, each an index-only scan of trades_pkey
+    TRADE_ID_PREFIX_QUERY = """
+        SELECT t.id
+        FROM unnest($1::bigint[], $2::bigint[]) AS r(low, high)
+        CROSS JOIN LATERAL (
+            SELECT id FROM trades WHERE id >= r.low AND id < r.high ORDER BY id LIMIT $3
+        ) AS t
+    """
+
+    HISTORY_QUERY = """
+        SELECT id, query_text, is_saved, query_name, create_time, last_use_time
+        FROM query_history
+        WHERE user_id = $1
+        ORDER BY last_use_time DESC
+        LIMIT $2
+    """
+
+    def __init__(
+        self,
+        rebuild_interval: float = settings.SUGGESTION_INDEX_REBUILD_SECONDS,
+        history_per_user: int = settings.SUGGESTION_HISTORY_PER_USER,
+        max_users: int = settings.SUGGESTION_HISTORY_MAX_USERS,
+        history_ttl: float = settings.SUGGESTION_HISTORY_TTL_SECONDS,
+    ):
+        self.db = db_manager
+        self.options_service = filter_options_service
+        self.rebuild_interval = rebuild_interval
+        self.history_per_user = history_per_user
+        self.max_users = max_users
+        self.history_ttl = history_ttl
+        self._values: list[tuple[int, str, str]] = []  # (field index, value, lowered value)
+        self._known: set[tuple[int, str]] = set()
+        self._trigrams: dict[str, set[int]] = defaultdict(set)
+        self._history: "OrderedDict[str, tuple[float, list[dict[str, Any]]]]" = OrderedDict()
+        self._refreshing: dict[str, asyncio.Task] = {}  # user_id -> background history reload
+        self._task: Optional[asyncio.Task] = None
+        self.loaded_at: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.loaded_at is not None
+
+    def start(self) -> None:
+        """Start the background load/rebuild task (idempotent)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="suggestion-index")
+            logger.info("Suggestion index started", extra={"rebuild_interval": self.rebuild_interval})
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.rebuild()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Suggestion index rebuild failed, keeping previous index: {e}")
+            await asyncio.sleep(self.rebuild_interval)
+
+    async def rebuild(self) -> None:
+        """Reload every distinct field value, replacing the current index."""
+        started = time.perf_counter()
+        options = await self.options_service.get_options()
+
+        self._values, self._known, self._trigrams = [], set(), defaultdict(set)
+        for field_index, (_, _, _, option_field) in enumerate(FIELD_SPECS):
+            for value in options.get(option_field, []):
+                self._add_value(field_index, value)
+        self.loaded_at = time.monotonic()
+
+        logger.info(
+            "Suggestion index rebuilt",
+            extra={
+                "values": len(self._values),
+                "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+            },
+        )
+
+    def _add_value(self, field_index: int, value: str) -> None:
+        if not value or (field_index, value) in self._known:
+            return
+        lowered = value.lower()
+        value_id = len(self._values)
+        self._values.append((field_index, value, lowered))
+        self._known.add((field_index, value))
+        for gram in self._grams(lowered):
+            self._trigrams[gram].add(value_id)
+
+    @staticmethod
+    def _grams(text: str) -> set[str]:
+        return {text[start : start + 3] for start in range(len(text) - 2)}
+
+    async def apply_trade_change(self, trade_id: int, trade_row: Optional[dict[str, Any]], event: dict) -> None:
+        """Trade change handler: index any field value seen for the first time."""
+        if not self.ready:
+            return
+        if trade_row:
+            for field_index, (_, column, _, _) in enumerate(FIELD_SPECS):
+                value = trade_row.get(column)
+                if isinstance(value, str):
+                    self._add_value(field_index, value)
+
+    async def field_matches(self, query: str, per_field_limit: int) -> list[tuple[str, str, str]]:
+        """
+        Field values containing query (case-insensitive), at most per_field_limit per field.
+
+        Returns:
+            (category, phrase label, value) tuples, fields in FIELD_SPECS order then trade ids
+        """
+        needle = query.strip().lower()
+        if not needle:
+            return []
+
+        if len(needle) >= 3:
+            postings = sorted((self._trigrams.get(gram, set()) for gram in self._grams(needle)), key=len)
+            candidate_ids = set.intersection(*postings) if postings else set()
+        else:
+            candidate_ids = range(len(self._values))
+
+        per_field: dict[int, list[str]] = defaultdict(list)
+        for value_id in candidate_ids:
+            field_index, value, lowered = self._values[value_id]
+            if needle in lowered:
+                per_field[field_index].append(value)
+
+        matches = []
+        for field_index, (category, _, label, _) in enumerate(FIELD_SPECS):
+            for value in sorted(per_field.get(field_index, []))[:per_field_limit]:
+                matches.append((category, label, value))
+
+        category, _, label = TRADE_ID_CATEGORY
+        trade_ids = await self.trade_id_matches(needle, per_field_limit)
+        matches.extend((category, label, str(trade_id)) for trade_id in trade_ids)
+        return matches
+
+    async def trade_id_matches(self, prefix: str, limit: int) -> list[int]:
+        """Trade ids whose decimal form starts with prefix, first limit in text order (like ORDER BY id::text)."""
+        if not prefix.isdigit() or prefix.startswith("0") or limit <= 0 or int(prefix) > MAX_TRADE_ID:
+            return []
+
+        # Ids with k more digits than prefix lie in [base * 10^k, (base + 1) * 10^k); within one
+        # length numeric order is text order, so the first limit of each range are enough
+        base = int(prefix)
+        lows, highs = [], []
+        for extra_digits in range(len(str(MAX_TRADE_ID)) - len(prefix) + 1):
+            if base * 10**extra_digits > MAX_TRADE_ID:
+                break
+            lows.append(base * 10**extra_digits)
+            highs.append((base + 1) * 10**extra_digits)
+
+        rows = await self.db.fetch(self.TRADE_ID_PREFIX_QUERY, lows, highs, limit)
+        return sorted((row["id"] for row in rows), key=str)[:limit]
+
+    async def history_matches(self, user_id: str, query: str, limit: int) -> list[dict[str, Any]]:
+        """The user's recent history rows containing query, most recently used first."""
+        needle = query.strip().lower()
+        rows = await self._user_history(user_id)
+        return [row for row in rows if needle in row["query_text"].lower()][:limit]
+
+    async def _user_history(self, user_id: str) -> list[dict[str, Any]]:
+        entry = self._history.get(user_id)
+        if entry is None:
+            return await self._load_history(user_id)
+
+        self._history.move_to_end(user_id)
+        if time.monotonic() - entry[0] >= self.history_ttl and user_id not in self._refreshing:
+            # Stale: answer from the cached list and reload in the background, off the keystroke path
+            task = asyncio.create_task(self._refresh_history(user_id), name=f"suggestion-history-{user_id}")
+            self._refreshing[user_id] = task
+        return entry[1]
+
+    async def _load_history(self, user_id: str) -> list[dict[str, Any]]:
+        records = await self.db.fetch(self.HISTORY_QUERY, user_id, self.history_per_user)
+        rows = [dict(record) for record in records]
+        self._history[user_id] = (time.monotonic(), rows)
+        self._history.move_to_end(user_id)
+        while len(self._history) > self.max_users:
+            self._history.popitem(last=False)
+        return rows
+
+    async def _refresh_history(self, user_id: str) -> None:
+        try:
+            await self._load_history(user_id)
+        except Exception as e:
+            logger.warning(f"Suggestion history refresh failed, keeping cached rows: {e}", extra={"user_id": user_id})
+        finally:
+            self._refreshing.pop(user_id, None)
+
+    def record_history(self, user_id: str, query_id: int, query_text: str) -> None:
+        """Put a just-saved query at the front of the user's cached history (if cached)."""
+        entry = self._history.get(user_id)
+        if entry is None:
+            return
+        now = datetime.now(timezone.utc).replace(tzinfo=None)  # Same clock as the write-behind row
+        row = {
+            "id": query_id,
+            "query_text": query_text,
+            "is_saved": False,
+            "query_name": None,
+            "create_time": now,
+            "last_use_time": now,
+        }
+        entry[1].insert(0, row)
+        del entry[1][self.history_per_user :]
+
+    def forget_history(self, user_id: str) -> None:
+        """Drop the user's cached history after an update or delete; it reloads on next use."""
+        self._history.pop(user_id, None)
+        refresh = self._refreshing.pop(user_id, None)
+        if refresh is not None:
+            refresh.cancel()  # It may have read the rows from before the change
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "values": len(self._values),
+            "trigrams": len(self._trigrams),
+            "cached_users": len(self._history),
+        }
+
+
+# Global singleton instance
+suggestion_index = SuggestionIndex()
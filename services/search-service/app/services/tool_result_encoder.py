@@ -0,0 +1,90 @@
+"""
+Compact encoding of chat tool results for Gemini function responses.
+
+Tool previews used to go back to the model as json.dumps of row dicts, repeating every
+key on every row. Input tokens dominate each function-calling turn, so results are sent
+as a columnar header plus value rows instead:
+
+    {"row_count": 12, "sample": {"columns": ["dimension_1", "exception_count"],
+                                 "rows": [["LCH", 40], ["DTCC", 31]],
+                                 "others": {"rows": 10, "exception_count": 52}}}
+
+Rows beyond the kept top-k are folded into an "others" bucket that sums the additive
+*_count columns, floats are rounded, and the number of kept rows is halved until the
+encoding fits the character budget.
+"""
+
+import json
+from typing import Any
+
+CHARS_PER_TOKEN = 4  # Rough estimate for logging; Gemini reports exact prompt tokens per turn
+FLOAT_DECIMALS = 2
+_SEPARATORS = (",", ":")
+
+
+def estimate_tokens(chars: int) -> int:
+    """Approximate token count of chars characters of JSON/text."""
+    return (chars + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def encode_tool_result(payload: dict[str, Any], max_chars: int, max_rows: int) -> str:
+    """
+    Encode a tool result preview as compact JSON within a character budget.
+
+    Args:
+        payload: result_preview dict; lists of row dicts anywhere in it are made columnar
+        max_chars: Budget for the encoded string
+        max_rows: Rows kept per list before the rest go to the "others" bucket
+
+    Returns:
+        JSON string of at most max_chars characters
+    """
+    keep = max_rows
+    while True:
+        text = json.dumps(_compact(payload, keep), separators=_SEPARATORS, default=str)
+        if len(text) <= max_chars or keep == 0:
+            break
+        keep //= 2
+
+    if len(text) > max_chars:
+        # Even the row-less summary is too long (e.g. a huge error message): send a cut-off copy.
+        # text is ASCII JSON, so escaping it again at most doubles its length.
+        cut = text[: max(0, max_chars - 32) // 2]
+        text = json.dumps({"truncated": True, "text": cut}, separators=_SEPARATORS)
+    return text
+
+
+def _compact(value: Any, keep: int) -> Any:
+    """Columnar row lists and rounded floats, recursively."""
+    if isinstance(value, float):
+        rounded = round(value, FLOAT_DECIMALS)
+        return int(rounded) if rounded.is_integer() else rounded
+    if isinstance(value, dict):
+        return {key: _compact(item, keep) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        if value and all(isinstance(item, dict) for item in value):
+            return _columnar(value, keep)
+        return [_compact(item, keep) for item in value]
+    return value
+
+
+def _columnar(rows: list[dict[str, Any]], keep: int) -> dict[str, Any]:
+    """Header + value rows for the first keep rows, with the remainder summarised as "others"."""
+    columns: list[str] = []
+    for row in rows:
+        columns.extend(key for key in row if key not in columns)
+
+    encoded: dict[str, Any] = {
+        "columns": columns,
+        "rows": [[_compact(row.get(column), keep) for column in columns] for row in rows[:keep]],
+    }
+    rest = rows[keep:]
+    if rest:
+        others: dict[str, Any] = {"rows": len(rest)}
+        for column in columns:
+            if column.endswith("_count"):
+                values = [row.get(column) for row in rest]
+                if all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+                    others[column] = _compact(sum(values), keep)
+        encoded["others"] = others
+    return encoded
@@ -39,6 +39,10 @@ class BedrockResponseError(SearchServiceException):
     """Raised when Bedrock response cannot be parsed"""
 
 
+class LLMCapacityError(SearchServiceException):
+    """Raised when an LLM provider's concurrency limit and wait queue are exhausted"""
+
+
 class InvalidSearchRequestError(SearchServiceException):
     """Raised when search request validation fails"""
 
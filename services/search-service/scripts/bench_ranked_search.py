@@ -0,0 +1,169 @@
+"""
+Benchmark for ranked search: two-query enrichment vs single round trip vs SQL ranking.
+
+Seeds session-local TEMP tables named trades/transactions (they shadow the real
+tables for this connection only, so QueryBuilder SQL runs unchanged), then times:
+
+    two-query:  search query, then build_enriched_data_query, then rank in Python
+    single:     build_ranked_query (LATERAL transaction count), then rank in Python
+    sql-score:  compiled ranking config in ORDER BY, Postgres returns the top rows
+
+Requires a reachable PostgreSQL (RDS_* settings). Nothing is written to real tables.
+Seeding 10M trades takes several minutes and a few GB of temp space.
+
+Usage:
+    python -m scripts.bench_ranked_search [--sizes 1000 100000 10000000] [--runs 20]
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import asyncpg
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.config.settings import settings  # noqa: E402
+from app.models.domain import Trade  # noqa: E402
+from app.models.request import ManualSearchFilters  # noqa: E402
+from app.services.query_builder import query_builder  # noqa: E402
+from app.services.ranking_service import trade_ranker  # noqa: E402
+
+SEED_SQL = """
+    DROP TABLE IF EXISTS pg_temp.transactions;
+    DROP TABLE IF EXISTS pg_temp.trades;
+
+    CREATE TEMP TABLE trades (
+        id INTEGER PRIMARY KEY,
+        account VARCHAR(50) NOT NULL,
+        asset_type VARCHAR(50) NOT NULL,
+        booking_system VARCHAR(50) NOT NULL,
+        affirmation_system VARCHAR(50) NOT NULL,
+        clearing_house VARCHAR(50) NOT NULL,
+        create_time TIMESTAMP NOT NULL,
+        update_time TIMESTAMP NOT NULL,
+        status VARCHAR(20) NOT NULL
+    );
+
+    INSERT INTO trades
+    SELECT
+        g,
+        'ACC' || lpad((g % 5000)::text, 5, '0'),
+        (ARRAY['FX', 'IRS', 'CDS', 'EQUITY', 'BOND', 'COMMODITY'])[1 + g % 6],
+        (ARRAY['HIGHGARDEN', 'KINGSLANDING', 'RIVERRUN'])[1 + g % 3],
+        (ARRAY['TRAI', 'MARC'])[1 + g % 2],
+        (ARRAY['DTCC', 'LCH', 'CME', 'NSCC', 'JSCC', 'OTCCHK'])[1 + g % 6],
+        now()::timestamp - (g % 500000) * interval '1 minute',
+        now()::timestamp - (g % 400000) * interval '1 minute',
+        (ARRAY['ALLEGED', 'CLEARED', 'REJECTED', 'CANCELLED'])[1 + g % 4]
+    FROM generate_series(1, {size}) AS g;
+
+    CREATE TEMP TABLE transactions (
+        id BIGINT PRIMARY KEY,
+        trade_id INTEGER NOT NULL
+    );
+
+    INSERT INTO transactions
+    SELECT row_number() OVER (), t.id
+    FROM trades t, generate_series(1, 1 + t.id % {max_tx_per_trade});
+
+    CREATE INDEX ON trades (update_time DESC);
+    CREATE INDEX ON trades (asset_type);
+    CREATE INDEX ON trades (status);
+    CREATE INDEX ON transactions (trade_id);
+    ANALYZE trades;
+    ANALYZE transactions;
+"""
+
+
+async def seed(conn: asyncpg.Connection, size: int, max_tx_per_trade: int) -> None:
+    """Create and populate the temp tables for one benchmark size."""
+    # Multi-statement scripts cannot take bind params; both values are ints from argparse
+    await conn.execute(SEED_SQL.format(size=int(size), max_tx_per_trade=int(max_tx_per_trade)))
+
+
+async def two_query(conn: asyncpg.Connection, sql_query: str, params: list) -> list[Trade]:
+    """Current path: search, then enrichment query, then rank."""
+    records = await conn.fetch(sql_query, *params)
+    trades = [Trade.from_trusted_record(record) for record in records]
+    enriched_query, enriched_params = query_builder.build_enriched_data_query([t.trade_id for t in trades])
+    enriched = {}
+    if enriched_query:
+        for record in await conn.fetch(enriched_query, *enriched_params):
+            enriched[record["trade_id"]] = {"transaction_count": record["transaction_count"]}
+    return trade_ranker.rank_trades(trades, enriched)
+
+
+async def single_round_trip(conn: asyncpg.Connection, sql_query: str, params: list) -> list[Trade]:
+    """Folded path: one query returns rows plus transaction counts, then rank."""
+    records = await conn.fetch(query_builder.build_ranked_query(sql_query, "update_time"), *params)
+    trades = [Trade.from_trusted_record(record) for record in records]
+    return trade_ranker.rank_trades(trades, transaction_counts=[record["transaction_count"] for record in records])
+
+
+async def sql_score(conn: asyncpg.Connection, sql_query: str, params: list) -> list[Trade]:
+    """Ranked in SQL: the search query itself orders by the compiled relevance score."""
+    records = await conn.fetch(sql_query, *params)
+    return [Trade.from_trusted_record(record) for record in records]
+
+
+async def time_path(path, conn, sql_query, params, runs: int) -> tuple[float, float]:
+    """Return (median ms, p95 ms) over runs after one warm-up."""
+    await path(conn, sql_query, params)
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await path(conn, sql_query, params)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[max(0, int(len(samples) * 0.95) - 1)]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 10_000_000])
+    parser.add_argument("--runs", type=int, default=20, help="Timed runs per path and size (default: 20)")
+    parser.add_argument("--max-tx-per-trade", type=int, default=8, help="Transactions per trade cycle 1..N")
+    args = parser.parse_args()
+
+    conn = await asyncpg.connect(
+        host=settings.RDS_HOST,
+        port=settings.RDS_PORT,
+        database=settings.RDS_DB,
+        user=settings.RDS_USER,
+        password=settings.RDS_PASSWORD,
+        command_timeout=None,
+    )
+
+    # A broad ranked search: hits MAX_SEARCH_RESULTS at every size above ~4k trades
+    filters = ManualSearchFilters(status=["ALLEGED", "REJECTED"])
+    sql_query, params = query_builder.build_from_manual_filters(filters)
+    scored_query, scored_params = query_builder.build_from_manual_filters(
+        filters, sql_score=trade_ranker.compile_sql_score()
+    )
+
+    try:
+        print(f"{'trades':>12} {'path':<18} {'median ms':>10} {'p95 ms':>10}")
+        for size in args.sizes:
+            seed_start = time.perf_counter()
+            await seed(conn, size, args.max_tx_per_trade)
+            print(f"{size:>12} seeded in {time.perf_counter() - seed_start:.1f}s")
+
+            paths = (
+                ("two-query", two_query, sql_query, params),
+                ("single-round-trip", single_round_trip, sql_query, params),
+                ("sql-score", sql_score, scored_query, scored_params),
+            )
+            for name, path, query, query_params in paths:
+                median, p95 = await time_path(path, conn, query, query_params, args.runs)
+                print(f"{size:>12} {name:<18} {median:>10.2f} {p95:>10.2f}")
+    finally:
+        await conn.execute("DROP TABLE IF EXISTS pg_temp.transactions; DROP TABLE IF EXISTS pg_temp.trades;")
+        await conn.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,107 @@
+"""
+Micro-benchmark for typeahead suggestion scoring.
+Compares the per-candidate SequenceMatcher scoring get_suggestions used before with
+the batch NgramScorer on synthetic history (no database needed). Quality is the legacy
+score of the batch top-k as a share of the legacy top-k's own score.
+
+Usage:
+    python -m scripts.bench_suggestion_scoring [--rows 10000] [--limit 10] [--repeat 10]
+"""
+
+import argparse
+import random
+import sys
+import timeit
+from difflib import SequenceMatcher
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.suggestion_scorer import NgramScorer  # noqa: E402
+
+QUERIES = ["cleared fx", "rejected irs trades", "acc00", "show me trades at lch", "cancelled bond"]
+STATUSES = ["alleged", "cleared", "rejected", "cancelled"]
+ASSET_TYPES = ["fx", "irs", "cds", "equity", "bond", "commodity"]
+HOUSES = ["lch", "dtcc", "cme", "ice"]
+TEMPLATES = [
+    "show me {status} {asset} trades",
+    "{status} {asset} trades at {house}",
+    "trades for account acc{account:05d}",
+    "{asset} trades cleared by {house} last week",
+    "all {status} trades for acc{account:05d} in {asset}",
+]
+
+
+def build_history(count: int, seed: int = 7) -> list[str]:
+    """Build normalised history texts shaped like typed NL queries."""
+    rng = random.Random(seed)
+    return [
+        rng.choice(TEMPLATES).format(
+            status=rng.choice(STATUSES),
+            asset=rng.choice(ASSET_TYPES),
+            house=rng.choice(HOUSES),
+            account=rng.randrange(500),
+        )
+        for _ in range(count)
+    ]
+
+
+def legacy_score(query: str, candidate: str) -> float:
+    """The per-candidate formula get_suggestions used before NgramScorer."""
+    ratio = SequenceMatcher(None, query, candidate).ratio()
+    if candidate.startswith(query):
+        ratio += 0.3
+    elif query in candidate:
+        ratio += 0.1
+    query_tokens = {token for token in query.split(" ") if token}
+    candidate_tokens = {token for token in candidate.split(" ") if token}
+    if query_tokens and candidate_tokens:
+        ratio += 0.2 * len(query_tokens & candidate_tokens) / len(query_tokens | candidate_tokens)
+    return min(ratio, 1.5)
+
+
+def legacy_top_k(query: str, texts: list[str], limit: int) -> list[int]:
+    scores = [legacy_score(query, text) for text in texts]
+    return sorted(range(len(texts)), key=lambda index: scores[index], reverse=True)[:limit]
+
+
+def batch_top_k(query: str, texts: list[str], limit: int) -> list[int]:
+    return NgramScorer.top_k(NgramScorer(texts).scores(query), limit, 0.0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000, help="History rows per user (default: 10000)")
+    parser.add_argument("--limit", type=int, default=10, help="Suggestions returned (default: 10)")
+    parser.add_argument("--repeat", type=int, default=10, help="Timed runs per query (default: 10)")
+    args = parser.parse_args()
+
+    texts = build_history(args.rows)
+    prebuilt = NgramScorer(texts)
+    print(f"Scoring {args.rows} history rows, top {args.limit}, best of {args.repeat} runs")
+    print(f"  {'query':<24} {'legacy ms':>10} {'batch ms':>10} {'score ms':>10} {'speedup':>8} {'quality':>8}")
+
+    for query in QUERIES:
+        legacy = min(timeit.repeat(lambda q=query: legacy_top_k(q, texts, args.limit), number=1, repeat=args.repeat))
+        batch = min(timeit.repeat(lambda q=query: batch_top_k(q, texts, args.limit), number=1, repeat=args.repeat))
+        score_only = min(
+            timeit.repeat(
+                lambda q=query: NgramScorer.top_k(prebuilt.scores(q), args.limit, 0.0), number=1, repeat=args.repeat
+            )
+        )
+
+        # Ties make index overlap meaningless, so compare the legacy score of what each returns
+        expected = sum(legacy_score(query, texts[index]) for index in legacy_top_k(query, texts, args.limit))
+        found = sum(legacy_score(query, texts[index]) for index in batch_top_k(query, texts, args.limit))
+        quality = found / expected if expected else 1.0
+
+        print(
+            f"  {query:<24} {legacy * 1000:10.2f} {batch * 1000:10.2f} {score_only * 1000:10.2f}"
+            f" {legacy / batch:7.1f}x {quality:8.0%}"
+        )
+
+    print("  (batch = build postings + score + top-k per request; score = postings built once)")
+
+
+if __name__ == "__main__":
+    main()
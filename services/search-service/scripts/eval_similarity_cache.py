@@ -0,0 +1,129 @@
+"""
+Hit-quality evaluation for the near-duplicate extraction cache.
+
+Replays natural-language searches from query_history in the order they were made and,
+for each candidate threshold, runs them through a fresh SimilarExtractionCache the way
+the orchestrator does: queries the rule parser answers are skipped, a lookup that hits
+is compared with the reference extraction, a miss indexes the reference extraction.
+
+The reference extraction of each distinct query comes from the configured LLM
+(extract_parameters, so the Redis extraction cache keeps re-runs cheap). All queries
+are resolved against today's date. Reported per threshold:
+
+    hits:       lookups served from the index
+    exact:      hits whose text equals an indexed query (the Redis cache would serve these too)
+    precision:  hits whose params equal the reference extraction
+
+Requires PostgreSQL (RDS_* settings) and LLM credentials; Redis is optional.
+
+Usage:
+    python -m scripts.eval_similarity_cache [--limit 500] [--thresholds 0.65 0.75 0.85 0.95]
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.cache.redis_client import redis_manager  # noqa: E402
+from app.database.connection import db_manager  # noqa: E402
+from app.models.domain import ExtractedParams  # noqa: E402
+from app.services.gemini_service import gemini_service  # noqa: E402
+from app.services.rule_parser import rule_based_parser  # noqa: E402
+from app.services.similar_extraction_cache import SimilarExtractionCache  # noqa: E402
+
+# Manual searches store their filters as a JSON object in query_text
+HISTORY_QUERY = """
+    SELECT query_text
+    FROM query_history
+    WHERE query_text NOT LIKE '{%'
+    ORDER BY create_time, id
+    LIMIT $1
+"""
+
+
+def canonical(params: ExtractedParams) -> dict:
+    """Params as a comparable dict (list filters are order-insensitive)."""
+    return {
+        field: sorted(value) if isinstance(value, list) else value
+        for field, value in params.model_dump(exclude_none=True).items()
+    }
+
+
+async def load_replay(limit: int) -> tuple[list[str], dict[str, dict]]:
+    """NL queries the rule parser declines, in history order, with their reference extractions."""
+    rows = await db_manager.fetch(HISTORY_QUERY, limit)
+    queries: list[str] = []
+    references: dict[str, dict] = {}
+    for row in rows:
+        query = " ".join(row["query_text"].split())
+        if not query or await rule_based_parser.parse(query) is not None:
+            continue
+        key = query.lower()
+        if key not in references:
+            try:
+                params = await gemini_service.extract_parameters(query=query, user_id="eval_similarity_cache")
+            except Exception as e:
+                print(f"skipping {query!r}: {e}")
+                continue
+            references[key] = canonical(params)
+        queries.append(query)
+    return queries, references
+
+
+def replay(queries: list[str], references: dict[str, dict], threshold: float) -> dict[str, float]:
+    cache = SimilarExtractionCache(threshold=threshold, max_entries=max(len(queries), 1))
+    seen: set[str] = set()
+    hits = exact = correct = 0
+    for query in queries:
+        key = query.lower()
+        reference = references[key]
+        match = cache.lookup(query)
+        if match is None:
+            cache.add(query, ExtractedParams(**reference))
+        else:
+            hits += 1
+            exact += key in seen
+            correct += canonical(match[0]) == reference
+        seen.add(key)
+
+    return {
+        "hits": hits,
+        "exact": exact,
+        "hit_rate": hits / len(queries) if queries else 0.0,
+        "precision": correct / hits if hits else 1.0,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--limit", type=int, default=500, help="History rows to replay (default: 500)")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.65, 0.75, 0.85, 0.95])
+    args = parser.parse_args()
+
+    await db_manager.connect()
+    try:
+        await redis_manager.connect()
+    except Exception as e:
+        print(f"Redis unavailable, every reference extraction calls the LLM: {e}")
+
+    try:
+        queries, references = await load_replay(args.limit)
+    finally:
+        await db_manager.close()
+        await redis_manager.disconnect()
+
+    print(f"{len(queries)} LLM-bound queries replayed ({len(references)} distinct)")
+    print(f"{'threshold':>10} {'hits':>6} {'exact':>6} {'hit rate':>9} {'precision':>10}")
+    for threshold in args.thresholds:
+        result = replay(queries, references, threshold)
+        print(
+            f"{threshold:>10.2f} {result['hits']:>6} {result['exact']:>6} "
+            f"{result['hit_rate']:>9.1%} {result['precision']:>10.1%}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
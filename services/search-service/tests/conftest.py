@@ -7,7 +7,9 @@ import os
 import socket
 import sys
 from pathlib import Path
+from types import SimpleNamespace
 from typing import AsyncGenerator
+from unittest.mock import AsyncMock, MagicMock
 
 import asyncpg
 import pytest
@@ -75,6 +77,7 @@ _apply_compose_fallback_if_needed()
 
 from app.cache.redis_client import redis_manager  # noqa: E402
 from app.database.connection import db_manager  # noqa: E402
+from app.services.chat_service import ChatService  # noqa: E402
 
 
 def pytest_configure(config):
@@ -99,8 +102,12 @@ async def db_transaction(
 ) -> AsyncGenerator[asyncpg.Connection, None]:
     """Database transaction that auto-rolls back after test"""
     async with db_connection.acquire() as conn:
-        async with conn.transaction():
+        transaction = conn.transaction()
+        await transaction.start()
+        try:
             yield conn
+        finally:
+            await transaction.rollback()
 
 
 @pytest.fixture(scope="function")
@@ -191,6 +198,59 @@ def sample_search_query():
     }
 
 
+# Chat Fixtures
+
+
+class _ScriptedResponse(SimpleNamespace):
+    """Gemini response stand-in; iterating it (stream=True) yields one text chunk per entry in chunks."""
+
+    def __iter__(self):
+        return iter([SimpleNamespace(parts=[SimpleNamespace(text=text)]) for text in self.chunks])
+
+
+@pytest.fixture(scope="function")
+def scripted_chat_service():
+    """Factory for a ChatService whose function-calling model replays a fixed script.
+
+    Each script item is one model response, consumed in order across conversations:
+    a list of (tool name, args) pairs is a function-call turn, a str is a text answer.
+
+    Args (of the returned factory):
+        *script: The responses, e.g. [("get_trade_rows", {})], "Done."
+        stream_chunks: Text chunks per response when streamed (default: an answer is one chunk)
+        query_id: id returned by the mocked history save
+        tool_result: Return value for a mocked _execute_tool_call (default: the real method)
+        on_send: Called with every message sent to the model
+    """
+
+    def _create(*script, stream_chunks=None, query_id=7, tool_result=None, on_send=None):
+        responses = []
+        for position, item in enumerate(script):
+            if isinstance(item, str):
+                parts, text = [], item
+            else:
+                parts = [SimpleNamespace(function_call=SimpleNamespace(name=name, args=args)) for name, args in item]
+                text = ""
+            chunks = stream_chunks[position] if stream_chunks else [text] if text else []
+            responses.append(_ScriptedResponse(parts=parts, text=text, chunks=chunks))
+
+        def send_message(content, **kwargs):
+            if on_send is not None:
+                on_send(content)
+            return responses.pop(0)
+
+        service = ChatService()
+        service.history = AsyncMock()
+        service.history.save_query.return_value = query_id
+        service._fc_model = MagicMock()
+        service._fc_model.start_chat.return_value.send_message.side_effect = send_message
+        if tool_result is not None:
+            service._execute_tool_call = AsyncMock(return_value=tool_result)
+        return service
+
+    return _create
+
+
 # Utility Fixtures
 
 
@@ -0,0 +1,314 @@
+"""
+Unit tests for the in-process columnar analytics snapshot.
+Tests that snapshot group-bys match the SQL semantics, incremental refresh and the compare switch.
+"""
+
+import random
+from collections import defaultdict
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import numpy as np
+import pytest
+
+from app.models.domain import ExtractedParams
+from app.services.analytics_snapshot import DIMENSION_COLUMNS, AnalyticsSnapshot
+from app.services.chat_service import ChatService
+
+SYSTEMS = {
+    "account": ["ACC1", "ACC2", "ACC3"],
+    "asset_type": ["FX", "IRS", "CDS"],
+    "booking_system": ["MUREX", "CALYPSO"],
+    "affirmation_system": ["MARKITWIRE", "DTCC"],
+    "clearing_house": ["LCH", "CME", "JSCC"],
+    "status": ["ALLEGED", "CLEARED", "REJECTED"],
+}
+
+
+def _trades(count=200, seed=7):
+    """Trades between mid December 2024 and March 2025, so ISO weeks cross a year boundary."""
+    rng = random.Random(seed)
+    start = datetime(2024, 12, 15)
+    return [
+        {"id": trade_id, "update_time": start + timedelta(minutes=rng.randrange(60 * 24 * 100))}
+        | {column: rng.choice(values) for column, values in SYSTEMS.items()}
+        for trade_id in rng.sample(range(1, 10 * count), count)
+    ]
+
+
+def _exceptions(trades, count=600, seed=11):
+    """Exceptions over a subset of the trades, plus one whose trade does not exist."""
+    rng = random.Random(seed)
+    rows = [
+        {
+            "trade_id": rng.choice(trades[:150])["id"],
+            "priority": rng.choice(["CRITICAL", "HIGH", "MEDIUM", "LOW"]),
+            "msg": rng.choice(["MISSING BIC", "TIMEOUT", "MAPPING ERROR"]),
+        }
+        for _ in range(count)
+    ]
+    return rows + [{"trade_id": -1, "priority": "HIGH", "msg": "ORPHAN"}]
+
+
+def _matches(trade, params, skip_statuses=False):
+    """Reference for ChatService._build_analytics_conditions on one trade."""
+    filters = {
+        "accounts": "account",
+        "asset_types": "asset_type",
+        "booking_systems": "booking_system",
+        "affirmation_systems": "affirmation_system",
+        "clearing_houses": "clearing_house",
+        "statuses": "status",
+    }
+    for field, column in filters.items():
+        values = getattr(params, field)
+        if values and not (skip_statuses and field == "statuses") and trade[column] not in values:
+            return False
+    if params.date_from and trade["update_time"] < datetime.fromisoformat(params.date_from):
+        return False
+    if params.date_to and trade["update_time"] >= datetime.fromisoformat(params.date_to) + timedelta(days=1):
+        return False
+    return True
+
+
+def _sql_analytics(trades, exceptions, dimensions, params, priority_filter, top_k):
+    """Reference for the raw exceptions JOIN trades GROUP BY (ties ordered by group values)."""
+    by_id = {trade["id"]: trade for trade in trades}
+    groups = defaultdict(lambda: [0, set()])
+    for exception in exceptions:
+        trade = by_id.get(exception["trade_id"])
+        if trade is None or not _matches(trade, params):
+            continue
+        if priority_filter and exception["priority"] not in priority_filter:
+            continue
+        row = trade | exception
+        key = tuple(row[DIMENSION_COLUMNS[dimension]] for dimension in dimensions) + (exception["priority"],)
+        groups[key][0] += 1
+        groups[key][1].add(trade["id"])
+    ordered = sorted(groups.items(), key=lambda item: (-item[1][0], item[0]))[:top_k]
+    return [
+        {f"dimension_{index + 1}": value for index, value in enumerate(key[:-1])}
+        | {"priority": key[-1], "exception_count": count, "affected_trades": len(trade_ids)}
+        for key, (count, trade_ids) in ordered
+    ]
+
+
+def _sql_timeseries(trades, params, year, status, bucket):
+    """Reference for the trades timeseries GROUP BY DATE_TRUNC(bucket) with TO_CHAR labels."""
+    counts = defaultdict(int)
+    for trade in trades:
+        if trade["status"] != status or not _matches(trade, params, skip_statuses=True):
+            continue
+        if year is not None and trade["update_time"].year != year:
+            continue
+        day = trade["update_time"].date()
+        counts[day - timedelta(days=day.weekday()) if bucket == "week" else day.replace(day=1)] += 1
+    rows = []
+    for start in sorted(counts):
+        iso = start.isocalendar()
+        label = f"{iso.year}-W{iso.week:02d}" if bucket == "week" else start.strftime("%Y-%m")
+        count = counts[start]
+        rows.append({"dimension_1": label, "priority": status, "exception_count": count, "affected_trades": count})
+    return rows
+
+
+async def _rows(rows):
+    """Async iterator standing in for an asyncpg cursor."""
+    for row in rows:
+        yield row
+
+
+def _connection(trades, exceptions):
+    """Mocked asyncpg connection serving the given tables through cursors."""
+    conn = AsyncMock()
+    conn.transaction = MagicMock(return_value=AsyncMock())
+    conn.cursor = MagicMock(side_effect=lambda query, **kwargs: _rows(trades if "FROM trades" in query else exceptions))
+    return conn
+
+
+@pytest.fixture
+def data():
+    """Trades and exceptions shared by the snapshot and the SQL reference."""
+    trades = _trades()
+    return trades, _exceptions(trades)
+
+
+@pytest.fixture
+async def snapshot(data):
+    """Snapshot loaded from the test data through a mocked database."""
+    snapshot = AnalyticsSnapshot(flush_interval=60, rebuild_interval=60)
+    snapshot.conn = _connection(*data)
+    snapshot.db = MagicMock()
+    snapshot.db.acquire = MagicMock(return_value=AsyncMock(__aenter__=AsyncMock(return_value=snapshot.conn)))
+    await snapshot.rebuild()
+    return snapshot
+
+
+class TestExceptionAnalytics:
+    """Parity with the exceptions JOIN trades group-by."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "dimensions,params,priority_filter,top_k",
+        [
+            (["booking_system"], ExtractedParams(), None, 25),
+            (["clearing_house"], ExtractedParams(statuses=["REJECTED", "ALLEGED"]), ["HIGH", "CRITICAL"], 5),
+            (["account", "exception_message"], ExtractedParams(date_from="2025-01-01", date_to="2025-01-31"), None, 7),
+            (["priority"], ExtractedParams(asset_types=["FX"], accounts=["ACC2", "UNKNOWN"]), None, 10),
+            (["status"], ExtractedParams(clearing_houses=["NOWHERE"]), None, 10),
+        ],
+    )
+    async def test_matches_sql(self, snapshot, data, dimensions, params, priority_filter, top_k):
+        """Test that grouped counts, distinct trades, filters and ordering equal the SQL result."""
+        expected = _sql_analytics(*data, dimensions, params, priority_filter, top_k)
+
+        assert await snapshot.exception_analytics(dimensions, params, priority_filter, top_k) == expected
+
+    @pytest.mark.asyncio
+    async def test_sorted_grouping_matches_dense(self, snapshot, data):
+        """Test that key spaces too large for a bincount group by sorting with the same result."""
+        params = ExtractedParams()
+        expected = _sql_analytics(*data, ["account", "exception_message"], params, None, 25)
+
+        with patch("app.services.analytics_snapshot.DENSE_GROUP_LIMIT", 0):
+            assert await snapshot.exception_analytics(["account", "exception_message"], params, None, 25) == expected
+
+    @pytest.mark.asyncio
+    async def test_not_loaded_returns_none(self):
+        """Test that callers fall back to SQL before the first load."""
+        assert await AnalyticsSnapshot().exception_analytics(["status"], ExtractedParams(), None, 10) is None
+
+
+class TestTradeTimeseries:
+    """Parity with the trades timeseries query."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "params,year,bucket",
+        [
+            (ExtractedParams(), None, "month"),
+            (ExtractedParams(), None, "week"),
+            (ExtractedParams(statuses=["CLEARED"], booking_systems=["MUREX"]), 2025, "week"),
+            (ExtractedParams(date_from="2024-12-20", date_to="2025-02-02"), 2024, "month"),
+        ],
+    )
+    async def test_matches_sql(self, snapshot, data, params, year, bucket):
+        """Test month and ISO week buckets, labels and filters (statuses are ignored, as in SQL)."""
+        expected = _sql_timeseries(data[0], params, year, "REJECTED", bucket)
+
+        assert await snapshot.trade_timeseries(params, year, "REJECTED", bucket) == expected
+        assert expected
+
+
+class TestIncrementalRefresh:
+    """Trade change events applied by flush."""
+
+    @pytest.mark.asyncio
+    async def test_flush_applies_updates_inserts_and_deletes(self, snapshot, data):
+        """Test that changed trades and their exceptions are replaced so results match SQL again."""
+        trades, exceptions = data
+        snapshot._tasks = [MagicMock()]  # Accept events as if started
+        updated = trades[0] | {"status": "REJECTED", "clearing_house": "EUREX"}
+        inserted = {"id": 0, "update_time": datetime(2025, 3, 1)} | {c: v[0] for c, v in SYSTEMS.items()}
+        deleted = trades[1]
+        new_exceptions = [
+            {"trade_id": updated["id"], "priority": "LOW", "msg": "TIMEOUT"},
+            {"trade_id": inserted["id"], "priority": "CRITICAL", "msg": "NEW"},
+        ]
+        trades = [updated, inserted] + trades[2:]
+        touched = {updated["id"], inserted["id"], deleted["id"]}
+        exceptions = [row for row in exceptions if row["trade_id"] not in touched] + new_exceptions
+        snapshot.conn.fetch.side_effect = [[updated, inserted], new_exceptions]
+        for trade_id in touched:
+            await snapshot.apply_trade_change(trade_id, None, {})
+
+        assert await snapshot.flush() == 3
+
+        params = ExtractedParams()
+        for dimensions in (["clearing_house"], ["exception_message", "status"]):
+            assert await snapshot.exception_analytics(dimensions, params, None, 25) == _sql_analytics(
+                trades, exceptions, dimensions, params, None, 25
+            )
+        assert await snapshot.trade_timeseries(params, None, "REJECTED", "week") == _sql_timeseries(
+            trades, params, None, "REJECTED", "week"
+        )
+        assert snapshot.stats()["trades"] == len(trades)
+        assert snapshot.stats()["exceptions"] == len(exceptions)  # Superseded rows are dropped, not masked
+        assert snapshot.stats()["pending_trades"] == 0
+
+    @pytest.mark.asyncio
+    async def test_flush_swaps_in_a_new_version(self, snapshot, data):
+        """Test that a flush leaves the version a running query holds untouched and read-only."""
+        trades, _ = data
+        snapshot._tasks = [MagicMock()]
+        before = snapshot._tables
+        statuses = before.trades["status"].copy()
+        snapshot.conn.fetch.side_effect = [[trades[0] | {"status": "NEW_STATUS"}], []]
+        await snapshot.apply_trade_change(trades[0]["id"], None, {})
+
+        await snapshot.flush()
+
+        assert snapshot._tables is not before
+        assert np.array_equal(before.trades["status"], statuses)
+        assert len(before.exceptions["trade_id"]) == len(data[1])
+        assert not before.trades["status"].flags.writeable
+        rows = await snapshot.trade_timeseries(ExtractedParams(), None, "NEW_STATUS", "month")
+        assert sum(row["exception_count"] for row in rows) == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_keeps_pending(self, snapshot):
+        """Test that trades from a failed re-read are retried on the next flush."""
+        snapshot._tasks = [MagicMock()]
+        snapshot.conn.fetch.side_effect = RuntimeError("connection lost")
+        await snapshot.apply_trade_change(7, None, {})
+
+        with pytest.raises(RuntimeError):
+            await snapshot.flush()
+
+        assert snapshot.stats()["pending_trades"] == 1
+
+
+class TestCompare:
+    """The SQL comparison switch."""
+
+    def test_ties_at_the_limit_may_differ(self):
+        """Test that rows tied at the LIMIT cut-off are compared by count only."""
+        sql = [{"dimension_1": "A", "exception_count": 5}, {"dimension_1": "B", "exception_count": 3}]
+        snapshot = [{"dimension_1": "A", "exception_count": 5}, {"dimension_1": "C", "exception_count": 3}]
+
+        assert AnalyticsSnapshot.rows_match(sql, snapshot, top_k=2)
+        assert not AnalyticsSnapshot.rows_match(sql, snapshot, top_k=3)
+        assert not AnalyticsSnapshot.rows_match(sql, snapshot, top_k=None)
+
+    @pytest.mark.asyncio
+    async def test_compare_engine_serves_sql_and_records_match(self, snapshot, data):
+        """Test that "compare" answers from SQL and checks the snapshot against it."""
+        params = ExtractedParams(statuses=["REJECTED"])
+        sql_rows = _sql_analytics(*data, ["asset_type"], params, None, 10)
+        with (
+            patch("app.services.chat_service.analytics_snapshot", snapshot),
+            patch("app.services.chat_service.settings.CHAT_ANALYTICS_ENGINE", "compare"),
+            patch("app.services.chat_service.settings.EXCEPTION_ROLLUP_ENABLED", False),
+            patch("app.services.chat_service.db_manager.fetch", new_callable=AsyncMock, return_value=sql_rows),
+        ):
+            evidence = await ChatService()._build_analytics_evidence(params, ["asset_type"], None, 10)
+
+        assert evidence["metadata"]["source"] == "exceptions"
+        assert (snapshot.comparisons, snapshot.mismatches) == (1, 0)
+
+    @pytest.mark.asyncio
+    async def test_snapshot_engine_skips_database(self, snapshot, data):
+        """Test that "snapshot" answers timeseries evidence without a query."""
+        with (
+            patch("app.services.chat_service.analytics_snapshot", snapshot),
+            patch("app.services.chat_service.settings.CHAT_ANALYTICS_ENGINE", "snapshot"),
+            patch("app.services.chat_service.db_manager.fetch", new_callable=AsyncMock) as fetch,
+        ):
+            evidence = await ChatService()._build_trade_timeseries_evidence(
+                ExtractedParams(), 2025, "REJECTED", "month"
+            )
+
+        fetch.assert_not_awaited()
+        assert evidence["metadata"]["source"] == "analytics_snapshot"
+        assert evidence["rows"] == _sql_timeseries(data[0], ExtractedParams(), 2025, "REJECTED", "month")
+        assert evidence["chart"]["labels"] == ["2025-01", "2025-02", "2025-03"]
@@ -97,7 +97,10 @@ class TestSearchEndpoint:
     @pytest.mark.asyncio
     async def test_manual_search_success(self, client):
         """Test manual search with valid filters."""
-        with patch("app.services.search_orchestrator.search_orchestrator.execute_search") as mock_search:
+        with (
+            patch("app.services.search_orchestrator.search_orchestrator.can_assemble_json", return_value=False),
+            patch("app.services.search_orchestrator.search_orchestrator.execute_search") as mock_search,
+        ):
             mock_search.return_value = {
                 "query_id": 1,
                 "total_results": 5,
@@ -124,7 +127,10 @@ class TestSearchEndpoint:
     @pytest.mark.asyncio
     async def test_natural_language_search_success(self, client):
         """Test natural language search."""
-        with patch("app.services.search_orchestrator.search_orchestrator.execute_search") as mock_search:
+        with (
+            patch("app.services.search_orchestrator.search_orchestrator.can_assemble_json", return_value=False),
+            patch("app.services.search_orchestrator.search_orchestrator.execute_search") as mock_search,
+        ):
             mock_search.return_value = {
                 "query_id": 2,
                 "total_results": 10,
@@ -148,6 +154,66 @@ class TestSearchEndpoint:
             assert data["search_type"] == "natural_language"
             assert data["extracted_params"] is not None
 
+    @pytest.mark.asyncio
+    async def test_ndjson_search_streams_lines(self, client):
+        """Test Accept: application/x-ndjson returns one trade per line with metadata headers."""
+
+        async def lines():
+            yield b'{"trade_id":1,"status":"CLEARED"}\n'
+            yield b'{"trade_id":2,"status":"ALLEGED"}\n'
+
+        with patch(
+            "app.services.search_orchestrator.search_orchestrator.stream_search",
+            new_callable=AsyncMock,
+        ) as mock_stream:
+            mock_stream.return_value = (
+                {"X-Query-Id": "7", "X-Search-Type": "manual", "X-Ranking-Mode": "none"},
+                lines(),
+            )
+
+            request_data = {
+                "user_id": "test_user",
+                "search_type": "manual",
+                "filters": {"asset_type": "FX"},
+            }
+
+            response = await client.post("/api/search", json=request_data, headers={"Accept": "application/x-ndjson"})
+
+            assert response.status_code == 200
+            assert response.headers["content-type"].startswith("application/x-ndjson")
+            assert response.headers["x-ranking-mode"] == "none"
+            assert [line for line in response.text.splitlines() if line] == [
+                '{"trade_id":1,"status":"CLEARED"}',
+                '{"trade_id":2,"status":"ALLEGED"}',
+            ]
+
+    @pytest.mark.asyncio
+    async def test_sql_json_search_passes_bytes_through(self, client):
+        """Test that SQL-assembled JSON is returned unchanged when ranking is not needed."""
+        body = b'{"query_id":3,"total_results":0,"search_type":"manual","cached":false,"results":[]}'
+
+        with (
+            patch(
+                "app.services.search_orchestrator.search_orchestrator.can_assemble_json",
+                return_value=True,
+            ),
+            patch(
+                "app.services.search_orchestrator.search_orchestrator.execute_search_json",
+                new_callable=AsyncMock,
+                return_value=body,
+            ),
+        ):
+            request_data = {
+                "user_id": "test_user",
+                "search_type": "manual",
+                "filters": {"asset_type": "FX"},
+            }
+
+            response = await client.post("/api/search", json=request_data)
+
+            assert response.status_code == 200
+            assert response.content == body
+
     @pytest.mark.asyncio
     async def test_search_missing_user_id(self, client):
         """Test search fails without user_id."""
@@ -0,0 +1,132 @@
+"""
+Unit tests for the pipelined chat stages.
+Tests extraction overlapping Gemini's first turn, the speculative trade row prefetch and stage timings.
+"""
+
+import asyncio
+import threading
+from datetime import datetime
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.models.chat import ChatRequest
+from app.models.domain import ExtractedParams
+
+RECORD = {
+    "id": 10001234,
+    "account": "ACC12345",
+    "asset_type": "FX",
+    "booking_system": "HIGHGARDEN",
+    "affirmation_system": "TRAI",
+    "clearing_house": "DTCC",
+    "create_time": datetime(2025, 1, 15, 9, 30),
+    "update_time": datetime(2025, 1, 15, 10, 0),
+    "status": "REJECTED",
+}
+
+
+NO_EVIDENCE = {"evidence": {}, "result_preview": {}}
+
+
+def _extract(params):
+    """Patch extraction to return params."""
+    return patch(
+        "app.services.chat_service.extraction_service.extract_parameters",
+        new_callable=AsyncMock,
+        return_value=params,
+    )
+
+
+@pytest.fixture
+def request_model():
+    """Chat request for rejected trades."""
+    return ChatRequest(user_id="alice", message="show rejected trades")
+
+
+class TestParallelStages:
+    """execute_chat with CHAT_PARALLEL_STAGES_ENABLED."""
+
+    @pytest.mark.asyncio
+    async def test_extraction_overlaps_first_turn(self, request_model, scripted_chat_service):
+        """Test that Gemini's first turn starts before extraction ends and tools still get the filters."""
+        sent: list = []
+        first_turn_started = threading.Event()
+
+        def on_send(content):
+            sent.append(content)
+            first_turn_started.set()
+
+        service = scripted_chat_service(
+            [("get_exception_analytics", {})], "Done.", tool_result=NO_EVIDENCE, on_send=on_send
+        )
+        overlapped = []
+
+        async def extract_parameters(**kwargs):
+            for _ in range(500):  # Only finishes once the first turn is under way
+                if first_turn_started.is_set():
+                    break
+                await asyncio.sleep(0.01)
+            overlapped.append(first_turn_started.is_set())
+            return ExtractedParams(statuses=["REJECTED"])
+
+        with patch("app.services.chat_service.extraction_service.extract_parameters", side_effect=extract_parameters):
+            response = await service.execute_chat(request_model)
+
+        assert overlapped == [True]
+        assert "being extracted" in sent[0]
+        assert '"REJECTED"' in sent[1].parts[0].text  # Filters follow with the first tool results
+        assert service._execute_tool_call.await_args.kwargs["extracted_params"].statuses == ["REJECTED"]
+        assert response.query_id == 7
+        assert response.extracted_params.statuses == ["REJECTED"]
+        assert {"history", "extraction", "first_turn", "llm", "tools", "total"} <= set(response.stage_timings_ms)
+
+    @pytest.mark.asyncio
+    async def test_get_trade_rows_uses_prefetch(self, request_model, scripted_chat_service):
+        """Test that get_trade_rows is served from the speculative query instead of a second one."""
+        service = scripted_chat_service([("get_trade_rows", {})], "Done.")
+        service._fetch_trade_records = AsyncMock(return_value=[RECORD] * 3)
+
+        with _extract(ExtractedParams(statuses=["REJECTED"])):
+            response = await service.execute_chat(request_model)
+
+        service._fetch_trade_records.assert_awaited_once()
+        assert response.mode == "table"
+        assert [trade.trade_id for trade in response.results] == [10001234] * 3
+        assert "trade_rows_prefetch" in response.stage_timings_ms
+
+    @pytest.mark.asyncio
+    async def test_failed_prefetch_queries_again(self, request_model, scripted_chat_service):
+        """Test that a failed speculative query is retried when get_trade_rows is actually called."""
+        service = scripted_chat_service([("get_trade_rows", {})], "Done.")
+        service._fetch_trade_records = AsyncMock(side_effect=[RuntimeError("connection lost"), [RECORD]])
+
+        with _extract(ExtractedParams()):
+            response = await service.execute_chat(request_model)
+
+        assert service._fetch_trade_records.await_count == 2
+        assert len(response.results) == 1
+
+
+class TestSequentialStages:
+    """execute_chat with the pipeline flags disabled."""
+
+    @pytest.mark.asyncio
+    async def test_filters_in_first_message_without_prefetch(self, request_model, scripted_chat_service):
+        """Test that disabling parallel stages extracts first and never runs the speculative query."""
+        sent: list = []
+        service = scripted_chat_service(
+            [("get_exception_analytics", {})], "Done.", tool_result=NO_EVIDENCE, on_send=sent.append
+        )
+        service._fetch_trade_records = AsyncMock(return_value=[])
+
+        with (
+            _extract(ExtractedParams(statuses=["REJECTED"])),
+            patch("app.services.chat_service.settings.CHAT_PARALLEL_STAGES_ENABLED", False),
+        ):
+            response = await service.execute_chat(request_model)
+
+        assert "Pre-extracted SQL filters (use these" in sent[0]
+        assert all(part.text == "" for part in sent[1].parts)
+        service._fetch_trade_records.assert_not_awaited()
+        assert "trade_rows_prefetch" not in response.stage_timings_ms
@@ -0,0 +1,133 @@
+"""
+Unit tests for server-sent-event chat streaming.
+Tests event order and payloads from ChatService.stream_chat and SSE selection on POST /api/chat.
+"""
+
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from httpx import AsyncClient
+
+from app.main import app
+from app.models.chat import ChatRequest
+from app.models.domain import ExtractedParams
+from app.services.chat_service import ChatService
+
+EVIDENCE = {"dimensions": ["asset_type"], "rows": [{"dimension_1": "FX", "exception_count": 3}], "metadata": {}}
+
+
+@pytest.fixture
+def service(scripted_chat_service):
+    """ChatService whose FC model calls one analytics tool (with some preamble text), then answers."""
+    return scripted_chat_service(
+        [("get_exception_analytics", {"top_k": 5})],
+        "FX leads.",
+        stream_chunks=[["Checking."], ["FX ", "leads."]],
+        query_id=42,
+        tool_result={"evidence": EVIDENCE, "result_preview": {"row_count": 1}},
+    )
+
+
+async def _events(service, request):
+    """Run stream_chat and parse its SSE frames into (event, data) pairs."""
+    body = b"".join([frame async for frame in service.stream_chat(request)]).decode()
+    events = []
+    for frame in body.strip().split("\n\n"):
+        event_line, data_line = frame.split("\n")
+        events.append((event_line.removeprefix("event: "), json.loads(data_line.removeprefix("data: "))))
+    return events
+
+
+@pytest.fixture
+def request_model():
+    """Analytics chat request."""
+    return ChatRequest(user_id="alice", message="exceptions by asset type")
+
+
+class TestStreamChat:
+    """ChatService.stream_chat."""
+
+    @pytest.mark.asyncio
+    async def test_events_arrive_in_progress_order(self, service, request_model):
+        """Test params, tool results and answer chunks are emitted before the final response."""
+        with (
+            patch(
+                "app.services.chat_service.extraction_service.extract_parameters",
+                new_callable=AsyncMock,
+                return_value=ExtractedParams(asset_types=["FX"]),
+            ),
+            patch("app.services.chat_service.settings.CHAT_PARALLEL_STAGES_ENABLED", False),  # Fixed params position
+        ):
+            events = await _events(service, request_model)
+
+        names = [name for name, _ in events]
+        assert names == [
+            "params",
+            "answer_delta",
+            "answer_reset",
+            "tool_result",
+            "answer_delta",
+            "answer_delta",
+            "done",
+        ]
+        assert events[0][1] == {"query_id": 42, "extracted_params": ExtractedParams(asset_types=["FX"]).model_dump()}
+        assert events[3][1] == {"tool": "get_exception_analytics", "evidence": EVIDENCE}
+        assert "".join(data["text"] for name, data in events[4:6]) == "FX leads."
+        assert events[-1][1]["ai_answer"] == "FX leads."
+        assert events[-1][1]["mode"] == "analysis"
+
+    @pytest.mark.asyncio
+    async def test_failure_becomes_error_event(self, service, request_model):
+        """Test that a failing request ends the stream with an error event instead of a broken response."""
+        service._fc_model = None
+
+        with patch(
+            "app.services.chat_service.extraction_service.extract_parameters",
+            new_callable=AsyncMock,
+            return_value=ExtractedParams(),
+        ):
+            events = await _events(service, request_model)
+
+        assert events[-1] == (
+            "error",
+            {
+                "success": False,
+                "error": "Chat execution failed",
+                "message": "Unable to process chat request at this time.",
+            },
+        )
+        assert "done" not in [name for name, _ in events]
+
+    def test_trade_rows_event_carries_rows(self):
+        """Test that get_trade_rows results are sent as JSON rows with a count."""
+        trade = MagicMock()
+        trade.model_dump.return_value = {"trade_id": 1}
+
+        event = ChatService._tool_result_event("get_trade_rows", {"table_results": [trade], "result_preview": {}})
+
+        assert event == {"tool": "get_trade_rows", "results": [{"trade_id": 1}], "total_results": 1}
+
+
+class TestChatRoute:
+    """POST /api/chat content negotiation."""
+
+    @pytest.mark.asyncio
+    async def test_accept_event_stream_selects_sse(self):
+        """Test that Accept: text/event-stream returns the event stream."""
+
+        async def frames(request):
+            yield b'event: done\ndata: {"mode": "analysis"}\n\n'
+
+        with patch("app.api.routes.chat.chat_service.stream_chat", side_effect=frames):
+            async with AsyncClient(app=app, base_url="http://test") as client:
+                response = await client.post(
+                    "/api/chat",
+                    json={"user_id": "alice", "message": "exceptions by asset type"},
+                    headers={"Accept": "text/event-stream"},
+                )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert response.headers["cache-control"] == "no-cache"
+        assert response.text == 'event: done\ndata: {"mode": "analysis"}\n\n'
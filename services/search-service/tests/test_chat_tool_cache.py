@@ -0,0 +1,96 @@
+"""
+Unit tests for ChatService tool-call reuse.
+Tests intra-turn dedupe, the cross-turn result cache and the hit rates reported on every response.
+"""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.models.chat import ChatRequest
+from app.models.domain import ExtractedParams
+from app.services.chat_service import ChatService
+
+ANALYTICS_CALL = ("get_exception_analytics", {"dimensions": ["asset_type"], "top_k": 10.0})
+EVIDENCE = {"dimensions": ["asset_type"], "rows": [{"asset_type": "FX", "count": 3}], "metadata": {"row_count": 1}}
+TOOL_RESULT = {"evidence": EVIDENCE, "result_preview": {"row_count": 1}}
+
+
+@pytest.fixture
+def request_model():
+    """Analytics chat request."""
+    return ChatRequest(user_id="alice", message="exceptions by asset type")
+
+
+class TestToolCallReuse:
+    """Dedupe and caching in _run_tool_calling_loop."""
+
+    @pytest.mark.asyncio
+    async def test_identical_calls_in_one_turn_run_once(self, request_model, scripted_chat_service):
+        """Test that duplicate calls in a turn execute once and contribute evidence once."""
+        service = scripted_chat_service([ANALYTICS_CALL] * 2, "Answer", tool_result=TOOL_RESULT)
+
+        result = await service._run_tool_calling_loop(request_model, ExtractedParams())
+
+        assert service._execute_tool_call.await_count == 1
+        assert result["evidence"]["rows"] == [{"asset_type": "FX", "count": 3}]
+        stats = result["tool_cache"]
+        assert stats == {"calls": 2, "deduplicated": 1, "cache_hits": 0, "executed": 1, "hit_rate": 0.5}
+
+    @pytest.mark.asyncio
+    async def test_repeat_across_conversations_hits_cache(self, request_model, scripted_chat_service):
+        """Test that the same call in a later request is served from the cache without SQL."""
+        service = scripted_chat_service(
+            [ANALYTICS_CALL],
+            [("get_exception_analytics", {"top_k": 10, "dimensions": ["asset_type"]})],
+            "Answer",
+            [ANALYTICS_CALL],  # Second conversation
+            "Answer",
+            tool_result=TOOL_RESULT,
+        )
+
+        first = await service._run_tool_calling_loop(request_model, ExtractedParams())
+        second = await service._run_tool_calling_loop(request_model, ExtractedParams())
+
+        assert service._execute_tool_call.await_count == 1
+        assert first["tool_cache"]["cache_hits"] == 1  # Second turn, same args
+        assert second["tool_cache"]["hit_rate"] == 1.0
+
+    @pytest.mark.asyncio
+    async def test_different_filters_are_not_shared(self, request_model, scripted_chat_service):
+        """Test that the cache key includes the extracted filters."""
+        service = scripted_chat_service([ANALYTICS_CALL], "Answer", [ANALYTICS_CALL], "Answer", tool_result=TOOL_RESULT)
+        await service._run_tool_calling_loop(request_model, ExtractedParams(statuses=["REJECTED"]))
+
+        await service._run_tool_calling_loop(request_model, ExtractedParams(statuses=["CLEARED"]))
+
+        assert service._execute_tool_call.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_hit_rate_reported_in_table_mode(self, request_model, scripted_chat_service):
+        """Test that a get_trade_rows-only chat (no evidence in the response) still reports tool reuse."""
+        service = scripted_chat_service(
+            [("get_trade_rows", {})], "Answer", tool_result={"results": [], "result_preview": {"row_count": 0}}
+        )
+
+        with patch(
+            "app.services.chat_service.extraction_service.extract_parameters",
+            new_callable=AsyncMock,
+            return_value=ExtractedParams(),
+        ):
+            response = await service.execute_chat(request_model)
+
+        assert response.mode == "table"
+        assert response.evidence is None
+        assert response.tool_cache == {"calls": 1, "deduplicated": 0, "cache_hits": 0, "executed": 1, "hit_rate": 0.0}
+
+    def test_key_normalises_args(self):
+        """Test that key normalisation treats proto-style floats and key order as equal."""
+        params = ExtractedParams()
+
+        assert ChatService._tool_cache_key("t", {"a": 1.0, "b": ["x"]}, params) == ChatService._tool_cache_key(
+            "t", {"b": ("x",), "a": 1}, params
+        )
+        assert ChatService._tool_cache_key("t", {"a": 1.5}, params) != ChatService._tool_cache_key(
+            "t", {"a": 1}, params
+        )
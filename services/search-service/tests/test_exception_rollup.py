@@ -0,0 +1,256 @@
+"""
+Unit tests for the exception rollup behind chat analytics.
+Tests when the rollup can answer, the generated rollup SQL, writer election, dirty-day
+maintenance and (integration) that the rollup sums match the raw GROUP BY.
+"""
+
+from datetime import date, datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.models.domain import ExtractedParams
+from app.services.chat_service import ChatService
+from app.services.exception_rollup import ROLLUP_LOCK_ID, ExceptionRollup
+
+
+def _connection(previous_days=()):
+    """Mocked asyncpg connection whose exception_rollup_trades lookup returns previous_days."""
+    conn = AsyncMock()
+    conn.transaction = MagicMock(return_value=AsyncMock())
+    conn.fetch.return_value = [{"day": day} for day in previous_days]
+    conn.fetchval.return_value = True  # pg_try_advisory_lock granted
+    conn.is_closed = MagicMock(return_value=False)
+    return conn
+
+
+@pytest.fixture
+def rollup():
+    """Rollup marked as built on the writer replica, over a mocked pool."""
+    rollup = ExceptionRollup(flush_interval=60, rebuild_interval=60)
+    rollup.rebuilt_at = 0.0
+    rollup.conn = _connection()
+    rollup.db = MagicMock()
+    rollup.db.pool.acquire = AsyncMock(return_value=rollup.conn)
+    rollup.db.pool.release = AsyncMock()
+    rollup._writer_conn = rollup.conn
+    return rollup
+
+
+@pytest.fixture
+def reader(rollup):
+    """Same rollup on a replica that lost the writer election and has not seen a built table yet."""
+    rollup._writer_conn = None
+    rollup.rebuilt_at = None
+    rollup.conn.fetchval.return_value = False
+    rollup.db.fetchval = AsyncMock(return_value=False)
+    return rollup
+
+
+class TestAnalyticsQuery:
+    """Choosing and building the rollup query."""
+
+    def test_not_ready_or_account_falls_back(self, rollup):
+        """Test that the raw join is used before the first rebuild and for account filters/dimensions."""
+        assert rollup.analytics_query(["status"], ExtractedParams(accounts=["ACC1"]), None, 10) is None
+        assert rollup.analytics_query(["account"], ExtractedParams(), None, 10) is None
+        rollup.rebuilt_at = None
+        assert rollup.analytics_query(["status"], ExtractedParams(), None, 10) is None
+
+    def test_filters_map_to_rollup_columns(self, rollup):
+        """Test that trade filters, whole-day dates and priorities become rollup conditions."""
+        params = ExtractedParams(statuses=["REJECTED"], date_from="2025-01-01", date_to="2025-01-31")
+
+        query, values = rollup.analytics_query(["clearing_house"], params, ["HIGH"], 5)
+
+        assert "FROM exception_rollup r" in query
+        assert "r.status = ANY($1::text[])" in query
+        assert "r.day >= $2::date AND r.day <= $3::date" in query
+        assert "r.priority = ANY($4::text[])" in query
+        assert query.rstrip().endswith("LIMIT 5")
+        assert values == [["REJECTED"], date(2025, 1, 1), date(2025, 1, 31), ["HIGH"]]
+
+    def test_distinct_trades_column_depends_on_msg_grouping(self, rollup):
+        """Test that affected trades sum first_msg_trades unless the grouping includes msg."""
+        by_system, _ = rollup.analytics_query(["booking_system"], ExtractedParams(), None, 10)
+        by_message, _ = rollup.analytics_query(["exception_message", "asset_type"], ExtractedParams(), None, 10)
+
+        assert "SUM(r.first_msg_trades)" in by_system
+        assert "SUM(r.affected_trades)" in by_message
+        assert "GROUP BY r.msg, r.asset_type, r.priority" in by_message
+
+
+class TestMaintenance:
+    """Rebuild and dirty-day recompute."""
+
+    @pytest.mark.asyncio
+    async def test_flush_recomputes_old_and_new_days(self, rollup):
+        """Test that a trade moving days recomputes both the day it left and the day it joined."""
+        rollup.conn.fetch.return_value = [{"day": date(2025, 1, 2)}]
+        await rollup.apply_trade_change(7, {"update_time": datetime(2025, 1, 5, 9, 30)}, {})
+        await rollup.apply_trade_change(8, None, {})
+
+        assert await rollup.flush() == 2
+
+        assert rollup.conn.fetch.await_args.args[1] == [7, 8]
+        days = [date(2025, 1, 2), date(2025, 1, 5)]
+        statements = [call.args for call in rollup.conn.execute.await_args_list]
+        assert ("DELETE FROM exception_rollup WHERE day = ANY($1::date[])", days) in statements
+        assert statements[-1][1] == days and "unnest($1::date[])" in statements[-1][0]
+        assert rollup.stats()["pending_trades"] == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_keeps_pending(self, rollup):
+        """Test that trades from a failed recompute are retried on the next flush."""
+        rollup.conn.fetch.side_effect = RuntimeError("connection lost")
+        await rollup.apply_trade_change(7, {"update_time": datetime(2025, 1, 5)}, {})
+
+        with pytest.raises(RuntimeError):
+            await rollup.flush()
+
+        assert rollup.stats()["pending_trades"] == 1
+
+    @pytest.mark.asyncio
+    async def test_rebuild_makes_rollup_ready(self, rollup):
+        """Test that a full rebuild clears pending trades and enables rollup answers."""
+        rollup.rebuilt_at = None
+        await rollup.apply_trade_change(7, {"update_time": datetime(2025, 1, 5)}, {})
+
+        await rollup.rebuild()
+
+        assert rollup.ready
+        assert rollup.stats()["pending_trades"] == 0
+        assert "DELETE FROM exception_rollup" in [call.args[0] for call in rollup.conn.execute.await_args_list]
+
+
+class TestWriterElection:
+    """Only the replica holding the advisory lock writes."""
+
+    @pytest.mark.asyncio
+    async def test_reader_does_not_write(self, reader):
+        """Test that a replica that loses the election neither rebuilds nor queues dirty days."""
+        await reader.rebuild()
+        await reader.apply_trade_change(7, {"update_time": datetime(2025, 1, 5)}, {})
+
+        assert reader.conn.fetchval.await_args.args == ("SELECT pg_try_advisory_lock($1)", ROLLUP_LOCK_ID)
+        reader.conn.execute.assert_not_awaited()
+        reader.db.pool.release.assert_awaited_once_with(reader.conn)
+        assert await reader.flush() == 0
+        assert reader.stats()["pending_trades"] == 0
+        assert not reader.ready
+
+    @pytest.mark.asyncio
+    async def test_reader_is_ready_once_table_is_built(self, reader):
+        """Test that a reader answers from the rollup as soon as the writer has populated it."""
+        reader.db.fetchval.return_value = True
+
+        await reader.rebuild()
+
+        reader.db.fetchval.assert_awaited_once_with(ExceptionRollup.POPULATED_QUERY)
+        assert reader.ready
+        assert not reader.is_writer
+
+    @pytest.mark.asyncio
+    async def test_reader_takes_over_when_lock_is_free(self, reader):
+        """Test that a reader whose election succeeds keeps the connection and rebuilds."""
+        reader.conn.fetchval.return_value = True
+
+        await reader.rebuild()
+
+        assert reader.is_writer
+        assert reader.ready
+        reader.db.pool.release.assert_not_awaited()
+        assert "DELETE FROM exception_rollup" in [call.args[0] for call in reader.conn.execute.await_args_list]
+
+    @pytest.mark.asyncio
+    async def test_closed_writer_connection_resigns(self, rollup):
+        """Test that a writer whose session dropped gives up the role and runs the election again."""
+        rollup.conn.is_closed.return_value = True
+        replacement = _connection()
+        replacement.fetchval.return_value = False
+        rollup.db.pool.acquire.return_value = replacement
+        rollup.db.fetchval = AsyncMock(return_value=True)
+
+        await rollup.rebuild()
+
+        rollup.db.pool.release.assert_any_await(rollup.conn)
+        assert not rollup.is_writer
+        rollup.conn.execute.assert_not_awaited()
+
+
+class TestChatIntegration:
+    """ChatService._build_analytics_evidence source selection."""
+
+    @pytest.mark.asyncio
+    async def test_evidence_reports_rollup_source(self, rollup):
+        """Test that analytics evidence is answered from the rollup once it is ready."""
+        rows = [{"dimension_1": "LCH", "priority": "HIGH", "exception_count": 4, "affected_trades": 3}]
+        with (
+            patch("app.services.chat_service.exception_rollup", rollup),
+            patch("app.services.chat_service.db_manager.fetch", new_callable=AsyncMock, return_value=rows) as fetch,
+        ):
+            evidence = await ChatService()._build_analytics_evidence(ExtractedParams(), ["clearing_house"], None, 10)
+
+        assert "FROM exception_rollup r" in fetch.await_args.args[0]
+        assert evidence["metadata"]["source"] == "exception_rollup"
+        assert evidence["chart"]["labels"] == ["LCH"]
+
+
+# Trades over two days; trade 2 has two messages at one priority (first_msg_trades counts it once)
+SEED_TRADES = [
+    (2_100_000_001, "ACC1", "FX", "HIGHGARDEN", "TRAI", "LCH", datetime(2025, 3, 1, 9), "REJECTED"),
+    (2_100_000_002, "ACC2", "FX", "HIGHGARDEN", "TRAI", "LCH", datetime(2025, 3, 1, 17), "REJECTED"),
+    (2_100_000_003, "ACC3", "IRS", "RIVERRUN", "MARC", "DTCC", datetime(2025, 3, 2, 8), "ALLEGED"),
+]
+SEED_EXCEPTIONS = [
+    (2_100_000_001, "MISSING BIC", "HIGH"),
+    (2_100_000_001, "MISSING BIC", "HIGH"),
+    (2_100_000_002, "MISSING BIC", "HIGH"),
+    (2_100_000_002, "INSUFFICIENT MARGIN", "HIGH"),
+    (2_100_000_002, "INSUFFICIENT MARGIN", "LOW"),
+    (2_100_000_003, "MAPPING ISSUE", "MEDIUM"),
+]
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+class TestRollupMatchesRawJoin:
+    """The rollup's SUMs against the raw exceptions JOIN trades GROUP BY, on PostgreSQL."""
+
+    @pytest.mark.parametrize(
+        "dimensions, params, priorities",
+        [
+            (["booking_system"], ExtractedParams(), None),
+            (["clearing_house", "status"], ExtractedParams(), None),
+            (["exception_message"], ExtractedParams(), None),
+            (["exception_message", "asset_type"], ExtractedParams(), ["HIGH"]),
+            (["asset_type"], ExtractedParams(statuses=["REJECTED"], date_from="2025-03-01"), ["HIGH", "LOW"]),
+        ],
+    )
+    async def test_grouped_counts_match(self, db_transaction, dimensions, params, priorities):
+        """Test that exception counts and distinct affected trades (first_msg_trades) equal the raw query."""
+        conn = db_transaction
+        for trade_id, account, asset, booking, affirmation, house, updated, status in SEED_TRADES:
+            await conn.execute(
+                "INSERT INTO trades VALUES ($1, $2, $3, $4, $5, $6, $7, $7, $8)",
+                trade_id, account, asset, booking, affirmation, house, updated, status,
+            )  # fmt: skip
+            await conn.execute(
+                "INSERT INTO transactions VALUES ($1, $1, $2, 'E', 'IN', 'NEW', 'OK', $2, 1)", trade_id, updated
+            )
+        for trade_id, msg, priority in SEED_EXCEPTIONS:
+            await conn.execute(
+                "INSERT INTO exceptions (trade_id, trans_id, msg, priority) VALUES ($1, $1, $2, $3)",
+                trade_id, msg, priority,
+            )  # fmt: skip
+        rollup = ExceptionRollup()
+        await rollup.build(conn)
+        rollup.rebuilt_at = 0.0
+
+        raw_query, raw_values = ChatService()._build_raw_analytics_query(dimensions, params, priorities, 10_000)
+        rollup_query, rollup_values = rollup.analytics_query(dimensions, params, priorities, 10_000)
+        raw = sorted(tuple(row) for row in await conn.fetch(raw_query, *raw_values))
+        summed = sorted(tuple(row) for row in await conn.fetch(rollup_query, *rollup_values))
+
+        assert summed == raw
+        assert raw  # The seeded trades are part of the answer
@@ -0,0 +1,180 @@
+"""
+Unit tests for the cached filter options snapshot.
+Tests the distinct-values table read path, incremental additions, reconcile and ETags.
+"""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from httpx import AsyncClient
+
+from app.main import app
+from app.services.filter_options_service import FILTER_FIELDS, FilterOptionsService
+
+TABLE_ROWS = [
+    {"field": "asset_types", "values": ["FX", "IRS"]},
+    {"field": "statuses", "values": ["CLEARED"]},
+]
+
+
+@pytest.fixture
+def service():
+    """Service over a mocked database and an empty cache."""
+    service = FilterOptionsService(reconcile_interval=60, cache_ttl=60)
+    service.db = AsyncMock()
+    service.db.fetch.return_value = TABLE_ROWS
+    service.cache = AsyncMock()
+    service.cache.get.return_value = None
+    return service
+
+
+def _transaction_conn(service):
+    """Route service.db.acquire() to a mocked connection whose DELETEs remove nothing."""
+    conn = AsyncMock()
+    conn.execute.return_value = "DELETE 0"
+    conn.transaction = MagicMock(return_value=AsyncMock())
+    service.db.acquire = MagicMock(return_value=AsyncMock(__aenter__=AsyncMock(return_value=conn)))
+    return conn
+
+
+class TestSnapshot:
+    """Read path."""
+
+    @pytest.mark.asyncio
+    async def test_reads_distinct_values_table(self, service):
+        """Test that options come from trade_filter_values, not an aggregate over trades."""
+        options = await service.get_options()
+
+        assert options["asset_types"] == ["FX", "IRS"]
+        assert options["accounts"] == []
+        assert set(options) == set(FILTER_FIELDS)
+        service.db.fetch.assert_awaited_once_with(FilterOptionsService.SNAPSHOT_QUERY)
+        service.db.fetchrow.assert_not_awaited()
+        assert service.cache.set.await_args.args[1]["options"] == options
+
+    @pytest.mark.asyncio
+    async def test_cached_snapshot_skips_database(self, service):
+        """Test that a cached snapshot is served without a query."""
+        service.cache.get.return_value = {"options": {"statuses": ["ALLEGED"]}, "etag": '"abc"'}
+
+        snapshot = await service.get_snapshot()
+
+        assert snapshot["etag"] == '"abc"'
+        service.db.fetch.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_empty_table_falls_back_to_aggregate(self, service):
+        """Test that the first start (table not backfilled yet) aggregates over trades."""
+        service.db.fetch.return_value = []
+        service.db.fetchrow.return_value = {field: None for field in FILTER_FIELDS} | {"statuses": ["ALLEGED"]}
+
+        assert (await service.get_options())["statuses"] == ["ALLEGED"]
+
+    @pytest.mark.asyncio
+    async def test_etag_tracks_content(self):
+        """Test that the ETag is stable for equal options and changes with them."""
+        first = FilterOptionsService._snapshot({"statuses": ["CLEARED"]})
+
+        assert first["etag"] == FilterOptionsService._snapshot({"statuses": ["CLEARED"]})["etag"]
+        assert first["etag"] != FilterOptionsService._snapshot({"statuses": ["ALLEGED", "CLEARED"]})["etag"]
+        assert first["etag"].startswith('"')
+
+
+class TestIncrementalUpdates:
+    """Trade change events and reconcile."""
+
+    @pytest.mark.asyncio
+    async def test_new_value_is_inserted_and_invalidates(self, service):
+        """Test that a value seen for the first time is stored and the snapshot dropped."""
+        await service.get_snapshot()
+        trade_row = {"id": 1, "asset_type": "CDS", "status": "CLEARED", "account": None}
+
+        await service.apply_trade_change(1, trade_row, {})
+
+        service.db.execute.assert_awaited_once_with(FilterOptionsService.INSERT_VALUES_QUERY, ["asset_types"], ["CDS"])
+        service.cache.delete.assert_awaited_once()
+        assert service.stats()["values_added"] == 1
+
+    @pytest.mark.asyncio
+    async def test_known_values_cost_nothing(self, service):
+        """Test that events carrying only known values neither write nor invalidate."""
+        await service.get_snapshot()
+
+        await service.apply_trade_change(1, {"asset_type": "FX", "status": "CLEARED"}, {})
+        await service.apply_trade_change(2, None, {})
+
+        service.db.execute.assert_not_awaited()
+        service.cache.delete.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_reconcile_replaces_table_contents(self, service):
+        """Test that reconcile upserts the aggregate, deletes stale values and invalidates on change."""
+        service.db.fetchrow.return_value = {field: None for field in FILTER_FIELDS} | {"statuses": ["ALLEGED"]}
+        conn = _transaction_conn(service)
+
+        await service.reconcile()
+
+        statements = [call.args for call in conn.execute.await_args_list]
+        assert statements[0] == (FilterOptionsService.INSERT_VALUES_QUERY, ["statuses"], ["ALLEGED"])
+        assert statements[-1] == (
+            FilterOptionsService.DELETE_STALE_QUERY.format(column="status"),
+            "statuses",
+            ["ALLEGED"],
+        )
+        assert "NOT EXISTS (SELECT 1 FROM trades t WHERE t.status = v.value)" in statements[-1][0]
+        assert len(statements) == 1 + len(FILTER_FIELDS)
+        service.cache.delete.assert_awaited_once()
+        assert service.stats()["values"] == 1
+
+    @pytest.mark.asyncio
+    async def test_value_added_during_reconcile_is_kept(self, service):
+        """Test that a value a trade event inserts while reconcile runs stays known afterwards."""
+        await service.get_snapshot()
+        service.db.fetchrow.return_value = {field: None for field in FILTER_FIELDS} | {"statuses": ["CLEARED"]}
+        _transaction_conn(service)
+        aggregate = service._aggregate
+
+        async def aggregate_then_event():
+            options = await aggregate()
+            await service.apply_trade_change(2, {"status": "PENDING"}, {})
+            return options
+
+        service._aggregate = aggregate_then_event
+        await service.reconcile()
+
+        assert ("statuses", "PENDING") in service._known
+
+    @pytest.mark.asyncio
+    async def test_cached_snapshot_seeds_known_values(self, service):
+        """Test that a snapshot from the cache (another replica's) is enough to diff new values."""
+        service.cache.get.return_value = {"options": {"statuses": ["CLEARED"]}, "etag": '"abc"'}
+
+        await service.apply_trade_change(1, {"status": "CLEARED"}, {})
+        await service.apply_trade_change(2, {"status": "PENDING"}, {})
+
+        service.db.execute.assert_awaited_once_with(FilterOptionsService.INSERT_VALUES_QUERY, ["statuses"], ["PENDING"])
+
+
+class TestFilterOptionsRoute:
+    """GET /api/filter-options conditional requests."""
+
+    @pytest.mark.asyncio
+    async def test_etag_and_not_modified(self):
+        """Test that the route returns an ETag and 304 when If-None-Match matches it."""
+        snapshot = FilterOptionsService._snapshot({field: [] for field in FILTER_FIELDS} | {"statuses": ["CLEARED"]})
+        with patch(
+            "app.api.routes.filters.filter_options_service.get_snapshot",
+            new_callable=AsyncMock,
+            return_value=snapshot,
+        ):
+            async with AsyncClient(app=app, base_url="http://test") as client:
+                response = await client.get("/api/filter-options")
+                not_modified = await client.get("/api/filter-options", headers={"If-None-Match": snapshot["etag"]})
+                stale = await client.get("/api/filter-options", headers={"If-None-Match": '"old"'})
+
+        assert response.status_code == 200
+        assert response.headers["etag"] == snapshot["etag"]
+        assert response.json()["statuses"] == ["CLEARED"]
+        assert not_modified.status_code == 304
+        assert not_modified.content == b""
+        assert stale.status_code == 200
@@ -0,0 +1,146 @@
+"""
+Unit tests for the bounded LLM executor.
+Tests per-provider concurrency limits, queue deadlines and backpressure metrics.
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from app.services.llm_executor import LLMExecutor
+from app.utils.exceptions import LLMCapacityError
+
+
+def make_executor(concurrency: int = 1, max_queue: int = 4, queue_timeout: float = 1.0) -> LLMExecutor:
+    """Executor with one tightly limited "gemini" provider."""
+    return LLMExecutor(max_concurrency={"gemini": concurrency}, max_queue=max_queue, queue_timeout=queue_timeout)
+
+
+class TestRun:
+    """Blocking calls on provider worker threads."""
+
+    @pytest.mark.asyncio
+    async def test_returns_result_and_propagates_errors(self):
+        """Test that results and exceptions come back from the worker thread."""
+        executor = make_executor()
+
+        def boom():
+            raise RuntimeError("sdk failure")
+
+        assert await executor.run("gemini", lambda x: x * 2, 21) == 42
+        with pytest.raises(RuntimeError, match="sdk failure"):
+            await executor.run("gemini", boom)
+
+        stats = executor.stats()["gemini"]
+        assert stats["completed"] == 2
+        assert stats["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_concurrency_capped_per_provider(self):
+        """Test that no more than max_concurrency calls run at once."""
+        executor = make_executor(concurrency=2)
+        running = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def call():
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            threading.Event().wait(0.05)
+            with lock:
+                running -= 1
+
+        await asyncio.gather(*(executor.run("gemini", call) for _ in range(6)))
+
+        assert peak == 2
+        assert executor.stats()["gemini"]["queued"] == 4
+
+    @pytest.mark.asyncio
+    async def test_providers_are_independent(self):
+        """Test that a saturated provider does not block another one."""
+        executor = make_executor(concurrency=1)
+        release = threading.Event()
+        blocked = asyncio.create_task(executor.run("gemini", release.wait))
+        await asyncio.sleep(0.01)
+
+        assert await executor.run("bedrock", lambda: "ok") == "ok"
+
+        release.set()
+        await blocked
+
+
+class TestBackpressure:
+    """Queue limit and deadline."""
+
+    @pytest.mark.asyncio
+    async def test_waiter_times_out(self):
+        """Test that a call waiting past the deadline raises LLMCapacityError."""
+        executor = make_executor(queue_timeout=0.05)
+        release = threading.Event()
+        blocked = asyncio.create_task(executor.run("gemini", release.wait))
+        await asyncio.sleep(0.01)
+
+        with pytest.raises(LLMCapacityError):
+            await executor.run("gemini", lambda: "late")
+
+        stats = executor.stats()["gemini"]
+        assert (stats["timeouts"], stats["queue_depth"], stats["in_flight"]) == (1, 0, 1)
+        assert stats["wait_ms_max"] >= 50
+
+        release.set()
+        await blocked
+        assert executor.stats()["gemini"]["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_full_queue_rejects_immediately(self):
+        """Test that callers beyond max_queue are refused without waiting."""
+        executor = make_executor(max_queue=1)
+        release = threading.Event()
+        running = asyncio.create_task(executor.run("gemini", release.wait))
+        await asyncio.sleep(0.01)
+        queued = asyncio.create_task(executor.run("gemini", lambda: "queued"))
+        await asyncio.sleep(0.01)
+
+        with pytest.raises(LLMCapacityError, match="queue is full"):
+            await executor.run("gemini", lambda: "rejected")
+        assert executor.stats()["gemini"]["rejected"] == 1
+
+        release.set()
+        await running
+        assert await queued == "queued"
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_leaves_queue(self):
+        """Test that a cancelled waiter does not keep a queue entry or leak a slot."""
+        executor = make_executor()
+        release = threading.Event()
+        running = asyncio.create_task(executor.run("gemini", release.wait))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.create_task(executor.run("gemini", lambda: "never"))
+        await asyncio.sleep(0.01)
+
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert executor.stats()["gemini"]["queue_depth"] == 0
+
+        release.set()
+        await running
+        assert await executor.run("gemini", lambda: "next") == "next"
+
+    @pytest.mark.asyncio
+    async def test_slot_limits_async_calls(self):
+        """Test that async SDK calls share the provider's slots."""
+        executor = LLMExecutor(max_concurrency={"bedrock": 1}, max_queue=4, queue_timeout=0.05)
+
+        async with executor.slot("bedrock"):
+            with pytest.raises(LLMCapacityError):
+                async with executor.slot("bedrock"):
+                    pass
+
+        async with executor.slot("bedrock"):
+            pass
+        assert executor.stats()["bedrock"]["completed"] == 2
@@ -0,0 +1,112 @@
+"""
+Unit tests for the two-tier (in-process LRU + Redis) cache.
+Tests LRU/TTL behaviour, tier selection and cross-replica invalidation.
+"""
+
+import json
+import time
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.cache.local_cache import LocalCache
+from app.cache.redis_client import RedisManager
+
+
+@pytest.fixture
+def manager():
+    """RedisManager with a mocked Redis client."""
+    manager = RedisManager()
+    manager._client = AsyncMock()
+    return manager
+
+
+class TestLocalCache:
+    """Tests for the in-process LRU tier."""
+
+    def test_evicts_least_recently_used(self):
+        """Test that the oldest untouched entry is evicted when full."""
+        cache = LocalCache(max_entries=2, default_ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.stats()["evictions"] == 1
+
+    def test_entries_expire(self, monkeypatch):
+        """Test that entries expire after the shorter of their TTL and the tier TTL."""
+        cache = LocalCache(max_entries=10, default_ttl=30)
+        cache.set("short", 1, ttl=5)
+        cache.set("long", 2, ttl=3600)
+
+        now = time.monotonic()
+        monkeypatch.setattr(time, "monotonic", lambda: now + 10)
+        assert cache.get("short") is None
+        assert cache.get("long") == 2
+
+        monkeypatch.setattr(time, "monotonic", lambda: now + 31)
+        assert cache.get("long") is None
+        assert cache.stats()["expirations"] == 2
+
+    def test_delete_pattern(self):
+        """Test Redis-style glob invalidation."""
+        cache = LocalCache(max_entries=10, default_ttl=60)
+        cache.set("filters:options", 1)
+        cache.set("search:count:abc", 2)
+
+        cache.delete_pattern("filters:*")
+
+        assert cache.get("filters:options") is None
+        assert cache.get("search:count:abc") == 2
+
+
+class TestTwoTierRedisManager:
+    """Tests for the local tier in front of Redis."""
+
+    @pytest.mark.asyncio
+    async def test_hot_key_served_locally(self, manager):
+        """Test that a second read of an eligible key skips Redis."""
+        manager._client.get.return_value = json.dumps({"accounts": ["ACC001"]})
+
+        first = await manager.get("gemini:extraction:abc")
+        second = await manager.get("gemini:extraction:abc")
+
+        assert first == second == {"accounts": ["ACC001"]}
+        assert manager._client.get.await_count == 1
+        stats = manager.stats()
+        assert stats["local"]["hits"] == 1
+        assert stats["redis"]["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_other_keys_bypass_local_tier(self, manager):
+        """Test that keys outside LOCAL_CACHE_PREFIXES always read Redis."""
+        manager._client.get.return_value = json.dumps({"results": []})
+
+        await manager.get("search:results:abc")
+        await manager.get("search:results:abc")
+
+        assert manager._client.get.await_count == 2
+        assert manager.stats()["local"]["size"] == 0
+
+    @pytest.mark.asyncio
+    async def test_write_publishes_invalidation(self, manager):
+        """Test that writing an eligible key updates the local tier and notifies other replicas."""
+        await manager.set("search:count:abc", 42, ttl=60)
+
+        assert await manager.get("search:count:abc") == 42
+        manager._client.get.assert_not_awaited()
+        channel, payload = manager._client.publish.await_args.args
+        assert json.loads(payload)["keys"] == ["search:count:abc"]
+
+    def test_applies_invalidation_from_other_replica(self, manager):
+        """Test that only messages from other replicas drop local entries."""
+        manager.local.set("search:count:abc", 42)
+
+        manager.apply_invalidation(json.dumps({"keys": ["search:count:abc"], "origin": manager._instance_id}))
+        assert manager.local.get("search:count:abc") == 42
+
+        manager.apply_invalidation(json.dumps({"keys": ["search:count:abc"], "origin": "other-replica"}))
+        assert manager.local.get("search:count:abc") is None
@@ -4,6 +4,7 @@ Tests domain models, request models, and response models.
 """
 
 import sys
+from datetime import datetime, timezone
 from pathlib import Path
 
 # Add parent directory to path
@@ -51,6 +52,41 @@ def test_trade_model():
         raise
 
 
+def test_trade_trusted_record():
+    """Test Trade.from_trusted_record matches the validated from_db_record path"""
+    print("\n" + "=" * 60)
+    print("Testing Trade Trusted Record Decoding")
+    print("=" * 60)
+
+    try:
+        record = {
+            "id": 10001234,
+            "account": "ACC12345",
+            "asset_type": "FX",
+            "booking_system": "HIGHGARDEN",
+            "affirmation_system": "TRAI",
+            "clearing_house": "DTCC",
+            "create_time": datetime(2025, 1, 15, 9, 30, 0, 250000),
+            "update_time": datetime(2025, 1, 15, 10, 0, 0),
+            "status": "CLEARED",
+        }
+
+        trusted = Trade.from_trusted_record(record)
+        assert trusted == Trade.from_db_record(record)
+        assert trusted.model_dump_json() == Trade.from_db_record(record).model_dump_json()
+        assert trusted.create_time == "2025-01-15T09:30:00Z"
+        print("✓ Trusted decoding matches validated decoding")
+
+        # Tz-aware timestamps keep the strftime formatting
+        aware = dict(record, update_time=datetime(2025, 1, 15, 10, 0, 0, tzinfo=timezone.utc))
+        assert Trade.from_trusted_record(aware).update_time == Trade.from_db_record(aware).update_time
+        print("✓ Tz-aware timestamps formatted identically")
+
+    except Exception as e:
+        print(f"❌ Trade trusted record test failed: {e}")
+        raise
+
+
 def test_query_history_model():
     """Test QueryHistory domain model"""
     print("\n" + "=" * 60)
@@ -311,6 +347,7 @@ def run_all_tests():
     results = []
 
     results.append(("Trade Model", test_trade_model()))
+    results.append(("Trade Trusted Record", test_trade_trusted_record()))
     results.append(("QueryHistory Model", test_query_history_model()))
     results.append(("ManualSearchFilters", test_manual_search_filters()))
     results.append(("SearchRequest (NL)", test_search_request_natural_language()))
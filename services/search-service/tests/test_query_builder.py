@@ -3,9 +3,15 @@ Unit tests for query_builder service.
 Tests SQL generation and safety validation.
 """
 
+from datetime import datetime
+
+import pytest
+
 from app.models.domain import ExtractedParams
 from app.models.request import ManualSearchFilters
 from app.services.query_builder import query_builder
+from app.services.ranking_service import TradeRanker
+from app.utils.exceptions import InvalidSearchRequestError
 
 
 class TestQueryBuilderFromExtractedParams:
@@ -242,3 +248,136 @@ class TestBuildCountQuery:
         count_query = query_builder.build_count_query(search_query)
 
         assert "WHERE asset_type = $1" in count_query
+
+
+class TestKeysetPagination:
+    """Tests for cursor-based pagination."""
+
+    def test_unpaginated_query_unchanged(self):
+        """Test that omitting page_size keeps the legacy ORDER BY / LIMIT."""
+        query, _ = query_builder.build_from_extracted_params(ExtractedParams(accounts=["ACC001"]))
+
+        assert "ORDER BY update_time DESC LIMIT" in query
+        assert "id DESC" not in query
+
+    def test_first_page_fetches_look_ahead_row(self):
+        """Test that the first page orders by (update_time, id) and fetches one extra row."""
+        query, params = query_builder.build_from_extracted_params(ExtractedParams(accounts=["ACC001"]), page_size=25)
+
+        assert "ORDER BY update_time DESC, id DESC LIMIT 26" in query
+        assert params == [["ACC001"]]
+
+    def test_cursor_adds_keyset_condition(self):
+        """Test that a cursor appends a row-comparison on the sort field and id."""
+        cursor = query_builder.encode_cursor("create_time", datetime(2025, 1, 15, 10, 0, 0, 123456), 1001)
+        filters = ManualSearchFilters(asset_type="FX", date_type="create_time")
+
+        query, params = query_builder.build_from_manual_filters(filters, page_size=10, cursor=cursor)
+
+        assert "(create_time, id) < ($2::timestamp, $3::integer)" in query
+        assert "ORDER BY create_time DESC, id DESC LIMIT 11" in query
+        assert params == ["FX", datetime(2025, 1, 15, 10, 0, 0, 123456), 1001]
+        assert query_builder.validate_query_safety(query, params) is True
+
+    def test_cursor_sort_field_mismatch(self):
+        """Test that a cursor issued for another sort field is rejected."""
+        cursor = query_builder.encode_cursor("update_time", datetime(2025, 1, 15), 1001)
+
+        with pytest.raises(InvalidSearchRequestError):
+            query_builder.build_from_manual_filters(ManualSearchFilters(date_type="create_time"), cursor=cursor)
+
+    def test_malformed_cursor(self):
+        """Test that a tampered cursor is rejected."""
+        with pytest.raises(InvalidSearchRequestError):
+            query_builder.build_from_extracted_params(ExtractedParams(), cursor="not-a-cursor")
+
+
+class TestBuildJsonQuery:
+    """Tests for Postgres-side JSON assembly."""
+
+    def test_wraps_search_query(self):
+        """Test that the search query becomes a subquery aggregated into a JSON array."""
+        query, params = query_builder.build_from_manual_filters(ManualSearchFilters(asset_type="FX"))
+        json_query = query_builder.build_json_query(query, "update_time")
+
+        assert f"FROM ({query}) AS t" in json_query
+        assert "'trade_id', t.id" in json_query
+        assert "ORDER BY t.update_time DESC, t.id DESC" in json_query
+        assert "'[]'::json" in json_query
+        assert query_builder.validate_query_safety(json_query, params) is True
+
+    def test_timestamp_format_matches_trade_model(self):
+        """Test that timestamps use the same ISO shape as Trade.from_db_record."""
+        json_query = query_builder.build_json_query("SELECT * FROM trades WHERE 1=1", "create_time")
+
+        assert """to_char(t.create_time, 'YYYY-MM-DD"T"HH24:MI:SS"Z"')""" in json_query
+        assert "ORDER BY t.create_time DESC" in json_query
+
+
+class TestBuildRankedQuery:
+    """Tests for the single-round-trip ranked search query."""
+
+    def test_lateral_transaction_count(self):
+        """Test that transaction counts are joined per row without losing the search query."""
+        query, params = query_builder.build_from_extracted_params(ExtractedParams(statuses=["ALLEGED"]))
+        ranked_query = query_builder.build_ranked_query(query, "update_time")
+
+        assert f"FROM ({query}) AS t" in ranked_query
+        assert "CROSS JOIN LATERAL" in ranked_query
+        assert "WHERE tr.trade_id = t.id" in ranked_query
+        assert "ORDER BY t.update_time DESC, t.id DESC" in ranked_query
+        assert query_builder.validate_query_safety(ranked_query, params) is True
+
+
+class TestScoreRankedQuery:
+    """Tests for ranking pushed down into SQL."""
+
+    def test_orders_by_relevance_before_limit(self):
+        """Test that every match is scored and the limit applies after ordering by score."""
+        sql_score = TradeRanker().compile_sql_score()
+        query, params = query_builder.build_from_manual_filters(
+            ManualSearchFilters(asset_type="FX"), sql_score=sql_score
+        )
+
+        assert "AS relevance_score" in query
+        assert "ORDER BY relevance_score DESC, t.update_time DESC, t.id DESC" in query
+        assert query.count("LIMIT") == 1
+        assert params[-len(sql_score.params) :] == sql_score.params
+        assert query_builder.validate_query_safety(query, params) is True
+
+    def test_trade_id_lookup_is_wrapped(self):
+        """Test that the exact trade_id lookup keeps the same result shape."""
+        sql_score = TradeRanker().compile_sql_score()
+        query, params = query_builder.build_from_extracted_params(ExtractedParams(trade_id=42), sql_score=sql_score)
+
+        assert "LIMIT 1" in query
+        assert "relevance_score" in query
+        assert params[0] == 42
+        assert query_builder.validate_query_safety(query, params) is True
+
+    def test_rejects_pagination(self):
+        """Test that SQL relevance ordering cannot be combined with keyset pagination."""
+        with pytest.raises(InvalidSearchRequestError):
+            query_builder.build_from_manual_filters(
+                ManualSearchFilters(), page_size=10, sql_score=TradeRanker().compile_sql_score()
+            )
+
+    def test_json_query_keeps_score_order(self):
+        """Test that JSON assembly orders by relevance for score-ranked queries."""
+        json_query = query_builder.build_json_query("SELECT * FROM trades WHERE 1=1", "update_time", ranked=True)
+
+        assert "ORDER BY t.relevance_score DESC, t.update_time DESC, t.id DESC" in json_query
+
+
+class TestBuildEstimateQuery:
+    """Tests for the planner row-estimate query."""
+
+    def test_explains_same_where_clause(self):
+        """Test that the estimate query explains the search's WHERE clause without ORDER BY/LIMIT."""
+        query, params = query_builder.build_from_manual_filters(ManualSearchFilters(asset_type="FX"))
+        estimate_query = query_builder.build_estimate_query(query)
+
+        assert estimate_query.startswith("EXPLAIN (FORMAT JSON) SELECT 1 FROM trades")
+        assert "asset_type" in estimate_query
+        assert "ORDER BY" not in estimate_query
+        assert query_builder.build_count_query(query).endswith(estimate_query.split("FROM trades", 1)[1])
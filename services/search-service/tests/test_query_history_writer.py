@@ -0,0 +1,175 @@
+"""
+Unit tests for write-behind query history batching.
+Tests id pre-allocation, batched COPY flushes, retry on failure and waiting for other replicas' ids.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import asyncpg
+import pytest
+
+from app.services.query_history_service import QueryHistoryService
+from app.services.query_history_writer import QueryHistoryWriter
+
+
+def make_writer(first_id: int = 100000, **kwargs) -> tuple[QueryHistoryWriter, AsyncMock]:
+    """Writer over a fake database whose sequence starts at first_id; returns (writer, connection)."""
+    writer = QueryHistoryWriter(**{"batch_size": 3, "flush_interval": 60, "id_block_size": 4, **kwargs})
+    next_id = first_id
+
+    async def fetch(query, count):
+        nonlocal next_id
+        rows = [(next_id + offset,) for offset in range(count)]
+        next_id += count
+        return rows
+
+    conn = AsyncMock()
+
+    @asynccontextmanager
+    async def acquire():
+        yield conn
+
+    writer.db = MagicMock()
+    writer.db.fetch = AsyncMock(side_effect=fetch)
+    writer.db.acquire = acquire
+    return writer, conn
+
+
+class TestIdAllocation:
+    """Ids come from pre-allocated sequence blocks."""
+
+    @pytest.mark.asyncio
+    async def test_ids_are_sequential_across_blocks(self):
+        """Test that one nextval round trip serves a whole block of ids."""
+        writer, _ = make_writer()
+
+        ids = [await writer.enqueue("user", f"query {n}") for n in range(6)]
+
+        assert ids == [100000, 100001, 100002, 100003, 100004, 100005]
+        assert writer.db.fetch.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_enqueue_does_not_touch_the_table(self):
+        """Test that saving only buffers the row until a flush."""
+        writer, conn = make_writer()
+
+        await writer.enqueue("user", "rejected trades")
+
+        conn.copy_records_to_table.assert_not_awaited()
+        assert writer.stats()["pending"] == 1
+
+
+class TestFlush:
+    """Batched writes."""
+
+    @pytest.mark.asyncio
+    async def test_flush_copies_buffered_rows(self):
+        """Test that pending rows are written with one COPY using their reserved ids."""
+        writer, conn = make_writer()
+        await writer.enqueue("alice", "fx trades")
+        await writer.enqueue("bob", "irs trades")
+
+        assert await writer.flush() == 2
+
+        args = conn.copy_records_to_table.await_args
+        records = args.kwargs["records"]
+        assert records == [(100000, "alice", "fx trades"), (100001, "bob", "irs trades")]
+        assert args.kwargs["columns"] == ("id", "user_id", "query_text")  # Timestamps default in the database
+        assert writer.stats()["pending"] == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_requeues_rows(self):
+        """Test that a connection failure keeps the rows for the next flush."""
+        writer, conn = make_writer()
+        conn.copy_records_to_table.side_effect = [ConnectionError("db down"), None]
+        await writer.enqueue("alice", "fx trades")
+
+        assert await writer.flush() == 0
+        assert writer.stats()["pending"] == 1
+
+        await writer.enqueue("bob", "irs trades")
+        assert await writer.flush() == 2
+        assert [r[0] for r in conn.copy_records_to_table.await_args.kwargs["records"]] == [100000, 100001]
+
+    @pytest.mark.asyncio
+    async def test_requeue_is_bounded(self):
+        """Test that the oldest rows are dropped once max_pending is exceeded."""
+        writer, conn = make_writer(max_pending=2)
+        conn.copy_records_to_table.side_effect = ConnectionError("db down")
+        for n in range(3):
+            await writer.enqueue("user", f"query {n}")
+
+        await writer.flush()
+
+        stats = writer.stats()
+        assert (stats["pending"], stats["dropped"]) == (2, 1)
+
+    @pytest.mark.asyncio
+    async def test_rejected_copy_falls_back_to_row_inserts(self):
+        """Test that a rejected batch is retried row by row, skipping rows that already exist."""
+        writer, conn = make_writer()
+        conn.copy_records_to_table.side_effect = asyncpg.UniqueViolationError("duplicate key")
+        conn.execute.side_effect = [asyncpg.UniqueViolationError("duplicate key"), "INSERT 0 1"]
+        await writer.enqueue("alice", "fx trades")
+        await writer.enqueue("bob", "irs trades")
+
+        assert await writer.flush() == 1
+        assert conn.execute.await_count == 2
+        assert writer.stats()["pending"] == 0
+
+
+class TestLifecycle:
+    """Background flushing and shutdown."""
+
+    @pytest.mark.asyncio
+    async def test_full_batch_wakes_flusher_and_stop_drains(self):
+        """Test that reaching batch_size triggers a flush and stop() writes the remainder."""
+        writer, conn = make_writer(batch_size=2)
+        writer.start()
+        await writer.enqueue("user", "one")
+        await writer.enqueue("user", "two")
+        for _ in range(10):
+            if conn.copy_records_to_table.await_count:
+                break
+            await asyncio.sleep(0.01)
+        assert conn.copy_records_to_table.await_count == 1
+
+        await writer.enqueue("user", "three")
+        await writer.stop()
+
+        assert conn.copy_records_to_table.await_count == 2
+        assert writer.stats()["written"] == 3
+        assert not writer.running
+
+
+class TestOtherReplicaIds:
+    """Saves for ids still buffered by another replica."""
+
+    @pytest.mark.asyncio
+    async def test_ownership_check_waits_for_reserved_id(self):
+        """Test that a reserved id missing from the table is polled for until the other replica flushes."""
+        db = MagicMock()
+        db.fetchrow = AsyncMock(side_effect=[None, None, {"user_id": "alice"}])
+        db.fetchval = AsyncMock(return_value=True)  # Id handed out by the sequence
+
+        with (
+            patch("app.services.query_history_service.db_manager", db),
+            patch("app.services.query_history_service.settings.HISTORY_FLUSH_INTERVAL_SECONDS", 0.01),
+        ):
+            await QueryHistoryService()._verify_ownership(100005, "alice")
+
+        assert db.fetchrow.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_unreserved_id_is_not_found_immediately(self):
+        """Test that an id the sequence never handed out is reported missing without waiting."""
+        db = MagicMock()
+        db.fetchrow = AsyncMock(return_value=None)
+        db.fetchval = AsyncMock(return_value=False)
+
+        with patch("app.services.query_history_service.db_manager", db):
+            assert await QueryHistoryService()._fetch_owner(999999999) is None
+
+        db.fetchrow.assert_awaited_once()
@@ -3,9 +3,11 @@ Unit tests for Trade Ranking Service
 Tests the intelligent relevance scoring algorithm and configuration management.
 """
 
+import asyncio
 import json
 from datetime import datetime, timedelta, timezone
 
+import numpy as np
 import pytest
 
 from app.models.domain import Trade
@@ -95,6 +97,30 @@ class TestRankingConfig:
         # Should load with warning, not fail
         assert config.is_enabled()
 
+    @pytest.mark.asyncio
+    async def test_watcher_reloads_on_change(self, tmp_path):
+        """Test that the file watcher reloads the config without a per-call stat()."""
+        config_file = tmp_path / "ranking_config.json"
+        with open(config_file, "w", encoding="utf-8") as f:
+            json.dump({"ranking_enabled": True}, f)  # Invalid -> defaults, but still loaded
+        config = RankingConfig(config_path=str(config_file))
+        version = config.version
+
+        config.start_watching()
+        try:
+            await asyncio.sleep(0.2)
+            with open(config_file, "w", encoding="utf-8") as f:
+                json.dump({"ranking_enabled": False}, f)
+
+            for _ in range(100):
+                if config.version > version:
+                    break
+                await asyncio.sleep(0.1)
+        finally:
+            await config.stop_watching()
+
+        assert config.version > version
+
     def test_disable_ranking_via_config(self, tmp_path):
         """Test disabling ranking through configuration."""
         disabled_config = {
@@ -201,6 +227,50 @@ class TestTradeRanker:
         # Trade 1 (CLEARED) should rank last
         assert ranked[-1].trade_id == 1
 
+    def test_rank_trades_with_aligned_transaction_counts(self, ranker, sample_trades):
+        """Test that positional transaction counts rank the same as enriched_data."""
+        enriched_data = {1: {"transaction_count": 3}, 2: {"transaction_count": 8}, 3: {"transaction_count": 5}}
+
+        by_dict = ranker.rank_trades(sample_trades, enriched_data)
+        by_counts = ranker.rank_trades(sample_trades, transaction_counts=[3, 8, 5])
+
+        assert [t.trade_id for t in by_counts] == [t.trade_id for t in by_dict]
+
+    def test_score_batch_matches_per_trade_scoring(self, ranker, sample_trades):
+        """Test that vectorised scores equal the per-trade scoring functions."""
+        counts = [0, 12, 3]
+        expected = [
+            ranker._calculate_relevance_score(trade, {"transaction_count": count})
+            for trade, count in zip(sample_trades, counts, strict=True)
+        ]
+
+        scores = ranker.score_batch(sample_trades, counts)
+
+        assert np.allclose(scores, expected, atol=1e-3)
+
+    def test_sql_score_recompiled_after_reload(self, tmp_path):
+        """Test that the compiled SQL score is cached per config version and rebuilt on reload."""
+        config = {
+            "weights": {"status_urgency": 0.4, "recency": 0.3, "transaction_volume": 0.2, "asset_type_risk": 0.1},
+            "status_priority": {"REJECTED": 100, "CLEARED": 25},
+            "asset_type_priority": {"CDS": 100, "FX": 70},
+        }
+        config_file = tmp_path / "ranking_config.json"
+        config_file.write_text(json.dumps(config))
+        ranker = TradeRanker(RankingConfig(str(config_file)))
+
+        first = ranker.compile_sql_score()
+        assert ranker.compile_sql_score() is first
+        assert first.config_row_sql(3).startswith("SELECT $3::jsonb AS status_priority")
+
+        config["weights"]["status_urgency"] = 0.9
+        config_file.write_text(json.dumps(config))
+        ranker.config.load()
+        second = ranker.compile_sql_score()
+
+        assert second is not first
+        assert 0.9 in second.params
+
     def test_status_urgency_scoring(self, ranker):
         """Test status urgency scoring."""
         assert ranker._score_status_urgency("REJECTED") > ranker._score_status_urgency("ALLEGED")
@@ -0,0 +1,100 @@
+"""
+Unit tests for the rule-based NL parser.
+Tests confident extraction, date phrases and fallback to the LLM.
+"""
+
+from datetime import datetime
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.services.rule_parser import RuleBasedParser
+
+TODAY = datetime(2025, 1, 22)  # A Wednesday
+
+
+@pytest.fixture
+def parser():
+    """Parser with a fixed filter-value vocabulary."""
+    parser = RuleBasedParser()
+    parser.options_service = AsyncMock()
+    parser.options_service.get_options.return_value = {
+        "accounts": ["ACC012345"],
+        "asset_types": ["BOND", "CDS", "EQUITY", "FX", "IRS"],
+        "booking_systems": ["HIGHGARDEN", "WINTERFELL"],
+        "affirmation_systems": ["TRAI"],
+        "clearing_houses": ["LCH", "DTCC"],
+        "statuses": ["ALLEGED", "CANCELLED", "CLEARED", "REJECTED"],
+    }
+    return parser
+
+
+class TestConfidentQueries:
+    """Queries fully covered by known vocabulary."""
+
+    @pytest.mark.asyncio
+    async def test_filters_and_relative_dates(self, parser):
+        """Test the canonical "cleared FX trades at LCH last week" query."""
+        params = await parser.parse("cleared FX trades at LCH last week", TODAY)
+
+        assert params.statuses == ["CLEARED"]
+        assert params.asset_types == ["FX"]
+        assert params.clearing_houses == ["LCH"]
+        assert (params.date_from, params.date_to) == ("2025-01-15", "2025-01-22")
+
+    @pytest.mark.asyncio
+    async def test_bare_trade_id(self, parser):
+        """Test that a bare trade id needs no vocabulary at all."""
+        params = await parser.parse(" 10001234 ", TODAY)
+
+        assert params.trade_id == 10001234
+        parser.options_service.get_options.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_prompt_examples(self, parser):
+        """Test extraction prompt examples that only use known values."""
+        pending = await parser.parse("show me pending FX trades from last week", TODAY)
+        assert pending.statuses == ["ALLEGED"] and pending.asset_types == ["FX"]
+
+        exceptions = await parser.parse("show me trades with exceptions from WINTERFELL", TODAY)
+        assert exceptions.with_exceptions_only is True
+        assert exceptions.booking_systems == ["WINTERFELL"]
+        assert exceptions.statuses is None
+
+        plural = await parser.parse("rejected bonds and equities for ACC012345", TODAY)
+        assert plural.asset_types == ["BOND", "EQUITY"]
+        assert plural.accounts == ["ACC012345"]
+
+    @pytest.mark.asyncio
+    async def test_iso_date_range(self, parser):
+        """Test explicit ISO date ranges."""
+        params = await parser.parse("IRS trades from 2025-01-01 to 2025-01-15", TODAY)
+
+        assert (params.date_from, params.date_to) == ("2025-01-01", "2025-01-15")
+
+
+class TestFallback:
+    """Queries the parser must leave to the LLM."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "query",
+        [
+            "FX trades not cleared at LCH",
+            "trades that look suspicious",
+            "FX trades from Jan 1 to Jan 15 2025",
+            "FX trades yesterday and last week",
+            "show me all trades",
+            "trade 10001234 at LCH",
+        ],
+    )
+    async def test_declines(self, parser, query):
+        """Test that unknown words, unsupported dates or empty filters return None."""
+        assert await parser.parse(query, TODAY) is None
+
+    @pytest.mark.asyncio
+    async def test_vocabulary_unavailable(self, parser):
+        """Test that a failed vocabulary load falls back to the LLM."""
+        parser.options_service.get_options.side_effect = RuntimeError("db down")
+
+        assert await parser.parse("cleared FX trades", TODAY) is None
@@ -0,0 +1,130 @@
+"""
+Unit tests for the search result cache.
+Tests key canonicalisation, predicate matching and targeted invalidation.
+"""
+
+import time
+from datetime import datetime
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.cache.search_cache import SearchResultCache, TradePredicate
+from app.models.domain import ExtractedParams
+from app.models.request import ManualSearchFilters
+
+
+def _row(**overrides):
+    row = {
+        "id": 1001,
+        "account": "ACC001",
+        "asset_type": "FX",
+        "booking_system": "HIGHGARDEN",
+        "affirmation_system": "TRAI",
+        "clearing_house": "LCH",
+        "create_time": datetime(2025, 1, 10, 9, 0),
+        "update_time": datetime(2025, 1, 15, 12, 0),
+        "status": "CLEARED",
+    }
+    row.update(overrides)
+    return row
+
+
+class TestCacheKey:
+    """Tests for canonical cache key generation."""
+
+    def test_whitespace_insensitive(self):
+        """Test that SQL whitespace differences share one cache key."""
+        cache = SearchResultCache()
+        a = cache.build_hash("SELECT *\n   FROM trades WHERE account = $1", ["ACC001"])
+        b = cache.build_hash("SELECT * FROM trades WHERE account = $1", ["ACC001"])
+        assert a == b
+
+    def test_params_change_key(self):
+        """Test that different bound params produce different keys."""
+        cache = SearchResultCache()
+        a = cache.build_hash("SELECT * FROM trades WHERE account = $1", ["ACC001"])
+        b = cache.build_hash("SELECT * FROM trades WHERE account = $1", ["ACC002"])
+        assert a != b
+
+
+class TestTradePredicate:
+    """Tests for Python-side predicate evaluation."""
+
+    def test_manual_filters_match(self):
+        """Test manual filter predicate against matching and non-matching rows."""
+        predicate = TradePredicate.from_manual_filters(
+            ManualSearchFilters(
+                asset_type="FX", status=["CLEARED", "ALLEGED"], date_from="2025-01-15", date_to="2025-01-15"
+            )
+        )
+        assert predicate.matches(_row())
+        assert not predicate.matches(_row(asset_type="IRS"))
+        assert not predicate.matches(_row(update_time=datetime(2025, 1, 16, 0, 0)))
+
+    def test_create_time_date_type(self):
+        """Test that date_type selects the column used for date bounds."""
+        predicate = TradePredicate.from_manual_filters(
+            ManualSearchFilters(date_type="create_time", date_from="2025-01-11", status=[])
+        )
+        assert not predicate.matches(_row())
+
+    def test_cleared_only_intersects_status(self):
+        """Test cleared_trades_only combined with a conflicting status list."""
+        predicate = TradePredicate.from_extracted_params(
+            ExtractedParams(statuses=["ALLEGED"], cleared_trades_only=True)
+        )
+        assert not predicate.matches(_row(status="ALLEGED"))
+        assert not predicate.matches(_row(status="CLEARED"))
+
+    def test_trade_id_lookup(self):
+        """Test trade_id exact lookup ignores other extracted filters."""
+        predicate = TradePredicate.from_extracted_params(ExtractedParams(trade_id=1001, accounts=["OTHER"]))
+        assert predicate.matches(_row())
+        assert not predicate.matches(_row(id=1002))
+
+    def test_round_trip(self):
+        """Test predicate survives serialisation to the cache index."""
+        predicate = TradePredicate.from_extracted_params(ExtractedParams(accounts=["ACC001"], date_from="2025-01-01"))
+        assert TradePredicate.from_dict(predicate.to_dict()).matches(_row())
+
+
+class TestInvalidation:
+    """Tests for targeted eviction on trade change."""
+
+    @pytest.mark.asyncio
+    async def test_evicts_only_affected_entries(self):
+        """Test that only entries containing or matching the trade are evicted."""
+        cache = SearchResultCache()
+        future = time.time() + 60
+        fx_predicate = TradePredicate.from_extracted_params(ExtractedParams(asset_types=["FX"]))
+        irs_predicate = TradePredicate.from_extracted_params(ExtractedParams(asset_types=["IRS"]))
+
+        redis = AsyncMock()
+        redis.hgetall.return_value = {
+            "fx": {"predicate": fx_predicate.to_dict(), "trade_ids": [], "expires_at": future},
+            "irs": {"predicate": irs_predicate.to_dict(), "trade_ids": [], "expires_at": future},
+            "irs_containing": {"predicate": irs_predicate.to_dict(), "trade_ids": [1001], "expires_at": future},
+            "expired": {"predicate": fx_predicate.to_dict(), "trade_ids": [], "expires_at": 0},
+        }
+        cache.cache = redis
+
+        evicted = await cache.invalidate_trade(1001, _row())
+
+        assert evicted == 2
+        deleted_keys = {call.args[0] for call in redis.delete.await_args_list}
+        assert deleted_keys == {"search:results:fx", "search:results:irs_containing"}
+        assert set(redis.hdel.await_args.args[1:]) == {"fx", "irs_containing", "expired"}
+
+    @pytest.mark.asyncio
+    async def test_unknown_row_evicts_conservatively(self):
+        """Test that an unreadable trade row evicts every live entry."""
+        cache = SearchResultCache()
+        predicate = TradePredicate.from_extracted_params(ExtractedParams(asset_types=["IRS"]))
+        redis = AsyncMock()
+        redis.hgetall.return_value = {
+            "irs": {"predicate": predicate.to_dict(), "trade_ids": [], "expires_at": time.time() + 60},
+        }
+        cache.cache = redis
+
+        assert await cache.invalidate_trade(1001, None) == 1
@@ -0,0 +1,70 @@
+"""
+Unit tests for the search count strategy.
+Tests exact vs estimated totals and the per-filter estimate cache.
+"""
+
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.config.settings import settings
+from app.models.request import ManualSearchFilters
+from app.services.query_builder import query_builder
+from app.services.search_count_service import SearchCountService
+
+
+def _service(estimate, exact=None, cached=None):
+    """Count service whose EXPLAIN returns estimate and whose COUNT(*) returns exact."""
+    service = SearchCountService()
+    plan = [{"Plan": {"Node Type": "Seq Scan", "Plan Rows": estimate}}]
+    service.db = AsyncMock()
+    service.db.fetchval.side_effect = [plan, exact]
+    service.cache = AsyncMock()
+    service.cache.get.return_value = cached
+    return service
+
+
+@pytest.fixture
+def search_query():
+    """Build a manual-filter search query and its params."""
+    return query_builder.build_from_manual_filters(ManualSearchFilters(asset_type="FX"))
+
+
+class TestSearchCountService:
+    """Tests for SearchCountService.count."""
+
+    @pytest.mark.asyncio
+    async def test_small_estimate_counts_exactly(self, search_query):
+        """Test that a small estimate is replaced by an exact COUNT(*)."""
+        service = _service(estimate=120, exact=117)
+
+        assert await service.count(*search_query) == (117, True)
+        count_call = service.db.fetchval.await_args_list[1]
+        assert count_call.args[0].startswith("SELECT COUNT(*) FROM trades")
+        service.cache.set.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_broad_estimate_is_cached(self, search_query):
+        """Test that a broad filter reports the planner estimate and caches it."""
+        estimate = settings.SEARCH_EXACT_COUNT_THRESHOLD + 1
+        service = _service(estimate=estimate)
+
+        assert await service.count(*search_query) == (estimate, False)
+        assert service.db.fetchval.await_count == 1
+        assert service.cache.set.await_args.args[1] == estimate
+
+    @pytest.mark.asyncio
+    async def test_cached_estimate_skips_database(self, search_query):
+        """Test that a cached estimate is served without touching the database."""
+        service = _service(estimate=0, cached=250000)
+
+        assert await service.count(*search_query) == (250000, False)
+        service.db.fetchval.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_database_error_returns_none(self, search_query):
+        """Test that a failed count never fails the search."""
+        service = _service(estimate=0)
+        service.db.fetchval.side_effect = RuntimeError("boom")
+
+        assert await service.count(*search_query) is None
@@ -0,0 +1,72 @@
+"""
+Unit tests for SearchOrchestrator's SQL JSON assembly path.
+Tests the JSON result cache and error mapping for execute_search_json.
+"""
+
+import json
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.models.request import SearchRequest
+from app.services.search_orchestrator import SearchOrchestrator
+from app.utils.exceptions import DatabaseQueryError
+
+
+@pytest.fixture
+def orchestrator():
+    """Orchestrator over mocked database, history, result cache and count service."""
+    orchestrator = SearchOrchestrator()
+    orchestrator.db = AsyncMock()
+    orchestrator.history = AsyncMock()
+    orchestrator.history.save_query.return_value = 5
+    orchestrator.result_cache = AsyncMock()
+    orchestrator.result_cache.get_json.return_value = None
+    orchestrator.count_service = AsyncMock()
+    orchestrator.count_service.count.return_value = None
+    return orchestrator
+
+
+@pytest.fixture
+def request_model():
+    """Manual FX search."""
+    return SearchRequest(user_id="alice", search_type="manual", filters={"asset_type": "FX"})
+
+
+class TestExecuteSearchJson:
+    """SearchOrchestrator.execute_search_json."""
+
+    @pytest.mark.asyncio
+    async def test_database_error_is_wrapped(self, orchestrator, request_model):
+        """Test that a failing JSON query raises DatabaseQueryError like the regular path."""
+        orchestrator.db.fetchrow.side_effect = RuntimeError("connection reset")
+
+        with pytest.raises(DatabaseQueryError):
+            await orchestrator.execute_search_json(request_model)
+
+    @pytest.mark.asyncio
+    async def test_miss_caches_assembled_json(self, orchestrator, request_model):
+        """Test that a cache miss runs the JSON query and stores its text with the returned trade ids."""
+        orchestrator.db.fetchrow.return_value = {"results": '[{"trade_id":7}]', "trade_ids": [7]}
+
+        body = await orchestrator.execute_search_json(request_model)
+
+        response = json.loads(body)
+        assert response["results"] == [{"trade_id": 7}]
+        assert response["cached"] is False
+        json_query, params, predicate, results_json, trade_ids = orchestrator.result_cache.set_json.await_args.args
+        assert json_query == orchestrator.db.fetchrow.await_args.args[0]
+        assert predicate.allowed == {"asset_type": ["FX"]}
+        assert (results_json, trade_ids) == ('[{"trade_id":7}]', [7])
+
+    @pytest.mark.asyncio
+    async def test_hit_skips_database(self, orchestrator, request_model):
+        """Test that a cached JSON result is served without running the search query."""
+        orchestrator.result_cache.get_json.return_value = ('[{"trade_id":7},{"trade_id":8}]', 2)
+
+        response = json.loads(await orchestrator.execute_search_json(request_model))
+
+        orchestrator.db.fetchrow.assert_not_awaited()
+        assert response["cached"] is True
+        assert response["total_results"] == 2
+        assert [row["trade_id"] for row in response["results"]] == [7, 8]
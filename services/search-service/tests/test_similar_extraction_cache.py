@@ -0,0 +1,111 @@
+"""
+Unit tests for the near-duplicate extraction cache.
+Tests reworded/misspelt hits, the content-word guard, eviction and day scoping.
+"""
+
+from datetime import datetime
+
+import pytest
+
+from app.models.domain import ExtractedParams
+from app.services.similar_extraction_cache import SimilarExtractionCache
+
+TODAY = datetime(2025, 1, 22)
+
+REJECTED_FX = ExtractedParams(asset_types=["FX"], statuses=["REJECTED"], date_from="2025-01-21", date_to="2025-01-21")
+
+
+@pytest.fixture
+def cache():
+    """Cache holding one extraction, with the default threshold."""
+    cache = SimilarExtractionCache(threshold=0.75, max_entries=8)
+    cache.add("show rejected FX trades from yesterday", REJECTED_FX, TODAY)
+    return cache
+
+
+class TestLookup:
+    """Near matches and the guard against confidently wrong reuse."""
+
+    @pytest.mark.parametrize(
+        "query",
+        [
+            "show rejected FX trades from yesterday",
+            "Rejected fx trades yesterday",
+            "yesterday's rejected FX trades",
+            "show me rejectd FX trades from yesterday",
+        ],
+    )
+    def test_rewordings_hit(self, cache, query):
+        """Test that reordered, filler-only and misspelt variants reuse the extraction."""
+        match = cache.lookup(query, TODAY)
+
+        assert match is not None
+        params, similarity = match
+        assert params == REJECTED_FX
+        assert similarity >= cache.threshold
+
+    @pytest.mark.parametrize(
+        "query",
+        [
+            "show rejected IRS trades from yesterday",  # Different short value
+            "show cleared FX trades from yesterday",  # Different status
+            "show rejected FX trades from today",  # Different date word
+            "show rejected FX trades from yesterday for ACC012345",  # Extra filter
+            "show rejected FX trades not from yesterday",  # Negation
+            "show rejected FX trades",  # Missing filter
+        ],
+    )
+    def test_different_filters_miss(self, cache, query):
+        """Test that queries naming different filter values are never served the cached params."""
+        assert cache.lookup(query, TODAY) is None
+
+    def test_status_synonyms_match(self):
+        """Test that "pending" and "alleged" are treated as the same word."""
+        cache = SimilarExtractionCache(threshold=0.75, max_entries=8)
+        cache.add("alleged trades at LCH", ExtractedParams(statuses=["ALLEGED"], clearing_houses=["LCH"]), TODAY)
+
+        assert cache.lookup("pending trades at LCH", TODAY) is not None
+
+    def test_threshold_is_tunable(self):
+        """Test that a stricter threshold turns a typo hit into a miss."""
+        strict = SimilarExtractionCache(threshold=0.99, max_entries=8)
+        strict.add("show rejected FX trades from yesterday", REJECTED_FX, TODAY)
+
+        assert strict.lookup("show me rejectd FX trades from yesterday", TODAY) is None
+        assert strict.lookup("rejected FX trades yesterday", TODAY) is not None
+
+    def test_returned_params_are_copies(self, cache):
+        """Test that mutating a hit does not change the cached extraction."""
+        params, _ = cache.lookup("rejected FX trades yesterday", TODAY)
+        params.asset_types.append("IRS")
+
+        assert cache.lookup("rejected FX trades yesterday", TODAY)[0] == REJECTED_FX
+
+
+class TestIndexLifecycle:
+    """Bounded size and per-day scoping."""
+
+    def test_oldest_entry_evicted_when_full(self):
+        """Test that the index keeps only the most recent max_entries queries."""
+        cache = SimilarExtractionCache(threshold=0.75, max_entries=2)
+        cache.add("rejected FX trades", ExtractedParams(asset_types=["FX"]), TODAY)
+        cache.add("rejected IRS trades", ExtractedParams(asset_types=["IRS"]), TODAY)
+        cache.add("rejected CDS trades", ExtractedParams(asset_types=["CDS"]), TODAY)
+
+        assert cache.lookup("rejected FX trades", TODAY) is None
+        assert cache.lookup("rejected IRS trades", TODAY)[0].asset_types == ["IRS"]
+        assert cache.lookup("rejected CDS trades", TODAY)[0].asset_types == ["CDS"]
+        assert cache.stats()["size"] == 2
+
+    def test_entries_dropped_when_day_changes(self, cache):
+        """Test that extractions with resolved relative dates are not reused the next day."""
+        assert cache.lookup("rejected FX trades yesterday", datetime(2025, 1, 23)) is None
+        assert cache.stats()["size"] == 0
+
+    def test_stats_count_hits_and_misses(self, cache):
+        """Test hit-rate accounting."""
+        cache.lookup("rejected FX trades yesterday", TODAY)
+        cache.lookup("cleared IRS trades", TODAY)
+
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
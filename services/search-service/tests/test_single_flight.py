@@ -0,0 +1,108 @@
+"""
+Unit tests for single-flight request coalescing.
+Tests in-process sharing, error propagation and the cross-replica lock fallback.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.cache.single_flight import SingleFlight
+
+
+def _no_redis():
+    """Redis manager whose client is not connected (in-process coalescing only)."""
+    cache = MagicMock()
+    cache.client.lock.side_effect = RuntimeError("Redis client not initialized")
+    return cache
+
+
+class TestInProcess:
+    """Tests for coalescing within one process."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_call(self):
+        """Test that concurrent callers for one key trigger a single computation."""
+        flight = SingleFlight()
+        flight.cache = _no_redis()
+        calls = 0
+
+        async def compute():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "params"
+
+        results = await asyncio.gather(*(flight.run("k", compute, AsyncMock(return_value=None)) for _ in range(30)))
+
+        assert results == ["params"] * 30
+        assert calls == 1
+        assert flight.stats()["coalesced"] == 29
+
+    @pytest.mark.asyncio
+    async def test_error_reaches_every_waiter_and_clears_key(self):
+        """Test that a failed computation fails all waiters and the next call retries."""
+        flight = SingleFlight()
+        flight.cache = _no_redis()
+        compute = AsyncMock(side_effect=[ValueError("llm down"), "params"])
+
+        results = await asyncio.gather(
+            flight.run("k", compute, AsyncMock(return_value=None)),
+            flight.run("k", compute, AsyncMock(return_value=None)),
+            return_exceptions=True,
+        )
+
+        assert all(isinstance(result, ValueError) for result in results)
+        assert await flight.run("k", compute, AsyncMock(return_value=None)) == "params"
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_others(self):
+        """Test that one caller disconnecting leaves the shared computation running."""
+        flight = SingleFlight()
+        flight.cache = _no_redis()
+
+        async def compute():
+            await asyncio.sleep(0.02)
+            return "params"
+
+        first = asyncio.create_task(flight.run("k", compute, AsyncMock(return_value=None)))
+        second = asyncio.create_task(flight.run("k", compute, AsyncMock(return_value=None)))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        assert await second == "params"
+
+
+class TestCrossReplica:
+    """Tests for the Redis lock path."""
+
+    @pytest.mark.asyncio
+    async def test_lock_loser_waits_for_cached_result(self):
+        """Test that a replica losing the lock is served from the cache the leader fills."""
+        flight = SingleFlight(wait_timeout=1.0)
+        flight.POLL_INTERVAL_SECONDS = 0.001
+        lock = MagicMock()
+        lock.acquire = AsyncMock(return_value=False)
+        flight.cache = MagicMock()
+        flight.cache.client.lock.return_value = lock
+        compute = AsyncMock()
+
+        result = await flight.run("k", compute, AsyncMock(side_effect=[None, "from-other-replica"]))
+
+        assert result == "from-other-replica"
+        compute.assert_not_awaited()
+        assert flight.stats()["remote_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_lock_winner_computes_and_releases(self):
+        """Test that the lock holder computes once and releases the lock."""
+        flight = SingleFlight()
+        lock = MagicMock()
+        lock.acquire = AsyncMock(return_value=True)
+        lock.release = AsyncMock()
+        flight.cache = MagicMock()
+        flight.cache.client.lock.return_value = lock
+
+        assert await flight.run("k", AsyncMock(return_value="params"), AsyncMock(return_value=None)) == "params"
+        lock.release.assert_awaited_once()
@@ -0,0 +1,68 @@
+"""
+Unit tests for the statement cache counters on DatabaseManager.
+Tests hit/miss counting against the connection's statement cache and (integration) asyncpg's cache key.
+"""
+
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.database.connection import DatabaseManager, db_manager
+
+
+def _manager(cached: set[str]) -> DatabaseManager:
+    """DatabaseManager over one mocked pooled connection whose statement cache holds the cached queries."""
+    conn = AsyncMock()
+    conn._protocol.get_record_class = MagicMock(return_value="Record")
+    keys = {(query, "Record", False) for query in cached}  # asyncpg's (query, record_class, ignore_custom_codec)
+    conn._con._stmt_cache.has = MagicMock(side_effect=keys.__contains__)
+
+    @asynccontextmanager
+    async def acquire():
+        yield conn
+
+    manager = DatabaseManager()
+    manager.acquire = acquire
+    return manager
+
+
+class TestStatementCacheCounters:
+    """DatabaseManager.statement_cache_stats."""
+
+    @pytest.mark.asyncio
+    async def test_counts_hits_and_misses(self):
+        """Test that queries already prepared on the connection count as hits and the rest as misses."""
+        manager = _manager(cached={"SELECT * FROM trades WHERE id = $1"})
+
+        await manager.fetch("SELECT * FROM trades WHERE id = $1", 1)
+        await manager.fetchrow("SELECT * FROM trades WHERE id = $1", 2)
+        await manager.fetchval("SELECT count(*) FROM trades")
+
+        with patch("app.database.connection.settings.DB_STATEMENT_CACHE_SIZE", 256):
+            assert manager.statement_cache_stats() == {"hits": 2, "misses": 1, "hit_rate": 0.6667, "max_size": 256}
+
+    def test_no_lookups_reports_zero_rate(self):
+        """Test that the stats are well-defined before any query has run."""
+        assert DatabaseManager().statement_cache_stats()["hit_rate"] == 0.0
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+class TestStatementCacheOnPostgres:
+    """The counters against asyncpg's real per-connection statement cache."""
+
+    async def test_repeated_query_is_a_hit(self, db_connection):
+        """Test that the second run of a query on the same pooled connection is counted as a hit."""
+        with (
+            patch("app.database.connection.settings.DB_POOL_MIN_SIZE", 1),
+            patch("app.database.connection.settings.DB_POOL_MAX_SIZE", 1),
+        ):
+            await db_manager.disconnect()
+            await db_manager.connect()
+        db_manager.statement_cache_hits = db_manager.statement_cache_misses = 0
+
+        for _ in range(3):
+            assert await db_manager.fetchval("SELECT $1::int + 1", 1) == 2
+
+        assert (db_manager.statement_cache_hits, db_manager.statement_cache_misses) == (2, 1)
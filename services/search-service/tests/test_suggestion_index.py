@@ -0,0 +1,172 @@
+"""
+Unit tests for the in-process typeahead suggestion index.
+Tests substring/prefix matching, incremental updates and the Postgres-free suggestion path.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.services.query_history_service import QueryHistoryService
+from app.services.suggestion_index import SuggestionIndex
+
+OPTIONS = {
+    "accounts": ["ACC012345", "ACC099999"],
+    "asset_types": ["BOND", "CDS", "FX", "IRS"],
+    "booking_systems": ["HIGHGARDEN", "WINTERFELL"],
+    "affirmation_systems": ["TRAI"],
+    "clearing_houses": ["DTCC", "LCH"],
+    "statuses": ["ALLEGED", "CANCELLED", "CLEARED", "REJECTED"],
+}
+
+TRADE_IDS = (1000, 10001, 10002, 20000, 100000)
+
+HISTORY = [
+    {"id": 7, "query_text": "cleared FX trades", "is_saved": True, "query_name": "fx", "create_time": None,
+     "last_use_time": None},
+    {"id": 5, "query_text": "rejected IRS trades at LCH", "is_saved": False, "query_name": None,
+     "create_time": None, "last_use_time": None},
+]  # fmt: skip
+
+
+@pytest.fixture
+async def index():
+    """Index loaded from fixed filter values, over a database holding TRADE_IDS and one user's history."""
+    index = SuggestionIndex(rebuild_interval=60, history_per_user=10, max_users=2, history_ttl=60)
+    index.options_service = AsyncMock()
+    index.options_service.get_options.return_value = OPTIONS
+    index.db = AsyncMock()
+    index.db.fetch.side_effect = _fetch
+    await index.rebuild()
+    return index
+
+
+async def _fetch(query, *args):
+    """Answer the prefix query like Postgres would over TRADE_IDS, and anything else with HISTORY."""
+    if query != SuggestionIndex.TRADE_ID_PREFIX_QUERY:
+        return HISTORY
+    lows, highs, limit = args
+    return [
+        {"id": trade_id}
+        for low, high in zip(lows, highs, strict=True)
+        for trade_id in [trade_id for trade_id in TRADE_IDS if low <= trade_id < high][:limit]
+    ]
+
+
+class TestFieldMatches:
+    """Substring and prefix lookups."""
+
+    @pytest.mark.asyncio
+    async def test_substring_match_like_ilike(self, index):
+        """Test trigram lookup finds case-insensitive substrings in any field."""
+        assert await index.field_matches("learED", 25) == [("Status", "status", "CLEARED")]
+        assert await index.field_matches("garde", 25) == [("Booking system", "booking system", "HIGHGARDEN")]
+
+    @pytest.mark.asyncio
+    async def test_short_query_scans_values(self, index):
+        """Test that two-character queries (no full trigram) still match substrings."""
+        matches = await index.field_matches("cc", 25)
+
+        assert ("Account", "account", "ACC012345") in matches
+        assert ("Clearing house", "clearing house", "DTCC") in matches
+
+    @pytest.mark.asyncio
+    async def test_per_field_limit_in_value_order(self, index):
+        """Test that each field returns its first values in sorted order."""
+        assert await index.field_matches("acc0", 1) == [("Account", "account", "ACC012345")]
+
+    @pytest.mark.asyncio
+    async def test_trade_id_prefix_in_text_order(self, index):
+        """Test that trade ids match by prefix and sort like ORDER BY id::text."""
+        assert await index.trade_id_matches("100", 10) == [1000, 100000, 10001, 10002]
+        assert await index.trade_id_matches("100", 2) == [1000, 100000]
+        assert await index.trade_id_matches("3", 10) == []
+        assert await index.trade_id_matches("fx", 10) == []
+
+    @pytest.mark.asyncio
+    async def test_trade_id_prefix_is_bounded_range_query(self, index):
+        """Test that ids come from one range per id length up to the INTEGER maximum, each capped at limit."""
+        index.db.fetch.reset_mock()
+
+        await index.trade_id_matches("21", 5)
+
+        query, lows, highs, limit = index.db.fetch.await_args.args
+        assert query == SuggestionIndex.TRADE_ID_PREFIX_QUERY
+        assert lows == [21 * 10**k for k in range(9)]  # 2.1e9 is the last start within 2^31 - 1
+        assert highs == [22 * 10**k for k in range(9)]
+        assert limit == 5
+        assert await index.trade_id_matches("3000000000", 5) == []
+
+
+class TestIncrementalUpdates:
+    """Trade change events and history writes."""
+
+    @pytest.mark.asyncio
+    async def test_trade_change_adds_new_values(self, index):
+        """Test that a new trade's unseen field values become searchable."""
+        await index.apply_trade_change(
+            100500, {"account": "ACC777777", "asset_type": "FX", "status": "CLEARED"}, {"trade_id": "100500"}
+        )
+
+        assert ("Account", "account", "ACC777777") in await index.field_matches("777", 25)
+        assert index.stats()["values"] == sum(len(values) for values in OPTIONS.values()) + 1
+
+    @pytest.mark.asyncio
+    async def test_history_record_and_forget(self, index):
+        """Test that saved queries appear at once and updates force a reload."""
+        assert [row["id"] for row in await index.history_matches("alice", "trades", 10)] == [7, 5]
+
+        index.record_history("alice", 9, "pending CDS trades")
+        assert [row["id"] for row in await index.history_matches("alice", "trades", 10)] == [9, 7, 5]
+
+        index.forget_history("alice")
+        assert [row["id"] for row in await index.history_matches("alice", "trades", 10)] == [7, 5]
+
+    @pytest.mark.asyncio
+    async def test_stale_history_is_served_while_refreshing(self, index):
+        """Test that history past its TTL is answered from cache and reloaded in the background."""
+        await index.history_matches("alice", "trades", 10)
+        index.history_ttl = 0
+        index.db.fetch.reset_mock()
+        index.db.fetch.side_effect = None
+        index.db.fetch.return_value = [HISTORY[1]]
+
+        stale = await index.history_matches("alice", "trades", 10)
+        await asyncio.gather(*index._refreshing.values())
+
+        assert [row["id"] for row in stale] == [7, 5]
+        index.db.fetch.assert_awaited_once()
+        index.history_ttl = 60
+        assert [row["id"] for row in await index.history_matches("alice", "trades", 10)] == [5]
+
+    @pytest.mark.asyncio
+    async def test_cached_users_are_bounded(self, index):
+        """Test that the least recently used user's history is evicted."""
+        for user in ("alice", "bob", "carol"):
+            await index.history_matches(user, "x", 10)
+
+        assert index.stats()["cached_users"] == 2
+
+
+class TestSuggestionsFromIndex:
+    """QueryHistoryService.get_suggestions on the index."""
+
+    @pytest.mark.asyncio
+    async def test_suggestions_do_not_query_postgres(self, index):
+        """Test that a ready index answers without any SQL from the service."""
+        await index.history_matches("alice", "warm", 10)  # History cached
+        service = QueryHistoryService()
+        failing_db = AsyncMock()
+        failing_db.fetch.side_effect = AssertionError("Postgres should not be queried")
+
+        with (
+            patch("app.services.query_history_service.suggestion_index", index),
+            patch("app.services.query_history_service.db_manager", failing_db),
+        ):
+            suggestions = await service.get_suggestions(user_id="alice", query="cleared")
+
+        by_text = {item["query_text"]: item for item in suggestions}
+        assert by_text["cleared FX trades"]["category"] == "History"
+        assert by_text["cleared FX trades"]["query_id"] == 7
+        assert by_text["status CLEARED"]["category"] == "Status"
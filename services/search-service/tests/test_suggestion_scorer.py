@@ -0,0 +1,99 @@
+"""
+Unit tests for the batch suggestion scorer.
+Tests score parity with the per-candidate formula, long-tail skipping and top-k selection.
+"""
+
+from difflib import SequenceMatcher
+
+import numpy as np
+import pytest
+
+from app.services.suggestion_scorer import NgramScorer
+
+CANDIDATES = [
+    "cleared fx trades",
+    "show me cleared fx trades at lch",
+    "rejected irs trades",
+    "fx cleared",
+    "acc012345",
+    "",
+    "z",
+]
+
+
+def legacy_score(query: str, candidate: str) -> float:
+    """Per-candidate SequenceMatcher formula NgramScorer replaces."""
+    ratio = SequenceMatcher(None, query, candidate).ratio()
+    if candidate.startswith(query):
+        ratio += 0.3
+    elif query in candidate:
+        ratio += 0.1
+    query_tokens, candidate_tokens = set(query.split()), set(candidate.split())
+    if query_tokens and candidate_tokens:
+        ratio += 0.2 * len(query_tokens & candidate_tokens) / len(query_tokens | candidate_tokens)
+    return min(ratio, 1.5)
+
+
+@pytest.fixture
+def scorer():
+    """Scorer over a small mixed candidate list, including empty and one-character texts."""
+    return NgramScorer(CANDIDATES)
+
+
+class TestScores:
+    """Batch scores against the per-candidate formula."""
+
+    @pytest.mark.parametrize("query", ["cleared fx", "rejected", "acc01", "trades at lch"])
+    def test_close_to_legacy_formula(self, scorer, query):
+        """Test that every candidate sharing a bigram scores within 0.1 of the SequenceMatcher formula."""
+        scores = scorer.scores(query)
+
+        for candidate, score in zip(CANDIDATES, scores, strict=True):
+            if score > 0:
+                assert score == pytest.approx(legacy_score(query, candidate), abs=0.1)
+
+    def test_bonuses_and_cap(self, scorer):
+        """Test prefix, substring and token bonuses, and the 1.5 cap on an exact match."""
+        scores = scorer.scores("cleared fx trades")
+
+        assert scores[0] == pytest.approx(1.5)
+        assert scores[1] > scores[3]  # Contains the query (+0.1) vs. shares tokens only
+
+    def test_candidates_without_shared_bigrams_are_zero(self, scorer):
+        """Test that the long tail (no bigram in common) is never scored."""
+        scores = scorer.scores("qq")
+
+        assert not scores.any()
+        assert scores.dtype == np.float32
+
+    def test_repeated_tokens_and_unicode(self):
+        """Test that repeated bigrams and tokens count once and non-ASCII text hashes consistently."""
+        scorer = NgramScorer(["échec échec", "échec"])
+
+        scores = scorer.scores("échec")
+
+        # Distinct bigrams: 4 shared of 4 and 6 -> Dice 0.8; prefix +0.3; tokens {échec} == {échec} -> +0.2
+        assert scores[0] == pytest.approx(0.8 + 0.3 + 0.2)
+        assert scores[1] == pytest.approx(1.5)
+
+    def test_empty_candidate_list(self):
+        """Test that an empty scorer returns an empty score array."""
+        assert len(NgramScorer([]).scores("fx")) == 0
+
+
+class TestTopK:
+    """Top-k selection."""
+
+    def test_best_first_with_min_score(self):
+        """Test that top_k orders by score and drops scores under min_score."""
+        scores = np.array([0.2, 0.9, 0.5, 0.7], dtype=np.float32)
+
+        assert NgramScorer.top_k(scores, 2, 0.0) == [1, 3]
+        assert NgramScorer.top_k(scores, 10, 0.6) == [1, 3]
+        assert NgramScorer.top_k(scores, 0, 0.0) == []
+
+    def test_ties_keep_candidate_order(self):
+        """Test that equal scores keep their original order at the k boundary."""
+        scores = np.array([0.5, 0.9, 0.5, 0.5], dtype=np.float32)
+
+        assert NgramScorer.top_k(scores, 3, 0.0) == [1, 0, 2]
@@ -0,0 +1,76 @@
+"""
+Unit tests for compact tool-result encoding.
+Tests the columnar layout, the "others" bucket, rounding and the character budget, and its use in the FC loop.
+"""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from app.models.chat import ChatRequest
+from app.models.domain import ExtractedParams
+from app.services.tool_result_encoder import encode_tool_result
+
+ROWS = [
+    {"dimension_1": system, "exception_count": count, "affected_trades": count - 1, "share": count / 7}
+    for system, count in [("LCH", 40), ("DTCC", 31), ("CME", 9), ("EUREX", 5), ("JSCC", 2)]
+]
+
+
+class TestEncodeToolResult:
+    """encode_tool_result."""
+
+    def test_rows_become_columns_with_others_bucket(self):
+        """Test that row dicts are sent as a header plus value rows, with rows past top-k summed into others."""
+        encoded = encode_tool_result({"row_count": 5, "sample": ROWS}, max_chars=4000, max_rows=2)
+
+        result = json.loads(encoded)
+        assert result["row_count"] == 5
+        assert result["sample"]["columns"] == ["dimension_1", "exception_count", "affected_trades", "share"]
+        assert result["sample"]["rows"] == [["LCH", 40, 39, 5.71], ["DTCC", 31, 30, 4.43]]
+        assert result["sample"]["others"] == {"rows": 3, "exception_count": 16}
+        assert " " not in encoded
+        assert len(encoded) < len(json.dumps({"row_count": 5, "sample": ROWS}))
+
+    def test_budget_drops_rows_before_truncating(self):
+        """Test that rows are halved into others until the encoding fits the budget."""
+        rows = [{"account": f"ACC{i:05d}", "exception_count": 1} for i in range(100)]
+
+        encoded = encode_tool_result({"sample": rows}, max_chars=300, max_rows=25)
+
+        result = json.loads(encoded)
+        assert len(encoded) <= 300
+        kept = len(result["sample"]["rows"])
+        assert 0 < kept < 25
+        assert result["sample"]["others"] == {"rows": 100 - kept, "exception_count": 100 - kept}
+
+    def test_oversized_scalar_is_truncated_to_budget(self):
+        """Test that a payload with no rows to drop is cut to the budget as valid JSON."""
+        encoded = encode_tool_result({"error": 'bad "value" ' * 200}, max_chars=200, max_rows=10)
+
+        assert len(encoded) <= 200
+        assert json.loads(encoded)["truncated"] is True
+
+
+class TestChatIntegration:
+    """Tool results sent back to Gemini by _run_tool_calling_loop."""
+
+    @pytest.mark.asyncio
+    async def test_function_response_uses_compact_encoding(self, scripted_chat_service):
+        """Test that the function response carries the budgeted columnar encoding."""
+        sent: list = []
+        preview = {"dimensions": ["clearing_house"], "row_count": 5, "sample": ROWS}
+        service = scripted_chat_service(
+            [("get_exception_analytics", {})],
+            "Ok",
+            tool_result={"evidence": {}, "result_preview": preview},
+            on_send=sent.append,
+        )
+
+        with patch("app.services.chat_service.settings.CHAT_TOOL_RESULT_MAX_ROWS", 3):
+            await service._run_tool_calling_loop(ChatRequest(user_id="alice", message="by house"), ExtractedParams())
+
+        result = json.loads(sent[1].parts[0].function_response.response["result"])
+        assert len(result["sample"]["rows"]) == 3
+        assert result["sample"]["others"] == {"rows": 2, "exception_count": 7}